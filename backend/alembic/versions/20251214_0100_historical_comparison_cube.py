@@ -0,0 +1,191 @@
+"""Add historical comparison cube.
+
+Revision ID: 021_historical_comparison_cube
+Revises: 020_add_organization_id_to_budget_versions
+Create Date: 2025-12-14
+
+Creates historical_comparison_cube: one row per (module, dimension type,
+planning fiscal year, dimension code) holding the N-1 and N-2 actual values
+used by the historical comparison grids. The table is rebuilt by
+HistoricalComparisonService.refresh_cube after historical imports, and is
+backfilled here from existing historical_actuals.
+
+Note: historical_actuals has no organization column and its select policy
+lets every authenticated user read it (school-wide actuals), so the cube is
+not keyed by organization either and gets the same policies.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "021_historical_comparison_cube"
+down_revision: str | None = "020_add_organization_id_to_budget_versions"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create and backfill historical_comparison_cube."""
+    historical_module_code = postgresql.ENUM(
+        name="historicalmodulecode",
+        schema="efir_budget",
+        create_type=False,
+    )
+    historical_dimension_type = postgresql.ENUM(
+        name="historicaldimensiontype",
+        schema="efir_budget",
+        create_type=False,
+    )
+
+    op.create_table(
+        "historical_comparison_cube",
+        sa.Column(
+            "module_code",
+            historical_module_code,
+            nullable=False,
+            comment="Module identifier: enrollment, dhg, revenue, costs, capex",
+        ),
+        sa.Column(
+            "dimension_type",
+            historical_dimension_type,
+            nullable=False,
+            comment="Type of dimension: level, subject, account_code, etc.",
+        ),
+        sa.Column(
+            "fiscal_year",
+            sa.Integer(),
+            nullable=False,
+            comment="Planning fiscal year the history is compared against (N)",
+        ),
+        sa.Column(
+            "dimension_code",
+            sa.String(50),
+            nullable=False,
+            comment="Human-readable code (level_code, account_code, subject_code)",
+        ),
+        sa.Column(
+            "n_minus_1_value",
+            sa.Numeric(15, 2),
+            nullable=True,
+            comment="Actual value of fiscal year N-1",
+        ),
+        sa.Column(
+            "n_minus_2_value",
+            sa.Numeric(15, 2),
+            nullable=True,
+            comment="Actual value of fiscal year N-2",
+        ),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("NOW()"),
+            comment="When the row was last rebuilt",
+        ),
+        sa.PrimaryKeyConstraint(
+            "module_code",
+            "dimension_type",
+            "fiscal_year",
+            "dimension_code",
+            name="pk_historical_comparison_cube",
+        ),
+        schema="efir_budget",
+        comment="Precomputed N-1 / N-2 historical values per planning fiscal year",
+    )
+
+    # Backfill: every historical year feeds planning years Y+1 (as N-1) and Y+2 (as N-2)
+    op.execute(
+        """
+        INSERT INTO efir_budget.historical_comparison_cube (
+            module_code, dimension_type, fiscal_year, dimension_code,
+            n_minus_1_value, n_minus_2_value
+        )
+        SELECT
+            h.module_code,
+            h.dimension_type,
+            t.target_year,
+            h.dimension_code,
+            MAX(CASE WHEN h.fiscal_year = t.target_year - 1 THEN h.value END),
+            MAX(CASE WHEN h.fiscal_year = t.target_year - 2 THEN h.value END)
+        FROM (
+            SELECT
+                module_code,
+                dimension_type,
+                dimension_code,
+                fiscal_year,
+                CASE
+                    WHEN module_code = 'enrollment' THEN annual_count
+                    WHEN module_code = 'class_structure' THEN annual_classes
+                    WHEN module_code = 'dhg' THEN COALESCE(NULLIF(annual_fte, 0), annual_hours)
+                    ELSE annual_amount_sar
+                END AS value
+            FROM efir_budget.historical_actuals
+            WHERE deleted_at IS NULL
+        ) h
+        JOIN (
+            SELECT DISTINCT fiscal_year + 1 AS target_year
+            FROM efir_budget.historical_actuals
+            WHERE deleted_at IS NULL
+            UNION
+            SELECT DISTINCT fiscal_year + 2
+            FROM efir_budget.historical_actuals
+            WHERE deleted_at IS NULL
+        ) t ON h.fiscal_year IN (t.target_year - 1, t.target_year - 2)
+        GROUP BY h.module_code, h.dimension_type, t.target_year, h.dimension_code;
+        """
+    )
+
+    op.execute(
+        "ALTER TABLE efir_budget.historical_comparison_cube ENABLE ROW LEVEL SECURITY;"
+    )
+    op.execute(
+        """
+        CREATE POLICY "historical_comparison_cube_select_policy"
+        ON efir_budget.historical_comparison_cube
+        FOR SELECT
+        TO authenticated
+        USING (true);
+        """
+    )
+    # Rebuilt by the same users allowed to import historical actuals
+    op.execute(
+        """
+        CREATE POLICY "historical_comparison_cube_admin_all_policy"
+        ON efir_budget.historical_comparison_cube
+        FOR ALL
+        TO authenticated
+        USING (
+            EXISTS (
+                SELECT 1 FROM auth.users
+                WHERE id = auth.uid()
+                AND raw_user_meta_data->>'role' IN ('admin', 'finance_director')
+            )
+        )
+        WITH CHECK (
+            EXISTS (
+                SELECT 1 FROM auth.users
+                WHERE id = auth.uid()
+                AND raw_user_meta_data->>'role' IN ('admin', 'finance_director')
+            )
+        );
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop historical_comparison_cube."""
+    op.execute(
+        'DROP POLICY IF EXISTS "historical_comparison_cube_admin_all_policy" '
+        "ON efir_budget.historical_comparison_cube;"
+    )
+    op.execute(
+        'DROP POLICY IF EXISTS "historical_comparison_cube_select_policy" '
+        "ON efir_budget.historical_comparison_cube;"
+    )
+    op.drop_table("historical_comparison_cube", schema="efir_budget")
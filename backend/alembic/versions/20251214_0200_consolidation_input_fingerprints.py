@@ -0,0 +1,56 @@
+"""Add input fingerprints to consolidation and financial statements.
+
+Stores, with each consolidation line and financial statement, a fingerprint
+of the rows it was computed from (per-table row count and latest updated_at).
+Consolidation and statement generation reuse the stored result while the
+fingerprint of their inputs still matches.
+
+Existing rows keep a NULL fingerprint and are recomputed on next request.
+
+Revision ID: 022_consolidation_input_fingerprints
+Revises: 021_historical_comparison_cube
+Create Date: 2025-12-14
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "022_consolidation_input_fingerprints"
+down_revision: str | None = "021_historical_comparison_cube"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add input_fingerprint columns."""
+    op.add_column(
+        "budget_consolidations",
+        sa.Column(
+            "input_fingerprint",
+            sa.String(64),
+            nullable=True,
+            comment="Fingerprint of the planning inputs this line was consolidated from",
+        ),
+        schema="efir_budget",
+    )
+    op.add_column(
+        "financial_statements",
+        sa.Column(
+            "input_fingerprint",
+            sa.String(64),
+            nullable=True,
+            comment="Fingerprint of the consolidation this statement was generated from",
+        ),
+        schema="efir_budget",
+    )
+
+
+def downgrade() -> None:
+    """Drop input_fingerprint columns."""
+    op.drop_column("financial_statements", "input_fingerprint", schema="efir_budget")
+    op.drop_column("budget_consolidations", "input_fingerprint", schema="efir_budget")
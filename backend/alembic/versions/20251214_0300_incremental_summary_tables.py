@@ -0,0 +1,204 @@
+"""Add incrementally maintained per-version summary tables.
+
+Revision ID: 023_incremental_summary_tables
+Revises: 022_consolidation_input_fingerprints
+Create Date: 2025-12-14
+
+Refreshing mv_kpi_dashboard and mv_budget_consolidation recomputes every
+budget version, even when a single version changed. This migration adds:
+
+- v_kpi_dashboard / v_budget_consolidation: plain views with the exact
+  definitions of the materialized views. Both group by budget version, so a
+  filter on budget_version_id is pushed below the aggregation.
+- kpi_dashboard_summary / budget_consolidation_summary: tables holding the
+  same rows as the materialized views, keyed by budget_version_id and
+  backfilled here.
+- summary_dirty_versions: append-only log of budget versions whose summary
+  rows are stale. It has a surrogate key, so writers only ever insert new
+  rows and never wait on each other or on a refresh.
+- mark_summary_dirty statement-level triggers (with transition tables) on
+  budget_versions and every planning table read by the summaries, logging
+  each written version once per statement.
+
+MaterializedViewService.refresh_dirty claims the committed log rows (skipping
+rows locked by a concurrent claim) in a short transaction of its own, then
+recomputes the summary rows of those versions only. Rows logged by writers
+that have not committed yet are invisible to the claim and picked up by the
+next refresh. Rebuilds of the same version take a transaction-scoped advisory
+lock, because budget_consolidation_summary has no unique key and overlapping
+DELETE + INSERT rebuilds would otherwise duplicate its rows. The materialized
+views are kept for the full-refresh endpoints.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "023_incremental_summary_tables"
+down_revision: str | None = "022_consolidation_input_fingerprints"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Table -> column holding the budget version id of a written row
+DIRTY_TRIGGER_TABLES: dict[str, str] = {
+    "budget_versions": "id",
+    "enrollment_plans": "budget_version_id",
+    "class_structures": "budget_version_id",
+    "dhg_teacher_requirements": "budget_version_id",
+    "teacher_allocations": "budget_version_id",
+    "revenue_plans": "budget_version_id",
+    "personnel_cost_plans": "budget_version_id",
+    "operating_cost_plans": "budget_version_id",
+    "capex_plans": "budget_version_id",
+    "budget_consolidations": "budget_version_id",
+}
+
+# Transition tables are only allowed on single-event triggers
+TRIGGER_EVENTS: dict[str, str] = {
+    "ins": "INSERT REFERENCING NEW TABLE AS new_rows",
+    "upd": "UPDATE REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "del": "DELETE REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Create summary tables, dirty tracking and triggers."""
+    # Plain views reusing the materialized view definitions verbatim
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            EXECUTE 'CREATE VIEW efir_budget.v_kpi_dashboard AS '
+                || pg_get_viewdef('efir_budget.mv_kpi_dashboard'::regclass);
+            EXECUTE 'CREATE VIEW efir_budget.v_budget_consolidation AS '
+                || pg_get_viewdef('efir_budget.mv_budget_consolidation'::regclass);
+        END
+        $$;
+        """
+    )
+
+    # Summary tables, backfilled for all versions
+    op.execute(
+        """
+        CREATE TABLE efir_budget.kpi_dashboard_summary AS
+        SELECT * FROM efir_budget.v_kpi_dashboard;
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE efir_budget.kpi_dashboard_summary
+        ADD CONSTRAINT pk_kpi_dashboard_summary PRIMARY KEY (budget_version_id);
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX idx_kpi_dashboard_summary_fiscal_year_status
+        ON efir_budget.kpi_dashboard_summary(fiscal_year, status);
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TABLE efir_budget.budget_consolidation_summary AS
+        SELECT * FROM efir_budget.v_budget_consolidation;
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX idx_consolidation_summary_version_account
+        ON efir_budget.budget_consolidation_summary(budget_version_id, account_code);
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX idx_consolidation_summary_category
+        ON efir_budget.budget_consolidation_summary(consolidation_category);
+        """
+    )
+
+    # Dirty tracking: insert-only, so concurrent writers never conflict
+    op.execute(
+        """
+        CREATE TABLE efir_budget.summary_dirty_versions (
+            id BIGSERIAL PRIMARY KEY,
+            budget_version_id UUID NOT NULL,
+            marked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX idx_summary_dirty_versions_version
+        ON efir_budget.summary_dirty_versions(budget_version_id);
+        """
+    )
+    op.execute(
+        """
+        COMMENT ON TABLE efir_budget.summary_dirty_versions IS
+        'Log of budget versions whose summary table rows must be recomputed';
+        """
+    )
+
+    # TG_ARGV[0] names the column holding the budget version id
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION efir_budget.mark_summary_dirty()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql
+        SET search_path = ''
+        AS $$
+        DECLARE
+            version_column TEXT := TG_ARGV[0];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                EXECUTE format(
+                    'INSERT INTO efir_budget.summary_dirty_versions (budget_version_id)
+                     SELECT DISTINCT %1$I FROM new_rows',
+                    version_column
+                );
+            ELSIF TG_OP = 'UPDATE' THEN
+                EXECUTE format(
+                    'INSERT INTO efir_budget.summary_dirty_versions (budget_version_id)
+                     SELECT %1$I FROM new_rows UNION SELECT %1$I FROM old_rows',
+                    version_column
+                );
+            ELSE
+                EXECUTE format(
+                    'INSERT INTO efir_budget.summary_dirty_versions (budget_version_id)
+                     SELECT DISTINCT %1$I FROM old_rows',
+                    version_column
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    for table, version_column in DIRTY_TRIGGER_TABLES.items():
+        for suffix, event in TRIGGER_EVENTS.items():
+            op.execute(
+                f"""
+                CREATE TRIGGER mark_summary_dirty_{suffix}
+                AFTER {event}
+                ON efir_budget.{table}
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION efir_budget.mark_summary_dirty('{version_column}');
+                """
+            )
+
+
+def downgrade() -> None:
+    """Drop triggers, dirty tracking and summary tables."""
+    for table in DIRTY_TRIGGER_TABLES:
+        for suffix in TRIGGER_EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS mark_summary_dirty_{suffix} ON efir_budget.{table};")
+    op.execute("DROP FUNCTION IF EXISTS efir_budget.mark_summary_dirty();")
+    op.execute("DROP TABLE IF EXISTS efir_budget.summary_dirty_versions;")
+    op.execute("DROP TABLE IF EXISTS efir_budget.budget_consolidation_summary;")
+    op.execute("DROP TABLE IF EXISTS efir_budget.kpi_dashboard_summary;")
+    op.execute("DROP VIEW IF EXISTS efir_budget.v_budget_consolidation;")
+    op.execute("DROP VIEW IF EXISTS efir_budget.v_kpi_dashboard;")
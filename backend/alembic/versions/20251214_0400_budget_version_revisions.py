@@ -0,0 +1,194 @@
+"""Add per-version data revisions maintained by statement triggers.
+
+Revision ID: 024_budget_version_revisions
+Revises: 023_incremental_summary_tables
+Create Date: 2025-12-14
+
+Read endpoints answer conditional GETs (If-None-Match) with ETags derived
+from a data revision per budget version. This migration adds:
+
+- budget_version_revisions: insert-only write log, backfilled here with one
+  row per budget version. It has a surrogate key, so writers only ever
+  insert new rows and never wait on each other (the summary refresh writes
+  versioned tables too). The revision of a version is the sum of the write
+  counts of its rows.
+- bump_data_revision statement-level triggers (with transition tables) on
+  every versioned table: each INSERT, UPDATE or DELETE statement logs the
+  versions it wrote once, however many rows it touched. Service ORM
+  flushes, bulk upserts, INSERT ... SELECT consolidation and the writeback
+  service's SQL are all covered.
+- bump_budget_version_revision row triggers on budget_versions (name,
+  status and other version fields appear in read responses). Deleting a
+  version deletes its log rows.
+
+The log lives apart from budget_versions: updating budget_versions would
+fire its approved version edit guard, updated_at and summary dirty triggers.
+The summary refresh scheduler compacts it (data_revision.compact_data_revisions)
+into one row per version.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "024_budget_version_revisions"
+down_revision: str | None = "023_incremental_summary_tables"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Tables with a budget_version_id column whose writes change the version's data
+REVISION_TRIGGER_TABLES: tuple[str, ...] = (
+    "aefe_positions",
+    "budget_consolidation_summary",
+    "budget_consolidations",
+    "budget_vs_actual",
+    "capex_plans",
+    "class_size_params",
+    "class_structures",
+    "dhg_subject_hours",
+    "dhg_teacher_requirements",
+    "employee_salaries",
+    "employees",
+    "enrollment_plans",
+    "enrollment_projection_configs",
+    "eos_provisions",
+    "fee_structure",
+    "financial_statements",
+    "kpi_dashboard_summary",
+    "kpi_values",
+    "nationality_distributions",
+    "operating_cost_plans",
+    "personnel_cost_plans",
+    "planning_cells",
+    "revenue_plans",
+    "subject_hours_matrix",
+    "teacher_allocations",
+    "teacher_cost_params",
+    "timetable_constraints",
+)
+
+# Transition tables are only allowed on single-event triggers
+TRIGGER_EVENTS: dict[str, str] = {
+    "ins": "INSERT REFERENCING NEW TABLE AS new_rows",
+    "upd": "UPDATE REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "del": "DELETE REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Create the revision log, bump functions and triggers."""
+    op.execute(
+        """
+        CREATE TABLE efir_budget.budget_version_revisions (
+            id BIGSERIAL PRIMARY KEY,
+            budget_version_id UUID NOT NULL,
+            writes BIGINT NOT NULL DEFAULT 1,
+            logged_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX idx_budget_version_revisions_version
+        ON efir_budget.budget_version_revisions(budget_version_id);
+        """
+    )
+    op.execute(
+        """
+        COMMENT ON TABLE efir_budget.budget_version_revisions IS
+        'Write log per budget version; the data revision is the sum of its write counts';
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO efir_budget.budget_version_revisions (budget_version_id)
+        SELECT id FROM efir_budget.budget_versions;
+        """
+    )
+
+    # One log row per written version and statement; insert-only
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION efir_budget.bump_data_revision()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql
+        SET search_path = ''
+        AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO efir_budget.budget_version_revisions (budget_version_id)
+                SELECT DISTINCT budget_version_id FROM new_rows;
+            ELSIF TG_OP = 'UPDATE' THEN
+                INSERT INTO efir_budget.budget_version_revisions (budget_version_id)
+                SELECT budget_version_id FROM new_rows
+                UNION
+                SELECT budget_version_id FROM old_rows;
+            ELSE
+                INSERT INTO efir_budget.budget_version_revisions (budget_version_id)
+                SELECT DISTINCT budget_version_id FROM old_rows;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    # Row triggers fire in name order: the foreign key cascade triggers
+    # (RI_ConstraintTrigger_*) run first, so the rows their deletes log go too
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION efir_budget.bump_budget_version_revision()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql
+        SET search_path = ''
+        AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM efir_budget.budget_version_revisions
+                WHERE budget_version_id = OLD.id;
+            ELSE
+                INSERT INTO efir_budget.budget_version_revisions (budget_version_id)
+                VALUES (NEW.id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    for table in REVISION_TRIGGER_TABLES:
+        for suffix, event in TRIGGER_EVENTS.items():
+            op.execute(
+                f"""
+                CREATE TRIGGER bump_data_revision_{suffix}
+                AFTER {event}
+                ON efir_budget.{table}
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION efir_budget.bump_data_revision();
+                """
+            )
+
+    op.execute(
+        """
+        CREATE TRIGGER bump_budget_version_revision
+        AFTER INSERT OR UPDATE OR DELETE ON efir_budget.budget_versions
+        FOR EACH ROW
+        EXECUTE FUNCTION efir_budget.bump_budget_version_revision();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop triggers, bump functions and the revision log."""
+    op.execute(
+        "DROP TRIGGER IF EXISTS bump_budget_version_revision ON efir_budget.budget_versions;"
+    )
+    for table in REVISION_TRIGGER_TABLES:
+        for suffix in TRIGGER_EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS bump_data_revision_{suffix} ON efir_budget.{table};")
+    op.execute("DROP FUNCTION IF EXISTS efir_budget.bump_budget_version_revision();")
+    op.execute("DROP FUNCTION IF EXISTS efir_budget.bump_data_revision();")
+    op.execute("DROP TABLE IF EXISTS efir_budget.budget_version_revisions;")
@@ -2,6 +2,7 @@
 
 from app.api.v1.admin import router as admin_router
 from app.api.v1.analysis import router as analysis_router
+from app.api.v1.batch import router as batch_router
 from app.api.v1.calculations import router as calculations_router
 from app.api.v1.configuration import router as configuration_router
 from app.api.v1.consolidation import router as consolidation_router
@@ -18,6 +19,7 @@ from app.api.v1.writeback import router as writeback_router
 __all__ = [
     "admin_router",
     "analysis_router",
+    "batch_router",
     "calculations_router",
     "configuration_router",
     "consolidation_router",
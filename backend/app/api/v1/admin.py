@@ -3,20 +3,36 @@ Admin API endpoints.
 
 Provides REST API for administrative operations:
 - Historical data import
+- Integration logs
 - Template downloads
 - System configuration
 """
 
 import io
+import uuid
+from datetime import datetime
+from decimal import Decimal
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import PaginatedResponse
 from app.database import get_db
 from app.dependencies.auth import UserDep
+from app.models.integrations import IntegrationLog
+from app.schemas.integrations import IntegrationLogResponse
+from app.services.base import BaseService
+from app.services.enrollment_calibration_service import (
+    fiscal_year_to_school_year,
+    invalidate_calibration_cache,
+)
+from app.services.exceptions import ValidationError
+from app.services.historical_comparison_service import (
+    invalidate_historical_comparison_cache,
+)
 from app.services.historical_import_service import (
     HistoricalImportService,
     ImportModule,
@@ -41,6 +57,21 @@ def get_import_service(db: AsyncSession = Depends(get_db)) -> HistoricalImportSe
     return HistoricalImportService(db)
 
 
+def get_integration_log_service(
+    db: AsyncSession = Depends(get_db),
+) -> BaseService[IntegrationLog]:
+    """
+    Dependency to get integration log service instance.
+
+    Args:
+        db: Database session
+
+    Returns:
+        BaseService for IntegrationLog
+    """
+    return BaseService(IntegrationLog, db)
+
+
 # ==============================================================================
 # Historical Import Endpoints
 # ==============================================================================
@@ -55,6 +86,28 @@ class ImportHistoryItem(BaseModel):
     last_imported: str | None
 
 
+class HistoricalActualItem(BaseModel):
+    """Imported historical actuals row."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    fiscal_year: int
+    module_code: str
+    dimension_type: str
+    dimension_id: uuid.UUID | None
+    dimension_code: str
+    dimension_name: str | None
+    annual_amount_sar: Decimal | None
+    annual_count: int | None
+    annual_fte: Decimal | None
+    annual_hours: Decimal | None
+    annual_classes: int | None
+    data_source: str
+    import_batch_id: uuid.UUID | None
+    created_at: datetime
+
+
 @router.post(
     "/historical/preview",
     response_model=ImportPreviewResult,
@@ -267,6 +320,58 @@ async def get_import_history(
     return [ImportHistoryItem(**item) for item in history]
 
 
+@router.get(
+    "/historical/rows",
+    response_model=PaginatedResponse[HistoricalActualItem],
+)
+async def list_historical_rows(
+    fiscal_year: Annotated[int | None, Query(description="Filter by fiscal year")] = None,
+    module: Annotated[str | None, Query(description="Filter by module")] = None,
+    cursor: Annotated[str | None, Query(description="Cursor from the previous page")] = None,
+    page_size: Annotated[int, Query(description="Items per page", ge=1, le=100)] = 50,
+    estimate_total: Annotated[
+        bool, Query(description="Include an estimated total (unfiltered lists only)")
+    ] = False,
+    import_service: HistoricalImportService = Depends(get_import_service),
+    user: UserDep = ...,
+):
+    """
+    List imported historical actuals rows by cursor, newest first.
+
+    Args:
+        fiscal_year: Optional filter by year
+        module: Optional filter by module
+        cursor: Cursor from the previous page (None for the first page)
+        page_size: Items per page (1-100)
+        estimate_total: Include an estimated total (unfiltered lists only)
+        import_service: Import service
+        user: Current authenticated user
+
+    Returns:
+        Paginated response with historical rows and next_cursor
+    """
+    import_module: ImportModule | None = None
+    if module:
+        try:
+            import_module = ImportModule(module.lower())
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid module: {module}",
+            )
+
+    try:
+        return await import_service.get_historical_rows_keyset(
+            fiscal_year=fiscal_year,
+            module=import_module,
+            cursor=cursor,
+            page_size=page_size,
+            estimate_total=estimate_total,
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get(
     "/historical/template/{module}",
     responses={
@@ -343,6 +448,73 @@ async def delete_historical_data(
             )
 
     await import_service._delete_existing(fiscal_year, import_module)
+    await import_service.refresh_comparison_cube(fiscal_year, import_module)
     await import_service.session.commit()
+    invalidate_historical_comparison_cache()
+
+    if import_module in (None, ImportModule.ENROLLMENT):
+        # Calibration windows reuse already-seen school years; this one changed
+        invalidate_calibration_cache(school_years=[fiscal_year_to_school_year(fiscal_year)])
 
     return None
+
+
+# ==============================================================================
+# Integration Log Endpoints
+# ==============================================================================
+
+
+@router.get(
+    "/integration-logs",
+    response_model=PaginatedResponse[IntegrationLogResponse],
+)
+async def list_integration_logs(
+    integration_type: Annotated[
+        str | None, Query(description="Filter by integration type")
+    ] = None,
+    log_status: Annotated[
+        str | None, Query(alias="status", description="Filter by operation status")
+    ] = None,
+    batch_id: Annotated[uuid.UUID | None, Query(description="Filter by batch ID")] = None,
+    cursor: Annotated[str | None, Query(description="Cursor from the previous page")] = None,
+    page_size: Annotated[int, Query(description="Items per page", ge=1, le=100)] = 50,
+    estimate_total: Annotated[
+        bool, Query(description="Include an estimated total (unfiltered lists only)")
+    ] = False,
+    log_service: BaseService[IntegrationLog] = Depends(get_integration_log_service),
+    user: UserDep = ...,
+):
+    """
+    List integration logs by cursor, newest first.
+
+    Args:
+        integration_type: Optional filter by integration type (odoo, skolengo, aefe)
+        log_status: Optional filter by operation status
+        batch_id: Optional filter by batch ID
+        cursor: Cursor from the previous page (None for the first page)
+        page_size: Items per page (1-100)
+        estimate_total: Include an estimated total (unfiltered lists only)
+        log_service: Integration log service
+        user: Current authenticated user
+
+    Returns:
+        Paginated response with integration logs and next_cursor
+    """
+    filters = {}
+    if integration_type:
+        filters["integration_type"] = integration_type
+    if log_status:
+        filters["status"] = log_status
+    if batch_id:
+        filters["batch_id"] = batch_id
+
+    try:
+        return await log_service.get_keyset_paginated(
+            cursor=cursor,
+            page_size=page_size,
+            filters=filters,
+            order_by="created_at",
+            estimate_total=estimate_total,
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -11,17 +11,26 @@ Provides REST API for:
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.pagination import PaginatedResponse
+from app.database import (
+    AsyncSessionLocal,
+    get_db,
+    get_read_db,
+    get_read_session_factory,
+)
 from app.dependencies.auth import UserDep
+from app.dependencies.etag import ETagRoute, version_etag
 from app.schemas.analysis import (
     ActivityLogEntry,
     ActualDataImportRequest,
     ActualDataImportResponse,
+    ActualDataResponse,
     AlertResponse,
     ChartDataResponse,
     ComparisonResponse,
+    DashboardBundleResponse,
     DashboardSummaryResponse,
     ForecastRevisionRequest,
     ForecastRevisionResponse,
@@ -49,8 +58,9 @@ from app.services.exceptions import (
 from app.services.kpi_service import KPIService
 from app.services.materialized_view_service import MaterializedViewService
 from app.services.strategic_service import StrategicService
+from app.services.summary_refresh_scheduler import notify_summary_write
 
-router = APIRouter(prefix="/api/v1/analysis", tags=["analysis"])
+router = APIRouter(prefix="/api/v1/analysis", tags=["analysis"], route_class=ETagRoute)
 
 
 # ============================================================================
@@ -63,11 +73,23 @@ def get_kpi_service(db: AsyncSession = Depends(get_db)) -> KPIService:
     return KPIService(db)
 
 
-def get_dashboard_service(db: AsyncSession = Depends(get_db)) -> DashboardService:
-    """Get dashboard service instance."""
+def get_kpi_read_service(db: AsyncSession = Depends(get_read_db)) -> KPIService:
+    """Get KPI service instance for read-only endpoints (may use the read replica)."""
+    return KPIService(db)
+
+
+def get_dashboard_service(db: AsyncSession = Depends(get_read_db)) -> DashboardService:
+    """Get dashboard service instance (read-only, may use the read replica)."""
     return DashboardService(db)
 
 
+def get_dashboard_session_factory(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+) -> async_sessionmaker[AsyncSession]:
+    """Get the session factory used for concurrent dashboard widget loading."""
+    return session_factory
+
+
 def get_budget_actual_service(
     db: AsyncSession = Depends(get_db),
 ) -> BudgetActualService:
@@ -75,15 +97,31 @@ def get_budget_actual_service(
     return BudgetActualService(db)
 
 
+def get_budget_actual_read_service(
+    db: AsyncSession = Depends(get_read_db),
+) -> BudgetActualService:
+    """Get budget actual service instance for read-only endpoints."""
+    return BudgetActualService(db)
+
+
 def get_strategic_service(db: AsyncSession = Depends(get_db)) -> StrategicService:
     """Get strategic service instance."""
     return StrategicService(db)
 
 
+def get_strategic_read_service(db: AsyncSession = Depends(get_read_db)) -> StrategicService:
+    """Get strategic service instance for read-only endpoints."""
+    return StrategicService(db)
+
+
 # ============================================================================
 # KPI Endpoints
 # ============================================================================
 
+# KPI reads embed kpi_definitions fields (names, units, targets, benchmarks).
+# That table is global and not logged in the per-version data revision, so
+# these routes do not answer conditional GETs with version_etag.
+
 
 @router.post(
     "/kpis/{version_id}/calculate",
@@ -106,6 +144,7 @@ async def calculate_kpis(
         kpi_codes = request.kpi_codes if request else None
         results = await kpi_service.calculate_kpis(version_id, kpi_codes)
         saved_values = await kpi_service.save_kpi_values(version_id, results)
+        notify_summary_write(db, version_id)
         await db.commit()
 
         return MessageResponse(
@@ -130,7 +169,7 @@ async def get_all_kpis(
     version_id: uuid.UUID,
     category: str | None = Query(None, description="Filter by category"),
     current_user: UserDep = None,
-    kpi_service: KPIService = Depends(get_kpi_service),
+    kpi_service: KPIService = Depends(get_kpi_read_service),
 ):
     """
     Get all calculated KPIs for a budget version.
@@ -174,7 +213,7 @@ async def get_kpi_by_type(
     version_id: uuid.UUID,
     kpi_code: str,
     current_user: UserDep = None,
-    kpi_service: KPIService = Depends(get_kpi_service),
+    kpi_service: KPIService = Depends(get_kpi_read_service),
 ):
     """Get specific KPI value for a budget version."""
     try:
@@ -212,7 +251,7 @@ async def get_kpi_trends(
     kpi_code: str,
     version_ids: list[uuid.UUID] = Query(..., description="List of version IDs"),
     current_user: UserDep = None,
-    kpi_service: KPIService = Depends(get_kpi_service),
+    kpi_service: KPIService = Depends(get_kpi_read_service),
 ):
     """Get KPI trend across multiple budget versions."""
     try:
@@ -238,7 +277,7 @@ async def get_kpi_trends(
 async def get_benchmark_comparison(
     version_id: uuid.UUID,
     current_user: UserDep = None,
-    kpi_service: KPIService = Depends(get_kpi_service),
+    kpi_service: KPIService = Depends(get_kpi_read_service),
 ):
     """Compare budget version KPIs to AEFE benchmarks."""
     try:
@@ -258,6 +297,7 @@ async def get_benchmark_comparison(
 @router.get(
     "/dashboard/{version_id}/summary",
     response_model=DashboardSummaryResponse,
+    dependencies=[Depends(version_etag)],
 )
 async def get_dashboard_summary(
     version_id: uuid.UUID,
@@ -272,9 +312,46 @@ async def get_dashboard_summary(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
+@router.get(
+    "/dashboard/{version_id}/bundle",
+    response_model=DashboardBundleResponse,
+    dependencies=[Depends(version_etag)],
+)
+async def get_dashboard_bundle(
+    version_id: uuid.UUID,
+    enrollment_breakdown: str = Query("level", description="level, nationality, or cycle"),
+    cost_breakdown: str = Query("category", description="category, account, or period"),
+    revenue_breakdown: str = Query(
+        "fee_type", description="fee_type, nationality, trimester, or period"
+    ),
+    current_user: UserDep = None,
+    dashboard_service: DashboardService = Depends(get_dashboard_service),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_dashboard_session_factory),
+):
+    """
+    Get all dashboard widgets in one response.
+
+    Returns the summary, enrollment/cost/revenue charts, alerts and KPI
+    summary. The version is loaded once and the widget aggregates run
+    concurrently; each widget reports its own duration and error.
+    """
+    try:
+        bundle = await dashboard_service.get_dashboard_bundle(
+            version_id,
+            session_factory=session_factory,
+            enrollment_breakdown=enrollment_breakdown,
+            cost_breakdown=cost_breakdown,
+            revenue_breakdown=revenue_breakdown,
+        )
+        return DashboardBundleResponse(**bundle)
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
 @router.get(
     "/dashboard/{version_id}/charts/enrollment",
     response_model=ChartDataResponse,
+    dependencies=[Depends(version_etag)],
 )
 async def get_enrollment_chart(
     version_id: uuid.UUID,
@@ -295,6 +372,7 @@ async def get_enrollment_chart(
 @router.get(
     "/dashboard/{version_id}/charts/costs",
     response_model=ChartDataResponse,
+    dependencies=[Depends(version_etag)],
 )
 async def get_cost_breakdown_chart(
     version_id: uuid.UUID,
@@ -313,6 +391,7 @@ async def get_cost_breakdown_chart(
 @router.get(
     "/dashboard/{version_id}/charts/revenue",
     response_model=ChartDataResponse,
+    dependencies=[Depends(version_etag)],
 )
 async def get_revenue_breakdown_chart(
     version_id: uuid.UUID,
@@ -335,6 +414,7 @@ async def get_revenue_breakdown_chart(
 @router.get(
     "/dashboard/{version_id}/alerts",
     response_model=list[AlertResponse],
+    dependencies=[Depends(version_etag)],
 )
 async def get_alerts(
     version_id: uuid.UUID,
@@ -398,6 +478,36 @@ async def get_comparison_data(
 # ============================================================================
 
 
+@router.get(
+    "/actuals",
+    response_model=PaginatedResponse[ActualDataResponse],
+)
+async def list_actuals(
+    fiscal_year: int | None = Query(None, description="Filter by fiscal year"),
+    period: int | None = Query(None, ge=1, le=12, description="Filter by period (month)"),
+    account_code: str | None = Query(None, description="Filter by account code"),
+    cursor: str | None = Query(None, description="Cursor from the previous page"),
+    page_size: int = Query(50, ge=1, le=100, description="Number of items per page"),
+    estimate_total: bool = Query(
+        False, description="Include an estimated total (unfiltered lists only)"
+    ),
+    current_user: UserDep = None,
+    budget_actual_service: BudgetActualService = Depends(get_budget_actual_read_service),
+):
+    """List imported actuals by cursor, newest first."""
+    try:
+        return await budget_actual_service.get_actual_data_keyset(
+            fiscal_year=fiscal_year,
+            period=period,
+            account_code=account_code,
+            cursor=cursor,
+            page_size=page_size,
+            estimate_total=estimate_total,
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.post(
     "/actuals/{version_id}/import",
     response_model=ActualDataImportResponse,
@@ -466,7 +576,7 @@ async def get_variance_report(
     ),
     material_only: bool = Query(False, description="Only material variances"),
     current_user: UserDep = None,
-    budget_actual_service: BudgetActualService = Depends(get_budget_actual_service),
+    budget_actual_service: BudgetActualService = Depends(get_budget_actual_read_service),
 ):
     """Get comprehensive variance report."""
     try:
@@ -554,7 +664,7 @@ async def create_strategic_plan(
 async def get_strategic_plan(
     plan_id: uuid.UUID,
     current_user: UserDep = None,
-    strategic_service: StrategicService = Depends(get_strategic_service),
+    strategic_service: StrategicService = Depends(get_strategic_read_service),
 ):
     """Get strategic plan by ID."""
     try:
@@ -573,7 +683,7 @@ async def get_year_projection(
     year: int,
     scenario_type: str | None = Query(None, description="Optional scenario filter"),
     current_user: UserDep = None,
-    strategic_service: StrategicService = Depends(get_strategic_service),
+    strategic_service: StrategicService = Depends(get_strategic_read_service),
 ):
     """Get financial projections for a specific year."""
     try:
@@ -632,7 +742,7 @@ async def update_scenario_assumptions(
 async def compare_scenarios(
     plan_id: uuid.UUID,
     current_user: UserDep = None,
-    strategic_service: StrategicService = Depends(get_strategic_service),
+    strategic_service: StrategicService = Depends(get_strategic_read_service),
 ):
     """Compare all scenarios in a strategic plan."""
     try:
@@ -701,9 +811,9 @@ async def refresh_all_materialized_views(
     - After budget consolidation
     - On a scheduled basis (e.g., nightly)
 
-    Performance: ~1-3 seconds total for all views.
+    Views are refreshed concurrently, each on its own connection.
     """
-    results = await MaterializedViewService.refresh_all(db)
+    results = await MaterializedViewService.refresh_all(db, session_factory=AsyncSessionLocal)
 
     # Count successes and failures
     success_count = sum(1 for r in results.values() if r["status"] == "success")
@@ -718,6 +828,24 @@ async def refresh_all_materialized_views(
     }
 
 
+@router.post(
+    "/materialized-views/refresh-dirty",
+    response_model=dict,
+    status_code=status.HTTP_200_OK,
+)
+async def refresh_dirty_summary_tables(
+    current_user: UserDep = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Refresh the per-version summary tables for changed budget versions.
+
+    Only budget versions written since the last refresh are recomputed, so
+    the cost scales with the number of changed versions, not with history.
+    """
+    return await MaterializedViewService.refresh_dirty(db)
+
+
 @router.post(
     "/materialized-views/refresh/{view_name}",
     response_model=dict,
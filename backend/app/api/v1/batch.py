@@ -0,0 +1,206 @@
+"""
+Batched read API endpoint.
+
+Planning pages load enrollment, distributions, class structure, DHG hours,
+teacher requirements, allocations and progress with separate GET requests,
+each paying authentication, rate limiting and a database connection. The
+batch endpoint accepts several reads on whitelisted planning routes, runs
+them concurrently (bounded) for the already authenticated user, and returns
+all results in one response. None of the whitelisted routes takes query
+parameters, so an operation path carrying a query string is rejected.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.v1 import planning
+from app.core.logging import logger
+from app.database import get_read_session_factory
+from app.dependencies.auth import UserDep
+from app.schemas.batch import (
+    BatchOperation,
+    BatchOperationResult,
+    BatchRequest,
+    BatchResponse,
+)
+
+router = APIRouter(prefix="/api/v1", tags=["batch"])
+
+# Maximum operations of one batch running at the same time
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+# Read endpoints allowed in a batch -> (service parameter, service factory)
+BATCH_READ_ENDPOINTS: dict[Callable[..., Any], tuple[str, Callable[[AsyncSession], Any]]] = {
+    planning.get_enrollment_plan: ("enrollment_service", planning.get_enrollment_service),
+    planning.get_enrollment_summary: ("enrollment_service", planning.get_enrollment_service),
+    planning.get_enrollment_with_distribution: (
+        "enrollment_service",
+        planning.get_enrollment_service,
+    ),
+    planning.get_distributions: ("enrollment_service", planning.get_enrollment_service),
+    planning.get_class_structure: (
+        "class_structure_service",
+        planning.get_class_structure_service,
+    ),
+    planning.get_dhg_subject_hours: ("dhg_service", planning.get_dhg_service),
+    planning.get_teacher_requirements: ("dhg_service", planning.get_dhg_service),
+    planning.get_teacher_allocations: ("dhg_service", planning.get_dhg_service),
+    planning.get_trmd_gap_analysis: ("dhg_service", planning.get_dhg_service),
+    planning.get_planning_progress: (
+        "progress_service",
+        planning.get_planning_progress_service,
+    ),
+}
+
+
+class _BatchRoute:
+    """A whitelisted GET route with its service wiring and response serializer."""
+
+    def __init__(self, route: APIRoute, service_param: str, service_factory: Callable):
+        self.route = route
+        self.service_param = service_param
+        self.service_factory = service_factory
+        self.adapter: TypeAdapter[Any] = TypeAdapter(route.response_model)
+
+    def match(self, path: str) -> dict[str, str] | None:
+        """Return the path parameters if path matches this route."""
+        match = self.route.path_regex.match(path)
+        return match.groupdict() if match else None
+
+    def serialize(self, result: Any) -> Any:
+        """Validate against the route's response model and dump as JSON data."""
+        if isinstance(result, Response):
+            # Endpoints on the fast path return already serialized JSON
+            return orjson.loads(result.body)
+        return self.adapter.dump_python(
+            self.adapter.validate_python(result, from_attributes=True), mode="json"
+        )
+
+
+BATCH_ROUTES: list[_BatchRoute] = [
+    _BatchRoute(route, *BATCH_READ_ENDPOINTS[route.endpoint])
+    for route in planning.router.routes
+    if isinstance(route, APIRoute)
+    and "GET" in route.methods
+    and route.endpoint in BATCH_READ_ENDPOINTS
+]
+
+
+def get_batch_session_factory(
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_read_session_factory),
+) -> async_sessionmaker[AsyncSession]:
+    """Get the session factory used for concurrent batch operations (read-only)."""
+    return session_factory
+
+
+def resolve_batch_route(path: str) -> tuple[_BatchRoute, dict[str, Any]] | None:
+    """
+    Find the whitelisted route serving path.
+
+    Args:
+        path: Request path, without query string
+
+    Returns:
+        Tuple of (route, path parameters), or None when not whitelisted
+
+    Raises:
+        ValueError: If a path parameter is malformed
+    """
+    for batch_route in BATCH_ROUTES:
+        params = batch_route.match(path)
+        if params is not None:
+            return batch_route, {name: uuid.UUID(value) for name, value in params.items()}
+    return None
+
+
+async def _run_operation(
+    operation: BatchOperation,
+    user: Any,
+    session_factory: async_sessionmaker[AsyncSession],
+    semaphore: asyncio.Semaphore,
+) -> BatchOperationResult:
+    """Run one operation on its own session and capture its status."""
+    start = time.perf_counter()
+    # default_id_to_path fills the id during validation
+    operation_id = operation.id or operation.path
+
+    def result(status: int, data: Any = None, error: str | None = None) -> BatchOperationResult:
+        return BatchOperationResult(
+            id=operation_id,
+            status=status,
+            data=data,
+            error=error,
+            duration_ms=round((time.perf_counter() - start) * 1000, 2),
+        )
+
+    if "?" in operation.path:
+        return result(400, error="Query strings are not supported in batch operations")
+    try:
+        resolved = resolve_batch_route(operation.path)
+    except ValueError:
+        return result(422, error="Invalid path parameter")
+    if resolved is None:
+        return result(404, error="Route not available in batch requests")
+
+    batch_route, params = resolved
+    async with semaphore:
+        try:
+            async with session_factory() as db:
+                service = batch_route.service_factory(db)
+                data = await batch_route.route.endpoint(
+                    **params, **{batch_route.service_param: service}, user=user
+                )
+                return result(200, data=batch_route.serialize(data))
+        except HTTPException as e:
+            return result(e.status_code, error=str(e.detail))
+        except Exception as e:
+            logger.error("batch_operation_failed", path=operation.path, error=str(e))
+            return result(500, error=str(e))
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch_read(
+    request: BatchRequest,
+    user: UserDep = ...,
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_batch_session_factory),
+):
+    """
+    Run several read operations on whitelisted planning routes in one request.
+
+    Operations run concurrently (at most BATCH_MAX_CONCURRENCY at a time),
+    each on its own database session, for the authenticated user of the
+    batch request. A failing operation does not fail the batch: each result
+    carries the status code and error the individual GET would have returned.
+
+    Args:
+        request: Operations to run
+        user: Current authenticated user
+        session_factory: Session factory for per-operation sessions
+
+    Returns:
+        Results in request order with per-operation timing
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    results = await asyncio.gather(
+        *(
+            _run_operation(operation, user, session_factory, semaphore)
+            for operation in request.operations
+        )
+    )
+
+    return BatchResponse(
+        results=list(results),
+        total_duration_ms=round((time.perf_counter() - start) * 1000, 2),
+    )
@@ -11,6 +11,7 @@ Provides REST API for managing system configuration and budget parameters:
 """
 
 import uuid
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -194,23 +195,50 @@ async def get_budget_versions(
     page_size: int = Query(50, ge=1, le=100, description="Number of items per page"),
     fiscal_year: int | None = Query(None, description="Filter by fiscal year"),
     status: BudgetVersionStatus | None = Query(None, description="Filter by status"),
+    pagination: Literal["page", "cursor"] = Query(
+        "page", description="Pagination mode: page number or keyset cursor"
+    ),
+    cursor: str | None = Query(None, description="Cursor from the previous page (cursor mode)"),
+    estimate_total: bool = Query(
+        False, description="Include an estimated total in cursor mode (unfiltered lists only)"
+    ),
     config_service: ConfigurationService = Depends(get_config_service),
     user: UserDep = ...,
 ):
     """
     Get paginated budget versions.
 
+    Page mode returns an exact total and page numbers. Cursor mode (also
+    selected by passing a cursor) returns next_cursor instead; every page
+    costs the same regardless of depth.
+
     Args:
         page: Page number (1-indexed)
         page_size: Number of items per page (max 100)
         fiscal_year: Optional fiscal year filter
         status: Optional status filter
+        pagination: Pagination mode ("page" or "cursor")
+        cursor: Cursor from the previous page (cursor mode)
+        estimate_total: Include an estimated total (cursor mode)
         config_service: Configuration service
         user: Current authenticated user
 
     Returns:
         Paginated response with budget versions
     """
+    if pagination == "cursor" or cursor:
+        try:
+            return await config_service.get_budget_versions_keyset(
+                cursor=cursor,
+                page_size=page_size,
+                fiscal_year=fiscal_year,
+                status=status,
+                estimate_total=estimate_total,
+            )
+        except ValidationError as e:
+            # "status" is the filter parameter here, not fastapi.status
+            raise HTTPException(status_code=400, detail=str(e))
+
     result = await config_service.get_budget_versions_paginated(
         page=page,
         page_size=page_size,
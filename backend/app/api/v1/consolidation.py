@@ -17,8 +17,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.cache import CacheInvalidator
+from app.core.responses import ORJSONResponse
 from app.database import get_db
 from app.dependencies.auth import ManagerDep, UserDep
+from app.dependencies.etag import ETagRoute, version_etag
 from app.models.consolidation import ConsolidationCategory, StatementFormat, StatementType
 from app.schemas.consolidation import (
     ApprovebudgetRequest,
@@ -42,8 +44,9 @@ from app.services.exceptions import (
     ValidationError,
 )
 from app.services.financial_statements_service import FinancialStatementsService
+from app.services.summary_refresh_scheduler import notify_summary_write
 
-router = APIRouter(prefix="/api/v1/consolidation", tags=["consolidation"])
+router = APIRouter(prefix="/api/v1/consolidation", tags=["consolidation"], route_class=ETagRoute)
 
 
 def get_consolidation_service(
@@ -206,7 +209,11 @@ def _normalize_income_statement(
 # ==============================================================================
 
 
-@router.get("/{version_id}/status", response_model=ConsolidationStatusResponse)
+@router.get(
+    "/{version_id}/status",
+    response_model=ConsolidationStatusResponse,
+    dependencies=[Depends(version_etag)],
+)
 async def get_consolidation_status(
     version_id: uuid.UUID,
     consolidation_service: ConsolidationService = Depends(_resolve_consolidation_service),
@@ -264,7 +271,80 @@ async def get_consolidation_status(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
-@router.get("/{version_id}", response_model=BudgetConsolidationResponse)
+async def _build_consolidated_budget(
+    version_id: uuid.UUID,
+    consolidation_service: ConsolidationService,
+) -> BudgetConsolidationResponse:
+    """Group a version's consolidation entries by type with summary totals."""
+    # Get consolidation entries
+    consolidations = await consolidation_service.get_consolidation(version_id)
+
+    # Get budget version info
+    budget_version = await consolidation_service.budget_version_service.get_by_id(
+        version_id
+    )
+
+    if not budget_version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Budget version {version_id} not found",
+        )
+
+    # Group items by type
+    revenue_items = []
+    personnel_items = []
+    operating_items = []
+    capex_items = []
+
+    total_revenue = Decimal("0.00")
+    total_personnel = Decimal("0.00")
+    total_operating = Decimal("0.00")
+    total_capex = Decimal("0.00")
+
+    for item in consolidations:
+        item_response = _normalize_line_item(item)
+
+        if item.is_revenue:
+            revenue_items.append(item_response)
+            total_revenue += item.amount_sar
+        elif item.source_table == "personnel_cost_plans":
+            personnel_items.append(item_response)
+            total_personnel += item.amount_sar
+        elif item.source_table == "operating_cost_plans":
+            operating_items.append(item_response)
+            total_operating += item.amount_sar
+        elif item.source_table == "capex_plans":
+            capex_items.append(item_response)
+            total_capex += item.amount_sar
+
+    # Calculate totals
+    operating_result = total_revenue - total_personnel - total_operating
+    net_result = operating_result  # Simplified - CapEx not expensed directly
+
+    return BudgetConsolidationResponse(
+        budget_version_id=version_id,
+        budget_version_name=budget_version.name,
+        fiscal_year=budget_version.fiscal_year,
+        academic_year=budget_version.academic_year,
+        status=budget_version.status,
+        revenue_items=revenue_items,
+        personnel_items=personnel_items,
+        operating_items=operating_items,
+        capex_items=capex_items,
+        total_revenue=total_revenue,
+        total_personnel_costs=total_personnel,
+        total_operating_costs=total_operating,
+        total_capex=total_capex,
+        operating_result=operating_result,
+        net_result=net_result,
+    )
+
+
+@router.get(
+    "/{version_id}",
+    response_model=BudgetConsolidationResponse,
+    dependencies=[Depends(version_etag)],
+)
 async def get_consolidated_budget(
     version_id: uuid.UUID,
     consolidation_service: ConsolidationService = Depends(_resolve_consolidation_service),
@@ -287,68 +367,9 @@ async def get_consolidated_budget(
         404: Budget version not found
     """
     try:
-        # Get consolidation entries
-        consolidations = await consolidation_service.get_consolidation(version_id)
-
-        # Get budget version info
-        budget_version = await consolidation_service.budget_version_service.get_by_id(
-            version_id
-        )
-
-        if not budget_version:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Budget version {version_id} not found",
-            )
-
-        # Group items by type
-        revenue_items = []
-        personnel_items = []
-        operating_items = []
-        capex_items = []
-
-        total_revenue = Decimal("0.00")
-        total_personnel = Decimal("0.00")
-        total_operating = Decimal("0.00")
-        total_capex = Decimal("0.00")
-
-        for item in consolidations:
-            item_response = _normalize_line_item(item)
-
-            if item.is_revenue:
-                revenue_items.append(item_response)
-                total_revenue += item.amount_sar
-            elif item.source_table == "personnel_cost_plans":
-                personnel_items.append(item_response)
-                total_personnel += item.amount_sar
-            elif item.source_table == "operating_cost_plans":
-                operating_items.append(item_response)
-                total_operating += item.amount_sar
-            elif item.source_table == "capex_plans":
-                capex_items.append(item_response)
-                total_capex += item.amount_sar
-
-        # Calculate totals
-        operating_result = total_revenue - total_personnel - total_operating
-        net_result = operating_result  # Simplified - CapEx not expensed directly
-
-        return BudgetConsolidationResponse(
-            budget_version_id=version_id,
-            budget_version_name=budget_version.name,
-            fiscal_year=budget_version.fiscal_year,
-            academic_year=budget_version.academic_year,
-            status=budget_version.status,
-            revenue_items=revenue_items,
-            personnel_items=personnel_items,
-            operating_items=operating_items,
-            capex_items=capex_items,
-            total_revenue=total_revenue,
-            total_personnel_costs=total_personnel,
-            total_operating_costs=total_operating,
-            total_capex=total_capex,
-            operating_result=operating_result,
-            net_result=net_result,
-        )
+        consolidated = await _build_consolidated_budget(version_id, consolidation_service)
+        # Already validated: serialize directly instead of through response_model
+        return ORJSONResponse(consolidated)
 
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
@@ -370,7 +391,8 @@ async def consolidate_budget(
     Run consolidation calculation for a budget version.
 
     Aggregates all planning modules (revenue, costs, CapEx) into consolidated
-    budget line items.
+    budget line items. The stored consolidation is reused when planning inputs
+    are unchanged, unless request.recalculate forces a recomputation.
 
     Args:
         version_id: Budget version UUID
@@ -386,14 +408,23 @@ async def consolidate_budget(
         400: Validation error
     """
     try:
-        # Run consolidation
-        await consolidation_service.consolidate_budget(version_id, user_id=user.user_id)
+        # Run consolidation (skipped when planning inputs are unchanged)
+        await consolidation_service.consolidate_budget(
+            version_id,
+            user_id=user.user_id,
+            force=request.recalculate,
+        )
+        recomputed = consolidation_service.last_recomputed
 
         # Invalidate consolidation and dependent caches
-        await CacheInvalidator.invalidate(str(version_id), "budget_consolidation")
+        if recomputed is not False:
+            await CacheInvalidator.invalidate(str(version_id), "budget_consolidation")
+            notify_summary_write(consolidation_service.session, version_id)
 
         # Return consolidated budget
-        return await get_consolidated_budget(version_id, consolidation_service, user)
+        response = await _build_consolidated_budget(version_id, consolidation_service)
+        response.recomputed = recomputed
+        return response
 
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
@@ -542,7 +573,11 @@ async def approve_budget(
         )
 
 
-@router.get("/{version_id}/validation", response_model=ConsolidationValidationResponse)
+@router.get(
+    "/{version_id}/validation",
+    response_model=ConsolidationValidationResponse,
+    dependencies=[Depends(version_etag)],
+)
 async def validate_budget_completeness(
     version_id: uuid.UUID,
     consolidation_service: ConsolidationService = Depends(_resolve_consolidation_service),
@@ -577,7 +612,11 @@ async def validate_budget_completeness(
         )
 
 
-@router.get("/{version_id}/summary", response_model=ConsolidationSummary)
+@router.get(
+    "/{version_id}/summary",
+    response_model=ConsolidationSummary,
+    dependencies=[Depends(version_etag)],
+)
 async def get_consolidation_summary(
     version_id: uuid.UUID,
     consolidation_service: ConsolidationService = Depends(_resolve_consolidation_service),
@@ -601,9 +640,7 @@ async def get_consolidation_summary(
     """
     try:
         # Get consolidated budget
-        full_response = await get_consolidated_budget(
-            version_id, consolidation_service, user
-        )
+        full_response = await _build_consolidated_budget(version_id, consolidation_service)
 
         # Get budget version
         budget_version = await consolidation_service.budget_version_service.get_by_id(
@@ -648,7 +685,11 @@ async def get_consolidation_summary(
 # ==============================================================================
 
 
-@router.get("/{version_id}/statements/income", response_model=IncomeStatementResponse)
+@router.get(
+    "/{version_id}/statements/income",
+    response_model=IncomeStatementResponse,
+    dependencies=[Depends(version_etag)],
+)
 async def get_income_statement(
     version_id: uuid.UUID,
     format: str = Query(
@@ -684,6 +725,7 @@ async def get_income_statement(
         data = normalized.model_dump()
         # Preserve legacy format string expected by tests/client
         data["statement_format"] = "pcg" if str(format).lower().startswith("pcg") else "ifrs"
+        data["recomputed"] = statements_service.last_recomputed
         return data
 
     except NotFoundError as e:
@@ -697,7 +739,11 @@ async def get_income_statement(
         )
 
 
-@router.get("/{version_id}/statements/balance", response_model=BalanceSheetResponse)
+@router.get(
+    "/{version_id}/statements/balance",
+    response_model=BalanceSheetResponse,
+    dependencies=[Depends(version_etag)],
+)
 async def get_balance_sheet(
     version_id: uuid.UUID,
     statements_service: FinancialStatementsService = Depends(
@@ -757,6 +803,7 @@ async def get_balance_sheet(
             assets=assets_stmt,
             liabilities=liabilities_stmt,
             is_balanced=is_balanced,
+            recomputed=statements_service.last_recomputed,
         )
 
     except NotFoundError as e:
@@ -768,7 +815,11 @@ async def get_balance_sheet(
         )
 
 
-@router.get("/{version_id}/statements/periods", response_model=list[FinancialPeriodTotals])
+@router.get(
+    "/{version_id}/statements/periods",
+    response_model=list[FinancialPeriodTotals],
+    dependencies=[Depends(version_etag)],
+)
 async def get_period_totals(
     version_id: uuid.UUID,
     statements_service: FinancialStatementsService = Depends(
@@ -824,7 +875,9 @@ async def get_period_totals(
 
 
 @router.get(
-    "/{version_id}/statements/periods/{period}", response_model=FinancialPeriodTotals
+    "/{version_id}/statements/periods/{period}",
+    response_model=FinancialPeriodTotals,
+    dependencies=[Depends(version_etag)],
 )
 async def get_period_total(
     version_id: uuid.UUID,
@@ -877,7 +930,7 @@ async def get_period_total(
 # ==============================================================================
 
 
-@router.get("/{version_id}/statements/{statement_type}")
+@router.get("/{version_id}/statements/{statement_type}", dependencies=[Depends(version_etag)])
 async def get_financial_statement(
     version_id: uuid.UUID,
     statement_type: str,
@@ -30,7 +30,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query  # noqa: E402
 from fastapi.responses import StreamingResponse  # noqa: E402
 from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
 
-from app.database import get_db  # noqa: E402
+from app.database import get_read_db  # noqa: E402
 from app.services.consolidation_service import ConsolidationService  # noqa: E402
 from app.services.kpi_service import KPIService  # noqa: E402
 
@@ -46,7 +46,7 @@ router = APIRouter(prefix="/api/v1/export", tags=["export"])
 async def export_budget_excel(
     version_id: uuid.UUID,
     include_details: bool = Query(True, description="Include detailed breakdown"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> StreamingResponse:
     global openpyxl
     """
@@ -162,7 +162,7 @@ async def export_budget_excel(
 @router.get("/kpi/{version_id}/excel")
 async def export_kpi_excel(
     version_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> StreamingResponse:
     global openpyxl
     """
@@ -249,7 +249,7 @@ async def export_kpi_excel(
 @router.get("/budget/{version_id}/pdf")
 async def export_budget_pdf(
     version_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> StreamingResponse:
     global reportlab
     """
@@ -406,7 +406,7 @@ async def export_budget_pdf(
 @router.get("/budget/{version_id}/csv")
 async def export_budget_csv(
     version_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> StreamingResponse:
     """
     Export budget line items to CSV format.
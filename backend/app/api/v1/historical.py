@@ -12,7 +12,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_read_db
 from app.schemas.historical import (
     CapExWithHistoryResponse,
     ClassStructureWithHistoryResponse,
@@ -43,7 +43,7 @@ router = APIRouter(prefix="/api/v1/historical", tags=["Historical Comparison"])
 async def get_enrollment_with_history(
     budget_version_id: UUID,
     history_years: int = Query(2, ge=1, le=5, description="Number of historical years"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> EnrollmentWithHistoryResponse:
     """Get enrollment data with historical comparison."""
     service = HistoricalComparisonService(db)
@@ -78,7 +78,7 @@ async def get_enrollment_with_history(
 async def get_classes_with_history(
     budget_version_id: UUID,
     history_years: int = Query(2, ge=1, le=5, description="Number of historical years"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> ClassStructureWithHistoryResponse:
     """Get class structure data with historical comparison."""
     service = HistoricalComparisonService(db)
@@ -123,7 +123,7 @@ async def get_classes_with_history(
 async def get_dhg_with_history(
     budget_version_id: UUID,
     history_years: int = Query(2, ge=1, le=5, description="Number of historical years"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> DHGWithHistoryResponse:
     """Get DHG data with historical comparison."""
     service = HistoricalComparisonService(db)
@@ -158,7 +158,7 @@ async def get_dhg_with_history(
 async def get_revenue_with_history(
     budget_version_id: UUID,
     history_years: int = Query(2, ge=1, le=5, description="Number of historical years"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> RevenueWithHistoryResponse:
     """Get revenue data with historical comparison."""
     service = HistoricalComparisonService(db)
@@ -193,7 +193,7 @@ async def get_revenue_with_history(
 async def get_costs_with_history(
     budget_version_id: UUID,
     history_years: int = Query(2, ge=1, le=5, description="Number of historical years"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> CostsWithHistoryResponse:
     """Get costs data with historical comparison."""
     service = HistoricalComparisonService(db)
@@ -228,7 +228,7 @@ async def get_costs_with_history(
 async def get_capex_with_history(
     budget_version_id: UUID,
     history_years: int = Query(2, ge=1, le=5, description="Number of historical years"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> CapExWithHistoryResponse:
     """Get CapEx data with historical comparison."""
     service = HistoricalComparisonService(db)
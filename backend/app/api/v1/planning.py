@@ -13,9 +13,11 @@ import uuid
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.v1.enrollment_projection import router as enrollment_projection_router
+from app.core.cache import CacheInvalidator
+from app.core.responses import validated_response
 from app.database import get_db
 from app.dependencies.auth import UserDep
+from app.dependencies.etag import ETagRoute, version_etag
 from app.schemas.planning import (
     ClassStructureCalculationRequest,
     ClassStructureResponse,
@@ -31,10 +33,14 @@ from app.schemas.planning import (
     EnrollmentTotalsBulkUpdate,
     EnrollmentWithDistributionResponse,
     FTECalculationRequest,
+    GoalSeekRequest,
+    GoalSeekResponse,
     ImpactCalculationRequest,
     ImpactCalculationResponse,
     NationalityDistributionBulkUpdate,
     NationalityDistributionResponse,
+    SensitivityAnalysisRequest,
+    SensitivityAnalysisResponse,
     TeacherAllocationBulkUpdate,
     TeacherAllocationCreate,
     TeacherAllocationResponse,
@@ -42,10 +48,12 @@ from app.schemas.planning import (
     TRMDGapAnalysisResponse,
 )
 from app.schemas.planning_progress import (
+    BudgetRecalculationResponse,
     CascadeRequest,
     CascadeResponse,
     PlanningProgressResponse,
 )
+from app.services.budget_model_service import BudgetModelService
 from app.services.cascade_service import CascadeService
 from app.services.class_structure_service import ClassStructureService
 from app.services.dhg_service import DHGService
@@ -58,11 +66,11 @@ from app.services.exceptions import (
 from app.services.impact_calculator_service import (
     ImpactCalculatorService,
     ProposedChange,
+    SensitivityDriver,
 )
 from app.services.planning_progress_service import PlanningProgressService
 
-router = APIRouter(prefix="/api/v1/planning", tags=["planning"])
-router.include_router(enrollment_projection_router)
+router = APIRouter(prefix="/api/v1/planning", tags=["planning"], route_class=ETagRoute)
 
 
 def get_enrollment_service(db: AsyncSession = Depends(get_db)) -> EnrollmentService:
@@ -129,6 +137,7 @@ def get_planning_progress_service(
 @router.get(
     "/enrollment/{version_id}",
     response_model=list[EnrollmentPlanResponse],
+    dependencies=[Depends(version_etag)],
 )
 async def get_enrollment_plan(
     version_id: uuid.UUID,
@@ -148,7 +157,7 @@ async def get_enrollment_plan(
     """
     try:
         enrollments = await enrollment_service.get_enrollment_plan(version_id)
-        return enrollments
+        return validated_response(enrollments, list[EnrollmentPlanResponse])
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
     except Exception as e:
@@ -280,6 +289,7 @@ async def delete_enrollment(
 @router.get(
     "/enrollment/{version_id}/summary",
     response_model=EnrollmentSummary,
+    dependencies=[Depends(version_etag)],
 )
 async def get_enrollment_summary(
     version_id: uuid.UUID,
@@ -351,6 +361,7 @@ async def project_enrollment(
     "/enrollment/{version_id}/with-distribution",
     response_model=EnrollmentWithDistributionResponse,
     summary="Get enrollment with nationality distribution and breakdown",
+    dependencies=[Depends(version_etag)],
 )
 async def get_enrollment_with_distribution(
     version_id: uuid.UUID,
@@ -444,6 +455,7 @@ async def bulk_upsert_enrollment_totals(
     "/distributions/{version_id}",
     response_model=list[NationalityDistributionResponse],
     summary="Get nationality distributions for a budget version",
+    dependencies=[Depends(version_etag)],
 )
 async def get_distributions(
     version_id: uuid.UUID,
@@ -466,7 +478,7 @@ async def get_distributions(
     """
     try:
         distributions = await enrollment_service.get_distributions(version_id)
-        return distributions
+        return validated_response(distributions, list[NationalityDistributionResponse])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -532,6 +544,7 @@ async def bulk_upsert_distributions(
 @router.get(
     "/class-structure/{version_id}",
     response_model=list[ClassStructureResponse],
+    dependencies=[Depends(version_etag)],
 )
 async def get_class_structure(
     version_id: uuid.UUID,
@@ -555,7 +568,7 @@ async def get_class_structure(
         class_structures = await class_structure_service.get_class_structure(
             version_id
         )
-        return class_structures
+        return validated_response(class_structures, list[ClassStructureResponse])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -661,6 +674,7 @@ async def update_class_structure(
 @router.get(
     "/dhg/subject-hours/{version_id}",
     response_model=list[DHGSubjectHoursResponse],
+    dependencies=[Depends(version_etag)],
 )
 async def get_dhg_subject_hours(
     version_id: uuid.UUID,
@@ -680,7 +694,7 @@ async def get_dhg_subject_hours(
     """
     try:
         subject_hours = await dhg_service.get_dhg_subject_hours(version_id)
-        return subject_hours
+        return validated_response(subject_hours, list[DHGSubjectHoursResponse])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -734,6 +748,7 @@ async def calculate_dhg_subject_hours(
 @router.get(
     "/dhg/teacher-requirements/{version_id}",
     response_model=list[DHGTeacherRequirementResponse],
+    dependencies=[Depends(version_etag)],
 )
 async def get_teacher_requirements(
     version_id: uuid.UUID,
@@ -753,7 +768,7 @@ async def get_teacher_requirements(
     """
     try:
         requirements = await dhg_service.get_teacher_requirements(version_id)
-        return requirements
+        return validated_response(requirements, list[DHGTeacherRequirementResponse])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -807,6 +822,7 @@ async def calculate_teacher_requirements(
 @router.get(
     "/dhg/allocations/{version_id}",
     response_model=list[TeacherAllocationResponse],
+    dependencies=[Depends(version_etag)],
 )
 async def get_teacher_allocations(
     version_id: uuid.UUID,
@@ -826,7 +842,7 @@ async def get_teacher_allocations(
     """
     try:
         allocations = await dhg_service.get_teacher_allocations(version_id)
-        return allocations
+        return validated_response(allocations, list[TeacherAllocationResponse])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -1126,6 +1142,7 @@ async def apply_dhg_and_calculate(
 @router.get(
     "/dhg/trmd/{version_id}",
     response_model=TRMDGapAnalysisResponse,
+    dependencies=[Depends(version_etag)],
 )
 async def get_trmd_gap_analysis(
     version_id: uuid.UUID,
@@ -1165,6 +1182,7 @@ async def get_trmd_gap_analysis(
     "/progress/{version_id}",
     response_model=PlanningProgressResponse,
     summary="Get planning progress and validation status",
+    dependencies=[Depends(version_etag)],
 )
 async def get_planning_progress(
     version_id: uuid.UUID,
@@ -1292,6 +1310,72 @@ async def cascade_recalculate(
         )
 
 
+def get_budget_model_service(db: AsyncSession = Depends(get_db)) -> BudgetModelService:
+    """
+    Dependency to get budget model service instance.
+
+    Args:
+        db: Database session
+
+    Returns:
+        BudgetModelService instance
+    """
+    return BudgetModelService(db)
+
+
+@router.post(
+    "/{version_id}/recalculate",
+    response_model=BudgetRecalculationResponse,
+    summary="Recalculate the whole budget version in a single pass",
+)
+async def recalculate_budget_version(
+    version_id: uuid.UUID,
+    budget_model_service: BudgetModelService = Depends(get_budget_model_service),
+    user: UserDep = ...,
+):
+    """
+    Recalculate every calculated table of a budget version in one transaction.
+
+    Loads all drivers once, runs class structure → DHG → revenue → personnel
+    costs → consolidation in memory, and bulk-writes the results. Generated
+    financial statements are dropped and rebuilt on next read.
+
+    Args:
+        version_id: Budget version UUID
+        budget_model_service: Budget model service
+        user: Current authenticated user
+
+    Returns:
+        BudgetRecalculationResponse with headline totals and row counts
+    """
+    try:
+        result, stats = await budget_model_service.recalculate(version_id, user_id=user.user_id)
+        await CacheInvalidator.invalidate(str(version_id), "enrollment")
+
+        return BudgetRecalculationResponse(
+            version_id=version_id,
+            total_students=result.total_students,
+            total_classes=result.total_classes,
+            total_teacher_fte=result.total_teacher_fte,
+            total_revenue=result.total_revenue,
+            total_costs=result.total_costs,
+            net_result=result.net_result,
+            rows_inserted=stats.inserted,
+            rows_updated=stats.updated,
+            rows_deleted=stats.deleted,
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+    except BusinessRuleError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.message
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
 # ==============================================================================
 # Impact Calculation Endpoint
 # ==============================================================================
@@ -1332,7 +1416,10 @@ async def calculate_impact(
     - Revenue impact (change in total revenue)
     - Margin impact (change in operating margin %)
 
-    The calculation is a preview only - no database changes are made.
+    The calculation is a preview only - no database changes are made. The
+    change is applied to the cached in-memory snapshot of the version and the
+    class structure, DHG, revenue and cost engines are rerun, so the deltas
+    are exact. Class size rules broken by the change are returned as warnings.
 
     Args:
         version_id: Budget version UUID
@@ -1367,7 +1454,8 @@ async def calculate_impact(
             "margin_impact_pct": 0.12,
             "margin_current_pct": 57.6,
             "margin_proposed_pct": 57.72,
-            "affected_steps": ["class_structure", "dhg", "costs", "revenue"]
+            "affected_steps": ["class_structure", "dhg", "costs", "revenue"],
+            "warnings": []
         }
     """
     try:
@@ -1402,7 +1490,70 @@ async def calculate_impact(
             margin_current_pct=impact_metrics.margin_current_pct,
             margin_proposed_pct=impact_metrics.margin_proposed_pct,
             affected_steps=impact_metrics.affected_steps,
+            warnings=impact_metrics.warnings,
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.message
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post(
+    "/{version_id}/sensitivity",
+    response_model=SensitivityAnalysisResponse,
+)
+async def calculate_sensitivity(
+    version_id: uuid.UUID,
+    request: SensitivityAnalysisRequest,
+    impact_service: ImpactCalculatorService = Depends(get_impact_calculator_service),
+    user: UserDep = ...,
+):
+    """
+    Rank budget drivers by their impact on the net result (tornado chart).
+
+    Every driver is evaluated at its low and high delta in one batch against
+    the cached in-memory snapshot of the version. Deltas are in students for
+    enrollment and class size drivers and in percent for fee and salary
+    drivers. Preview only - no database changes are made.
+
+    Args:
+        version_id: Budget version UUID
+        request: Drivers with their low/high deltas
+        impact_service: Impact calculator service
+        user: Current authenticated user
+
+    Returns:
+        SensitivityAnalysisResponse with bars ranked by descending swing
+
+    Example:
+        POST /api/v1/planning/{version_id}/sensitivity
+        {
+            "drivers": [
+                {"driver_type": "fee", "low_delta": -5, "high_delta": 5},
+                {"driver_type": "salary", "low_delta": 0, "high_delta": 3},
+                {
+                    "driver_type": "enrollment",
+                    "dimension_id": "uuid-of-level",
+                    "low_delta": -10,
+                    "high_delta": 10
+                }
+            ]
+        }
+    """
+    try:
+        result = await impact_service.calculate_sensitivity(
+            version_id=version_id,
+            drivers=[
+                SensitivityDriver(**driver.model_dump()) for driver in request.drivers
+            ],
         )
+        return SensitivityAnalysisResponse.model_validate(result)
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
     except ValidationError as e:
@@ -1413,3 +1564,64 @@ async def calculate_impact(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
+
+
+@router.post(
+    "/{version_id}/goal-seek",
+    response_model=GoalSeekResponse,
+)
+async def goal_seek(
+    version_id: uuid.UUID,
+    request: GoalSeekRequest,
+    impact_service: ImpactCalculatorService = Depends(get_impact_calculator_service),
+    user: UserDep = ...,
+):
+    """
+    Solve for the driver change that makes a metric reach a target.
+
+    Runs a bracketed secant/bisection solver over one driver; every guess
+    reruns the revenue, cost and KPI engines on the cached in-memory
+    snapshot of the version. Preview only - no database changes are made.
+
+    Args:
+        version_id: Budget version UUID
+        request: Driver, bracket and target metric
+        impact_service: Impact calculator service
+        user: Current authenticated user
+
+    Returns:
+        GoalSeekResponse with the solved change and convergence diagnostics
+
+    Example:
+        POST /api/v1/planning/{version_id}/goal-seek
+        {
+            "driver_type": "fee",
+            "target_metric": "margin_pct",
+            "target_value": 12,
+            "lower_delta": 0,
+            "upper_delta": 20
+        }
+    """
+    try:
+        result = await impact_service.goal_seek(
+            version_id=version_id,
+            driver_type=request.driver_type,
+            dimension_id=request.dimension_id,
+            target_metric=request.target_metric,
+            target_value=request.target_value,
+            lower_delta=request.lower_delta,
+            upper_delta=request.upper_delta,
+            tolerance=request.tolerance,
+            max_iterations=request.max_iterations,
+        )
+        return GoalSeekResponse.model_validate(result)
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+    except (ValidationError, BusinessRuleError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.message
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
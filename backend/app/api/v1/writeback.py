@@ -7,6 +7,7 @@ collaborative editing in AG Grid with optimistic locking and undo/redo:
 - PUT /cells/{cell_id} - Update single cell with optimistic locking
 - POST /cells/batch - Batch update multiple cells
 - GET /cells/changes/{budget_version_id} - Get change history
+- GET /cells/changes/{budget_version_id}/cursor - Get change history by cursor
 - POST /cells/undo - Undo changes in a session
 - POST /cells/{cell_id}/comments - Add comment to cell
 - POST /cells/{cell_id}/lock - Lock cell to prevent edits
@@ -29,6 +30,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import PaginatedResponse
 from app.database import get_db
 from app.dependencies.auth import PlannerDep, UserDep
 from app.schemas.writeback import (
@@ -394,6 +396,66 @@ async def get_change_history(
         )
 
 
+@router.get(
+    "/cells/changes/{budget_version_id}/cursor",
+    response_model=PaginatedResponse[CellChangeResponse],
+    summary="Get change history by cursor",
+    description="Get change history for a budget version with keyset (cursor) pagination. "
+    "Can be filtered by module, entity, or field. "
+    "Pass the next_cursor of the previous page to continue; deep pages cost "
+    "the same as the first.",
+    responses={
+        200: {"description": "Change history page retrieved"},
+        400: {"description": "Malformed cursor"},
+        401: {"description": "Not authenticated"},
+    },
+)
+async def get_change_history_by_cursor(
+    budget_version_id: Annotated[UUID, Path(description="Budget version UUID")],
+    module_code: Annotated[str | None, Query(description="Filter by module code")] = None,
+    entity_id: Annotated[UUID | None, Query(description="Filter by entity ID")] = None,
+    field_name: Annotated[str | None, Query(description="Filter by field name")] = None,
+    cursor: Annotated[str | None, Query(description="Cursor from the previous page")] = None,
+    page_size: Annotated[int, Query(ge=1, le=1000, description="Records per page")] = 100,
+    writeback_service: WritebackService = Depends(get_writeback_service),
+    user: UserDep = ...,
+):
+    """
+    Get change history for cells in a budget version, one cursor page at a time.
+
+    Changes are ordered by (changed_at, id) descending (most recent first).
+
+    Args:
+        budget_version_id: Budget version to query
+        module_code: Optional filter by module
+        entity_id: Optional filter by entity
+        field_name: Optional filter by field
+        cursor: Cursor from the previous page (None for the first page)
+        page_size: Records per page (1-1000)
+        writeback_service: Writeback service
+        user: Current authenticated user
+
+    Returns:
+        Paginated response with change history records and next_cursor
+    """
+    try:
+        return await writeback_service.get_change_history_keyset(
+            budget_version_id=budget_version_id,
+            module_code=module_code,
+            entity_id=entity_id,
+            field_name=field_name,
+            cursor=cursor,
+            page_size=page_size,
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get change history: {e!s}",
+        )
+
+
 # ==============================================================================
 # Undo Endpoint
 # ==============================================================================
@@ -700,6 +762,7 @@ async def health_check() -> dict:
             "update_cell": "PUT /cells/{cell_id}",
             "batch_update": "POST /cells/batch",
             "change_history": "GET /cells/changes/{budget_version_id}",
+            "change_history_cursor": "GET /cells/changes/{budget_version_id}/cursor",
             "undo": "POST /cells/undo",
             "add_comment": "POST /cells/{cell_id}/comments",
             "lock_cell": "POST /cells/{cell_id}/lock",
@@ -8,11 +8,10 @@ correlation IDs for request tracing, and proper log level management.
 import errno
 import logging
 import uuid
-from typing import Any
 
 import structlog
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Client disconnect errors - expected behavior, not application errors
 # These occur when clients close connections before server responds
@@ -80,65 +79,67 @@ def configure_logging() -> structlog.BoundLogger:
 logger = configure_logging()
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """
-    FastAPI middleware for request/response logging with correlation IDs.
+    ASGI middleware for request/response logging with correlation IDs.
 
     Adds a unique correlation ID to each request and logs request start/completion.
     The correlation ID is returned in the X-Correlation-ID response header.
+
+    Implemented as a raw ASGI callable: the response body is passed through
+    untouched, so streaming responses are not buffered.
     """
 
-    async def dispatch(self, request: Request, call_next: Any) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request with correlation ID and logging.
 
         Args:
-            request: FastAPI request object
-            call_next: Next middleware in chain
-
-        Returns:
-            Response with X-Correlation-ID header
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generate unique correlation ID for this request
         correlation_id = str(uuid.uuid4())
+        headers = Headers(scope=scope)
+        client = scope.get("client")
 
         # Bind correlation ID and request metadata to context
         structlog.contextvars.bind_contextvars(
             correlation_id=correlation_id,
-            path=request.url.path,
-            method=request.method,
-            client_host=request.client.host if request.client else None,
+            path=scope["path"],
+            method=scope["method"],
+            client_host=client[0] if client else None,
         )
 
         # Log request start
         logger.info(
             "request_started",
-            user_agent=request.headers.get("user-agent"),
-            content_type=request.headers.get("content-type"),
+            user_agent=headers.get("user-agent"),
+            content_type=headers.get("content-type"),
         )
 
-        try:
-            # Process request
-            response = await call_next(request)
-
-            # Tests may return mock responses; normalize to Response to avoid shared state
-            if not isinstance(response, Response):
-                response = Response(
-                    content=getattr(response, "body", b""),
-                    status_code=getattr(response, "status_code", 200),
-                    headers=dict(getattr(response, "headers", {})),
+        async def send_with_correlation_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Log successful completion
+                logger.info(
+                    "request_completed",
+                    status_code=message["status"],
                 )
+                # Add correlation ID to response headers
+                MutableHeaders(scope=message)["X-Correlation-ID"] = correlation_id
+            await send(message)
 
-            # Log successful completion
-            logger.info(
-                "request_completed",
-                status_code=response.status_code,
-            )
-
-            # Add correlation ID to response headers
-            response.headers["X-Correlation-ID"] = correlation_id
-
-            return response
+        try:
+            # Process request
+            await self.app(scope, receive, send_with_correlation_id)
 
         except Exception as exc:
             # Don't log client disconnect errors as failures - they're expected behavior
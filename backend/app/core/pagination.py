@@ -2,9 +2,20 @@
 Pagination utilities for API responses.
 
 Provides Pydantic models and helper functions for paginated results.
+
+Two pagination modes are supported:
+- Page/offset: page number and page_size, with an exact total.
+- Keyset (cursor): an opaque cursor over the (sort key, id) of the last item
+  of the previous page. Every page costs the same index range scan, however
+  deep it is; the total is optional and may be an estimate.
 """
 
-from typing import Generic, TypeVar
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Generic, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -22,6 +33,18 @@ class PaginationParams(BaseModel):
     page_size: int = Field(default=50, ge=1, le=100, description="Number of items per page")
 
 
+class CursorParams(BaseModel):
+    """
+    Query parameters for keyset (cursor) pagination.
+
+    Omit cursor for the first page, then pass the next_cursor of the
+    previous response.
+    """
+
+    cursor: str | None = Field(default=None, description="Opaque cursor from the previous page")
+    page_size: int = Field(default=50, ge=1, le=100, description="Number of items per page")
+
+
 class PaginatedResponse(BaseModel, Generic[T]):
     """
     Generic paginated response model.
@@ -46,10 +69,23 @@ class PaginatedResponse(BaseModel, Generic[T]):
     """
 
     items: list[T] = Field(description="List of items for current page")
-    total: int = Field(description="Total number of items")
-    page: int = Field(description="Current page number")
+    total: int | None = Field(
+        default=None, description="Total number of items (None when not counted)"
+    )
+    page: int | None = Field(default=None, description="Current page number (page mode)")
     page_size: int = Field(description="Number of items per page")
-    total_pages: int = Field(description="Total number of pages")
+    total_pages: int | None = Field(
+        default=None, description="Total number of pages (None when not counted)"
+    )
+    next_cursor: str | None = Field(
+        default=None, description="Cursor of the next page (cursor mode, None on last page)"
+    )
+    has_more: bool | None = Field(
+        default=None, description="Whether more items follow (cursor mode)"
+    )
+    total_is_estimate: bool = Field(
+        default=False, description="Whether total is a planner estimate rather than a count"
+    )
 
     class Config:
         """Pydantic configuration."""
@@ -93,3 +129,111 @@ def create_paginated_response(
         page_size=page_size,
         total_pages=total_pages,
     )
+
+
+# ==============================================================================
+# Keyset (cursor) pagination
+# ==============================================================================
+
+
+def _encode_value(value: Any) -> list[Any]:
+    """Encode a sort key value as a [type tag, JSON value] pair."""
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    if isinstance(value, uuid.UUID):
+        return ["uuid", str(value)]
+    if value is None or isinstance(value, bool | int | float | str):
+        return ["v", value]
+    # Enums and other str-like values
+    return ["v", str(getattr(value, "value", value))]
+
+
+def _decode_value(encoded: list[Any]) -> Any:
+    """Decode a [type tag, JSON value] pair produced by _encode_value."""
+    tag, value = encoded
+    if tag == "dt":
+        return datetime.fromisoformat(value)
+    if tag == "d":
+        return date.fromisoformat(value)
+    if tag == "dec":
+        return Decimal(value)
+    if tag == "uuid":
+        return uuid.UUID(value)
+    if tag == "v":
+        return value
+    raise ValueError(f"Unknown cursor value type: {tag}")
+
+
+def encode_cursor(sort_value: Any, id: uuid.UUID) -> str:
+    """
+    Encode the (sort key, id) of the last item of a page as an opaque cursor.
+
+    Args:
+        sort_value: Value of the sort column of the last item
+        id: ID of the last item (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps([_encode_value(sort_value), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (sort value, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _decode_value(sort_value), uuid.UUID(id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {e!s}") from e
+
+
+def create_cursor_paginated_response(
+    items: list[T],
+    page_size: int,
+    next_cursor: str | None,
+    total: int | None = None,
+    total_is_estimate: bool = False,
+) -> PaginatedResponse[T]:
+    """
+    Create a cursor-mode paginated response.
+
+    Args:
+        items: List of items for current page
+        page_size: Number of items per page
+        next_cursor: Cursor of the next page, None on the last page
+        total: Optional total (exact or estimated)
+        total_is_estimate: Whether total is an estimate
+
+    Returns:
+        Paginated response with cursor metadata
+    """
+    total_pages = None
+    if total is not None and page_size > 0:
+        total_pages = (total + page_size - 1) // page_size
+
+    return PaginatedResponse(
+        items=items,
+        total=total,
+        page_size=page_size,
+        total_pages=total_pages,
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None,
+        total_is_estimate=total_is_estimate,
+    )
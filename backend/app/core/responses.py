@@ -0,0 +1,88 @@
+"""
+Fast JSON responses using orjson.
+
+ORJSONResponse is the application's default response class. It encodes
+Decimal (as strings, like Pydantic's JSON mode), UUID, date/datetime, enums
+and Pydantic models natively with orjson, producing the same JSON as the
+standard response path.
+
+For hot read endpoints, validated_response() validates data against the
+response schema once and serializes it directly, skipping FastAPI's
+response_model round trip (dump, re-validate, dump to JSON-compatible data,
+encode).
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import JSONResponse
+
+# Non-string dict keys as strings; UTC datetimes with "Z" like Pydantic
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Encode types orjson does not handle natively."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(by_alias=True)
+    if isinstance(obj, set | frozenset):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def json_dumps(content: Any) -> bytes:
+    """
+    Serialize content to JSON bytes with orjson.
+
+    Args:
+        content: JSON-compatible data, Pydantic models, or data containing
+            Decimal, UUID, date/datetime and enum values
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (see json_dumps)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+@lru_cache(maxsize=256)
+def _type_adapter(response_type: Any) -> TypeAdapter[Any]:
+    """Cached TypeAdapter for a response schema."""
+    return TypeAdapter(response_type)
+
+
+def validated_response(
+    data: Any,
+    response_type: Any,
+    status_code: int = 200,
+) -> ORJSONResponse:
+    """
+    Validate data against a response schema once and return it as JSON.
+
+    Use on hot read endpoints instead of returning data for the route's
+    response_model; keep response_model on the route for the OpenAPI schema.
+
+    Args:
+        data: ORM objects, dicts or models matching response_type
+        response_type: Response schema (e.g. list[DHGSubjectHoursResponse])
+        status_code: HTTP status code
+
+    Returns:
+        ORJSONResponse with the serialized data
+    """
+    adapter = _type_adapter(response_type)
+    validated = adapter.validate_python(data, from_attributes=True)
+    return ORJSONResponse(adapter.dump_python(validated, by_alias=True), status_code=status_code)
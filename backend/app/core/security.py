@@ -6,18 +6,37 @@ Note: Primary authentication is handled by Supabase Auth.
 These utilities are for additional backend security if needed.
 """
 
+import hashlib
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any
 
 import bcrypt
 from jose import JWTError, jwt
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
 
 # JWT configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
+# Verified Supabase token cache metrics
+JWT_CACHE_REQUESTS = Counter(
+    "auth_token_cache_requests_total",
+    "Supabase JWT verifications by token cache result",
+    ["result"],
+)
+JWT_CACHE_SIZE = Gauge(
+    "auth_token_cache_size",
+    "Verified Supabase JWT tokens currently cached",
+)
+
 
 def hash_password(password: str) -> str:
     """
@@ -108,6 +127,159 @@ def decode_access_token(token: str) -> dict[str, Any] | None:
         return None
 
 
+class SupabaseJWTVerifier:
+    """
+    Verify Supabase JWT tokens with a bounded cache of verified tokens.
+
+    Configuration (secret, issuer, audience) is resolved once. Each token is
+    verified with a single decode; verified claims are then cached by token
+    digest until the token's exp, so repeated requests with the same token
+    skip decoding entirely. The cache is an LRU bounded to cache_size entries.
+
+    Cached claims are shared between requests and must not be mutated.
+    """
+
+    AUDIENCE = "authenticated"
+    ALGORITHMS = ["HS256"]
+
+    # Fallback issuer for project ssxwmxqvafesyldycqzy when SUPABASE_URL is unset
+    DEFAULT_ISSUER = "https://ssxwmxqvafesyldycqzy.supabase.co/auth/v1"
+
+    def __init__(self, secret: str, issuer: str, cache_size: int = 1024):
+        """
+        Initialize the verifier.
+
+        Args:
+            secret: Supabase JWT secret (empty disables verification)
+            issuer: Expected issuer claim
+            cache_size: Maximum number of verified tokens kept
+        """
+        self.secret = secret
+        self.issuer = issuer
+        self.cache_size = cache_size
+        self._cache: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SupabaseJWTVerifier":
+        """
+        Build a verifier from SUPABASE_JWT_SECRET, SUPABASE_URL and
+        SUPABASE_JWT_CACHE_SIZE.
+        """
+        secret = os.getenv("SUPABASE_JWT_SECRET", "").strip().strip('"').strip("'")
+        supabase_url = os.getenv("SUPABASE_URL", "").strip().strip('"').strip("'")
+        cache_size = int(os.getenv("SUPABASE_JWT_CACHE_SIZE", "1024") or "1024")
+
+        if not secret:
+            logger.error(
+                "SUPABASE_JWT_SECRET not configured. "
+                "Get JWT secret from Supabase Dashboard > Settings > API > JWT Secret. "
+                "Add it to backend/.env.local as: SUPABASE_JWT_SECRET=your-secret-here"
+            )
+
+        # Format: https://[project-id].supabase.co/auth/v1
+        if supabase_url:
+            issuer = f"{supabase_url.rstrip('/')}/auth/v1"
+        else:
+            issuer = cls.DEFAULT_ISSUER
+            logger.warning(
+                "SUPABASE_URL not set, using default issuer. "
+                "Set SUPABASE_URL in backend/.env.local for proper issuer validation."
+            )
+
+        return cls(secret=secret, issuer=issuer, cache_size=cache_size)
+
+    def verify(self, token: str) -> dict[str, Any] | None:
+        """
+        Verify a token, serving previously verified tokens from the cache.
+
+        Args:
+            token: Supabase JWT token
+
+        Returns:
+            Decoded token payload or None if invalid
+        """
+        if not self.secret:
+            return None
+
+        # Key on a digest so raw tokens are not kept in memory
+        key = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                claims, expires_at = cached
+                if expires_at > now:
+                    self._cache.move_to_end(key)
+                    JWT_CACHE_REQUESTS.labels(result="hit").inc()
+                    return claims
+                del self._cache[key]
+        JWT_CACHE_REQUESTS.labels(result="miss").inc()
+
+        try:
+            payload = jwt.decode(
+                token,
+                self.secret,
+                algorithms=self.ALGORITHMS,
+                audience=self.AUDIENCE,
+                issuer=self.issuer,
+                options={
+                    "verify_signature": True,
+                    "verify_aud": True,
+                    "verify_iss": True,
+                    "verify_exp": True,
+                },
+            )
+        except JWTError as e:
+            logger.warning(
+                f"JWT verification failed: {e!r}. "
+                f"Expected issuer: {self.issuer}, Expected audience: {self.AUDIENCE}"
+            )
+            return None
+
+        # Tokens without exp are verified every time rather than cached forever
+        expires_at = payload.get("exp")
+        if isinstance(expires_at, int | float) and self.cache_size > 0:
+            with self._lock:
+                self._cache[key] = (payload, float(expires_at))
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                JWT_CACHE_SIZE.set(len(self._cache))
+
+        return payload
+
+    def clear(self) -> None:
+        """Drop all cached tokens."""
+        with self._lock:
+            self._cache.clear()
+            JWT_CACHE_SIZE.set(0)
+
+
+_jwt_verifier: SupabaseJWTVerifier | None = None
+
+
+def get_jwt_verifier() -> SupabaseJWTVerifier:
+    """Return the process-wide Supabase JWT verifier, built on first use."""
+    global _jwt_verifier
+    if _jwt_verifier is None:
+        _jwt_verifier = SupabaseJWTVerifier.from_env()
+    return _jwt_verifier
+
+
+def reset_jwt_verifier() -> None:
+    """
+    Discard the process-wide verifier and its cache.
+
+    The next verification re-reads the configuration (e.g. after rotating
+    SUPABASE_JWT_SECRET, or between tests).
+    """
+    global _jwt_verifier
+    _jwt_verifier = None
+    JWT_CACHE_SIZE.set(0)
+
+
 def verify_supabase_jwt(token: str) -> dict[str, Any] | None:
     """
     Verify a Supabase JWT token with proper issuer and audience validation.
@@ -118,6 +290,9 @@ def verify_supabase_jwt(token: str) -> dict[str, Any] | None:
     - Audience claim (aud) is "authenticated"
     - Token expiration (exp)
 
+    Configuration is read once per process (see reset_jwt_verifier), and
+    tokens already verified are served from a cache until they expire.
+
     Args:
         token: Supabase JWT token
 
@@ -128,84 +303,4 @@ def verify_supabase_jwt(token: str) -> dict[str, Any] | None:
         In production, you should use Supabase's JWT secret from environment variables.
         The secret is available in your Supabase project settings under API > JWT Secret.
     """
-    import logging
-    logger = logging.getLogger(__name__)
-
-    supabase_jwt_secret = os.getenv("SUPABASE_JWT_SECRET", "").strip().strip('"').strip("'")
-    supabase_url = os.getenv("SUPABASE_URL", "").strip().strip('"').strip("'")
-
-    # Debug: Print env var status
-    logger.info(
-        f"JWT env present: {bool(supabase_jwt_secret)}, "
-        f"secret length: {len(supabase_jwt_secret) if supabase_jwt_secret else 0}, "
-        f"SUPABASE_URL: {supabase_url or 'NOT SET'}"
-    )
-
-    if not supabase_jwt_secret:
-        logger.error(
-            "SUPABASE_JWT_SECRET not configured. "
-            "Get JWT secret from Supabase Dashboard > Settings > API > JWT Secret. "
-            "Add it to backend/.env.local as: SUPABASE_JWT_SECRET=your-secret-here"
-        )
-        return None
-
-    # Build issuer URL from SUPABASE_URL
-    # Format: https://[project-id].supabase.co/auth/v1
-    if supabase_url:
-        # Remove trailing slash and append /auth/v1
-        issuer = f"{supabase_url.rstrip('/')}/auth/v1"
-        logger.debug(f"Using issuer from SUPABASE_URL: {issuer}")
-    else:
-        # Fallback: use default for project ssxwmxqvafesyldycqzy
-        issuer = "https://ssxwmxqvafesyldycqzy.supabase.co/auth/v1"
-        logger.warning(
-            "SUPABASE_URL not set, using default issuer. "
-            "Set SUPABASE_URL in backend/.env.local for proper issuer validation."
-        )
-
-    audience = "authenticated"
-    algorithms = ["HS256"]
-
-    # Debug: Decode token without verification to inspect claims
-    try:
-        header = jwt.get_unverified_header(token)
-        payload_unverified = jwt.get_unverified_claims(token)
-        logger.info(
-            f"Token inspection (unverified): "
-            f"alg={header.get('alg')}, "
-            f"aud={payload_unverified.get('aud')}, "
-            f"iss={payload_unverified.get('iss')}, "
-            f"sub={payload_unverified.get('sub', 'N/A')[:20]}..."
-        )
-    except Exception as e:
-        logger.warning(f"Failed to decode token for inspection: {e}")
-
-    # Verify token with all checks
-    try:
-        payload = jwt.decode(
-            token,
-            supabase_jwt_secret,
-            algorithms=algorithms,
-            audience=audience,
-            issuer=issuer,
-            options={
-                "verify_signature": True,
-                "verify_aud": True,
-                "verify_iss": True,
-                "verify_exp": True,
-            },
-        )
-        user_id = payload.get("sub", "unknown")
-        email = payload.get("email", "unknown")
-        logger.info(
-            f"✅ JWT verified successfully. User: {user_id}, Email: {email}, "
-            f"Issuer: {payload.get('iss', 'N/A')}, Audience: {payload.get('aud', 'N/A')}"
-        )
-        return payload
-    except JWTError as e:
-        logger.error(
-            f"❌ JWT verification failed: {e!r}. "
-            f"Expected issuer: {issuer}, Expected audience: {audience}"
-        )
-        logger.debug(f"Token preview (first 50 chars): {token[:50]}...")
-        return None
+    return get_jwt_verifier().verify(token)
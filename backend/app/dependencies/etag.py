@@ -0,0 +1,141 @@
+"""
+Conditional GET dependencies for budget version reads.
+
+Read endpoints keyed by a budget version opt in with
+``dependencies=[Depends(version_etag)]`` on a router using ``ETagRoute``:
+
+1. version_etag reads the version's data revision (an index scan over the
+   compacted revision log) and derives an ETag from (route, version,
+   revision, query string)
+2. A matching If-None-Match is answered with 304 before the endpoint runs,
+   so none of its service queries are executed
+3. Otherwise ETagRoute adds the ETag to the endpoint's 2xx response
+
+The revision is read before the endpoint's queries, on the request's
+get_read_db session (the read replica when use_read_replica allows it,
+otherwise the primary): a write committed in between, or data read from the
+primary, yields newer data under an older ETag, which only costs the client
+one extra full response. A 304 is therefore never staler than the full
+response the same request would have served. On the replica both may trail
+the primary by the lag use_read_replica tolerates; users who wrote recently
+are routed to the primary, so they see their own writes. The revision is
+deliberately not read from the primary for replica requests: a newer
+revision on older replica data would pin that data to a current ETag.
+"""
+
+import hashlib
+import uuid
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from prometheus_client import Counter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+from app.database import get_read_db
+from app.dependencies.auth import UserDep
+from app.services.data_revision import get_data_revision
+
+# Clients may store responses but must revalidate them on every use
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+CONDITIONAL_GET_CHECKS = Counter(
+    "conditional_get_checks_total",
+    "Conditional GET checks on budget version reads",
+    ["result"],
+)
+
+
+def make_etag(route_path: str, version_id: uuid.UUID, revision: int, query: str = "") -> str:
+    """
+    Build the ETag of a version read.
+
+    Args:
+        route_path: Route template (e.g. /api/v1/planning/enrollment/{version_id})
+        version_id: Budget version UUID
+        revision: Data revision of the version
+        query: Raw query string (representations differ by query parameters)
+
+    Returns:
+        Quoted entity tag
+    """
+    key = f"{route_path}|{version_id}|{revision}|{query}"
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (weak comparison).
+
+    Weak comparison is required for If-None-Match; it also keeps ETags
+    matching after the compression middleware weakens them.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(",")
+    )
+
+
+async def version_etag(
+    request: Request,
+    user: UserDep,
+    db: AsyncSession = Depends(get_read_db),
+) -> None:
+    """
+    Answer If-None-Match for a budget version read, or record its ETag.
+
+    A no-op for requests without a valid version_id path parameter and for
+    versions without a data revision.
+
+    Raises:
+        HTTPException: 304 Not Modified when If-None-Match matches
+    """
+    try:
+        version_id = uuid.UUID(str(request.path_params["version_id"]))
+    except (KeyError, ValueError):
+        return
+
+    try:
+        revision = await get_data_revision(db, version_id)
+    except Exception as e:
+        # Conditional GET is an optimization: serve the full response instead
+        await db.rollback()
+        logger.warning("data_revision_lookup_failed", version_id=str(version_id), error=str(e))
+        return
+    if revision is None:
+        return
+
+    route = request.scope.get("route")
+    route_path = route.path if isinstance(route, APIRoute) else request.url.path
+    etag = make_etag(route_path, version_id, revision, request.url.query)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        CONDITIONAL_GET_CHECKS.labels(result="not_modified").inc()
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL},
+        )
+
+    CONDITIONAL_GET_CHECKS.labels(result="modified").inc()
+    request.state.etag = etag
+
+
+class ETagRoute(APIRoute):
+    """Route adding the ETag recorded by version_etag to successful responses."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def etag_route_handler(request: Request) -> Response:
+            response = await handler(request)
+            etag = getattr(request.state, "etag", None)
+            if etag and 200 <= response.status_code < 300 and "etag" not in response.headers:
+                response.headers["ETag"] = etag
+                response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
+            return response
+
+        return etag_route_handler
@@ -9,6 +9,7 @@ Engines:
 - dhg: Teacher workforce planning (DHG methodology) (Module 9)
 - revenue: Revenue and fee calculations (Module 10)
 - kpi: Key Performance Indicator calculations (Module 15)
+- budget_model: Whole-version cascade (class structure → DHG → revenue → costs → consolidation)
 
 Design Principles:
 - Pure functions: No side effects, no database I/O
@@ -0,0 +1,83 @@
+"""
+Budget Model Engine - Whole-Version Cascade
+
+This module compiles the planning cascade of a budget version into a single
+in-memory pass. The service layer bulk-loads every driver once into a
+BudgetModelInput snapshot, this engine computes every output table, and the
+service bulk-writes the results in one transaction.
+
+Cascade:
+    Enrollment → Class Structure → DHG Hours → Teacher FTE
+    Enrollment × Fee Grid → Revenue
+    Teacher Allocations × Cost Parameters → Personnel Costs
+    Revenue + Costs + Manual Lines → Consolidation
+
+A bracketed goal-seek solver finds the driver value that makes a metric of
+the cascade reach a target.
+"""
+
+from app.engine.budget_model.calculator import (
+    calculate_budget_model,
+    calculate_class_structures,
+    calculate_consolidation_lines,
+    calculate_personnel_costs,
+    calculate_revenue_lines,
+    calculate_subject_hours,
+    calculate_teacher_requirements,
+    goal_seek,
+)
+from app.engine.budget_model.consolidation_rules import map_consolidation_category
+from app.engine.budget_model.models import (
+    AllocationInput,
+    BudgetModelInput,
+    BudgetModelResult,
+    ClassSizeInput,
+    ClassSizeViolation,
+    ClassStructureLine,
+    ConsolidationLine,
+    EnrollmentInput,
+    FeeInput,
+    GoalSeekIteration,
+    GoalSeekSolution,
+    LedgerLine,
+    LevelInput,
+    PersonnelCostLine,
+    RevenueLine,
+    SubjectHoursInput,
+    SubjectHoursLine,
+    TeacherCostInput,
+    TeacherRequirementLine,
+)
+
+__all__ = [
+    # Models
+    "AllocationInput",
+    "BudgetModelInput",
+    "BudgetModelResult",
+    "ClassSizeInput",
+    "ClassSizeViolation",
+    "ClassStructureLine",
+    "ConsolidationLine",
+    "EnrollmentInput",
+    "FeeInput",
+    "GoalSeekIteration",
+    "GoalSeekSolution",
+    "LedgerLine",
+    "LevelInput",
+    "PersonnelCostLine",
+    "RevenueLine",
+    "SubjectHoursInput",
+    "SubjectHoursLine",
+    "TeacherCostInput",
+    "TeacherRequirementLine",
+    # Calculator functions
+    "calculate_budget_model",
+    "calculate_class_structures",
+    "calculate_consolidation_lines",
+    "calculate_personnel_costs",
+    "calculate_revenue_lines",
+    "calculate_subject_hours",
+    "calculate_teacher_requirements",
+    "goal_seek",
+    "map_consolidation_category",
+]
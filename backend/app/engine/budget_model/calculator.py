@@ -0,0 +1,756 @@
+"""
+Budget Model Engine - Calculator Functions
+
+Runs the whole calculation cascade for a budget version on plain data:
+
+    Enrollment → Class Structure → DHG Hours → Teacher FTE
+         ↓                                          ↓
+      Revenue                              Personnel Costs
+         ↓                                          ↓
+         └────────────→ Consolidation ←─────────────┘
+
+Formulas match the step-by-step planning services:
+
+Class Structure:
+    classes = CEILING(total_students / target_class_size)   (minimum 1)
+    avg_class_size = total_students / classes
+    atsem_count = classes if cycle requires ATSEM else 0
+    (a manual class count override replaces the target method: 'custom')
+
+DHG Hours:
+    total_hours = classes × hours_per_class  (× 2 if split)
+
+Teacher FTE:
+    simple_fte = Σ total_hours / standard_hours (18h secondary, 24h primary)
+    rounded_fte = CEILING(simple_fte)
+    hsa_hours = MAX(0, total_hours - rounded_fte × standard_hours)
+    (a manual FTE override replaces simple_fte for its subject)
+
+Revenue:
+    per student revenue from the revenue engine × student_count
+    T1 = 40%, T2 = 30%, T3 = 30%
+
+Personnel Costs:
+    AEFE:  unit_cost = prrd_eur × eur_to_sar_rate
+    Local: unit_cost = salary + salary × social_charges_rate + benefits
+    total = Σ allocated FTE × unit_cost
+
+Goal Seek:
+    safeguarded secant over a sign-changing bracket [lower, upper]; falls
+    back to bisection whenever a secant step fails to halve the bracket
+
+All functions are stateless with no side effects.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable
+from decimal import Decimal
+from math import ceil
+from uuid import UUID
+
+from app.engine.budget_model.consolidation_rules import (
+    CONSOLIDATION_ROLLUP_KEY,
+    CONSOLIDATION_SOURCE_ORDER,
+    SOURCE_CAPEX,
+    SOURCE_OPERATING,
+    SOURCE_PERSONNEL,
+    SOURCE_REVENUE,
+    map_consolidation_category,
+)
+from app.engine.budget_model.models import (
+    BudgetModelInput,
+    BudgetModelResult,
+    ClassSizeInput,
+    ClassSizeViolation,
+    ClassStructureLine,
+    ConsolidationLine,
+    FeeInput,
+    GoalSeekIteration,
+    GoalSeekSolution,
+    LedgerLine,
+    PersonnelCostLine,
+    RevenueLine,
+    SubjectHoursLine,
+    TeacherRequirementLine,
+)
+from app.engine.dhg.calculator import STANDARD_HOURS
+from app.engine.dhg.models import EducationLevel
+from app.engine.revenue import (
+    FeeCategory,
+    TuitionInput,
+    calculate_total_student_revenue,
+)
+
+# Revenue plan lines written by the enrollment-driven revenue calculation
+TUITION_TRIMESTER_LINES: tuple[tuple[str, str, int, Decimal], ...] = (
+    ("70110", "Scolarité Trimestre 1", 1, Decimal("0.40")),
+    ("70120", "Scolarité Trimestre 2", 2, Decimal("0.30")),
+    ("70130", "Scolarité Trimestre 3", 3, Decimal("0.30")),
+)
+TEACHING_SALARIES_ACCOUNT = "64110"
+AEFE_CATEGORY_CODES = frozenset({"AEFE_DETACHED", "AEFE_FUNDED"})
+
+
+# ==============================================================================
+# Cascade steps
+# ==============================================================================
+
+
+def _find_class_size_params(
+    level_id: UUID,
+    cycle_id: UUID,
+    params: list[ClassSizeInput],
+) -> ClassSizeInput | None:
+    """Level-specific parameters take precedence over the cycle default."""
+    cycle_default = None
+    for param in params:
+        if param.level_id == level_id:
+            return param
+        if param.level_id is None and param.cycle_id == cycle_id:
+            cycle_default = param
+    return cycle_default
+
+
+def calculate_class_structures(
+    model_input: BudgetModelInput,
+) -> tuple[list[ClassStructureLine], list[ClassSizeViolation]]:
+    """
+    Calculate class formations from enrollment (target class size method).
+
+    Levels listed in ``class_overrides`` use the manual class count instead
+    (calculation method 'custom'); class size rules are still checked.
+
+    Class size rule violations are collected rather than raised so callers can
+    decide whether to block (persisted recalculation) or warn (what-if preview).
+
+    Args:
+        model_input: Budget model drivers
+
+    Returns:
+        Tuple of (class structure lines ordered by level, violations)
+    """
+    levels = {level.level_id: level for level in model_input.levels}
+
+    students_by_level: dict[UUID, int] = defaultdict(int)
+    for enrollment in model_input.enrollments:
+        students_by_level[enrollment.level_id] += enrollment.student_count
+
+    lines: list[ClassStructureLine] = []
+    violations: list[ClassSizeViolation] = []
+
+    for level_id, total_students in students_by_level.items():
+        level = levels.get(level_id)
+        if level is None:
+            continue
+
+        params = _find_class_size_params(
+            level_id, level.cycle_id, model_input.class_size_params
+        )
+        if params is None:
+            violations.append(
+                ClassSizeViolation(
+                    rule="MISSING_CLASS_SIZE_PARAMS",
+                    level_id=level_id,
+                    level_code=level.level_code,
+                    message=f"No class size parameters found for level {level.level_code}",
+                )
+            )
+            continue
+
+        override = model_input.class_overrides.get(level_id)
+        if override is not None:
+            number_of_classes = max(override, 1)
+            calculation_method = "custom"
+        else:
+            number_of_classes = ceil(total_students / params.target_class_size) or 1
+            calculation_method = "target"
+        avg_class_size = Decimal(total_students / number_of_classes).quantize(
+            Decimal("0.01")
+        )
+
+        if avg_class_size < params.min_class_size:
+            violations.append(
+                ClassSizeViolation(
+                    rule="AVG_BELOW_MIN",
+                    level_id=level_id,
+                    level_code=level.level_code,
+                    message=(
+                        f"Average class size ({avg_class_size}) is below minimum "
+                        f"({params.min_class_size}) for level {level.level_code}"
+                    ),
+                    avg_class_size=avg_class_size,
+                    limit=params.min_class_size,
+                )
+            )
+        elif avg_class_size > params.max_class_size:
+            violations.append(
+                ClassSizeViolation(
+                    rule="AVG_EXCEEDS_MAX",
+                    level_id=level_id,
+                    level_code=level.level_code,
+                    message=(
+                        f"Average class size ({avg_class_size}) exceeds maximum "
+                        f"({params.max_class_size}) for level {level.level_code}"
+                    ),
+                    avg_class_size=avg_class_size,
+                    limit=params.max_class_size,
+                )
+            )
+
+        lines.append(
+            ClassStructureLine(
+                level_id=level_id,
+                level_code=level.level_code,
+                total_students=total_students,
+                number_of_classes=number_of_classes,
+                avg_class_size=avg_class_size,
+                requires_atsem=level.requires_atsem,
+                atsem_count=number_of_classes if level.requires_atsem else 0,
+                calculation_method=calculation_method,
+            )
+        )
+
+    lines.sort(key=lambda line: (levels[line.level_id].sort_order, line.level_code))
+    return lines, violations
+
+
+def calculate_subject_hours(
+    model_input: BudgetModelInput,
+    class_structures: list[ClassStructureLine],
+) -> list[SubjectHoursLine]:
+    """
+    Calculate DHG hours per subject and level from class counts.
+
+    Args:
+        model_input: Budget model drivers (subject hours matrix)
+        class_structures: Calculated class structures
+
+    Returns:
+        List of DHG subject hours lines
+    """
+    classes_by_level = {cs.level_id: cs.number_of_classes for cs in class_structures}
+
+    lines: list[SubjectHoursLine] = []
+    for entry in model_input.subject_hours:
+        number_of_classes = classes_by_level.get(entry.level_id)
+        if not number_of_classes:
+            continue
+
+        total_hours = Decimal(number_of_classes) * entry.hours_per_week
+        if entry.is_split:
+            total_hours *= Decimal("2.00")
+
+        lines.append(
+            SubjectHoursLine(
+                subject_id=entry.subject_id,
+                level_id=entry.level_id,
+                number_of_classes=number_of_classes,
+                hours_per_class_per_week=entry.hours_per_week,
+                total_hours_per_week=total_hours.quantize(Decimal("0.01")),
+                is_split=entry.is_split,
+            )
+        )
+    return lines
+
+
+def calculate_teacher_requirements(
+    model_input: BudgetModelInput,
+    subject_hours: list[SubjectHoursLine],
+) -> list[TeacherRequirementLine]:
+    """
+    Calculate teacher FTE requirements per subject from DHG hours.
+
+    The standard teaching hours of a subject follow its first level in
+    display order (18h for secondary, 24h for primary).
+
+    Args:
+        model_input: Budget model drivers (levels)
+        subject_hours: Calculated DHG subject hours
+
+    Returns:
+        List of teacher requirement lines
+    """
+    levels = {level.level_id: level for level in model_input.levels}
+
+    hours_by_subject: dict[UUID, list[SubjectHoursLine]] = defaultdict(list)
+    for line in subject_hours:
+        hours_by_subject[line.subject_id].append(line)
+
+    lines: list[TeacherRequirementLine] = []
+    for subject_id, subject_lines in hours_by_subject.items():
+        total_hours = sum(
+            (line.total_hours_per_week for line in subject_lines), Decimal("0")
+        )
+
+        first_level = min(
+            (levels[line.level_id] for line in subject_lines if line.level_id in levels),
+            key=lambda level: level.sort_order,
+            default=None,
+        )
+        education_level = (
+            EducationLevel.SECONDARY
+            if first_level is None or first_level.is_secondary
+            else EducationLevel.PRIMARY
+        )
+        standard_hours = STANDARD_HOURS[education_level].quantize(Decimal("0.01"))
+
+        simple_fte = model_input.fte_overrides.get(
+            subject_id, total_hours / standard_hours
+        ).quantize(Decimal("0.01"))
+        rounded_fte = ceil(simple_fte)
+        hsa_hours = max(
+            Decimal("0.00"), total_hours - (Decimal(rounded_fte) * standard_hours)
+        ).quantize(Decimal("0.01"))
+
+        lines.append(
+            TeacherRequirementLine(
+                subject_id=subject_id,
+                total_hours_per_week=total_hours,
+                standard_teaching_hours=standard_hours,
+                simple_fte=simple_fte,
+                rounded_fte=rounded_fte,
+                hsa_hours=hsa_hours,
+            )
+        )
+    return lines
+
+
+def _engine_fee_category(nationality_code: str) -> FeeCategory:
+    """Map nationality code to the revenue engine fee category."""
+    if nationality_code == "FRENCH":
+        return FeeCategory.FRENCH_TTC
+    if nationality_code == "SAUDI":
+        return FeeCategory.SAUDI_HT
+    return FeeCategory.OTHER_TTC
+
+
+def _build_fee_grid(fees: list[FeeInput]) -> dict[tuple[UUID, str], dict[str, Decimal]]:
+    """Merge fee rows into one {tuition, dai, registration} dict per level and nationality."""
+    grid: dict[tuple[UUID, str], dict[str, Decimal]] = defaultdict(dict)
+    for fee in fees:
+        key = (fee.level_id, fee.nationality_code)
+        if fee.fee_category_code == "TUITION" and fee.trimester is None:
+            grid[key]["tuition"] = fee.amount_sar
+        elif fee.fee_category_code == "DAI":
+            grid[key]["dai"] = fee.amount_sar
+        elif fee.fee_category_code == "REGISTRATION":
+            grid[key]["registration"] = fee.amount_sar
+    return grid
+
+
+def calculate_revenue_lines(model_input: BudgetModelInput) -> list[RevenueLine]:
+    """
+    Calculate tuition revenue lines from enrollment and the fee grid.
+
+    Every student of an enrollment group has the same fees (no sibling data),
+    so the revenue engine is evaluated once per group and scaled by the
+    student count.
+
+    Args:
+        model_input: Budget model drivers (enrollment, fees, levels)
+
+    Returns:
+        Trimester revenue lines (empty when no fee grid is configured)
+    """
+    if not model_input.fees:
+        return []
+
+    level_codes = {level.level_id: level.level_code for level in model_input.levels}
+    fee_grid = _build_fee_grid(model_input.fees)
+
+    total_revenue = Decimal("0")
+    for enrollment in model_input.enrollments:
+        if enrollment.student_count <= 0:
+            continue
+        fees = fee_grid.get((enrollment.level_id, enrollment.nationality_code))
+        if not fees or "tuition" not in fees:
+            continue
+
+        student_revenue = calculate_total_student_revenue(
+            TuitionInput(
+                level_id=enrollment.level_id,
+                level_code=level_codes.get(enrollment.level_id, ""),
+                student_id=None,
+                fee_category=_engine_fee_category(enrollment.nationality_code),
+                tuition_fee=fees["tuition"],
+                dai_fee=fees.get("dai", Decimal("0")),
+                registration_fee=fees.get("registration", Decimal("0")),
+                sibling_order=1,
+            )
+        )
+        total_revenue += student_revenue.total_annual_revenue * enrollment.student_count
+
+    return [
+        RevenueLine(
+            account_code=account_code,
+            description=description,
+            category="tuition",
+            amount_sar=(total_revenue * share).quantize(Decimal("0.01")),
+            trimester=trimester,
+            notes=f"Calculated from enrollment × fee structure ({int(share * 100)}%)",
+        )
+        for account_code, description, trimester, share in TUITION_TRIMESTER_LINES
+    ]
+
+
+def calculate_personnel_costs(model_input: BudgetModelInput) -> list[PersonnelCostLine]:
+    """
+    Calculate teaching personnel costs from teacher allocations.
+
+    Args:
+        model_input: Budget model drivers (allocations, teacher cost params)
+
+    Returns:
+        One personnel cost line per (category, cycle) allocation group
+    """
+    cost_params = {(p.category_id, p.cycle_id): p for p in model_input.teacher_costs}
+
+    groups: dict[tuple[UUID, UUID | None], list] = defaultdict(list)
+    for allocation in model_input.allocations:
+        groups[(allocation.category_id, allocation.cycle_id)].append(allocation)
+
+    lines: list[PersonnelCostLine] = []
+    for (category_id, cycle_id), allocations in groups.items():
+        param = cost_params.get((category_id, cycle_id)) or cost_params.get(
+            (category_id, None)
+        )
+        if param is None:
+            continue
+
+        first = allocations[0]
+        if first.category_code in AEFE_CATEGORY_CODES:
+            unit_cost = (
+                param.prrd_contribution_eur * model_input.eur_to_sar_rate
+                if param.prrd_contribution_eur
+                else Decimal("0")
+            )
+        else:
+            base_salary = param.avg_salary_sar or Decimal("0")
+            unit_cost = (
+                base_salary
+                + base_salary * param.social_charges_rate
+                + (param.benefits_allowance_sar or Decimal("0"))
+            )
+
+        group_fte = sum((a.fte_count for a in allocations), Decimal("0"))
+        description = f"Teaching Staff - {first.category_name}"
+        if first.cycle_name:
+            description += f" - {first.cycle_name}"
+
+        lines.append(
+            PersonnelCostLine(
+                account_code=TEACHING_SALARIES_ACCOUNT,
+                description=description,
+                category_id=category_id,
+                cycle_id=cycle_id,
+                fte_count=group_fte,
+                unit_cost_sar=unit_cost,
+                total_cost_sar=group_fte * unit_cost,
+            )
+        )
+    return lines
+
+
+def _source_table_for_account(account_code: str) -> str:
+    """Infer the planning table of an account from its PCG class."""
+    if account_code.startswith("7"):
+        return SOURCE_REVENUE
+    if account_code.startswith("64"):
+        return SOURCE_PERSONNEL
+    if account_code.startswith("2"):
+        return SOURCE_CAPEX
+    return SOURCE_OPERATING
+
+
+def calculate_consolidation_lines(
+    revenue_lines: list[RevenueLine],
+    personnel_costs: list[PersonnelCostLine],
+    ledger_lines: list[LedgerLine],
+    account_overrides: dict[str, Decimal] | None = None,
+) -> list[ConsolidationLine]:
+    """
+    Roll calculated and manual planning lines up by account code.
+
+    Follows the shared consolidation rules (see CONSOLIDATION_SOURCE_ORDER), the
+    same ConsolidationService applies in SQL.
+
+    Args:
+        revenue_lines: Calculated revenue lines
+        personnel_costs: Calculated personnel cost lines
+        ledger_lines: Manually entered planning lines
+        account_overrides: Manual amounts replacing an account total
+            (accounts not planned yet are added)
+
+    Returns:
+        One consolidation line per account code, revenue first
+    """
+    sources = [
+        LedgerLine(
+            source_table=SOURCE_REVENUE,
+            account_code=line.account_code,
+            description=line.description,
+            amount_sar=line.amount_sar,
+        )
+        for line in revenue_lines
+    ]
+    sources.extend(
+        LedgerLine(
+            source_table=SOURCE_PERSONNEL,
+            account_code=line.account_code,
+            description=line.description,
+            amount_sar=line.total_cost_sar,
+        )
+        for line in personnel_costs
+    )
+    sources.extend(ledger_lines)
+
+    rolled: dict[str, ConsolidationLine] = {}
+    for source in sources:
+        key = getattr(source, CONSOLIDATION_ROLLUP_KEY)
+        existing = rolled.get(key)
+        if existing is not None:
+            existing.amount_sar += source.amount_sar
+            existing.source_count += 1
+            existing.account_name = min(existing.account_name, source.description)
+            if CONSOLIDATION_SOURCE_ORDER.index(
+                source.source_table
+            ) < CONSOLIDATION_SOURCE_ORDER.index(existing.source_table):
+                existing.source_table = source.source_table
+                existing.consolidation_category = map_consolidation_category(
+                    source.source_table, source.account_code
+                )
+                existing.is_revenue = source.source_table == SOURCE_REVENUE
+            continue
+        rolled[key] = ConsolidationLine(
+            account_code=source.account_code,
+            account_name=source.description,
+            consolidation_category=map_consolidation_category(
+                source.source_table, source.account_code
+            ),
+            is_revenue=source.source_table == SOURCE_REVENUE,
+            amount_sar=source.amount_sar,
+            source_table=source.source_table,
+            source_count=1,
+        )
+
+    for account_code, amount in (account_overrides or {}).items():
+        existing = rolled.get(account_code)
+        if existing is not None:
+            existing.amount_sar = amount
+            continue
+        source_table = _source_table_for_account(account_code)
+        rolled[account_code] = ConsolidationLine(
+            account_code=account_code,
+            account_name=account_code,
+            consolidation_category=map_consolidation_category(source_table, account_code),
+            is_revenue=source_table == SOURCE_REVENUE,
+            amount_sar=amount,
+            source_table=source_table,
+            source_count=0,
+        )
+
+    return sorted(
+        rolled.values(),
+        key=lambda line: (not line.is_revenue, line.consolidation_category, line.account_code),
+    )
+
+
+# ==============================================================================
+# Full model
+# ==============================================================================
+
+
+def calculate_budget_model(model_input: BudgetModelInput) -> BudgetModelResult:
+    """
+    Run the whole cascade for a budget version in dependency order.
+
+    Args:
+        model_input: Budget model drivers
+
+    Returns:
+        BudgetModelResult with every calculated row and headline totals
+
+    Example:
+        >>> result = calculate_budget_model(snapshot)
+        >>> result.total_revenue - result.total_costs == result.net_result
+        True
+    """
+    class_structures, violations = calculate_class_structures(model_input)
+    subject_hours = calculate_subject_hours(model_input, class_structures)
+    teacher_requirements = calculate_teacher_requirements(model_input, subject_hours)
+    revenue_lines = calculate_revenue_lines(model_input)
+    personnel_costs = calculate_personnel_costs(model_input)
+    consolidation_lines = calculate_consolidation_lines(
+        revenue_lines,
+        personnel_costs,
+        model_input.ledger_lines,
+        model_input.account_overrides,
+    )
+
+    total_revenue = sum(
+        (line.amount_sar for line in consolidation_lines if line.is_revenue), Decimal("0")
+    )
+    total_costs = sum(
+        (
+            line.amount_sar
+            for line in consolidation_lines
+            if not line.is_revenue and line.source_table != SOURCE_CAPEX
+        ),
+        Decimal("0"),
+    )
+    total_personnel = sum(
+        (
+            line.amount_sar
+            for line in consolidation_lines
+            if line.source_table == SOURCE_PERSONNEL
+        ),
+        Decimal("0"),
+    )
+
+    return BudgetModelResult(
+        version_id=model_input.version_id,
+        class_structures=class_structures,
+        subject_hours=subject_hours,
+        teacher_requirements=teacher_requirements,
+        revenue_lines=revenue_lines,
+        personnel_costs=personnel_costs,
+        consolidation_lines=consolidation_lines,
+        violations=violations,
+        total_students=sum(cs.total_students for cs in class_structures),
+        total_classes=sum(cs.number_of_classes for cs in class_structures),
+        total_dhg_hours=sum(
+            (line.total_hours_per_week for line in subject_hours), Decimal("0")
+        ),
+        total_teacher_fte=sum(
+            (req.simple_fte for req in teacher_requirements), Decimal("0")
+        ),
+        total_revenue=total_revenue,
+        total_personnel_costs=total_personnel,
+        total_costs=total_costs,
+        net_result=total_revenue - total_costs,
+    )
+
+
+# ==============================================================================
+# Goal seek
+# ==============================================================================
+
+
+def goal_seek(
+    evaluate: Callable[[float], float],
+    target: float,
+    lower: float,
+    upper: float,
+    tolerance: float,
+    max_iterations: int = 50,
+    step: float | None = None,
+) -> GoalSeekSolution:
+    """
+    Find the driver value where a monotonic-enough metric reaches a target.
+
+    The root of metric(x) - target must be bracketed by [lower, upper]. Each
+    iteration tries a secant step inside the bracket and switches to
+    bisection whenever the previous step did not halve the bracket, so the
+    solver never does worse than bisection.
+
+    A discrete driver can run out of resolution before the metric comes
+    within tolerance of the target: the closest grid value is returned with
+    converged=False, along with the final bracket.
+
+    Args:
+        evaluate: Metric as a function of the driver value
+        target: Metric value to reach
+        lower: Lower bound of the driver bracket
+        upper: Upper bound of the driver bracket
+        tolerance: Accepted absolute distance between metric and target
+        max_iterations: Maximum number of solver iterations
+        step: Driver resolution for discrete drivers (e.g., 1 student)
+
+    Returns:
+        GoalSeekSolution with the solved driver value and diagnostics
+
+    Raises:
+        ValueError: If the bracket is empty or does not contain the target
+
+    Example:
+        >>> goal_seek(lambda x: x * x, 2.0, 0.0, 2.0, tolerance=1e-9).solved_value
+        1.414213562...
+    """
+    if step:
+        lower, upper = round(lower / step) * step, round(upper / step) * step
+    if lower >= upper:
+        raise ValueError(f"Empty bracket [{lower}, {upper}]")
+
+    history: list[GoalSeekIteration] = []
+
+    def residual_at(x: float, iteration: int, method: str) -> float:
+        value = evaluate(x)
+        history.append(
+            GoalSeekIteration(
+                iteration=iteration,
+                method=method,
+                driver_value=x,
+                metric_value=value,
+                residual=value - target,
+            )
+        )
+        return value - target
+
+    f_lower = residual_at(lower, 0, "bracket")
+    f_upper = residual_at(upper, 0, "bracket")
+    if f_lower * f_upper > 0:
+        raise ValueError(
+            f"Target {target} is not bracketed: metric is {f_lower + target} at "
+            f"{lower} and {f_upper + target} at {upper}"
+        )
+
+    def solution(termination: str, iterations: int) -> GoalSeekSolution:
+        best = min(
+            (entry for entry in history if lower <= entry.driver_value <= upper),
+            key=lambda entry: abs(entry.residual),
+        )
+        return GoalSeekSolution(
+            solved_value=best.driver_value,
+            metric_value=best.metric_value,
+            residual=best.residual,
+            converged=abs(best.residual) <= tolerance,
+            termination=termination,
+            iterations=iterations,
+            evaluations=len(history),
+            bracket_lower=lower,
+            bracket_upper=upper,
+            history=history,
+        )
+
+    if min(abs(f_lower), abs(f_upper)) <= tolerance:
+        return solution("tolerance", 0)
+
+    resolution = step or 1e-12 * max(1.0, abs(upper - lower))
+    previous_width = upper - lower
+    use_bisection = False
+
+    for iteration in range(1, max_iterations + 1):
+        if use_bisection:
+            x, method = (lower + upper) / 2, "bisection"
+        else:
+            x = upper - f_upper * (upper - lower) / (f_upper - f_lower)
+            method = "secant"
+        if step:
+            x = min(max(round(x / step) * step, lower + step), upper - step)
+
+        f_x = residual_at(x, iteration, method)
+        if abs(f_x) <= tolerance:
+            return solution("tolerance", iteration)
+
+        if (f_x < 0) == (f_lower < 0):
+            lower, f_lower = x, f_x
+        else:
+            upper, f_upper = x, f_x
+
+        width = upper - lower
+        if width <= resolution:
+            return solution("resolution", iteration)
+        use_bisection = width > previous_width / 2
+        previous_width = width
+
+    return solution("max_iterations", max_iterations)
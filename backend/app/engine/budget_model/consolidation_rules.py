@@ -0,0 +1,80 @@
+"""
+Consolidation rules shared by the budget model and ConsolidationService.
+
+Planning lines are rolled up into budget_consolidations by account code (the
+uk_consolidation_version_account key); each line's consolidation category is
+derived from its source table and account code prefix. ConsolidationService
+applies these rules in SQL, the budget model in memory, so both write the same
+lines whichever of them ran last.
+"""
+
+SOURCE_REVENUE = "revenue_plans"
+SOURCE_PERSONNEL = "personnel_cost_plans"
+SOURCE_OPERATING = "operating_cost_plans"
+SOURCE_CAPEX = "capex_plans"
+
+# Column planning lines are rolled up by (one consolidation line per value)
+CONSOLIDATION_ROLLUP_KEY = "account_code"
+
+# Source tables in precedence order. An account planned in several tables takes
+# the category, source table and revenue flag of the first of them, and the
+# lowest description of its lines as account name.
+CONSOLIDATION_SOURCE_ORDER: tuple[str, ...] = (
+    SOURCE_REVENUE,
+    SOURCE_PERSONNEL,
+    SOURCE_OPERATING,
+    SOURCE_CAPEX,
+)
+
+# Account code prefix → consolidation category value, per source table.
+# The first matching prefix wins; the default category applies otherwise.
+CONSOLIDATION_CATEGORY_RULES: dict[str, tuple[tuple[str, str], ...]] = {
+    SOURCE_REVENUE: (
+        ("701", "revenue_tuition"),  # Tuition (701xx)
+        ("702", "revenue_fees"),  # Fees (702xx-703xx)
+        ("703", "revenue_fees"),
+    ),
+    SOURCE_PERSONNEL: (
+        ("6411", "personnel_teaching"),  # 64110-64119
+        ("6412", "personnel_admin"),  # 64120-64129
+        ("6413", "personnel_support"),  # 64130-64139
+        ("645", "personnel_social"),  # Social charges (645xx)
+    ),
+    SOURCE_OPERATING: (
+        ("606", "operating_supplies"),  # Supplies (606xx)
+        ("6061", "operating_utilities"),  # Utilities (6061x)
+        ("615", "operating_maintenance"),  # Maintenance (615xx)
+        ("616", "operating_insurance"),  # Insurance (616xx)
+    ),
+    SOURCE_CAPEX: (
+        ("2154", "capex_equipment"),  # Equipment (2154x)
+        ("2183", "capex_it"),  # IT (2183x)
+        ("2184", "capex_furniture"),  # Furniture (2184x)
+        ("213", "capex_building"),  # Building (213xx)
+        ("205", "capex_software"),  # Software (205xx)
+    ),
+}
+
+CONSOLIDATION_DEFAULT_CATEGORY: dict[str, str] = {
+    SOURCE_REVENUE: "revenue_other",  # 75xxx-77xxx
+    SOURCE_PERSONNEL: "personnel_teaching",
+    SOURCE_OPERATING: "operating_other",
+    SOURCE_CAPEX: "capex_equipment",
+}
+
+
+def map_consolidation_category(source_table: str, account_code: str) -> str:
+    """
+    Map a planning line to its consolidation category value.
+
+    Args:
+        source_table: Planning table the line comes from
+        account_code: PCG account code
+
+    Returns:
+        ConsolidationCategory value (e.g., 'revenue_tuition')
+    """
+    for prefix, category in CONSOLIDATION_CATEGORY_RULES[source_table]:
+        if account_code.startswith(prefix):
+            return category
+    return CONSOLIDATION_DEFAULT_CATEGORY[source_table]
@@ -0,0 +1,272 @@
+"""
+Budget Model Engine - Pydantic Models
+
+Input/output models for the in-memory budget model. The input is a plain-data
+snapshot of every driver a budget version needs (enrollment, class size
+parameters, subject hours, fee grid, teacher allocations and cost parameters,
+manually entered ledger lines). The result holds every calculated row of the
+cascade, ready to be bulk-written by the service layer.
+
+All identifiers are UUIDs and all amounts are Decimal, so the snapshot can be
+built from database rows without any ORM objects leaking into the engine.
+"""
+
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+# ==============================================================================
+# Inputs
+# ==============================================================================
+
+
+class LevelInput(BaseModel):
+    """Academic level with the cycle attributes the cascade needs."""
+
+    level_id: UUID = Field(..., description="Academic level UUID")
+    level_code: str = Field(..., description="Level code (e.g., '6EME')")
+    cycle_id: UUID = Field(..., description="Academic cycle UUID")
+    cycle_code: str = Field(..., description="Cycle code (e.g., 'COLL')")
+    cycle_name: str = Field(..., description="Cycle name (English)")
+    is_secondary: bool = Field(..., description="Secondary level (18h standard)")
+    requires_atsem: bool = Field(default=False, description="Cycle requires ATSEM")
+    sort_order: int = Field(default=0, description="Display order")
+
+
+class EnrollmentInput(BaseModel):
+    """Student count for one level and nationality."""
+
+    level_id: UUID = Field(..., description="Academic level UUID")
+    nationality_code: str = Field(..., description="Nationality code (FRENCH, SAUDI, OTHER)")
+    nationality_name: str = Field(default="", description="Nationality name (English)")
+    student_count: int = Field(..., ge=0, description="Number of students")
+
+
+class ClassSizeInput(BaseModel):
+    """Class size parameters, defined per level or as a cycle default."""
+
+    level_id: UUID | None = Field(None, description="Level UUID (level-specific)")
+    cycle_id: UUID | None = Field(None, description="Cycle UUID (cycle default)")
+    min_class_size: int = Field(..., gt=0, description="Minimum class size")
+    target_class_size: int = Field(..., gt=0, description="Target class size")
+    max_class_size: int = Field(..., gt=0, description="Maximum class size")
+
+
+class SubjectHoursInput(BaseModel):
+    """One cell of the subject hours matrix."""
+
+    subject_id: UUID = Field(..., description="Subject UUID")
+    level_id: UUID = Field(..., description="Academic level UUID")
+    hours_per_week: Decimal = Field(..., ge=Decimal("0"), description="Hours per class")
+    is_split: bool = Field(default=False, description="Split classes (hours doubled)")
+
+
+class FeeInput(BaseModel):
+    """One row of the fee grid."""
+
+    level_id: UUID = Field(..., description="Academic level UUID")
+    nationality_code: str = Field(..., description="Nationality code")
+    fee_category_code: str = Field(..., description="TUITION, DAI or REGISTRATION")
+    amount_sar: Decimal = Field(..., ge=Decimal("0"), description="Fee amount (SAR)")
+    trimester: int | None = Field(None, description="Trimester (None for annual)")
+
+
+class AllocationInput(BaseModel):
+    """Teacher allocation (TRMD) row."""
+
+    category_id: UUID = Field(..., description="Teacher category UUID")
+    category_code: str = Field(..., description="Teacher category code")
+    category_name: str = Field(..., description="Teacher category name (English)")
+    subject_id: UUID | None = Field(None, description="Subject UUID")
+    cycle_id: UUID | None = Field(None, description="Academic cycle UUID")
+    cycle_name: str | None = Field(None, description="Academic cycle name (English)")
+    fte_count: Decimal = Field(..., ge=Decimal("0"), description="Allocated FTE")
+
+
+class TeacherCostInput(BaseModel):
+    """Teacher cost parameters for a category (and optionally a cycle)."""
+
+    category_id: UUID = Field(..., description="Teacher category UUID")
+    cycle_id: UUID | None = Field(None, description="Cycle UUID (None = default)")
+    prrd_contribution_eur: Decimal | None = Field(None, description="AEFE PRRD (EUR)")
+    avg_salary_sar: Decimal | None = Field(None, description="Average salary (SAR)")
+    social_charges_rate: Decimal = Field(default=Decimal("0"), description="Social charges")
+    benefits_allowance_sar: Decimal = Field(default=Decimal("0"), description="Benefits (SAR)")
+
+
+class LedgerLine(BaseModel):
+    """Manually entered planning line that feeds consolidation as-is."""
+
+    source_table: str = Field(..., description="Source planning table")
+    account_code: str = Field(..., description="PCG account code")
+    description: str = Field(..., description="Line description")
+    amount_sar: Decimal = Field(..., description="Amount (SAR)")
+
+
+class BudgetModelInput(BaseModel):
+    """Complete set of drivers for one budget version."""
+
+    version_id: UUID = Field(..., description="Budget version UUID")
+    eur_to_sar_rate: Decimal = Field(default=Decimal("4.05"), description="EUR/SAR rate")
+    levels: list[LevelInput] = Field(default_factory=list)
+    enrollments: list[EnrollmentInput] = Field(default_factory=list)
+    class_size_params: list[ClassSizeInput] = Field(default_factory=list)
+    subject_hours: list[SubjectHoursInput] = Field(default_factory=list)
+    fees: list[FeeInput] = Field(default_factory=list)
+    allocations: list[AllocationInput] = Field(default_factory=list)
+    teacher_costs: list[TeacherCostInput] = Field(default_factory=list)
+    ledger_lines: list[LedgerLine] = Field(
+        default_factory=list,
+        description="Non-calculated revenue/personnel/operating/capex lines",
+    )
+    class_overrides: dict[UUID, int] = Field(
+        default_factory=dict,
+        description="Manual number of classes by level UUID (replaces the target method)",
+    )
+    fte_overrides: dict[UUID, Decimal] = Field(
+        default_factory=dict,
+        description="Manual teacher FTE requirement by subject UUID",
+    )
+    account_overrides: dict[str, Decimal] = Field(
+        default_factory=dict,
+        description="Manual consolidated amount by account code",
+    )
+
+
+# ==============================================================================
+# Outputs
+# ==============================================================================
+
+
+class ClassStructureLine(BaseModel):
+    """Calculated class formation for one level."""
+
+    level_id: UUID
+    level_code: str
+    total_students: int
+    number_of_classes: int
+    avg_class_size: Decimal
+    requires_atsem: bool
+    atsem_count: int
+    calculation_method: str = "target"
+
+
+class SubjectHoursLine(BaseModel):
+    """Calculated DHG hours for one subject and level."""
+
+    subject_id: UUID
+    level_id: UUID
+    number_of_classes: int
+    hours_per_class_per_week: Decimal
+    total_hours_per_week: Decimal
+    is_split: bool
+
+
+class TeacherRequirementLine(BaseModel):
+    """Calculated teacher FTE requirement for one subject."""
+
+    subject_id: UUID
+    total_hours_per_week: Decimal
+    standard_teaching_hours: Decimal
+    simple_fte: Decimal
+    rounded_fte: int
+    hsa_hours: Decimal
+
+
+class RevenueLine(BaseModel):
+    """Calculated revenue plan line."""
+
+    account_code: str
+    description: str
+    category: str
+    amount_sar: Decimal
+    trimester: int | None = None
+    notes: str | None = None
+
+
+class PersonnelCostLine(BaseModel):
+    """Calculated personnel cost line for a category/cycle group."""
+
+    account_code: str
+    description: str
+    category_id: UUID
+    cycle_id: UUID | None
+    fte_count: Decimal
+    unit_cost_sar: Decimal
+    total_cost_sar: Decimal
+
+
+class ConsolidationLine(BaseModel):
+    """Consolidated amount for one account code."""
+
+    account_code: str
+    account_name: str
+    consolidation_category: str = Field(..., description="ConsolidationCategory value")
+    is_revenue: bool
+    amount_sar: Decimal
+    source_table: str
+    source_count: int
+
+
+class ClassSizeViolation(BaseModel):
+    """Class size rule broken by the calculated structure."""
+
+    rule: str = Field(..., description="AVG_BELOW_MIN, AVG_EXCEEDS_MAX or MISSING_CLASS_SIZE_PARAMS")
+    level_id: UUID
+    level_code: str
+    message: str
+    avg_class_size: Decimal | None = None
+    limit: int | None = None
+
+
+class BudgetModelResult(BaseModel):
+    """Every calculated output of the cascade for one version."""
+
+    version_id: UUID
+    class_structures: list[ClassStructureLine] = Field(default_factory=list)
+    subject_hours: list[SubjectHoursLine] = Field(default_factory=list)
+    teacher_requirements: list[TeacherRequirementLine] = Field(default_factory=list)
+    revenue_lines: list[RevenueLine] = Field(default_factory=list)
+    personnel_costs: list[PersonnelCostLine] = Field(default_factory=list)
+    consolidation_lines: list[ConsolidationLine] = Field(default_factory=list)
+    violations: list[ClassSizeViolation] = Field(default_factory=list)
+
+    total_students: int = 0
+    total_classes: int = 0
+    total_dhg_hours: Decimal = Decimal("0")
+    total_teacher_fte: Decimal = Decimal("0")
+    total_revenue: Decimal = Decimal("0")
+    total_personnel_costs: Decimal = Decimal("0")
+    total_costs: Decimal = Decimal("0")
+    net_result: Decimal = Decimal("0")
+
+
+# ==============================================================================
+# Goal seek
+# ==============================================================================
+
+
+class GoalSeekIteration(BaseModel):
+    """One evaluation of the goal-seek solver."""
+
+    iteration: int = Field(..., description="0 for the bracket end evaluations")
+    method: str = Field(..., description="bracket, secant or bisection")
+    driver_value: float
+    metric_value: float
+    residual: float = Field(..., description="metric_value - target")
+
+
+class GoalSeekSolution(BaseModel):
+    """Driver value solving metric(driver) = target, with convergence diagnostics."""
+
+    solved_value: float
+    metric_value: float
+    residual: float
+    converged: bool = Field(..., description="Whether the residual is within tolerance")
+    termination: str = Field(..., description="tolerance, resolution or max_iterations")
+    iterations: int
+    evaluations: int
+    bracket_lower: float = Field(..., description="Final bracket lower bound")
+    bracket_upper: float = Field(..., description="Final bracket upper bound")
+    history: list[GoalSeekIteration] = Field(default_factory=list)
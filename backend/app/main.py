@@ -23,6 +23,7 @@ from sqlalchemy import text
 from app.api.v1 import (
     admin_router,
     analysis_router,
+    batch_router,
     calculations_router,
     configuration_router,
     consolidation_router,
@@ -36,13 +37,22 @@ from app.api.v1 import (
     workforce_router,
     writeback_router,
 )
+from app.api.v1.enrollment_projection import router as enrollment_projection_router
 from app.core.cache import initialize_cache, validate_redis_config
 from app.core.logging import LoggingMiddleware, logger
-from app.database import DATABASE_URL, engine, init_db
+from app.core.responses import ORJSONResponse
+from app.database import DATABASE_URL, AsyncSessionLocal, engine, init_db
 from app.middleware.auth import AuthenticationMiddleware
+from app.middleware.compression import CompressionMiddleware
 from app.middleware.metrics import RequestMetricsMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.routes import health
+from app.services.parallel_validation import shutdown_validation_pool
+from app.services.summary_refresh_scheduler import (
+    SummaryRefreshScheduler,
+    get_summary_refresh_scheduler,
+    set_summary_refresh_scheduler,
+)
 
 # =============================================================================
 # Sentry Error Filtering
@@ -133,6 +143,7 @@ def create_app() -> FastAPI:
         description="REST API for EFIR School Budget Planning Application",
         docs_url="/docs",
         redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
     )
     # Auto-enable test bypass during pytest runs, otherwise use env var (default: false)
     is_pytest = "pytest" in sys.modules or os.getenv("PYTEST_CURRENT_TEST") is not None
@@ -153,6 +164,9 @@ def create_app() -> FastAPI:
         print(f"  Expected issuer: {supabase_url.rstrip('/')}/auth/v1")
     print("=" * 60)
 
+    # Compression middleware (innermost: compresses route responses as they stream)
+    app.add_middleware(CompressionMiddleware)
+
     # CORS middleware should wrap authentication so preflight checks hit it first
     # Get allowed origins from environment variable, with sensible defaults
     allowed_origins_str = os.getenv(
@@ -202,7 +216,11 @@ def create_app() -> FastAPI:
     app.include_router(admin_router)
     app.include_router(calculations_router)
     app.include_router(configuration_router)
+    # Mounted under the planning prefix, but kept out of the planning module so
+    # that planning (and the batch endpoint built on it) import on their own
+    app.include_router(enrollment_projection_router, prefix="/api/v1/planning")
     app.include_router(planning_router)
+    app.include_router(batch_router)
     app.include_router(costs_router)
     app.include_router(analysis_router)
     app.include_router(consolidation_router)
@@ -395,6 +413,13 @@ async def startup_event():
                 message="Auth endpoints may be unavailable",
             )
 
+    # 6. Start the debounced summary table refresher (PostgreSQL only)
+    refresher_enabled = os.getenv("ENABLE_SUMMARY_REFRESH", "true").lower() == "true"
+    if refresher_enabled and not DATABASE_URL.startswith("sqlite"):
+        scheduler = SummaryRefreshScheduler(AsyncSessionLocal)
+        scheduler.start()
+        set_summary_refresh_scheduler(scheduler)
+
     logger.info("application_startup_complete")
 
 
@@ -403,6 +428,15 @@ async def shutdown_event():
     """Cleanup resources on application shutdown."""
     logger.info("application_shutdown_begin")
 
+    # Stop the summary table refresher
+    scheduler = get_summary_refresh_scheduler()
+    if scheduler is not None:
+        await scheduler.stop()
+        set_summary_refresh_scheduler(None)
+
+    # Stop the import validation worker processes
+    shutdown_validation_pool()
+
     # Close Redis client
     try:
         from app.core.cache import close_redis_client
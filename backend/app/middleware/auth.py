@@ -4,19 +4,21 @@ Authentication middleware for JWT validation with Supabase.
 Validates Supabase JWT tokens and extracts user information.
 """
 
+import logging
 import os
-from collections.abc import Callable
 
-from fastapi import Request, Response
+from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core.security import verify_supabase_jwt
 
+logger = logging.getLogger(__name__)
 
-class AuthenticationMiddleware(BaseHTTPMiddleware):
+
+class AuthenticationMiddleware:
     """
-    Middleware for validating Supabase JWT tokens.
+    ASGI middleware for validating Supabase JWT tokens.
 
     Extracts the Authorization header, validates the JWT token,
     and adds user information to the request state.
@@ -36,6 +38,9 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
         "/health",  # All health endpoints (/health/live, /health/ready)
     ]
 
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
     def _get_cors_headers(self, request: Request) -> dict[str, str]:
         """
         Generate CORS headers for authentication responses.
@@ -67,92 +72,94 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
             "Access-Control-Allow-Headers": "authorization, content-type",
         }
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process the request and validate authentication.
 
-        Args:
-            request: FastAPI request object
-            call_next: Next middleware/handler in the chain
+        User information is stored in the request state (scope["state"]),
+        which downstream middleware and handlers read via request.state.
 
-        Returns:
-            Response from the next handler or authentication error
+        Args:
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+
         # Optional app-level toggle for test environments
         if getattr(request.app.state, "skip_auth_for_tests", False):
             request.state.user_role = "planner"
             request.state.user_id = "00000000-0000-0000-0000-000000000001"
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Skip authentication for public paths
         if request.url.path in self.PUBLIC_PATHS:
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Skip authentication for public path prefixes
         for prefix in self.PUBLIC_PATH_PREFIXES:
             if request.url.path.startswith(prefix):
-                return await call_next(request)
+                await self.app(scope, receive, send)
+                return
 
         # Extract authorization header
-        import logging
-        logger = logging.getLogger(__name__)
-
         # Try both lowercase and capitalized header names
         auth_header = request.headers.get("authorization") or request.headers.get("Authorization")
 
         if not auth_header:
             logger.warning(f"❌ Authorization header missing for {request.url.path}")
-            print(f"[AUTH] Auth header missing/invalid for {request.url.path}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": "Authorization header missing"},
                 headers=self._get_cors_headers(request),
             )
+            await response(scope, receive, send)
+            return
 
         # Validate Bearer token format
         if not auth_header.startswith("Bearer "):
             logger.warning(f"❌ Invalid Authorization header format for {request.url.path}")
-            print(f"[AUTH] Invalid header format (prefix only): {auth_header[:20]}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": "Invalid authorization header format. Expected: Bearer <token>"},
                 headers=self._get_cors_headers(request),
             )
+            await response(scope, receive, send)
+            return
 
         token = auth_header.split(" ", 1)[1]
-        logger.info(
-            f"📥 JWT token received for {request.url.path}, "
-            f"length: {len(token)}, preview: {token[:20]}..."
-        )
-        print(f"[AUTH] Token received, length: {len(token)}, prefix: {token[:20]}...")
 
-        # Verify JWT token
+        # Verify JWT token (served from the verified-token cache when warm)
         payload = verify_supabase_jwt(token)
         if not payload:
             logger.warning(
                 f"JWT verification failed for {request.url.path}. "
                 f"Check backend logs for details."
             )
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": "Invalid or expired token"},
                 headers=self._get_cors_headers(request),
             )
+            await response(scope, receive, send)
+            return
 
         user_id = payload.get("sub")
         if not user_id:
             logger.error(f"JWT payload missing 'sub' field. Payload keys: {payload.keys()}")
-            print("[AUTH] ERROR: JWT payload missing 'sub' field")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": "JWT token missing user ID"},
                 headers=self._get_cors_headers(request),
             )
-
-        logger.info(
-            f"JWT verification successful for {request.url.path}, user: {user_id}"
-        )
-        print(f"[AUTH] ✅ JWT verified, user_id: {user_id}, type: {type(user_id)}")
+            await response(scope, receive, send)
+            return
 
         # Add user information to request state
         request.state.user_id = user_id
@@ -160,4 +167,4 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
         request.state.user_role = payload.get("role", "planner")
         request.state.user_metadata = payload.get("user_metadata", {})
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
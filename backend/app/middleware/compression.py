@@ -0,0 +1,361 @@
+"""
+Response compression middleware.
+
+Negotiates gzip or brotli (when the brotli package is installed) from the
+Accept-Encoding header and compresses responses that:
+1. Have an allow-listed content type (JSON, CSV, text)
+2. Are at least COMPRESSION_MIN_SIZE bytes (unknown for streams: always)
+3. Are not already encoded
+
+Streaming responses (CSV exports) are compressed chunk by chunk as they are
+produced, never buffered: each chunk is fed to the compressor and whatever
+it emits is sent, with a sync flush every COMPRESSION_STREAM_FLUSH_BYTES of
+input so clients keep receiving data.
+
+Compressed bytes, ratio and compression CPU time are recorded per route
+(Prometheus), together with the reasons responses were not compressed.
+"""
+
+import os
+import time
+import zlib
+from typing import Protocol
+
+from prometheus_client import Counter, Histogram
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.metrics import RequestMetricsMiddleware
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Smaller bodies are sent uncompressed (headers and framing outweigh the gain)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# zlib level 1-9 and brotli quality 0-11; moderate defaults favour CPU time
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Streams are sync-flushed after this much input (0 flushes every chunk)
+COMPRESSION_STREAM_FLUSH_BYTES = int(os.getenv("COMPRESSION_STREAM_FLUSH_BYTES", "16384"))
+
+# Content types worth compressing (binary exports like xlsx/pdf already are)
+COMPRESSIBLE_CONTENT_TYPES = frozenset(
+    {
+        "application/json",
+        "application/problem+json",
+        "application/javascript",
+        "application/xml",
+        "image/svg+xml",
+        "text/csv",
+        "text/css",
+        "text/html",
+        "text/plain",
+        "text/xml",
+    }
+)
+
+COMPRESSION_INPUT_BYTES = Counter(
+    "http_compression_input_bytes_total",
+    "Response bytes before compression",
+    ["path", "encoding"],
+)
+COMPRESSION_OUTPUT_BYTES = Counter(
+    "http_compression_output_bytes_total",
+    "Response bytes after compression",
+    ["path", "encoding"],
+)
+COMPRESSION_CPU_SECONDS = Counter(
+    "http_compression_cpu_seconds_total",
+    "CPU time spent compressing responses",
+    ["path", "encoding"],
+)
+COMPRESSION_RATIO = Histogram(
+    "http_compression_ratio",
+    "Uncompressed to compressed size ratio per response",
+    ["path", "encoding"],
+    buckets=(1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 12.0, 20.0, 50.0),
+)
+COMPRESSION_SKIPPED = Counter(
+    "http_compression_skipped_total",
+    "Responses to clients accepting compression that were sent uncompressed",
+    ["path", "reason"],
+)
+
+
+class _Encoder(Protocol):
+    encoding: str
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _GzipEncoder:
+    """Incremental gzip encoder."""
+
+    encoding = "gzip"
+
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    """Incremental brotli encoder."""
+
+    encoding = "br"
+
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Encodings this server can produce, in order of preference."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick the response encoding from an Accept-Encoding header.
+
+    The encoding with the highest q-value wins; ties go to the server
+    preference (brotli, then gzip). "*" matches encodings not listed.
+
+    Args:
+        accept_encoding: Accept-Encoding header value
+
+    Returns:
+        "br", "gzip", or None when no supported encoding is acceptable
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best: str | None = None
+    best_q = 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _create_encoder(encoding: str, gzip_level: int, brotli_quality: int) -> _Encoder:
+    if encoding == "br":
+        return _BrotliEncoder(brotli_quality)
+    return _GzipEncoder(gzip_level)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with gzip or brotli.
+
+    Features:
+    - Accept-Encoding negotiation with q-values (brotli preferred)
+    - Size threshold and content-type allow-list
+    - Incremental compression of streaming responses
+    - Vary: Accept-Encoding on compressible responses; strong ETags of
+      compressed responses are weakened (the bytes differ per encoding)
+    - Per-route compression metrics
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        stream_flush_bytes: int = COMPRESSION_STREAM_FLUSH_BYTES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stream_flush_bytes = stream_flush_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-response compression state."""
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        scope: Scope,
+        send: Send,
+        encoding: str,
+    ) -> None:
+        self.middleware = middleware
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.start_message: Message | None = None
+        self.encoder: _Encoder | None = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self.pending_flush = 0
+
+    @property
+    def path(self) -> str:
+        return RequestMetricsMiddleware._normalize_path(self.scope["path"])
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.downstream(message)
+        elif message["type"] == "http.response.start":
+            reason = self._skip_reason(message)
+            if reason is None:
+                # Hold the start message until the first body chunk
+                self.start_message = message
+                return
+            self.passthrough = True
+            if reason != "status":
+                COMPRESSION_SKIPPED.labels(path=self.path, reason=reason).inc()
+            await self.downstream(message)
+        elif message["type"] == "http.response.body":
+            await self._send_body(message)
+        else:
+            await self.downstream(message)
+
+    def _skip_reason(self, message: Message) -> str | None:
+        """Return why a response is sent uncompressed, or None to compress."""
+        status_code = message["status"]
+        if status_code < 200 or status_code in (204, 304):
+            return "status"
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return "encoded"
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in COMPRESSIBLE_CONTENT_TYPES:
+            return "content_type"
+        # Vary on every compressible response so caches keep variants apart
+        MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.middleware.minimum_size:
+            return "too_small"
+        return None
+
+    async def _send_body(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            start_message = self.start_message
+            assert start_message is not None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Whole body known and too small (no Content-Length was set)
+                self.passthrough = True
+                COMPRESSION_SKIPPED.labels(path=self.path, reason="too_small").inc()
+                await self.downstream(start_message)
+                await self.downstream(message)
+                return
+
+            self.encoder = _create_encoder(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            headers = MutableHeaders(scope=start_message)
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+
+            if not more_body:
+                # Complete body in one message: compress it with a known length
+                compressed = self._compress(body, final=True)
+                headers["Content-Length"] = str(len(compressed))
+                await self.downstream(start_message)
+                await self.downstream({"type": "http.response.body", "body": compressed})
+                self._record()
+                return
+
+            # Streaming: length unknown until the end
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.downstream(start_message)
+
+        chunk = self._compress(body, final=not more_body)
+        if more_body and not chunk:
+            # Compressor is still buffering; nothing to send yet
+            return
+        await self.downstream(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+        if not more_body:
+            self._record()
+
+    def _compress(self, data: bytes, final: bool) -> bytes:
+        """Feed data to the encoder and return the compressed output available."""
+        encoder = self.encoder
+        assert encoder is not None
+        start = time.thread_time()
+        output = encoder.compress(data) if data else b""
+        self.pending_flush += len(data)
+        if final:
+            output += encoder.finish()
+        elif self.pending_flush and self.pending_flush >= self.middleware.stream_flush_bytes:
+            output += encoder.flush()
+            self.pending_flush = 0
+        self.cpu_seconds += time.thread_time() - start
+        self.bytes_in += len(data)
+        self.bytes_out += len(output)
+        return output
+
+    def _record(self) -> None:
+        """Record compression metrics for the completed response."""
+        try:
+            labels = {"path": self.path, "encoding": self.encoding}
+            COMPRESSION_INPUT_BYTES.labels(**labels).inc(self.bytes_in)
+            COMPRESSION_OUTPUT_BYTES.labels(**labels).inc(self.bytes_out)
+            COMPRESSION_CPU_SECONDS.labels(**labels).inc(self.cpu_seconds)
+            if self.bytes_out:
+                COMPRESSION_RATIO.labels(**labels).observe(self.bytes_in / self.bytes_out)
+        except Exception:
+            # Metrics should never break the request flow
+            pass
@@ -14,9 +14,8 @@ import re
 import time
 
 from prometheus_client import Counter, Histogram
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.logging import logger
 
@@ -40,63 +39,78 @@ HTTP_REQUEST_DURATION = Histogram(
 SLOW_REQUEST_THRESHOLD = 1.0
 
 
-class RequestMetricsMiddleware(BaseHTTPMiddleware):
+class RequestMetricsMiddleware:
     """
-    Middleware to track HTTP request metrics and timing.
+    ASGI middleware to track HTTP request metrics and timing.
 
     Features:
     - Increments request counter (method/path/status)
     - Records request duration histogram
     - Adds X-Request-Time-Ms header to responses
     - Logs slow requests (>1s) for investigation
+
+    Duration is measured until the response starts, as headers cannot be
+    changed afterwards; streamed bodies pass through unbuffered.
     """
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Start timing
         start_time = time.perf_counter()
 
+        async def send_with_metrics(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._record(scope, message, time.perf_counter() - start_time)
+            await send(message)
+
         # Process request
-        response = await call_next(request)
+        await self.app(scope, receive, send_with_metrics)
 
-        # Calculate duration
-        duration = time.perf_counter() - start_time
+    def _record(self, scope: Scope, message: Message, duration: float) -> None:
+        """Record metrics for a response and add the timing header."""
         duration_ms = round(duration * 1000, 2)
+        method = scope["method"]
+        status_code = message["status"]
 
         try:
-            path = self._normalize_path(request.url.path)
+            path = self._normalize_path(scope["path"])
 
             # Increment request counter
             HTTP_REQUEST_COUNTER.labels(
-                method=request.method,
+                method=method,
                 path=path,
-                status=str(response.status_code),
+                status=str(status_code),
             ).inc()
 
             # Record duration histogram
             HTTP_REQUEST_DURATION.labels(
-                method=request.method,
+                method=method,
                 path=path,
             ).observe(duration)
 
             # Add timing header for frontend debugging
-            response.headers["X-Request-Time-Ms"] = str(duration_ms)
+            MutableHeaders(scope=message)["X-Request-Time-Ms"] = str(duration_ms)
 
             # Log slow requests
             if duration > SLOW_REQUEST_THRESHOLD:
                 logger.warning(
                     "slow_request",
-                    method=request.method,
-                    path=request.url.path,
+                    method=method,
+                    path=scope["path"],
                     duration_ms=duration_ms,
-                    status=response.status_code,
+                    status=status_code,
                 )
 
         except Exception:
             # Metrics should never break the request flow
             pass
 
-        return response
-
     @staticmethod
     def _normalize_path(path: str) -> str:
         """
@@ -3,16 +3,25 @@ Rate limiting middleware for EFIR Budget Planning Application.
 
 Implements sliding window rate limiting using Redis for distributed enforcement.
 Provides different rate limits based on endpoint sensitivity and user role.
+
+Each check is a single atomic Lua script over a sliding-window counter
+(current and previous window counts in one hash, O(1) memory per client).
+An optional in-process token bucket admits clients that are clearly under
+their limit without a Redis round trip; locally admitted requests are
+added to the Redis counter on the client's next Redis check.
 """
 
 import os
 import time
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import Any
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import Request
+from prometheus_client import Counter
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.logging import logger
 
@@ -55,6 +64,71 @@ _testing = os.getenv("PYTEST_CURRENT_TEST") is not None
 RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true" and not _testing
 REDIS_ENABLED = os.getenv("REDIS_ENABLED", "true").lower() == "true" and not _testing
 
+# In-process pre-check: admit clients clearly under their limit without Redis
+LOCAL_PRECHECK_ENABLED = os.getenv("RATE_LIMIT_LOCAL_PRECHECK", "true").lower() == "true"
+# Share of the limit a worker may admit locally between two Redis checks
+LOCAL_SHARE = float(os.getenv("RATE_LIMIT_LOCAL_SHARE", "0.1"))
+# Local admission only while the last Redis count is below this share of the limit
+LOCAL_HEADROOM = float(os.getenv("RATE_LIMIT_LOCAL_HEADROOM", "0.5"))
+# Maximum number of clients tracked locally (least recently used are evicted)
+LOCAL_MAX_KEYS = int(os.getenv("RATE_LIMIT_LOCAL_MAX_KEYS", "10000"))
+
+RATE_LIMIT_CHECKS = Counter(
+    "rate_limit_checks_total",
+    "Rate limit decisions by source (local pre-check or Redis)",
+    ["source", "result"],
+)
+
+# Sliding-window counter, evaluated atomically in Redis.
+#
+# KEYS[1]: hash holding w (current window index), c (current count),
+#          p (previous window count)
+# ARGV[1]: max requests per window
+# ARGV[2]: window in seconds
+# ARGV[3]: requests admitted locally since the last check (always counted)
+#
+# The request count is estimated as p * (1 - elapsed share of window) + c.
+# Returns {allowed (0/1), estimated count, seconds until window reset}.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local pending = tonumber(ARGV[3])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local index = math.floor(now / window)
+
+local state = redis.call('HMGET', KEYS[1], 'w', 'c', 'p')
+local current_index = tonumber(state[1])
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+
+if current_index ~= index then
+    if current_index == index - 1 then
+        previous = current
+    else
+        previous = 0
+    end
+    current = 0
+end
+
+current = current + pending
+local elapsed = now - index * window
+local estimated = previous * (1 - elapsed / window) + current
+
+local allowed = 0
+if estimated + 1 <= limit then
+    allowed = 1
+    current = current + 1
+    estimated = estimated + 1
+end
+
+redis.call('HSET', KEYS[1], 'w', index, 'c', current, 'p', previous)
+redis.call('EXPIRE', KEYS[1], window * 2)
+
+return {allowed, math.ceil(estimated), window - math.floor(elapsed)}
+"""
+
 
 def get_client_identifier(request: Request) -> str:
     """
@@ -126,44 +200,173 @@ def get_user_role(request: Request) -> str:
     return "viewer"
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class LocalTokenBucket:
+    """Per-client token bucket refilled from the last Redis decision."""
+
+    __slots__ = ("pending", "remote_count", "tokens", "updated_at")
+
+    def __init__(self) -> None:
+        self.tokens = 0.0
+        self.updated_at = time.monotonic()
+        self.remote_count = 0
+        self.pending = 0
+
+
+class LocalRateLimiter:
+    """
+    In-process token buckets in front of the Redis limiter.
+
+    A worker may admit up to LOCAL_SHARE of a client's limit per window
+    without Redis, but only while the client's last Redis count was below
+    LOCAL_HEADROOM of the limit. Locally admitted requests are reported to
+    Redis with the client's next Redis check, so the shared count stays
+    exact up to the requests admitted since then.
+    """
+
+    def __init__(
+        self,
+        share: float = LOCAL_SHARE,
+        headroom: float = LOCAL_HEADROOM,
+        max_keys: int = LOCAL_MAX_KEYS,
+    ):
+        self.share = share
+        self.headroom = headroom
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, LocalTokenBucket] = OrderedDict()
+
+    def try_acquire(self, key: str, max_requests: int, window: int) -> int | None:
+        """
+        Admit a request locally if the client is clearly under its limit.
+
+        Args:
+            key: Rate limit key (category and client)
+            max_requests: Maximum requests allowed per window
+            window: Time window in seconds
+
+        Returns:
+            Estimated request count when admitted, None when Redis must decide
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.remote_count + bucket.pending >= max_requests * self.headroom:
+            return None
+
+        capacity = max_requests * self.share
+        now = time.monotonic()
+        bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated_at) * capacity / window)
+        bucket.updated_at = now
+        if bucket.tokens < 1:
+            return None
+
+        bucket.tokens -= 1
+        bucket.pending += 1
+        self._buckets.move_to_end(key)
+        return bucket.remote_count + bucket.pending
+
+    def take_pending(self, key: str) -> int:
+        """Return and reset the requests admitted locally since the last Redis check."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0
+        pending, bucket.pending = bucket.pending, 0
+        return pending
+
+    def record(self, key: str, is_allowed: bool, current_count: int, max_requests: int) -> None:
+        """
+        Store the result of a Redis check for later local decisions.
+
+        Args:
+            key: Rate limit key (category and client)
+            is_allowed: Whether Redis admitted the request
+            current_count: Request count reported by Redis
+            max_requests: Maximum requests allowed per window
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            # New clients start with a full bucket so bursts skip Redis
+            bucket = LocalTokenBucket()
+            bucket.tokens = max_requests * self.share
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+
+        bucket.remote_count = current_count
+        if not is_allowed:
+            bucket.tokens = 0.0
+            bucket.updated_at = time.monotonic()
+
+    def clear(self) -> None:
+        """Drop all local buckets."""
+        self._buckets.clear()
+
+
+_local_limiter = LocalRateLimiter()
+_sliding_window_script: Any = None
+
+
+def get_local_rate_limiter() -> LocalRateLimiter:
+    """Return the process-wide local rate limiter."""
+    return _local_limiter
+
+
+def _get_sliding_window_script(client: Any) -> Any:
+    """Register the sliding-window script once per Redis client (EVALSHA thereafter)."""
+    global _sliding_window_script
+    if _sliding_window_script is None or _sliding_window_script.registered_client is not client:
+        _sliding_window_script = client.register_script(SLIDING_WINDOW_SCRIPT)
+    return _sliding_window_script
+
+
+class RateLimitMiddleware:
     """
-    Rate limiting middleware using sliding window algorithm.
+    Rate limiting ASGI middleware using sliding window algorithm.
 
     Features:
-    - Redis-backed for distributed rate limiting
+    - Redis-backed for distributed rate limiting (one atomic script per check)
+    - Local token-bucket pre-check for clients well under their limit
     - Role-based rate limit multipliers
     - Path-based rate limit categories
     - Graceful degradation when Redis unavailable
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         Process request with rate limiting.
 
         Args:
-            request: Incoming request
-            call_next: Next middleware/handler
-
-        Returns:
-            Response or 429 Too Many Requests
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope, receive)
+
         # Skip if rate limiting disabled or flagged off for this app
         if (
             getattr(request.app.state, "skip_rate_limit_for_tests", False)
             or not RATE_LIMIT_ENABLED
             or os.getenv("DISABLE_RATE_LIMITING", "false").lower() == "true"
         ):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Skip rate limiting for health checks
         if request.url.path in ["/health", "/health/ready", "/health/live"]:
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Skip rate limiting for OPTIONS preflight requests
         # CORS preflight should never be rate limited as they're browser-generated
         if request.method == "OPTIONS":
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Get rate limit parameters
         client_id = get_client_identifier(request)
@@ -202,7 +405,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             allowed_origins = [o.strip() for o in allowed_origins_str.split(",")]
             cors_origin = origin if origin in allowed_origins else allowed_origins[0]
 
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=429,
                 content={
                     "detail": "Rate limit exceeded",
@@ -222,16 +425,20 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     "Access-Control-Allow-Headers": "authorization, content-type",
                 },
             )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_rate_limit_headers(message: Message) -> None:
+            # Add rate limit headers to response
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(max_requests)
+                headers["X-RateLimit-Remaining"] = str(max(0, max_requests - current_count))
+                headers["X-RateLimit-Reset"] = str(int(time.time()) + reset_time)
+            await send(message)
 
         # Process request
-        response = await call_next(request)
-
-        # Add rate limit headers to response
-        response.headers["X-RateLimit-Limit"] = str(max_requests)
-        response.headers["X-RateLimit-Remaining"] = str(max(0, max_requests - current_count))
-        response.headers["X-RateLimit-Reset"] = str(int(time.time()) + reset_time)
-
-        return response
+        await self.app(scope, receive, send_with_rate_limit_headers)
 
     async def _check_rate_limit(
         self,
@@ -256,30 +463,32 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             # Graceful degradation: allow all requests if Redis unavailable
             return True, 0, window
 
+        key = f"rate_limit:sw:{category}:{client_id}"
+
+        if LOCAL_PRECHECK_ENABLED:
+            local_count = _local_limiter.try_acquire(key, max_requests, window)
+            if local_count is not None:
+                RATE_LIMIT_CHECKS.labels(source="local", result="allowed").inc()
+                return True, local_count, window - int(time.time()) % window
+
+        pending = _local_limiter.take_pending(key)
         try:
             from app.core.cache import get_redis_client
 
             client = await get_redis_client()
-            key = f"rate_limit:{category}:{client_id}"
-            now = int(time.time())
-
-            # Use Redis pipeline for atomic operations
-            async with client.pipeline(transaction=True) as pipe:
-                # Remove expired entries
-                pipe.zremrangebyscore(key, 0, now - window)
-                # Add current request
-                pipe.zadd(key, {str(now): now})
-                # Count requests in window
-                pipe.zcard(key)
-                # Set expiry on key
-                pipe.expire(key, window)
-                results = await pipe.execute()
-
-            current_count = results[2]
-            reset_time = window - (now % window)
-
-            is_allowed = current_count <= max_requests
-            return is_allowed, current_count, reset_time
+            script = _get_sliding_window_script(client)
+            allowed, current_count, reset_time = await script(
+                keys=[key], args=[max_requests, window, pending], client=client
+            )
+
+            is_allowed = bool(int(allowed))
+            current_count = int(current_count)
+            if LOCAL_PRECHECK_ENABLED:
+                _local_limiter.record(key, is_allowed, current_count, max_requests)
+            RATE_LIMIT_CHECKS.labels(
+                source="redis", result="allowed" if is_allowed else "limited"
+            ).inc()
+            return is_allowed, current_count, int(reset_time)
 
         except Exception as e:
             logger.error("rate_limit_check_failed", error=str(e), client_id=client_id)
@@ -21,6 +21,7 @@ from app.models.analysis import (
     DashboardWidget,
     # Historical Comparison
     HistoricalActuals,
+    HistoricalComparisonCube,
     HistoricalDataSource,
     HistoricalDimensionType,
     HistoricalModuleCode,
@@ -46,6 +47,7 @@ from app.models.configuration import (
     AcademicCycle,
     AcademicLevel,
     BudgetVersion,
+    BudgetVersionRevision,
     BudgetVersionStatus,
     ClassSizeParam,
     FeeCategory,
@@ -131,6 +133,7 @@ __all__ = [
     # Consolidation Layer (Modules 13-14)
     "BudgetConsolidation",
     "BudgetVersion",
+    "BudgetVersionRevision",
     "BudgetVersionStatus",
     "BudgetVsActual",
     "CapExPlan",
@@ -168,6 +171,7 @@ __all__ = [
     "FinancialStatementLine",
     # Historical Comparison
     "HistoricalActuals",
+    "HistoricalComparisonCube",
     "HistoricalDataSource",
     "HistoricalDimensionType",
     "HistoricalModuleCode",
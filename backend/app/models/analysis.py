@@ -37,7 +37,15 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.models.base import BaseModel, PortableJSON, VersionedMixin, get_fk_target, get_schema
+from app.models.base import (
+    Base,
+    BaseModel,
+    PortableJSON,
+    VersionedMixin,
+    get_fk_target,
+    get_schema,
+    get_table_args,
+)
 
 # Note: BudgetVersion is inherited from VersionedMixin, no TYPE_CHECKING import needed
 
@@ -1465,6 +1473,68 @@ class HistoricalActuals(BaseModel):
         )
 
 
+class HistoricalComparisonCube(Base):
+    """
+    Precomputed N-1 / N-2 historical values per planning fiscal year.
+
+    One row per (module, dimension, planning fiscal year) holding the module's
+    comparison value (student count, FTE/hours, SAR amount) for the two prior
+    years, so historical comparison grids read a single primary-key range
+    instead of pivoting historical_actuals on every request.
+
+    Maintained by HistoricalComparisonService.refresh_cube whenever historical
+    actuals are imported or deleted.
+    """
+
+    __tablename__ = "historical_comparison_cube"
+    __table_args__ = get_table_args(comment=__doc__)
+
+    module_code: Mapped[HistoricalModuleCode] = mapped_column(
+        Enum(
+            HistoricalModuleCode,
+            schema=get_schema("efir_budget"),
+            values_callable=lambda x: [e.value for e in x],
+        ),
+        primary_key=True,
+        comment="Module identifier: enrollment, dhg, revenue, costs, capex",
+    )
+    dimension_type: Mapped[HistoricalDimensionType] = mapped_column(
+        Enum(
+            HistoricalDimensionType,
+            schema=get_schema("efir_budget"),
+            values_callable=lambda x: [e.value for e in x],
+        ),
+        primary_key=True,
+        comment="Type of dimension: level, subject, account_code, etc.",
+    )
+    fiscal_year: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        comment="Planning fiscal year the history is compared against (N)",
+    )
+    dimension_code: Mapped[str] = mapped_column(
+        String(50),
+        primary_key=True,
+        comment="Human-readable code (level_code, account_code, subject_code)",
+    )
+    n_minus_1_value: Mapped[Decimal | None] = mapped_column(
+        Numeric(15, 2),
+        nullable=True,
+        comment="Actual value of fiscal year N-1",
+    )
+    n_minus_2_value: Mapped[Decimal | None] = mapped_column(
+        Numeric(15, 2),
+        nullable=True,
+        comment="Actual value of fiscal year N-2",
+    )
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        comment="When the row was last rebuilt",
+    )
+
+
 # ============================================================================
 # KPI Helpers
 # ============================================================================
@@ -23,6 +23,7 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy import (
     UUID,
+    BigInteger,
     Boolean,
     CheckConstraint,
     DateTime,
@@ -37,12 +38,14 @@ from sqlalchemy import (
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import (
+    Base,
     BaseModel,
     PortableJSON,
     ReferenceDataModel,
     VersionedMixin,
     get_fk_target,
     get_schema,
+    get_table_args,
 )
 
 if TYPE_CHECKING:
@@ -229,6 +232,52 @@ class BudgetVersion(BaseModel):
     )
 
 
+class BudgetVersionRevision(Base):
+    """
+    Write log entry of a budget version's data.
+
+    Statement-level database triggers insert one row per written version
+    whenever a statement writes the version's row in budget_versions or its
+    rows in a versioned table (planning, costs, consolidation, statements,
+    KPIs, summaries, writeback cells). The log is insert-only, so concurrent
+    writers never wait on each other; deleting a budget version deletes its
+    rows.
+
+    The data revision of a version is the sum of its rows' write counts (see
+    get_data_revision). Read endpoints derive ETags from it. Compaction folds
+    a version's rows into one row carrying their summed write count, which
+    leaves the revision unchanged.
+    """
+
+    __tablename__ = "budget_version_revisions"
+    __table_args__ = get_table_args(comment=__doc__)
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+        comment="Log sequence number",
+    )
+    budget_version_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+        index=True,
+        comment="Budget version (no foreign key: its delete trigger removes the rows)",
+    )
+    writes: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=1,
+        comment="Write statements logged by this row (more than one once compacted)",
+    )
+    logged_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        comment="When the row was logged or compacted",
+    )
+
+
 # ==============================================================================
 # Module 2: Class Size Parameters
 # ==============================================================================
@@ -185,6 +185,11 @@ class BudgetConsolidation(BaseModel, VersionedMixin):
         default=True,
         comment="True if auto-calculated, False if manual override",
     )
+    input_fingerprint: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+        comment="Fingerprint of the planning inputs this line was consolidated from",
+    )
 
     # Optional Notes
     notes: Mapped[str | None] = mapped_column(
@@ -325,6 +330,11 @@ class FinancialStatement(BaseModel, VersionedMixin):
         default=True,
         comment="True if auto-calculated, False if manual",
     )
+    input_fingerprint: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+        comment="Fingerprint of the consolidation this statement was generated from",
+    )
     notes: Mapped[str | None] = mapped_column(
         Text,
         nullable=True,
@@ -8,7 +8,7 @@ Provides request/response models for:
 - Strategic planning and scenario modeling
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 from typing import Any
@@ -189,6 +189,25 @@ class AlertResponse(BaseModel):
     timestamp: str
 
 
+class DashboardWidgetResult(BaseModel):
+    """One widget of a dashboard bundle."""
+
+    data: Any = None
+    duration_ms: float
+    error: str | None = None
+
+
+class DashboardBundleResponse(BaseModel):
+    """All dashboard widgets of a budget version, with per-widget timing."""
+
+    version_id: str
+    version_name: str
+    fiscal_year: int
+    status: str
+    widgets: dict[str, DashboardWidgetResult]
+    total_duration_ms: float
+
+
 class ActivityLogEntry(BaseModel):
     """Activity log entry."""
 
@@ -245,6 +264,28 @@ class ActualDataImportResponse(BaseModel):
     import_date: str
 
 
+class ActualDataResponse(BaseModel):
+    """Imported actual (Odoo GL) record."""
+
+    id: UUID
+    fiscal_year: int
+    period: int
+    account_code: str
+    account_name: str | None
+    amount_sar: Decimal
+    currency: str
+    import_batch_id: UUID
+    import_date: datetime
+    source: str
+    transaction_date: date | None
+    description: str | None
+    is_reconciled: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class VarianceDetailResponse(BaseModel):
     """Single variance detail."""
 
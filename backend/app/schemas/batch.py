@@ -0,0 +1,68 @@
+"""
+Pydantic schemas for batched read requests.
+
+A batch bundles several GET requests on whitelisted planning routes into one
+HTTP round trip.
+"""
+
+from typing import Any
+
+from pydantic import BaseModel, Field, model_validator
+
+# Upper bound on operations per batch request
+MAX_BATCH_OPERATIONS = 20
+
+
+class BatchOperation(BaseModel):
+    """One read operation of a batch."""
+
+    id: str | None = Field(
+        default=None,
+        max_length=100,
+        description="Client key used to match the result (defaults to the path)",
+    )
+    path: str = Field(
+        ...,
+        max_length=500,
+        description="Route path, e.g. /api/v1/planning/enrollment/{version_id}",
+    )
+
+    @model_validator(mode="after")
+    def default_id_to_path(self) -> "BatchOperation":
+        """Use the path as id when none is given."""
+        if self.id is None:
+            self.id = self.path
+        return self
+
+
+class BatchRequest(BaseModel):
+    """Batch of read operations."""
+
+    operations: list[BatchOperation] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_OPERATIONS
+    )
+
+    @model_validator(mode="after")
+    def unique_ids(self) -> "BatchRequest":
+        """Reject duplicate operation ids."""
+        ids = [operation.id for operation in self.operations]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Operation ids must be unique")
+        return self
+
+
+class BatchOperationResult(BaseModel):
+    """Result of one operation, with the status the route would have returned."""
+
+    id: str
+    status: int
+    data: Any = None
+    error: str | None = None
+    duration_ms: float
+
+
+class BatchResponse(BaseModel):
+    """Results of all operations, in request order."""
+
+    results: list[BatchOperationResult]
+    total_duration_ms: float
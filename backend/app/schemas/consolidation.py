@@ -77,6 +77,10 @@ class BudgetConsolidationResponse(BaseModel):
     net_result: Decimal = Field(
         ..., description="Net result (operating result - capex if expensed)"
     )
+    recomputed: bool | None = Field(
+        default=None,
+        description="Whether consolidation was recomputed (False if inputs were unchanged)",
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -120,7 +124,8 @@ class ConsolidationRequest(BaseModel):
     """Schema for consolidation request."""
 
     recalculate: bool = Field(
-        default=True, description="Whether to force recalculation"
+        default=False,
+        description="Whether to force recalculation even if planning inputs are unchanged",
     )
 
 
@@ -165,6 +170,10 @@ class IncomeStatementResponse(BaseModel):
     )
     created_at: datetime
     updated_at: datetime
+    recomputed: bool | None = Field(
+        default=None,
+        description="Whether the statement was regenerated (False if consolidation was unchanged)",
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -179,6 +188,10 @@ class BalanceSheetResponse(BaseModel):
     is_balanced: bool = Field(
         ..., description="True if total assets = total liabilities"
     )
+    recomputed: bool | None = Field(
+        default=None,
+        description="Whether the statements were regenerated (False if consolidation was unchanged)",
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -10,6 +10,7 @@ Request and response models for planning API operations:
 import uuid
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -477,3 +478,141 @@ class ImpactCalculationResponse(BaseModel):
     margin_proposed_pct: float = Field(description="Proposed operating margin percentage")
 
     affected_steps: list[str] = Field(description="List of steps affected by this change")
+    warnings: list[str] = Field(
+        default_factory=list, description="Class size rules broken by the proposed change"
+    )
+
+
+# ==============================================================================
+# Sensitivity Analysis Schemas
+# ==============================================================================
+
+
+class SensitivityDriverRequest(BaseModel):
+    """Driver to perturb in a sensitivity analysis."""
+
+    driver_type: Literal["enrollment", "fee", "class_size", "salary"] = Field(
+        ...,
+        description=(
+            "Driver: enrollment (students), fee (%), class_size (students), salary (%)"
+        ),
+    )
+    dimension_id: str | None = Field(
+        None,
+        description="Level UUID (enrollment, fee, class_size), cycle UUID (class_size) "
+        "or teacher category UUID (salary); all when omitted",
+    )
+    label: str | None = Field(None, description="Display label for the tornado bar")
+    low_delta: Decimal = Field(..., description="Downside change of the driver")
+    high_delta: Decimal = Field(..., description="Upside change of the driver")
+
+
+class SensitivityAnalysisRequest(BaseModel):
+    """Request for a batch sensitivity (tornado) analysis."""
+
+    drivers: list[SensitivityDriverRequest] = Field(
+        ..., min_length=1, max_length=100, description="Drivers to perturb"
+    )
+
+
+class TornadoBarResponse(BaseModel):
+    """Net result impact of one driver at its low and high deltas."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    rank: int = Field(..., description="Rank by swing (1 = most sensitive)")
+    driver_type: str
+    dimension_id: str | None = None
+    label: str
+    unit: str = Field(..., description="Unit of the deltas (students or %)")
+    low_delta: Decimal
+    high_delta: Decimal
+    low_net_result_sar: Decimal = Field(..., description="Net result at the low delta")
+    high_net_result_sar: Decimal = Field(..., description="Net result at the high delta")
+    low_impact_sar: Decimal = Field(..., description="Net result change at the low delta")
+    high_impact_sar: Decimal = Field(..., description="Net result change at the high delta")
+    swing_sar: Decimal = Field(..., description="Absolute spread between low and high")
+    warnings: list[str] = Field(
+        default_factory=list, description="Class size rules broken by the perturbation"
+    )
+
+
+class SensitivityAnalysisResponse(BaseModel):
+    """Ranked tornado dataset for a budget version."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    version_id: uuid.UUID
+    baseline_net_result_sar: Decimal = Field(..., description="Current net result")
+    baseline_margin_pct: float = Field(..., description="Current operating margin %")
+    scenario_count: int = Field(..., description="Distinct scenarios calculated")
+    calculation_ms: float = Field(..., description="Engine time for the whole batch")
+    bars: list[TornadoBarResponse] = Field(
+        default_factory=list, description="Drivers ranked by descending swing"
+    )
+
+
+# ==============================================================================
+# Goal Seek Schemas
+# ==============================================================================
+
+
+class GoalSeekRequest(BaseModel):
+    """Request to solve for the driver value that reaches a target metric."""
+
+    driver_type: Literal["enrollment", "fee", "class_size", "salary"] = Field(
+        ...,
+        description=(
+            "Driver: enrollment (students), fee (%), class_size (students), salary (%)"
+        ),
+    )
+    dimension_id: str | None = Field(
+        None,
+        description="Level UUID (enrollment, fee, class_size), cycle UUID (class_size) "
+        "or teacher category UUID (salary); all when omitted",
+    )
+    target_metric: Literal["net_result", "margin_pct", "staff_cost_ratio"] = Field(
+        ..., description="Metric to reach"
+    )
+    target_value: Decimal = Field(..., description="Target value of the metric")
+    lower_delta: Decimal = Field(..., description="Lower bound of the driver change")
+    upper_delta: Decimal = Field(..., description="Upper bound of the driver change")
+    tolerance: Decimal | None = Field(
+        None, ge=0, description="Accepted distance to the target (metric default if omitted)"
+    )
+    max_iterations: int = Field(50, ge=1, le=200, description="Maximum solver iterations")
+
+
+class GoalSeekIterationResponse(BaseModel):
+    """One evaluation of the goal-seek solver."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    iteration: int
+    method: str = Field(..., description="bracket, secant or bisection")
+    driver_value: float
+    metric_value: float
+    residual: float
+
+
+class GoalSeekResponse(BaseModel):
+    """Solved driver change with convergence diagnostics."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    version_id: uuid.UUID
+    driver_type: str
+    dimension_id: str | None = None
+    unit: str = Field(..., description="Unit of the driver change (students or %)")
+    target_metric: str
+    target_value: Decimal
+    baseline_metric_value: Decimal = Field(..., description="Metric before any change")
+    solved_delta: Decimal = Field(..., description="Driver change reaching the target")
+    achieved_metric_value: Decimal = Field(..., description="Metric at the solved change")
+    residual: Decimal = Field(..., description="Achieved minus target value")
+    converged: bool = Field(..., description="Whether the residual is within tolerance")
+    termination: str = Field(..., description="tolerance, resolution or max_iterations")
+    iterations: int
+    evaluations: int = Field(..., description="Cascade evaluations performed")
+    calculation_ms: float
+    history: list[GoalSeekIterationResponse] = Field(default_factory=list)
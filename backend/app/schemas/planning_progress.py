@@ -7,6 +7,7 @@ These schemas define the contract for progress checking across all 6 planning st
 
 from __future__ import annotations
 
+from decimal import Decimal
 from typing import Any, Literal
 from uuid import UUID
 
@@ -169,6 +170,27 @@ class CascadeResponse(BaseModel):
     message: str = Field(..., description="Summary message of the operation")
 
 
+class BudgetRecalculationResponse(BaseModel):
+    """Response from single-pass recalculation of a whole budget version."""
+
+    version_id: UUID = Field(..., description="Budget version UUID")
+    total_students: int = Field(..., description="Total enrolled students")
+    total_classes: int = Field(..., description="Total number of classes")
+    total_teacher_fte: Decimal = Field(..., description="Total teacher FTE required")
+    total_revenue: Decimal = Field(..., description="Total consolidated revenue (SAR)")
+    total_costs: Decimal = Field(..., description="Total operating expenses (SAR)")
+    net_result: Decimal = Field(..., description="Revenue minus expenses (SAR)")
+    rows_inserted: dict[str, int] = Field(
+        default_factory=dict, description="Rows inserted per table"
+    )
+    rows_updated: dict[str, int] = Field(
+        default_factory=dict, description="Rows updated per table"
+    )
+    rows_deleted: dict[str, int] = Field(
+        default_factory=dict, description="Rows deleted per table"
+    )
+
+
 # Static step metadata
 STEP_METADATA: dict[str, StepMetadata] = {
     "enrollment": StepMetadata(
@@ -8,10 +8,12 @@ import uuid
 from datetime import datetime
 from typing import Any, Generic, TypeVar
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.base import BaseModel
+from app.services.entity_loader import get_entity_loader, is_request_cached
 from app.services.exceptions import NotFoundError, ValidationError
 
 # Generic type for model classes
@@ -60,13 +62,19 @@ class BaseService(Generic[ModelType]):
         Raises:
             NotFoundError: If record not found and raise_if_not_found=True
         """
-        query = select(self.model).where(self.model.id == id)
+        if is_request_cached(self.model):
+            # Memoized per request: versions are looked up by several services
+            instance = await get_entity_loader(self.session, self.model).load(id)
+            if instance is not None and not include_deleted and instance.deleted_at is not None:
+                instance = None
+        else:
+            query = select(self.model).where(self.model.id == id)
 
-        if not include_deleted:
-            query = query.where(self.model.deleted_at.is_(None))
+            if not include_deleted:
+                query = query.where(self.model.deleted_at.is_(None))
 
-        result = await self.session.execute(query)
-        instance = result.scalar_one_or_none()
+            result = await self.session.execute(query)
+            instance = result.scalar_one_or_none()
 
         if instance is None and raise_if_not_found:
             raise NotFoundError(self.model.__name__, str(id))
@@ -179,6 +187,130 @@ class BaseService(Generic[ModelType]):
             "total_pages": total_pages,
         }
 
+    async def get_keyset_paginated(
+        self,
+        cursor: str | None = None,
+        page_size: int = 50,
+        include_deleted: bool = False,
+        order_by: str | None = None,
+        descending: bool = True,
+        filters: dict[str, Any] | None = None,
+        estimate_total: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Get records with keyset (cursor) pagination.
+
+        Rows are ordered by (order_by, id) and each page starts after the
+        (sort key, id) encoded in the cursor, so every page is the same
+        index range scan regardless of depth. No COUNT query is issued.
+
+        Args:
+            cursor: Cursor from the previous page (None for the first page)
+            page_size: Number of records per page
+            include_deleted: Whether to include soft-deleted records
+            order_by: Non-nullable field name to order by (default: created_at)
+            descending: Whether to order from newest/highest to oldest/lowest
+            filters: Field-value pairs to filter by
+            estimate_total: Whether to include the planner's row estimate
+                (pg_class.reltuples) of the whole table as total. Ignored
+                when filters are applied, since the estimate cannot reflect
+                them.
+
+        Returns:
+            Dictionary with:
+                - items: List of model instances
+                - page_size: Records per page
+                - next_cursor: Cursor of the next page (None on the last page)
+                - has_more: Whether more records follow
+                - total: Estimated table row count, or None (always None
+                  when filters are applied)
+                - total_is_estimate: Whether total is an estimate
+
+        Raises:
+            ValidationError: If the cursor is malformed
+        """
+        if page_size < 1:
+            page_size = 50
+        if page_size > 100:
+            page_size = 100
+
+        if order_by and hasattr(self.model, order_by):
+            sort_column = getattr(self.model, order_by)
+        else:
+            sort_column = self.model.created_at
+
+        query = select(self.model)
+
+        if not include_deleted:
+            query = query.where(self.model.deleted_at.is_(None))
+
+        if filters:
+            for field, value in filters.items():
+                if hasattr(self.model, field):
+                    query = query.where(getattr(self.model, field) == value)
+
+        if cursor:
+            try:
+                last_value, last_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise ValidationError(str(e), field="cursor")
+            key = tuple_(sort_column, self.model.id)
+            query = query.where(
+                key < (last_value, last_id) if descending else key > (last_value, last_id)
+            )
+
+        if descending:
+            query = query.order_by(sort_column.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), self.model.id.asc())
+
+        # Fetch one extra row to know whether another page follows
+        result = await self.session.execute(query.limit(page_size + 1))
+        items = list(result.scalars().all())
+
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        next_cursor = None
+        if has_more:
+            last = items[-1]
+            next_cursor = encode_cursor(getattr(last, sort_column.key), last.id)
+
+        # The table estimate says nothing about a filtered subset
+        total = await self.estimate_total() if estimate_total and not filters else None
+
+        return {
+            "items": items,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "total": total,
+            "total_is_estimate": total is not None,
+        }
+
+    async def estimate_total(self) -> int | None:
+        """
+        Estimate the table's row count from planner statistics.
+
+        Reads pg_class.reltuples (maintained by VACUUM/ANALYZE) instead of
+        counting rows. Ignores filters and soft deletes.
+
+        Returns:
+            Estimated row count, or None when unavailable (SQLite, or a
+            table that has never been analyzed)
+        """
+        bind = self.session.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+
+        result = await self.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": self.model.__table__.fullname},
+        )
+        estimate = result.scalar_one_or_none()
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+
     async def create(
         self,
         data: dict[str, Any],
@@ -273,6 +405,8 @@ class BaseService(Generic[ModelType]):
         instance = await self.get_by_id(id, include_deleted=True)
         await self.session.delete(instance)
         await self.session.flush()
+        if is_request_cached(self.model):
+            get_entity_loader(self.session, self.model).forget(id)
         return True
 
     async def soft_delete(
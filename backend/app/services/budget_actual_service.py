@@ -10,7 +10,7 @@ Implements business logic for:
 
 import uuid
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from typing import Any
 
 from sqlalchemy import and_, select
@@ -27,12 +27,49 @@ from app.models.analysis import (
 from app.models.configuration import BudgetVersion, BudgetVersionStatus
 from app.models.consolidation import BudgetConsolidation
 from app.services.base import BaseService
+from app.services.entity_loader import get_entity_loader
 from app.services.exceptions import (
     BusinessRuleError,
     NotFoundError,
     ServiceException,
     ValidationError,
 )
+from app.services.parallel_validation import validate_in_chunks
+
+ACTUAL_REQUIRED_FIELDS = ("fiscal_year", "period", "account_code", "amount_sar")
+
+
+def _validate_actuals_chunk(
+    records: list[dict[str, Any]], start: int
+) -> list[dict[str, Any] | str]:
+    """
+    Validate a chunk of Odoo records.
+
+    Returns, per record, the normalized ActualData values or an error message.
+    """
+    results: list[dict[str, Any] | str] = []
+    for record in records:
+        if not all(k in record for k in ACTUAL_REQUIRED_FIELDS):
+            results.append("Missing required fields in Odoo data record")
+            continue
+        try:
+            amount = Decimal(str(record["amount_sar"]))
+        except InvalidOperation:
+            results.append(f"Invalid amount_sar in Odoo data record: {record['amount_sar']}")
+            continue
+        results.append(
+            {
+                "fiscal_year": record["fiscal_year"],
+                "period": record["period"],
+                "account_code": record["account_code"],
+                "account_name": record.get("account_name"),
+                "amount_sar": amount,
+                "currency": record.get("currency", "SAR"),
+                "transaction_date": record.get("transaction_date"),
+                "description": record.get("description"),
+            }
+        )
+    return results
 
 
 class BudgetActualService:
@@ -95,9 +132,7 @@ class BudgetActualService:
         """
         try:
             # Verify budget version exists
-            version_query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-            version_result = await self.session.execute(version_query)
-            version = version_result.scalar_one_or_none()
+            version = await get_entity_loader(self.session, BudgetVersion).load(budget_version_id)
 
             if not version:
                 raise NotFoundError("BudgetVersion", str(budget_version_id))
@@ -112,24 +147,19 @@ class BudgetActualService:
             periods_covered = set()
             fiscal_year = None
 
-            for record in odoo_data:
-                # Validate required fields
-                if not all(k in record for k in ["fiscal_year", "period", "account_code", "amount_sar"]):
-                    raise ValidationError("Missing required fields in Odoo data record")
+            # Validate all records first (in worker processes for large imports)
+            validated = await validate_in_chunks(odoo_data, _validate_actuals_chunk)
+            for values in validated:
+                if isinstance(values, str):
+                    raise ValidationError(values)
 
+            for values in validated:
                 # Create ActualData record
                 actual_data = ActualData(
-                    fiscal_year=record["fiscal_year"],
-                    period=record["period"],
-                    account_code=record["account_code"],
-                    account_name=record.get("account_name"),
-                    amount_sar=Decimal(str(record["amount_sar"])),
-                    currency=record.get("currency", "SAR"),
+                    **values,
                     import_batch_id=import_batch_id,
                     import_date=datetime.utcnow(),
                     source=ActualDataSource.ODOO_IMPORT,
-                    transaction_date=record.get("transaction_date"),
-                    description=record.get("description"),
                     is_reconciled=False,
                 )
 
@@ -138,9 +168,9 @@ class BudgetActualService:
 
                 # Track summary data
                 total_amount += actual_data.amount_sar
-                periods_covered.add(record["period"])
+                periods_covered.add(values["period"])
                 if not fiscal_year:
-                    fiscal_year = record["fiscal_year"]
+                    fiscal_year = values["fiscal_year"]
 
             await self.session.flush()
 
@@ -196,9 +226,7 @@ class BudgetActualService:
             NotFoundError: If budget version not found
         """
         # Verify budget version exists
-        version_query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-        version_result = await self.session.execute(version_query)
-        version = version_result.scalar_one_or_none()
+        version = await get_entity_loader(self.session, BudgetVersion).load(budget_version_id)
 
         if not version:
             raise NotFoundError("BudgetVersion", str(budget_version_id))
@@ -325,6 +353,49 @@ class BudgetActualService:
 
         return variances
 
+    async def get_actual_data_keyset(
+        self,
+        fiscal_year: int | None = None,
+        period: int | None = None,
+        account_code: str | None = None,
+        cursor: str | None = None,
+        page_size: int = 50,
+        estimate_total: bool = False,
+    ) -> dict[str, Any]:
+        """
+        List imported actuals with keyset (cursor) pagination, newest first.
+
+        Args:
+            fiscal_year: Optional fiscal year filter
+            period: Optional period (month 1-12) filter
+            account_code: Optional account code filter
+            cursor: Cursor from the previous page (None for the first page)
+            page_size: Records per page
+            estimate_total: Whether to include an estimated total (unfiltered
+                lists only)
+
+        Returns:
+            Keyset page with items, page_size, next_cursor, has_more, total
+
+        Raises:
+            ValidationError: If the cursor is malformed
+        """
+        filters: dict[str, Any] = {}
+        if fiscal_year:
+            filters["fiscal_year"] = fiscal_year
+        if period:
+            filters["period"] = period
+        if account_code:
+            filters["account_code"] = account_code
+
+        return await self.actual_data_service.get_keyset_paginated(
+            cursor=cursor,
+            page_size=page_size,
+            filters=filters,
+            order_by="created_at",
+            estimate_total=estimate_total,
+        )
+
     async def get_variance_report(
         self,
         budget_version_id: uuid.UUID,
@@ -353,9 +424,7 @@ class BudgetActualService:
             NotFoundError: If budget version not found
         """
         # Verify budget version exists
-        version_query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-        version_result = await self.session.execute(version_query)
-        version = version_result.scalar_one_or_none()
+        version = await get_entity_loader(self.session, BudgetVersion).load(budget_version_id)
 
         if not version:
             raise NotFoundError("BudgetVersion", str(budget_version_id))
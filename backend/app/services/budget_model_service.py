@@ -0,0 +1,945 @@
+"""
+Budget model service for whole-version recalculation.
+
+Compiles the planning cascade (class structure → DHG → revenue → personnel
+costs → consolidation) into a single load → compute → bulk write pass:
+
+1. Bulk-load every driver of the version with one query per table
+2. Run the pure budget model engine on plain data structures
+3. Write every output table with bulk UPDATE/INSERT/DELETE statements
+
+All writes happen in the caller's transaction, so a recalculation either
+lands completely or not at all.
+
+The engine input and baseline result of a version are also kept in a short
+lived process-local cache so what-if previews can rerun the cascade without
+reloading the version from the database.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+from app.engine.budget_model import (
+    AllocationInput,
+    BudgetModelInput,
+    BudgetModelResult,
+    ClassSizeInput,
+    EnrollmentInput,
+    FeeInput,
+    LedgerLine,
+    LevelInput,
+    SubjectHoursInput,
+    TeacherCostInput,
+    calculate_budget_model,
+    calculate_personnel_costs,
+)
+from app.engine.budget_model.calculator import TUITION_TRIMESTER_LINES
+from app.engine.budget_model.consolidation_rules import (
+    SOURCE_CAPEX,
+    SOURCE_OPERATING,
+    SOURCE_PERSONNEL,
+    SOURCE_REVENUE,
+)
+from app.models.configuration import (
+    AcademicCycle,
+    AcademicLevel,
+    BudgetVersion,
+    ClassSizeParam,
+    FeeCategory,
+    FeeStructure,
+    NationalityType,
+    SubjectHoursMatrix,
+    TeacherCategory,
+    TeacherCostParam,
+)
+from app.models.consolidation import (
+    BudgetConsolidation,
+    ConsolidationCategory,
+    FinancialStatement,
+    FinancialStatementLine,
+)
+from app.models.planning import (
+    CapExPlan,
+    ClassStructure,
+    DHGSubjectHours,
+    DHGTeacherRequirement,
+    EnrollmentPlan,
+    OperatingCostPlan,
+    PersonnelCostPlan,
+    RevenuePlan,
+    TeacherAllocation,
+)
+from app.services.base import BaseService
+from app.services.data_revision import get_data_revision
+from app.services.exceptions import BusinessRuleError, ServiceException
+from app.services.summary_refresh_scheduler import notify_summary_write
+
+CALCULATED_REVENUE_ACCOUNTS = frozenset(line[0] for line in TUITION_TRIMESTER_LINES)
+PERSONNEL_CALCULATION_DRIVER = "dhg_allocation"
+
+# Cached snapshots are checked against the version's data revision on every
+# read; the expiry bounds staleness where no revision is logged (reference
+# data such as academic levels, databases without the revision triggers)
+MODEL_CACHE_TTL_SECONDS = 60.0
+
+# Budget versions whose models are kept in memory (least recently used evicted)
+MODEL_CACHE_SIZE = 32
+
+
+@dataclass
+class BudgetModelSnapshot:
+    """Engine input plus the ids of already persisted output rows."""
+
+    model_input: BudgetModelInput
+    class_structure_ids: dict[uuid.UUID, uuid.UUID] = field(default_factory=dict)
+    subject_hours_ids: dict[tuple[uuid.UUID, uuid.UUID], uuid.UUID] = field(
+        default_factory=dict
+    )
+    teacher_requirement_ids: dict[uuid.UUID, uuid.UUID] = field(default_factory=dict)
+    revenue_ids: dict[str, uuid.UUID] = field(default_factory=dict)
+    calculated_revenue_ids: set[uuid.UUID] = field(default_factory=set)
+    personnel_ids: dict[tuple[str, uuid.UUID | None, uuid.UUID | None], uuid.UUID] = field(
+        default_factory=dict
+    )
+    calculated_personnel_ids: set[uuid.UUID] = field(default_factory=set)
+
+
+@dataclass
+class CachedBudgetModel:
+    """Engine input and baseline result of a version held in memory."""
+
+    model_input: BudgetModelInput
+    baseline: BudgetModelResult
+    # Data revision of the version when the snapshot was loaded
+    revision: int | None = None
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+_model_cache: OrderedDict[uuid.UUID, CachedBudgetModel] = OrderedDict()
+
+
+def invalidate_budget_model_cache(version_id: uuid.UUID | None = None) -> None:
+    """
+    Drop the cached budget model of a version (or of every version).
+
+    Args:
+        version_id: Budget version UUID, None to clear the whole cache
+    """
+    if version_id is None:
+        _model_cache.clear()
+    else:
+        _model_cache.pop(version_id, None)
+
+
+@dataclass
+class BudgetModelWriteStats:
+    """Row counts written per output table."""
+
+    inserted: dict[str, int] = field(default_factory=dict)
+    updated: dict[str, int] = field(default_factory=dict)
+    deleted: dict[str, int] = field(default_factory=dict)
+
+
+class BudgetModelService:
+    """
+    Service for in-memory recalculation of a whole budget version.
+
+    Replaces the per-step, row-by-row cascade with a handful of bulk
+    statements: one SELECT per input table and one UPDATE/INSERT/DELETE per
+    output table.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Initialize budget model service.
+
+        Args:
+            session: Async database session
+        """
+        self.session = session
+        self.budget_version_service = BaseService(BudgetVersion, session)
+
+    async def load_snapshot(self, version_id: uuid.UUID) -> BudgetModelSnapshot:
+        """
+        Bulk-load every driver of a budget version.
+
+        Args:
+            version_id: Budget version UUID
+
+        Returns:
+            BudgetModelSnapshot with engine input and existing output row ids
+
+        Raises:
+            NotFoundError: If budget version not found
+            ServiceException: If database operation fails
+        """
+        await self.budget_version_service.get_by_id(version_id)
+
+        try:
+            snapshot = BudgetModelSnapshot(
+                model_input=BudgetModelInput(
+                    version_id=version_id,
+                    levels=await self._load_levels(),
+                    enrollments=await self._load_enrollments(version_id),
+                    class_size_params=await self._load_class_size_params(version_id),
+                    subject_hours=await self._load_subject_hours(version_id),
+                    fees=await self._load_fees(version_id),
+                    allocations=await self._load_allocations(version_id),
+                    teacher_costs=await self._load_teacher_costs(version_id),
+                )
+            )
+            await self._load_existing_outputs(version_id, snapshot)
+        except SQLAlchemyError as e:
+            logger.error(
+                "Failed to load budget model snapshot",
+                version_id=str(version_id),
+                error=str(e),
+                exc_info=True,
+            )
+            raise ServiceException(
+                "Failed to load budget version data. Please try again.",
+                status_code=500,
+                details={"version_id": str(version_id)},
+            ) from e
+
+        return snapshot
+
+    async def get_cached_model(self, version_id: uuid.UUID) -> CachedBudgetModel:
+        """
+        Get the engine input and baseline result of a version from memory.
+
+        The snapshot is loaded and calculated on first use, then served from
+        the process-local cache while the version's data revision is
+        unchanged, so writes committed through any worker or write path
+        reload it. Entries also expire and are dropped on recalculation.
+
+        Args:
+            version_id: Budget version UUID
+
+        Returns:
+            CachedBudgetModel with the version drivers and baseline result
+
+        Raises:
+            NotFoundError: If budget version not found
+            ServiceException: If database operation fails
+        """
+        # Read before loading: a write landing in between leaves the cached
+        # revision behind, so the next read reloads
+        revision = await get_data_revision(self.session, version_id)
+        cached = _model_cache.get(version_id)
+        if (
+            cached is not None
+            and cached.revision == revision
+            and time.monotonic() - cached.loaded_at < MODEL_CACHE_TTL_SECONDS
+        ):
+            _model_cache.move_to_end(version_id)
+            return cached
+
+        snapshot = await self.load_snapshot(version_id)
+        cached = CachedBudgetModel(
+            model_input=snapshot.model_input,
+            baseline=calculate_budget_model(snapshot.model_input),
+            revision=revision,
+        )
+        _model_cache[version_id] = cached
+        _model_cache.move_to_end(version_id)
+        while len(_model_cache) > MODEL_CACHE_SIZE:
+            _model_cache.popitem(last=False)
+        return cached
+
+    async def recalculate(
+        self,
+        version_id: uuid.UUID,
+        user_id: uuid.UUID | None = None,
+    ) -> tuple[BudgetModelResult, BudgetModelWriteStats]:
+        """
+        Recalculate and persist every calculated table of a budget version.
+
+        Generated financial statements are dropped so they are regenerated
+        from the new consolidation on next read.
+
+        Args:
+            version_id: Budget version UUID
+            user_id: User ID for audit trail
+
+        Returns:
+            Tuple of (engine result, write statistics)
+
+        Raises:
+            NotFoundError: If budget version not found
+            BusinessRuleError: If enrollment is missing or class sizes are invalid
+            ServiceException: If database operation fails
+        """
+        snapshot = await self.load_snapshot(version_id)
+
+        if not snapshot.model_input.enrollments:
+            raise BusinessRuleError(
+                "NO_ENROLLMENT_DATA",
+                "Cannot recalculate budget version without enrollment data",
+                details={"version_id": str(version_id)},
+            )
+
+        result = calculate_budget_model(snapshot.model_input)
+
+        if result.violations:
+            violation = result.violations[0]
+            raise BusinessRuleError(
+                violation.rule,
+                violation.message,
+                details={
+                    "level_code": violation.level_code,
+                    "violations": [v.model_dump(mode="json") for v in result.violations],
+                },
+            )
+
+        try:
+            stats = await self._write_result(snapshot, result, user_id)
+            await self.session.flush()
+        except SQLAlchemyError as e:
+            logger.error(
+                "Failed to write budget model results",
+                version_id=str(version_id),
+                error=str(e),
+                exc_info=True,
+            )
+            raise ServiceException(
+                "Failed to save budget recalculation. Please try again.",
+                status_code=500,
+                details={"version_id": str(version_id)},
+            ) from e
+
+        invalidate_budget_model_cache(version_id)
+        # The summary tables read budget_consolidations: refresh once this commits
+        notify_summary_write(self.session, version_id)
+        logger.info(
+            "Budget model recalculated",
+            version_id=str(version_id),
+            inserted=stats.inserted,
+            updated=stats.updated,
+            deleted=stats.deleted,
+        )
+        return result, stats
+
+    # ==========================================================================
+    # Bulk loading
+    # ==========================================================================
+
+    async def _load_levels(self) -> list[LevelInput]:
+        """Load academic levels with their cycle attributes."""
+        query = select(
+            AcademicLevel.id,
+            AcademicLevel.code,
+            AcademicLevel.cycle_id,
+            AcademicLevel.is_secondary,
+            AcademicLevel.sort_order,
+            AcademicCycle.code.label("cycle_code"),
+            AcademicCycle.name_en.label("cycle_name"),
+            AcademicCycle.requires_atsem,
+        ).join(AcademicCycle, AcademicLevel.cycle_id == AcademicCycle.id)
+        result = await self.session.execute(query)
+        return [
+            LevelInput(
+                level_id=row.id,
+                level_code=row.code,
+                cycle_id=row.cycle_id,
+                cycle_code=row.cycle_code,
+                cycle_name=row.cycle_name,
+                is_secondary=row.is_secondary,
+                requires_atsem=row.requires_atsem,
+                sort_order=row.sort_order,
+            )
+            for row in result
+        ]
+
+    async def _load_enrollments(self, version_id: uuid.UUID) -> list[EnrollmentInput]:
+        """Load enrollment by level and nationality."""
+        query = (
+            select(
+                EnrollmentPlan.level_id,
+                EnrollmentPlan.student_count,
+                NationalityType.code,
+                NationalityType.name_en,
+            )
+            .join(NationalityType, EnrollmentPlan.nationality_type_id == NationalityType.id)
+            .where(
+                and_(
+                    EnrollmentPlan.budget_version_id == version_id,
+                    EnrollmentPlan.deleted_at.is_(None),
+                )
+            )
+        )
+        result = await self.session.execute(query)
+        return [
+            EnrollmentInput(
+                level_id=row.level_id,
+                nationality_code=row.code,
+                nationality_name=row.name_en,
+                student_count=row.student_count,
+            )
+            for row in result
+        ]
+
+    async def _load_class_size_params(self, version_id: uuid.UUID) -> list[ClassSizeInput]:
+        """Load class size parameters."""
+        query = select(
+            ClassSizeParam.level_id,
+            ClassSizeParam.cycle_id,
+            ClassSizeParam.min_class_size,
+            ClassSizeParam.target_class_size,
+            ClassSizeParam.max_class_size,
+        ).where(
+            and_(
+                ClassSizeParam.budget_version_id == version_id,
+                ClassSizeParam.deleted_at.is_(None),
+            )
+        )
+        result = await self.session.execute(query)
+        return [
+            ClassSizeInput(
+                level_id=row.level_id,
+                cycle_id=row.cycle_id,
+                min_class_size=row.min_class_size,
+                target_class_size=row.target_class_size,
+                max_class_size=row.max_class_size,
+            )
+            for row in result
+        ]
+
+    async def _load_subject_hours(self, version_id: uuid.UUID) -> list[SubjectHoursInput]:
+        """Load the subject hours matrix."""
+        query = select(
+            SubjectHoursMatrix.subject_id,
+            SubjectHoursMatrix.level_id,
+            SubjectHoursMatrix.hours_per_week,
+            SubjectHoursMatrix.is_split,
+        ).where(
+            and_(
+                SubjectHoursMatrix.budget_version_id == version_id,
+                SubjectHoursMatrix.deleted_at.is_(None),
+            )
+        )
+        result = await self.session.execute(query)
+        return [
+            SubjectHoursInput(
+                subject_id=row.subject_id,
+                level_id=row.level_id,
+                hours_per_week=row.hours_per_week,
+                is_split=row.is_split,
+            )
+            for row in result
+        ]
+
+    async def _load_fees(self, version_id: uuid.UUID) -> list[FeeInput]:
+        """Load the fee grid with nationality and fee category codes."""
+        query = (
+            select(
+                FeeStructure.level_id,
+                FeeStructure.amount_sar,
+                FeeStructure.trimester,
+                NationalityType.code.label("nationality_code"),
+                FeeCategory.code.label("fee_category_code"),
+            )
+            .join(NationalityType, FeeStructure.nationality_type_id == NationalityType.id)
+            .join(FeeCategory, FeeStructure.fee_category_id == FeeCategory.id)
+            .where(
+                and_(
+                    FeeStructure.budget_version_id == version_id,
+                    FeeStructure.deleted_at.is_(None),
+                )
+            )
+        )
+        result = await self.session.execute(query)
+        return [
+            FeeInput(
+                level_id=row.level_id,
+                nationality_code=row.nationality_code,
+                fee_category_code=row.fee_category_code,
+                amount_sar=row.amount_sar,
+                trimester=row.trimester,
+            )
+            for row in result
+        ]
+
+    async def _load_allocations(self, version_id: uuid.UUID) -> list[AllocationInput]:
+        """Load teacher allocations with category and cycle names."""
+        query = (
+            select(
+                TeacherAllocation.category_id,
+                TeacherAllocation.subject_id,
+                TeacherAllocation.cycle_id,
+                TeacherAllocation.fte_count,
+                TeacherCategory.code.label("category_code"),
+                TeacherCategory.name_en.label("category_name"),
+                AcademicCycle.name_en.label("cycle_name"),
+            )
+            .join(TeacherCategory, TeacherAllocation.category_id == TeacherCategory.id)
+            .outerjoin(AcademicCycle, TeacherAllocation.cycle_id == AcademicCycle.id)
+            .where(
+                and_(
+                    TeacherAllocation.budget_version_id == version_id,
+                    TeacherAllocation.deleted_at.is_(None),
+                )
+            )
+        )
+        result = await self.session.execute(query)
+        return [
+            AllocationInput(
+                category_id=row.category_id,
+                category_code=row.category_code,
+                category_name=row.category_name,
+                subject_id=row.subject_id,
+                cycle_id=row.cycle_id,
+                cycle_name=row.cycle_name,
+                fte_count=row.fte_count,
+            )
+            for row in result
+        ]
+
+    async def _load_teacher_costs(self, version_id: uuid.UUID) -> list[TeacherCostInput]:
+        """Load teacher cost parameters."""
+        query = select(
+            TeacherCostParam.category_id,
+            TeacherCostParam.cycle_id,
+            TeacherCostParam.prrd_contribution_eur,
+            TeacherCostParam.avg_salary_sar,
+            TeacherCostParam.social_charges_rate,
+            TeacherCostParam.benefits_allowance_sar,
+        ).where(
+            and_(
+                TeacherCostParam.budget_version_id == version_id,
+                TeacherCostParam.deleted_at.is_(None),
+            )
+        )
+        result = await self.session.execute(query)
+        return [
+            TeacherCostInput(
+                category_id=row.category_id,
+                cycle_id=row.cycle_id,
+                prrd_contribution_eur=row.prrd_contribution_eur,
+                avg_salary_sar=row.avg_salary_sar,
+                social_charges_rate=row.social_charges_rate,
+                benefits_allowance_sar=row.benefits_allowance_sar,
+            )
+            for row in result
+        ]
+
+    async def _load_existing_outputs(
+        self,
+        version_id: uuid.UUID,
+        snapshot: BudgetModelSnapshot,
+    ) -> None:
+        """
+        Load keys of persisted output rows and the manual ledger lines.
+
+        Soft-deleted calculated rows are included so they are revived in
+        place instead of colliding with the unique constraints.
+        """
+        result = await self.session.execute(
+            select(ClassStructure.id, ClassStructure.level_id).where(
+                ClassStructure.budget_version_id == version_id
+            )
+        )
+        snapshot.class_structure_ids = {row.level_id: row.id for row in result}
+
+        result = await self.session.execute(
+            select(
+                DHGSubjectHours.id, DHGSubjectHours.subject_id, DHGSubjectHours.level_id
+            ).where(DHGSubjectHours.budget_version_id == version_id)
+        )
+        snapshot.subject_hours_ids = {
+            (row.subject_id, row.level_id): row.id for row in result
+        }
+
+        result = await self.session.execute(
+            select(DHGTeacherRequirement.id, DHGTeacherRequirement.subject_id).where(
+                DHGTeacherRequirement.budget_version_id == version_id
+            )
+        )
+        snapshot.teacher_requirement_ids = {row.subject_id: row.id for row in result}
+
+        ledger_lines = snapshot.model_input.ledger_lines
+
+        result = await self.session.execute(
+            select(
+                RevenuePlan.id,
+                RevenuePlan.account_code,
+                RevenuePlan.description,
+                RevenuePlan.amount_sar,
+                RevenuePlan.is_calculated,
+                RevenuePlan.deleted_at,
+            ).where(RevenuePlan.budget_version_id == version_id)
+        )
+        for row in result:
+            snapshot.revenue_ids[row.account_code] = row.id
+            if row.account_code in CALCULATED_REVENUE_ACCOUNTS:
+                if row.is_calculated:
+                    snapshot.calculated_revenue_ids.add(row.id)
+            elif row.deleted_at is None:
+                ledger_lines.append(
+                    LedgerLine(
+                        source_table=SOURCE_REVENUE,
+                        account_code=row.account_code,
+                        description=row.description,
+                        amount_sar=row.amount_sar,
+                    )
+                )
+
+        result = await self.session.execute(
+            select(
+                PersonnelCostPlan.id,
+                PersonnelCostPlan.account_code,
+                PersonnelCostPlan.description,
+                PersonnelCostPlan.category_id,
+                PersonnelCostPlan.cycle_id,
+                PersonnelCostPlan.total_cost_sar,
+                PersonnelCostPlan.calculation_driver,
+                PersonnelCostPlan.deleted_at,
+            ).where(PersonnelCostPlan.budget_version_id == version_id)
+        )
+        calculated_keys = {
+            (line.account_code, line.cycle_id, line.category_id)
+            for line in calculate_personnel_costs(snapshot.model_input)
+        }
+        for row in result:
+            key = (row.account_code, row.cycle_id, row.category_id)
+            snapshot.personnel_ids[key] = row.id
+            if row.calculation_driver == PERSONNEL_CALCULATION_DRIVER:
+                snapshot.calculated_personnel_ids.add(row.id)
+            elif row.deleted_at is None and key not in calculated_keys:
+                ledger_lines.append(
+                    LedgerLine(
+                        source_table=SOURCE_PERSONNEL,
+                        account_code=row.account_code,
+                        description=row.description,
+                        amount_sar=row.total_cost_sar,
+                    )
+                )
+
+        result = await self.session.execute(
+            select(
+                OperatingCostPlan.account_code,
+                OperatingCostPlan.description,
+                OperatingCostPlan.amount_sar,
+            ).where(
+                and_(
+                    OperatingCostPlan.budget_version_id == version_id,
+                    OperatingCostPlan.deleted_at.is_(None),
+                )
+            )
+        )
+        ledger_lines.extend(
+            LedgerLine(
+                source_table=SOURCE_OPERATING,
+                account_code=row.account_code,
+                description=row.description,
+                amount_sar=row.amount_sar,
+            )
+            for row in result
+        )
+
+        result = await self.session.execute(
+            select(
+                CapExPlan.account_code,
+                CapExPlan.description,
+                CapExPlan.total_cost_sar,
+            ).where(
+                and_(
+                    CapExPlan.budget_version_id == version_id,
+                    CapExPlan.deleted_at.is_(None),
+                )
+            )
+        )
+        ledger_lines.extend(
+            LedgerLine(
+                source_table=SOURCE_CAPEX,
+                account_code=row.account_code,
+                description=row.description,
+                amount_sar=row.total_cost_sar,
+            )
+            for row in result
+        )
+
+    # ==========================================================================
+    # Bulk writing
+    # ==========================================================================
+
+    async def _write_result(
+        self,
+        snapshot: BudgetModelSnapshot,
+        result: BudgetModelResult,
+        user_id: uuid.UUID | None,
+    ) -> BudgetModelWriteStats:
+        """Write every calculated table with bulk statements."""
+        version_id = result.version_id
+        stats = BudgetModelWriteStats()
+
+        await self._bulk_upsert(
+            ClassStructure,
+            [
+                (
+                    line.level_id,
+                    {
+                        "level_id": line.level_id,
+                        "total_students": line.total_students,
+                        "number_of_classes": line.number_of_classes,
+                        "avg_class_size": line.avg_class_size,
+                        "requires_atsem": line.requires_atsem,
+                        "atsem_count": line.atsem_count,
+                        "calculation_method": line.calculation_method,
+                    },
+                )
+                for line in result.class_structures
+            ],
+            snapshot.class_structure_ids,
+            version_id,
+            user_id,
+            stats,
+            delete_stale=True,
+        )
+
+        await self._bulk_upsert(
+            DHGSubjectHours,
+            [
+                (
+                    (line.subject_id, line.level_id),
+                    {
+                        "subject_id": line.subject_id,
+                        "level_id": line.level_id,
+                        "number_of_classes": line.number_of_classes,
+                        "hours_per_class_per_week": line.hours_per_class_per_week,
+                        "total_hours_per_week": line.total_hours_per_week,
+                        "is_split": line.is_split,
+                    },
+                )
+                for line in result.subject_hours
+            ],
+            snapshot.subject_hours_ids,
+            version_id,
+            user_id,
+            stats,
+            delete_stale=True,
+        )
+
+        await self._bulk_upsert(
+            DHGTeacherRequirement,
+            [
+                (
+                    line.subject_id,
+                    {
+                        "subject_id": line.subject_id,
+                        "total_hours_per_week": line.total_hours_per_week,
+                        "standard_teaching_hours": line.standard_teaching_hours,
+                        "simple_fte": line.simple_fte,
+                        "rounded_fte": line.rounded_fte,
+                        "hsa_hours": line.hsa_hours,
+                    },
+                )
+                for line in result.teacher_requirements
+            ],
+            snapshot.teacher_requirement_ids,
+            version_id,
+            user_id,
+            stats,
+            delete_stale=True,
+        )
+
+        await self._bulk_upsert(
+            RevenuePlan,
+            [
+                (
+                    line.account_code,
+                    {
+                        "account_code": line.account_code,
+                        "description": line.description,
+                        "category": line.category,
+                        "amount_sar": line.amount_sar,
+                        "is_calculated": True,
+                        "calculation_driver": "enrollment",
+                        "trimester": line.trimester,
+                        "notes": line.notes,
+                    },
+                )
+                for line in result.revenue_lines
+            ],
+            snapshot.revenue_ids,
+            version_id,
+            user_id,
+            stats,
+            delete_stale=True,
+            stale_candidates=snapshot.calculated_revenue_ids,
+        )
+
+        await self._bulk_upsert(
+            PersonnelCostPlan,
+            [
+                (
+                    (line.account_code, line.cycle_id, line.category_id),
+                    {
+                        "account_code": line.account_code,
+                        "description": line.description,
+                        "category_id": line.category_id,
+                        "cycle_id": line.cycle_id,
+                        "fte_count": line.fte_count,
+                        "unit_cost_sar": line.unit_cost_sar,
+                        "total_cost_sar": line.total_cost_sar,
+                        "is_calculated": True,
+                        "calculation_driver": PERSONNEL_CALCULATION_DRIVER,
+                        "notes": "Calculated from DHG teacher allocations",
+                    },
+                )
+                for line in result.personnel_costs
+            ],
+            snapshot.personnel_ids,
+            version_id,
+            user_id,
+            stats,
+            delete_stale=True,
+            stale_candidates=snapshot.calculated_personnel_ids,
+        )
+
+        await self._replace_consolidation(result, version_id, user_id, stats)
+        await self._drop_financial_statements(version_id, stats)
+
+        return stats
+
+    async def _bulk_upsert(
+        self,
+        model: type,
+        rows: list[tuple[Any, dict[str, Any]]],
+        existing_ids: dict[Any, uuid.UUID],
+        version_id: uuid.UUID,
+        user_id: uuid.UUID | None,
+        stats: BudgetModelWriteStats,
+        delete_stale: bool = False,
+        stale_candidates: set[uuid.UUID] | None = None,
+    ) -> None:
+        """
+        Upsert calculated rows keyed on the table's natural key.
+
+        Rows whose key already exists are updated by primary key in one
+        executemany UPDATE; the rest are inserted in one multi-row INSERT.
+        New ids are recorded in existing_ids so callers can resolve them.
+
+        Args:
+            model: ORM model class of the output table
+            rows: (natural key, column values) pairs
+            existing_ids: Natural key → id of persisted rows (updated in place)
+            version_id: Budget version UUID
+            user_id: User ID for audit trail
+            stats: Write statistics to update
+            delete_stale: Delete persisted rows not produced by this run
+            stale_candidates: Ids deletable as stale (default: every persisted
+                row), for tables that also hold manually entered rows
+        """
+        now = datetime.utcnow()
+        to_update: list[dict[str, Any]] = []
+        to_insert: list[dict[str, Any]] = []
+        written_keys = set()
+
+        for key, data in rows:
+            written_keys.add(key)
+            values = {
+                **data,
+                "budget_version_id": version_id,
+                "updated_at": now,
+                "updated_by_id": user_id,
+                "deleted_at": None,
+            }
+            if key in existing_ids:
+                to_update.append({"id": existing_ids[key], **values})
+            else:
+                new_id = uuid.uuid4()
+                existing_ids[key] = new_id
+                to_insert.append(
+                    {"id": new_id, "created_at": now, "created_by_id": user_id, **values}
+                )
+
+        if to_update:
+            await self.session.execute(update(model), to_update)
+        if to_insert:
+            await self.session.execute(insert(model), to_insert)
+
+        table = model.__tablename__
+        stats.updated[table] = len(to_update)
+        stats.inserted[table] = len(to_insert)
+
+        if delete_stale:
+            stale_ids = [
+                row_id
+                for key, row_id in existing_ids.items()
+                if key not in written_keys
+                and (stale_candidates is None or row_id in stale_candidates)
+            ]
+            if stale_ids:
+                await self.session.execute(delete(model).where(model.id.in_(stale_ids)))
+            stats.deleted[table] = len(stale_ids)
+
+    async def _replace_consolidation(
+        self,
+        result: BudgetModelResult,
+        version_id: uuid.UUID,
+        user_id: uuid.UUID | None,
+        stats: BudgetModelWriteStats,
+    ) -> None:
+        """Replace the consolidation of a version with one DELETE and one INSERT."""
+        deleted = await self.session.execute(
+            delete(BudgetConsolidation).where(
+                BudgetConsolidation.budget_version_id == version_id
+            )
+        )
+        stats.deleted[BudgetConsolidation.__tablename__] = deleted.rowcount or 0
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "budget_version_id": version_id,
+                "account_code": line.account_code,
+                "account_name": line.account_name,
+                "consolidation_category": ConsolidationCategory(line.consolidation_category),
+                "is_revenue": line.is_revenue,
+                "amount_sar": line.amount_sar,
+                "source_table": line.source_table,
+                "source_count": line.source_count,
+                "is_calculated": True,
+                "created_at": now,
+                "updated_at": now,
+                "created_by_id": user_id,
+                "updated_by_id": user_id,
+            }
+            for line in result.consolidation_lines
+        ]
+        if rows:
+            await self.session.execute(insert(BudgetConsolidation), rows)
+        stats.inserted[BudgetConsolidation.__tablename__] = len(rows)
+
+    async def _drop_financial_statements(
+        self,
+        version_id: uuid.UUID,
+        stats: BudgetModelWriteStats,
+    ) -> None:
+        """Delete generated statements; they are rebuilt on next read."""
+        statement_ids = select(FinancialStatement.id).where(
+            FinancialStatement.budget_version_id == version_id
+        )
+        await self.session.execute(
+            delete(FinancialStatementLine).where(
+                FinancialStatementLine.statement_id.in_(statement_ids)
+            )
+        )
+        deleted = await self.session.execute(
+            delete(FinancialStatement).where(
+                FinancialStatement.budget_version_id == version_id
+            )
+        )
+        stats.deleted[FinancialStatement.__tablename__] = deleted.rowcount or 0
+
@@ -131,6 +131,41 @@ class BudgetVersionService:
             order_by="created_at",
         )
 
+    async def get_budget_versions_keyset(
+        self,
+        cursor: str | None = None,
+        page_size: int = 50,
+        fiscal_year: int | None = None,
+        status: BudgetVersionStatus | None = None,
+        estimate_total: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Get budget versions with keyset (cursor) pagination, newest first.
+
+        Args:
+            cursor: Cursor from the previous page (None for the first page)
+            page_size: Records per page
+            fiscal_year: Optional fiscal year filter
+            status: Optional status filter
+            estimate_total: Whether to include an estimated total
+
+        Returns:
+            Keyset page with items, page_size, next_cursor, has_more, total
+        """
+        filters = {}
+        if fiscal_year:
+            filters["fiscal_year"] = fiscal_year
+        if status:
+            filters["status"] = status
+
+        return await self._base_service.get_keyset_paginated(
+            cursor=cursor,
+            page_size=page_size,
+            filters=filters,
+            order_by="created_at",
+            estimate_total=estimate_total,
+        )
+
     async def create_budget_version(
         self,
         name: str,
@@ -258,6 +258,38 @@ class ConfigurationService:
             status=status,
         )
 
+    async def get_budget_versions_keyset(
+        self,
+        cursor: str | None = None,
+        page_size: int = 50,
+        fiscal_year: int | None = None,
+        status: BudgetVersionStatus | None = None,
+        estimate_total: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Get budget versions with keyset (cursor) pagination.
+
+        Args:
+            cursor: Cursor from the previous page (None for the first page)
+            page_size: Records per page
+            fiscal_year: Optional fiscal year filter
+            status: Optional status filter
+            estimate_total: Whether to include an estimated total
+
+        Returns:
+            Keyset page with items, page_size, next_cursor, has_more, total
+
+        Note:
+            Delegates to BudgetVersionService for centralized version management.
+        """
+        return await self._budget_version.get_budget_versions_keyset(
+            cursor=cursor,
+            page_size=page_size,
+            fiscal_year=fiscal_year,
+            status=status,
+            estimate_total=estimate_total,
+        )
+
     async def create_budget_version(
         self,
         name: str,
@@ -6,15 +6,37 @@ version management, validation, and line item rollup calculations.
 """
 
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    Select,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+)
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.logging import logger
+from app.engine.budget_model.consolidation_rules import (
+    CONSOLIDATION_CATEGORY_RULES,
+    CONSOLIDATION_DEFAULT_CATEGORY,
+    CONSOLIDATION_SOURCE_ORDER,
+    SOURCE_CAPEX,
+    SOURCE_OPERATING,
+    SOURCE_PERSONNEL,
+    SOURCE_REVENUE,
+)
 from app.models.configuration import BudgetVersion, BudgetVersionStatus
 from app.models.consolidation import BudgetConsolidation, ConsolidationCategory
 from app.models.planning import (
@@ -28,6 +50,86 @@ from app.services.exceptions import (
     BusinessRuleError,
     ServiceException,
 )
+from app.services.input_fingerprint import compute_input_fingerprint
+
+
+@dataclass(frozen=True)
+class ConsolidationSource:
+    """
+    A planning table rolled up into budget_consolidations.
+
+    category_rules map account code prefixes to consolidation categories (see
+    CONSOLIDATION_CATEGORY_RULES, shared with the budget model); the first
+    matching prefix wins and default_category applies otherwise. Lines are
+    grouped by account code; source_rank is the table's position in
+    CONSOLIDATION_SOURCE_ORDER.
+    """
+
+    model: type
+    amount_column: str
+    source_table: str
+    source_rank: int
+    is_revenue: bool
+    category_rules: tuple[tuple[str, ConsolidationCategory], ...]
+    default_category: ConsolidationCategory
+
+
+def _source(
+    model: type,
+    amount_column: str,
+    source_table: str,
+) -> ConsolidationSource:
+    """Describe a planning source with the shared consolidation category rules."""
+    return ConsolidationSource(
+        model=model,
+        amount_column=amount_column,
+        source_table=source_table,
+        source_rank=CONSOLIDATION_SOURCE_ORDER.index(source_table),
+        is_revenue=source_table == SOURCE_REVENUE,
+        category_rules=tuple(
+            (prefix, ConsolidationCategory(category))
+            for prefix, category in CONSOLIDATION_CATEGORY_RULES[source_table]
+        ),
+        default_category=ConsolidationCategory(CONSOLIDATION_DEFAULT_CATEGORY[source_table]),
+    )
+
+
+CONSOLIDATION_SOURCES: tuple[ConsolidationSource, ...] = (
+    _source(RevenuePlan, "amount_sar", SOURCE_REVENUE),
+    _source(PersonnelCostPlan, "total_cost_sar", SOURCE_PERSONNEL),
+    _source(OperatingCostPlan, "amount_sar", SOURCE_OPERATING),
+    _source(CapExPlan, "total_cost_sar", SOURCE_CAPEX),
+)
+
+
+def _category_case(
+    account_code: ColumnElement,
+    source: ConsolidationSource,
+) -> ColumnElement:
+    """Map account codes to consolidation categories with a CASE expression."""
+    return cast(
+        case(
+            *(
+                (account_code.startswith(prefix), literal(category.value))
+                for prefix, category in source.category_rules
+            ),
+            else_=literal(source.default_category.value),
+        ),
+        BudgetConsolidation.__table__.c.consolidation_category.type,
+    )
+
+
+def _new_uuid_expression(dialect_name: str) -> ColumnElement:
+    """Generate primary keys in the database for INSERT ... SELECT."""
+    if dialect_name == "sqlite":
+        # SQLite has no UUID function: format random bytes as a UUID string
+        return func.lower(
+            func.printf(
+                "%s-%s-%s-%s-%s",
+                *(func.hex(func.randomblob(size)) for size in (4, 2, 2, 2, 6)),
+            )
+        )
+    return func.gen_random_uuid()
 
 
 class ConsolidationService:
@@ -49,8 +151,9 @@ class ConsolidationService:
             session: Async database session
         """
         self.session = session
-        self.consolidation_service = BaseService(BudgetConsolidation, session)
         self.budget_version_service = BaseService(BudgetVersion, session)
+        # Whether the last consolidate_budget call recomputed (None before any call)
+        self.last_recomputed: bool | None = None
 
     async def get_consolidation(
         self,
@@ -103,6 +206,7 @@ class ConsolidationService:
         self,
         budget_version_id: uuid.UUID,
         user_id: uuid.UUID | None = None,
+        force: bool = False,
     ) -> list[BudgetConsolidation]:
         """
         Calculate consolidated budget by aggregating all planning modules.
@@ -112,42 +216,64 @@ class ConsolidationService:
         2. Aggregates personnel costs from PersonnelCostPlan
         3. Aggregates operating costs from OperatingCostPlan
         4. Aggregates CapEx from CapExPlan
-        5. Creates/updates BudgetConsolidation entries
+        5. Replaces the BudgetConsolidation entries of the version
+
+        Aggregation and category mapping run in the database: the version's
+        entries are rewritten with one DELETE and one INSERT ... SELECT, so the
+        cost does not grow with the number of planning lines held in Python.
+
+        Each entry stores the fingerprint of the planning inputs it was built
+        from. When the inputs still match that fingerprint, the stored entries
+        are returned without recomputing. last_recomputed records which path
+        was taken.
 
         Args:
             budget_version_id: Budget version UUID
             user_id: User ID for audit trail
+            force: Recompute even if the planning inputs are unchanged
 
         Returns:
-            List of created/updated BudgetConsolidation instances
+            List of BudgetConsolidation instances of the version
 
         Raises:
             NotFoundError: If budget version not found
-            ValidationError: If consolidation fails
             ServiceException: If database operations fail
         """
         try:
             # Verify budget version exists
             await self.budget_version_service.get_by_id(budget_version_id)
 
-            # Delete existing consolidation entries for this version
-            await self._delete_existing_consolidation(budget_version_id)
-
-            # Calculate line items from all sources
-            consolidation_entries = await self.calculate_line_items(budget_version_id)
+            fingerprint = await compute_input_fingerprint(
+                self.session,
+                budget_version_id,
+                [source.model for source in CONSOLIDATION_SOURCES],
+            )
+            if not force:
+                stored = await self._get_stored_fingerprint(budget_version_id)
+                if stored == fingerprint:
+                    self.last_recomputed = False
+                    logger.info(
+                        "Budget consolidation inputs unchanged, reusing stored result",
+                        version_id=str(budget_version_id),
+                    )
+                    return await self._load_consolidation(budget_version_id)
 
-            # Create consolidation entries
-            created_entries = []
-            for entry_data in consolidation_entries:
-                entry = await self.consolidation_service.create(
-                    entry_data,
-                    user_id=user_id,
+            # Delete existing consolidation entries for this version
+            await self.session.execute(
+                delete(BudgetConsolidation).where(
+                    BudgetConsolidation.budget_version_id == budget_version_id
                 )
-                created_entries.append(entry)
+            )
 
-            # Commit the session
+            # Insert all line items from all sources in a single statement
+            await self.session.execute(
+                self._build_consolidation_insert(budget_version_id, user_id, fingerprint)
+            )
             await self.session.flush()
 
+            created_entries = await self._load_consolidation(budget_version_id)
+            self.last_recomputed = True
+
             logger.info(
                 "Budget consolidation completed successfully",
                 version_id=str(budget_version_id),
@@ -289,11 +415,11 @@ class ConsolidationService:
         """
         Calculate all consolidated line items by aggregating from source tables.
 
-        Aggregates:
-        1. Revenue from revenue_plans (account_code, category)
-        2. Personnel costs from personnel_cost_plans (account_code, category)
-        3. Operating costs from operating_cost_plans (account_code, category)
-        4. CapEx from capex_plans (account_code, category)
+        Aggregates, one line per account code:
+        1. Revenue from revenue_plans
+        2. Personnel costs from personnel_cost_plans
+        3. Operating costs from operating_cost_plans
+        4. CapEx from capex_plans
 
         Args:
             budget_version_id: Budget version UUID
@@ -301,25 +427,22 @@ class ConsolidationService:
         Returns:
             List of dictionaries with consolidation data ready for creation
         """
-        consolidation_data = []
-
-        # 1. Aggregate Revenue
-        revenue_items = await self._aggregate_revenue(budget_version_id)
-        consolidation_data.extend(revenue_items)
-
-        # 2. Aggregate Personnel Costs
-        personnel_items = await self._aggregate_personnel_costs(budget_version_id)
-        consolidation_data.extend(personnel_items)
+        result = await self.session.execute(self._line_items_query(budget_version_id))
 
-        # 3. Aggregate Operating Costs
-        operating_items = await self._aggregate_operating_costs(budget_version_id)
-        consolidation_data.extend(operating_items)
-
-        # 4. Aggregate CapEx
-        capex_items = await self._aggregate_capex(budget_version_id)
-        consolidation_data.extend(capex_items)
-
-        return consolidation_data
+        return [
+            {
+                "budget_version_id": budget_version_id,
+                "account_code": row.account_code,
+                "account_name": row.account_name,
+                "consolidation_category": ConsolidationCategory(row.consolidation_category),
+                "is_revenue": row.is_revenue,
+                "amount_sar": row.amount_sar,
+                "source_table": row.source_table,
+                "source_count": row.source_count,
+                "is_calculated": True,
+            }
+            for row in result.all()
+        ]
 
     async def validate_completeness(
         self,
@@ -396,16 +519,31 @@ class ConsolidationService:
     # Private Helper Methods
     # ==========================================================================
 
-    async def _delete_existing_consolidation(
+    async def _get_stored_fingerprint(
         self,
         budget_version_id: uuid.UUID,
-    ) -> None:
-        """Delete all existing consolidation entries for a version."""
-        existing = await self.consolidation_service.get_all(
-            filters={"budget_version_id": budget_version_id}
+    ) -> str | None:
+        """Get the input fingerprint stored with a version's consolidation."""
+        query = (
+            select(BudgetConsolidation.input_fingerprint)
+            .where(BudgetConsolidation.budget_version_id == budget_version_id)
+            .limit(1)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def _load_consolidation(
+        self,
+        budget_version_id: uuid.UUID,
+    ) -> list[BudgetConsolidation]:
+        """Load the consolidation entries of a version, bypassing stale identities."""
+        query = (
+            select(BudgetConsolidation)
+            .where(BudgetConsolidation.budget_version_id == budget_version_id)
+            .execution_options(populate_existing=True)
         )
-        for entry in existing:
-            await self.consolidation_service.delete(entry.id)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
 
     async def _supersede_previous_versions(
         self,
@@ -467,287 +605,110 @@ class ConsolidationService:
         result = await self.session.execute(query)
         return result.scalar_one()
 
-    async def _aggregate_revenue(
-        self,
-        budget_version_id: uuid.UUID,
-    ) -> list[dict]:
-        """Aggregate revenue from revenue_plans."""
-        query = (
-            select(
-                RevenuePlan.account_code,
-                RevenuePlan.description,
-                RevenuePlan.category,
-                func.sum(RevenuePlan.amount_sar).label("total_amount"),
-                func.count(RevenuePlan.id).label("source_count"),
-            )
-            .where(
-                and_(
-                    RevenuePlan.budget_version_id == budget_version_id,
-                    RevenuePlan.deleted_at.is_(None),
-                )
-            )
-            .group_by(
-                RevenuePlan.account_code,
-                RevenuePlan.description,
-                RevenuePlan.category,
-            )
-        )
-
-        result = await self.session.execute(query)
-        rows = result.all()
-
-        consolidation_data = []
-        for row in rows:
-            # Map revenue category to consolidation category
-            consolidation_category = self._map_revenue_to_consolidation_category(
-                row.account_code,
-                row.category,
-            )
-
-            consolidation_data.append({
-                "budget_version_id": budget_version_id,
-                "account_code": row.account_code,
-                "account_name": row.description,
-                "consolidation_category": consolidation_category,
-                "is_revenue": True,
-                "amount_sar": row.total_amount or Decimal("0.00"),
-                "source_table": "revenue_plans",
-                "source_count": row.source_count,
-                "is_calculated": True,
-            })
-
-        return consolidation_data
+    def _line_items_query(self, budget_version_id: uuid.UUID) -> Select:
+        """
+        Build the aggregation of all planning sources into consolidation lines.
 
-    async def _aggregate_personnel_costs(
-        self,
-        budget_version_id: uuid.UUID,
-    ) -> list[dict]:
-        """Aggregate personnel costs from personnel_cost_plans."""
-        query = (
-            select(
-                PersonnelCostPlan.account_code,
-                PersonnelCostPlan.description,
-                func.sum(PersonnelCostPlan.total_cost_sar).label("total_amount"),
-                func.count(PersonnelCostPlan.id).label("source_count"),
+        Each source is grouped by account in SQL and the four sources are read
+        in a single UNION ALL query, then rolled up by account code across
+        sources with the shared consolidation rules: an account planned in
+        several tables takes the category of the first of them (lowest
+        source_rank) and the lowest line description as account name.
+        """
+        per_source = union_all(
+            *(
+                self._aggregate_source(source, budget_version_id)
+                for source in CONSOLIDATION_SOURCES
             )
-            .where(
-                and_(
-                    PersonnelCostPlan.budget_version_id == budget_version_id,
-                    PersonnelCostPlan.deleted_at.is_(None),
+        ).subquery()
+        account_code = per_source.c.account_code
+        first_rank = func.min(per_source.c.source_rank)
+
+        return select(
+            account_code.label("account_code"),
+            func.min(per_source.c.account_name).label("account_name"),
+            case(
+                *(
+                    (first_rank == source.source_rank, _category_case(account_code, source))
+                    for source in CONSOLIDATION_SOURCES
                 )
-            )
-            .group_by(
-                PersonnelCostPlan.account_code,
-                PersonnelCostPlan.description,
-            )
-        )
-
-        result = await self.session.execute(query)
-        rows = result.all()
-
-        consolidation_data = []
-        for row in rows:
-            # Map personnel category to consolidation category
-            consolidation_category = self._map_personnel_to_consolidation_category(
-                row.account_code,
-            )
-
-            consolidation_data.append({
-                "budget_version_id": budget_version_id,
-                "account_code": row.account_code,
-                "account_name": row.description,
-                "consolidation_category": consolidation_category,
-                "is_revenue": False,
-                "amount_sar": row.total_amount or Decimal("0.00"),
-                "source_table": "personnel_cost_plans",
-                "source_count": row.source_count,
-                "is_calculated": True,
-            })
-
-        return consolidation_data
+            ).label("consolidation_category"),
+            case(
+                *(
+                    (first_rank == source.source_rank, literal(source.is_revenue))
+                    for source in CONSOLIDATION_SOURCES
+                )
+            ).label("is_revenue"),
+            func.sum(per_source.c.amount_sar).label("amount_sar"),
+            case(
+                *(
+                    (first_rank == source.source_rank, literal(source.source_table))
+                    for source in CONSOLIDATION_SOURCES
+                )
+            ).label("source_table"),
+            func.sum(per_source.c.source_count).label("source_count"),
+        ).group_by(account_code)
 
-    async def _aggregate_operating_costs(
+    def _aggregate_source(
         self,
+        source: ConsolidationSource,
         budget_version_id: uuid.UUID,
-    ) -> list[dict]:
-        """Aggregate operating costs from operating_cost_plans."""
-        query = (
+    ) -> Select:
+        """Aggregate one planning source table by account code."""
+        model = source.model
+
+        return (
             select(
-                OperatingCostPlan.account_code,
-                OperatingCostPlan.description,
-                OperatingCostPlan.category,
-                func.sum(OperatingCostPlan.amount_sar).label("total_amount"),
-                func.count(OperatingCostPlan.id).label("source_count"),
+                model.account_code.label("account_code"),
+                func.min(model.description).label("account_name"),
+                func.coalesce(func.sum(getattr(model, source.amount_column)), 0).label(
+                    "amount_sar"
+                ),
+                literal(source.source_rank).label("source_rank"),
+                func.count(model.id).label("source_count"),
             )
             .where(
                 and_(
-                    OperatingCostPlan.budget_version_id == budget_version_id,
-                    OperatingCostPlan.deleted_at.is_(None),
+                    model.budget_version_id == budget_version_id,
+                    model.deleted_at.is_(None),
                 )
             )
-            .group_by(
-                OperatingCostPlan.account_code,
-                OperatingCostPlan.description,
-                OperatingCostPlan.category,
-            )
+            .group_by(model.account_code)
         )
 
-        result = await self.session.execute(query)
-        rows = result.all()
-
-        consolidation_data = []
-        for row in rows:
-            # Map operating category to consolidation category
-            consolidation_category = self._map_operating_to_consolidation_category(
-                row.account_code,
-                row.category,
-            )
-
-            consolidation_data.append({
-                "budget_version_id": budget_version_id,
-                "account_code": row.account_code,
-                "account_name": row.description,
-                "consolidation_category": consolidation_category,
-                "is_revenue": False,
-                "amount_sar": row.total_amount or Decimal("0.00"),
-                "source_table": "operating_cost_plans",
-                "source_count": row.source_count,
-                "is_calculated": True,
-            })
-
-        return consolidation_data
-
-    async def _aggregate_capex(
+    def _build_consolidation_insert(
         self,
         budget_version_id: uuid.UUID,
-    ) -> list[dict]:
-        """Aggregate CapEx from capex_plans."""
-        query = (
-            select(
-                CapExPlan.account_code,
-                CapExPlan.description,
-                CapExPlan.category,
-                func.sum(CapExPlan.total_cost_sar).label("total_amount"),
-                func.count(CapExPlan.id).label("source_count"),
-            )
-            .where(
-                and_(
-                    CapExPlan.budget_version_id == budget_version_id,
-                    CapExPlan.deleted_at.is_(None),
-                )
-            )
-            .group_by(
-                CapExPlan.account_code,
-                CapExPlan.description,
-                CapExPlan.category,
-            )
-        )
-
-        result = await self.session.execute(query)
-        rows = result.all()
-
-        consolidation_data = []
-        for row in rows:
-            # Map CapEx category to consolidation category
-            consolidation_category = self._map_capex_to_consolidation_category(
-                row.account_code,
-                row.category,
-            )
-
-            consolidation_data.append({
-                "budget_version_id": budget_version_id,
-                "account_code": row.account_code,
-                "account_name": row.description,
-                "consolidation_category": consolidation_category,
-                "is_revenue": False,
-                "amount_sar": row.total_amount or Decimal("0.00"),
-                "source_table": "capex_plans",
-                "source_count": row.source_count,
-                "is_calculated": True,
-            })
+        user_id: uuid.UUID | None,
+        input_fingerprint: str,
+    ) -> Insert:
+        """Build the INSERT ... SELECT writing all line items of a version."""
+        lines = self._line_items_query(budget_version_id).subquery()
+        table = BudgetConsolidation.__table__
+        dialect_name = self.session.get_bind().dialect.name
+        now = datetime.utcnow()
+
+        values = {
+            "id": _new_uuid_expression(dialect_name),
+            "budget_version_id": literal(budget_version_id, table.c.budget_version_id.type),
+            "account_code": lines.c.account_code,
+            "account_name": lines.c.account_name,
+            "consolidation_category": lines.c.consolidation_category,
+            "is_revenue": lines.c.is_revenue,
+            "amount_sar": lines.c.amount_sar,
+            "source_table": lines.c.source_table,
+            "source_count": lines.c.source_count,
+            "is_calculated": literal(True),
+            "input_fingerprint": literal(input_fingerprint),
+            "created_at": literal(now, table.c.created_at.type),
+            "updated_at": literal(now, table.c.updated_at.type),
+        }
+        if user_id:
+            values["created_by_id"] = literal(user_id, table.c.created_by_id.type)
+            values["updated_by_id"] = literal(user_id, table.c.updated_by_id.type)
 
-        return consolidation_data
+        return insert(BudgetConsolidation).from_select(
+            list(values),
+            select(*values.values()),
+        )
 
-    def _map_revenue_to_consolidation_category(
-        self,
-        account_code: str,
-        category: str,
-    ) -> ConsolidationCategory:
-        """Map revenue account code and category to consolidation category."""
-        # Tuition (701xx)
-        if account_code.startswith("701"):
-            return ConsolidationCategory.REVENUE_TUITION
-        # Fees (702xx-709xx)
-        elif account_code.startswith("702") or account_code.startswith("703"):
-            return ConsolidationCategory.REVENUE_FEES
-        # Other revenue (75xxx-77xxx)
-        else:
-            return ConsolidationCategory.REVENUE_OTHER
-
-    def _map_personnel_to_consolidation_category(
-        self,
-        account_code: str,
-    ) -> ConsolidationCategory:
-        """Map personnel account code and category to consolidation category."""
-        # Teaching staff (64110-64119)
-        if account_code.startswith("6411"):
-            return ConsolidationCategory.PERSONNEL_TEACHING
-        # Admin staff (64120-64129)
-        elif account_code.startswith("6412"):
-            return ConsolidationCategory.PERSONNEL_ADMIN
-        # Support staff (64130-64139)
-        elif account_code.startswith("6413"):
-            return ConsolidationCategory.PERSONNEL_SUPPORT
-        # Social charges (645xx)
-        elif account_code.startswith("645"):
-            return ConsolidationCategory.PERSONNEL_SOCIAL
-        # Default to teaching
-        else:
-            return ConsolidationCategory.PERSONNEL_TEACHING
-
-    def _map_operating_to_consolidation_category(
-        self,
-        account_code: str,
-        category: str,
-    ) -> ConsolidationCategory:
-        """Map operating cost account code and category to consolidation category."""
-        # Supplies (606xx)
-        if account_code.startswith("606"):
-            return ConsolidationCategory.OPERATING_SUPPLIES
-        # Utilities (6061x)
-        elif account_code.startswith("6061"):
-            return ConsolidationCategory.OPERATING_UTILITIES
-        # Maintenance (615xx)
-        elif account_code.startswith("615"):
-            return ConsolidationCategory.OPERATING_MAINTENANCE
-        # Insurance (616xx)
-        elif account_code.startswith("616"):
-            return ConsolidationCategory.OPERATING_INSURANCE
-        # Other operating
-        else:
-            return ConsolidationCategory.OPERATING_OTHER
-
-    def _map_capex_to_consolidation_category(
-        self,
-        account_code: str,
-        category: str,
-    ) -> ConsolidationCategory:
-        """Map CapEx account code and category to consolidation category."""
-        # Equipment (2154x)
-        if account_code.startswith("2154"):
-            return ConsolidationCategory.CAPEX_EQUIPMENT
-        # IT (2183x)
-        elif account_code.startswith("2183"):
-            return ConsolidationCategory.CAPEX_IT
-        # Furniture (2184x)
-        elif account_code.startswith("2184"):
-            return ConsolidationCategory.CAPEX_FURNITURE
-        # Building (213xx)
-        elif account_code.startswith("213"):
-            return ConsolidationCategory.CAPEX_BUILDING
-        # Software (205xx)
-        elif account_code.startswith("205"):
-            return ConsolidationCategory.CAPEX_SOFTWARE
-        # Default to equipment
-        else:
-            return ConsolidationCategory.CAPEX_EQUIPMENT
@@ -26,6 +26,7 @@ from app.models.planning import (
     TeacherAllocation,
 )
 from app.services.base import BaseService
+from app.services.entity_loader import get_entity_loader
 from app.services.exceptions import ServiceException, ValidationError
 
 
@@ -336,9 +337,7 @@ class CostService:
 
             # Track by cycle
             if cycle_id:
-                cycle_query = select(AcademicCycle).where(AcademicCycle.id == cycle_id)
-                cycle_result = await self.session.execute(cycle_query)
-                cycle = cycle_result.scalar_one_or_none()
+                cycle = await get_entity_loader(self.session, AcademicCycle).load(cycle_id)
                 if cycle:
                     cycle_name = cycle.name_en
                     if cycle_name not in cost_by_cycle:
@@ -349,9 +348,7 @@ class CostService:
             account_code = "64110"  # Teaching salaries
             description = f"Teaching Staff - {category.name_en}"
             if cycle_id:
-                cycle_query = select(AcademicCycle).where(AcademicCycle.id == cycle_id)
-                cycle_result = await self.session.execute(cycle_query)
-                cycle = cycle_result.scalar_one_or_none()
+                cycle = await get_entity_loader(self.session, AcademicCycle).load(cycle_id)
                 if cycle:
                     description += f" - {cycle.name_en}"
 
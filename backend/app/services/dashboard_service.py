@@ -6,22 +6,27 @@ Implements business logic for:
 - Chart data generation (enrollment, costs, revenue breakdowns)
 - Alert generation (capacity, variance, staffing)
 - Recent activity tracking
+- Combined dashboard bundle with concurrent widget loading
 """
 
+import asyncio
+import time
 import uuid
+from collections.abc import Awaitable, Callable
 from datetime import datetime
 from decimal import Decimal
 from typing import Any
 
 from sqlalchemy import and_, func, select
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.logging import logger
 from app.models.configuration import AcademicLevel, BudgetVersion, BudgetVersionStatus
 from app.models.consolidation import BudgetConsolidation, ConsolidationCategory
 from app.models.planning import ClassStructure, DHGTeacherRequirement, EnrollmentPlan
 from app.services.enrollment_capacity import get_effective_capacity
+from app.services.entity_loader import get_entity_loader
 from app.services.exceptions import NotFoundError, ServiceException
 
 
@@ -73,15 +78,26 @@ class DashboardService:
             NotFoundError: If budget version not found
             ServiceException: If database operation fails
         """
-        try:
-            # Verify version exists
-            version_query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-            version_result = await self.session.execute(version_query)
-            version = version_result.scalar_one_or_none()
+        version = await self._get_version(budget_version_id)
+        return await self._build_summary(version)
 
-            if not version:
-                raise NotFoundError("BudgetVersion", str(budget_version_id))
+    async def _get_version(self, budget_version_id: uuid.UUID) -> BudgetVersion:
+        """
+        Load a budget version.
+
+        Raises:
+            NotFoundError: If budget version not found
+        """
+        version = await get_entity_loader(self.session, BudgetVersion).load(budget_version_id)
+
+        if not version:
+            raise NotFoundError("BudgetVersion", str(budget_version_id))
+        return version
 
+    async def _build_summary(self, version: BudgetVersion) -> dict[str, Any]:
+        """Compute the dashboard summary cards of a loaded budget version."""
+        budget_version_id = version.id
+        try:
             # Totals from consolidation
             revenue_query = (
                 select(func.coalesce(func.sum(BudgetConsolidation.amount_sar), 0))
@@ -201,13 +217,15 @@ class DashboardService:
         Raises:
             NotFoundError: If budget version not found
         """
-        # Verify version exists
-        version_query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-        version_result = await self.session.execute(version_query)
-        version = version_result.scalar_one_or_none()
+        await self._get_version(budget_version_id)
+        return await self._build_enrollment_chart(budget_version_id, breakdown_by)
 
-        if not version:
-            raise NotFoundError("BudgetVersion", str(budget_version_id))
+    async def _build_enrollment_chart(
+        self,
+        budget_version_id: uuid.UUID,
+        breakdown_by: str,
+    ) -> dict[str, Any]:
+        """Compute enrollment chart data (version already verified)."""
 
         base_query = (
             select(
@@ -313,13 +331,15 @@ class DashboardService:
         Raises:
             NotFoundError: If budget version not found
         """
-        # Verify version exists
-        version_query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-        version_result = await self.session.execute(version_query)
-        version = version_result.scalar_one_or_none()
+        await self._get_version(budget_version_id)
+        return await self._build_cost_breakdown(budget_version_id, breakdown_by)
 
-        if not version:
-            raise NotFoundError("BudgetVersion", str(budget_version_id))
+    async def _build_cost_breakdown(
+        self,
+        budget_version_id: uuid.UUID,
+        breakdown_by: str,
+    ) -> dict[str, Any]:
+        """Compute cost breakdown chart data (version already verified)."""
 
         chart_data: dict[str, Any] = {
             "breakdown_by": breakdown_by,
@@ -393,13 +413,15 @@ class DashboardService:
         Raises:
             NotFoundError: If budget version not found
         """
-        # Verify version exists
-        version_query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-        version_result = await self.session.execute(version_query)
-        version = version_result.scalar_one_or_none()
+        await self._get_version(budget_version_id)
+        return await self._build_revenue_breakdown(budget_version_id, breakdown_by)
 
-        if not version:
-            raise NotFoundError("BudgetVersion", str(budget_version_id))
+    async def _build_revenue_breakdown(
+        self,
+        budget_version_id: uuid.UUID,
+        breakdown_by: str,
+    ) -> dict[str, Any]:
+        """Compute revenue breakdown chart data (version already verified)."""
 
         # Pull revenue consolidation rows
         revenue_query = (
@@ -524,20 +546,21 @@ class DashboardService:
         Raises:
             NotFoundError: If budget version not found
         """
-        # Verify version exists
-        version_query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-        version_result = await self.session.execute(version_query)
-        version = version_result.scalar_one_or_none()
+        version = await self._get_version(budget_version_id)
 
-        if not version:
-            raise NotFoundError("BudgetVersion", str(budget_version_id))
+        # Get summary data for alert evaluation
+        summary = await self.get_dashboard_summary(budget_version_id)
+        return self._build_alerts(version, summary)
 
+    def _build_alerts(
+        self,
+        version: BudgetVersion,
+        summary: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Evaluate alert rules against a version's dashboard summary."""
         alerts = []
         now = datetime.utcnow().isoformat()
 
-        # Get summary data for alert evaluation
-        summary = await self.get_dashboard_summary(budget_version_id)
-
         # Capacity utilization alerts
         capacity_pct = Decimal(str(summary.get("capacity_utilization_pct", 0)))
         if capacity_pct >= self.CAPACITY_CRITICAL_PCT:
@@ -588,6 +611,120 @@ class DashboardService:
 
         return alerts
 
+    async def get_dashboard_bundle(
+        self,
+        budget_version_id: uuid.UUID,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        enrollment_breakdown: str = "level",
+        cost_breakdown: str = "category",
+        revenue_breakdown: str = "fee_type",
+    ) -> dict[str, Any]:
+        """
+        Get all dashboard widgets for a budget version in one call.
+
+        The version is loaded once. The summary and chart aggregates are
+        independent: with a session_factory each runs concurrently on its own
+        session, otherwise they run one after another on this session. Alerts
+        and the KPI summary are derived from the summary without more queries.
+        A failing widget is reported in its entry instead of failing the bundle.
+
+        Args:
+            budget_version_id: Budget version UUID
+            session_factory: Optional factory opening one session per widget
+            enrollment_breakdown: Enrollment chart dimension
+            cost_breakdown: Cost chart dimension
+            revenue_breakdown: Revenue chart dimension
+
+        Returns:
+            Dictionary with:
+                - version_id, version_name, fiscal_year, status
+                - widgets: Widget name -> {"data", "duration_ms", "error"}
+                - total_duration_ms: Server time for the whole bundle
+
+        Raises:
+            NotFoundError: If budget version not found
+        """
+        start_time = time.perf_counter()
+        version = await self._get_version(budget_version_id)
+
+        loaders: dict[str, Callable[[DashboardService], Awaitable[Any]]] = {
+            "summary": lambda service: service._build_summary(version),
+            "enrollment_chart": lambda service: service._build_enrollment_chart(
+                budget_version_id, enrollment_breakdown
+            ),
+            "cost_breakdown": lambda service: service._build_cost_breakdown(
+                budget_version_id, cost_breakdown
+            ),
+            "revenue_breakdown": lambda service: service._build_revenue_breakdown(
+                budget_version_id, revenue_breakdown
+            ),
+        }
+
+        async def _load_on_own_session(
+            factory: async_sessionmaker[AsyncSession],
+            name: str,
+            loader: Callable[[DashboardService], Awaitable[Any]],
+        ) -> dict[str, Any]:
+            async with factory() as session:
+                return await self._timed_widget(name, loader(DashboardService(session)))
+
+        if session_factory is not None:
+            results = await asyncio.gather(
+                *(
+                    _load_on_own_session(session_factory, name, loader)
+                    for name, loader in loaders.items()
+                )
+            )
+        else:
+            results = [
+                await self._timed_widget(name, loader(self)) for name, loader in loaders.items()
+            ]
+        widgets = dict(zip(loaders, results, strict=True))
+
+        summary = widgets["summary"]["data"]
+        derived: dict[str, Callable[[], Any]] = {
+            "alerts": lambda: self._build_alerts(version, summary),
+            "kpi_summary": lambda: self._build_kpi_summary(summary),
+        }
+        for name, build in derived.items():
+            widget_start = time.perf_counter()
+            widgets[name] = {
+                "data": build() if summary is not None else None,
+                "duration_ms": round((time.perf_counter() - widget_start) * 1000, 2),
+                "error": None if summary is not None else "Dashboard summary unavailable",
+            }
+
+        return {
+            "version_id": str(budget_version_id),
+            "version_name": version.name,
+            "fiscal_year": version.fiscal_year,
+            "status": version.status.value,
+            "widgets": widgets,
+            "total_duration_ms": round((time.perf_counter() - start_time) * 1000, 2),
+        }
+
+    @staticmethod
+    async def _timed_widget(name: str, loader: Awaitable[Any]) -> dict[str, Any]:
+        """Await a widget loader, recording its duration and any error."""
+        start_time = time.perf_counter()
+        data = None
+        error = None
+        try:
+            data = await loader
+        except Exception as e:
+            error = getattr(e, "message", None) or str(e)
+            logger.warning(
+                "Dashboard widget failed",
+                widget=name,
+                error=str(e),
+                exc_info=True,
+            )
+        return {
+            "data": data,
+            "duration_ms": round((time.perf_counter() - start_time) * 1000, 2),
+            "error": error,
+        }
+
     async def get_recent_activity(
         self,
         budget_version_id: uuid.UUID | None = None,
@@ -695,9 +832,7 @@ class DashboardService:
 
         for version_id in version_ids:
             # Get version
-            version_query = select(BudgetVersion).where(BudgetVersion.id == version_id)
-            version_result = await self.session.execute(version_query)
-            version = version_result.scalar_one_or_none()
+            version = await get_entity_loader(self.session, BudgetVersion).load(version_id)
 
             if not version:
                 continue
@@ -741,7 +876,11 @@ class DashboardService:
         """
         # Get base dashboard summary
         summary = await self.get_dashboard_summary(budget_version_id)
+        return self._build_kpi_summary(summary)
 
+    @staticmethod
+    def _build_kpi_summary(summary: dict[str, Any]) -> dict[str, Any]:
+        """Derive the KPI summary from a version's dashboard summary."""
         total_revenue = Decimal(str(summary.get("total_revenue_sar", 0)))
         total_costs = Decimal(str(summary.get("total_costs_sar", 0)))
         total_students = int(summary.get("total_students", 0))
@@ -757,7 +896,7 @@ class DashboardService:
         ) if total_teachers_fte else 0
 
         kpi_summary = {
-            "version_id": str(budget_version_id),
+            "version_id": summary["version_id"],
             "version_name": summary.get("version_name", ""),
             "financial_kpis": {
                 "total_revenue_sar": float(total_revenue),
@@ -0,0 +1,96 @@
+"""Data revisions of budget versions (see BudgetVersionRevision)."""
+
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.configuration import BudgetVersionRevision
+
+REVISIONS_TABLE = "efir_budget.budget_version_revisions"
+VERSIONS_TABLE = "efir_budget.budget_versions"
+
+
+async def get_data_revision(session: AsyncSession, budget_version_id: uuid.UUID) -> int | None:
+    """
+    Read the data revision of a budget version.
+
+    The revision counts the write statements logged for the version by the
+    database triggers, so two reads returning the same revision saw the same
+    data. A count rather than the highest log id: ids are drawn when a
+    statement runs, not when it commits, so a write committing after a later
+    one would leave the highest id unchanged. Compaction keeps the log at a
+    row or two per version, so this is a short index range scan.
+
+    Args:
+        session: Async database session
+        budget_version_id: Budget version UUID
+
+    Returns:
+        Current revision, or None when the version has none (unknown version,
+        or a database without the revision triggers)
+    """
+    result = await session.execute(
+        select(func.sum(BudgetVersionRevision.writes)).where(
+            BudgetVersionRevision.budget_version_id == budget_version_id
+        )
+    )
+    revision = result.scalar_one_or_none()
+    return int(revision) if revision is not None else None
+
+
+async def compact_data_revisions(session: AsyncSession) -> int:
+    """
+    Fold the revision log into one row per budget version.
+
+    Claims the committed rows of versions with more than one row (skipping
+    rows locked by a concurrent compaction) and replaces them with a row
+    carrying their summed write count, in one statement: revisions are
+    unchanged and writers, which only insert, are never blocked. Rows of
+    deleted versions (left by a compaction racing the delete) are dropped.
+    The caller commits.
+
+    Args:
+        session: Async database session
+
+    Returns:
+        Number of log rows removed
+    """
+    # SQLite (test) fallback: no revision triggers, nothing to compact
+    bind = session.get_bind()
+    if bind and bind.dialect.name == "sqlite":
+        return 0
+
+    result = await session.execute(
+        text(
+            f"""
+            WITH claimed AS (
+                DELETE FROM {REVISIONS_TABLE}
+                WHERE id IN (
+                    SELECT r.id FROM {REVISIONS_TABLE} r
+                    WHERE r.budget_version_id IN (
+                        SELECT budget_version_id FROM {REVISIONS_TABLE}
+                        GROUP BY budget_version_id
+                        HAVING COUNT(*) > 1
+                    )
+                    OR NOT EXISTS (
+                        SELECT 1 FROM {VERSIONS_TABLE} v WHERE v.id = r.budget_version_id
+                    )
+                    FOR UPDATE OF r SKIP LOCKED
+                )
+                RETURNING budget_version_id, writes
+            ),
+            folded AS (
+                INSERT INTO {REVISIONS_TABLE} (budget_version_id, writes)
+                SELECT budget_version_id, SUM(writes) FROM claimed
+                WHERE budget_version_id IN (SELECT id FROM {VERSIONS_TABLE})
+                GROUP BY budget_version_id
+                RETURNING 1
+            )
+            SELECT (SELECT COUNT(*) FROM claimed) - (SELECT COUNT(*) FROM folded)
+            """
+        )
+    )
+    return int(result.scalar_one())
@@ -7,15 +7,23 @@ This is the core service for the dynamic lateral entry calculation engine.
 
 from __future__ import annotations
 
+import math
 import statistics
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from decimal import Decimal
+from fractions import Fraction
+from itertools import pairwise
 from typing import TYPE_CHECKING
 from uuid import UUID
 
 from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.logging import logger
 from app.engine.enrollment.projection_engine import GRADE_SEQUENCE
 from app.models import (
     EnrollmentDerivedParameter,
@@ -42,6 +50,7 @@ from app.schemas.enrollment_settings import (
     IncidentalLateralResponse,
     ScenarioMultiplierResponse,
 )
+from app.services.input_fingerprint import row_version_aggregate
 
 if TYPE_CHECKING:
     pass
@@ -135,6 +144,266 @@ def calculate_data_quality_score(
     return min(score, 5)
 
 
+# Derived parameter columns rewritten by every calibration
+DERIVED_PARAMETER_FIELDS = (
+    "progression_rate",
+    "retention_rate",
+    "lateral_entry_rate",
+    "confidence",
+    "std_deviation",
+    "years_used",
+    "calculated_at",
+    "source_years",
+)
+
+
+def calculate_progression_rates(
+    history: dict[str, dict[str, int]],
+    years_with_data: list[str],
+    known_rates: dict[tuple[str, str], dict[str, float]] | None = None,
+) -> dict[tuple[str, str], dict[str, float]]:
+    """
+    Calculate progression rates of every grade for each consecutive pair of years.
+
+    Rates are grouped by (previous_year, current_year) so a rolling window only
+    computes the pairs it has not seen before; pairs present in known_rates are reused.
+
+    Returns: {(previous_year, current_year): {grade_code: progression_rate}}
+    """
+    known_rates = known_rates or {}
+    rates: dict[tuple[str, str], dict[str, float]] = {}
+
+    for prev_year, curr_year in pairwise(years_with_data):
+        pair = (prev_year, curr_year)
+        if pair in known_rates:
+            rates[pair] = known_rates[pair]
+            continue
+
+        prev_enrollment = history.get(prev_year, {})
+        curr_enrollment = history.get(curr_year, {})
+        pair_rates: dict[str, float] = {}
+        for grade in GRADE_SEQUENCE[1:]:  # Skip PS
+            prev_grade = get_previous_grade(grade)
+            if not prev_grade:
+                continue
+            prev_count = prev_enrollment.get(prev_grade, 0)
+            if prev_count > 0:
+                pair_rates[grade] = curr_enrollment.get(grade, 0) / prev_count
+        rates[pair] = pair_rates
+
+    return rates
+
+
+@dataclass
+class RollingRateStats:
+    """
+    Running progression rate statistics of one grade over a window's year pairs.
+
+    Sums are kept as exact fractions, so adding and removing pairs as the window
+    rolls gives the same statistics as summing the window afresh.
+    """
+
+    rates: dict[tuple[str, str], float] = field(default_factory=dict)
+    total: Fraction = Fraction(0)
+    total_sq: Fraction = Fraction(0)
+
+    def add(self, pair: tuple[str, str], rate: float) -> None:
+        """Add the rate of a year pair."""
+        self.rates[pair] = rate
+        exact = Fraction(rate)
+        self.total += exact
+        self.total_sq += exact * exact
+
+    def remove(self, pair: tuple[str, str]) -> None:
+        """Remove the rate of a year pair, if present."""
+        rate = self.rates.pop(pair, None)
+        if rate is not None:
+            exact = Fraction(rate)
+            self.total -= exact
+            self.total_sq -= exact * exact
+
+    def mean(self) -> float:
+        return float(self.total / len(self.rates))
+
+    def stdev(self) -> float:
+        """Sample standard deviation (at least two rates)."""
+        n = len(self.rates)
+        variance = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return math.sqrt(max(variance, Fraction(0)))
+
+
+def build_rate_stats(
+    rates: dict[tuple[str, str], dict[str, float]],
+) -> dict[str, RollingRateStats]:
+    """Build the rolling statistics of every grade from grouped progression rates."""
+    stats: dict[str, RollingRateStats] = {}
+    for pair, pair_rates in rates.items():
+        for grade, rate in pair_rates.items():
+            stats.setdefault(grade, RollingRateStats()).add(pair, rate)
+    return stats
+
+
+def derive_grade_parameters(
+    rates: dict[tuple[str, str], dict[str, float]],
+    stats: dict[str, RollingRateStats] | None = None,
+) -> dict[str, dict]:
+    """
+    Derive calibrated parameters of every grade from grouped progression rates.
+
+    Uses median (robust to outliers) if high volatility, else mean, then decomposes
+    into retention = min(rate, 1.0) and lateral = max(0, rate - retention).
+    Grades without any rate fall back to document defaults. Pass the rolling
+    statistics maintained alongside rates to skip rebuilding them.
+    """
+    if stats is None:
+        stats = build_rate_stats(rates)
+
+    derived_params: dict[str, dict] = {}
+    for grade in GRADE_SEQUENCE[1:]:
+        grade_stats = stats.get(grade) or RollingRateStats()
+        progression_rates = list(grade_stats.rates.values())
+        if len(progression_rates) >= 2:
+            avg_rate = grade_stats.mean()
+            median_rate = statistics.median(progression_rates)
+            std_dev = grade_stats.stdev()
+
+            # Use median if high volatility (more robust to outliers)
+            effective_rate = median_rate if std_dev > 0.10 else avg_rate
+
+            # Decompose into retention + lateral
+            # Retention cannot exceed 100%
+            retention = min(effective_rate, 1.0)
+            lateral = max(0.0, effective_rate - retention)
+
+            derived_params[grade] = {
+                "progression_rate": Decimal(str(round(effective_rate, 4))),
+                "retention_rate": Decimal(str(round(retention, 4))),
+                "lateral_entry_rate": Decimal(str(round(lateral, 4))),
+                "confidence": calculate_confidence(std_dev, len(progression_rates)),
+                "std_deviation": Decimal(str(round(std_dev, 4))),
+                "years_used": len(progression_rates),
+            }
+
+        elif len(progression_rates) == 1:
+            # Only one data point - low confidence
+            rate = progression_rates[0]
+            retention = min(rate, 1.0)
+            lateral = max(0.0, rate - retention)
+
+            derived_params[grade] = {
+                "progression_rate": Decimal(str(round(rate, 4))),
+                "retention_rate": Decimal(str(round(retention, 4))),
+                "lateral_entry_rate": Decimal(str(round(lateral, 4))),
+                "confidence": "low",
+                "std_deviation": None,
+                "years_used": 1,
+            }
+
+        else:
+            # No data - use document defaults
+            defaults = DOCUMENT_DEFAULTS.get(grade, {})
+            if "lateral_rate" in defaults:
+                derived_params[grade] = {
+                    "progression_rate": defaults["retention_rate"] + defaults["lateral_rate"],
+                    "retention_rate": defaults["retention_rate"],
+                    "lateral_entry_rate": defaults["lateral_rate"],
+                    "confidence": "low",
+                    "std_deviation": None,
+                    "years_used": 0,
+                }
+            elif "fixed_lateral" in defaults:
+                # For incidental grades, we still derive retention
+                derived_params[grade] = {
+                    "progression_rate": defaults["retention_rate"],
+                    "retention_rate": defaults["retention_rate"],
+                    "lateral_entry_rate": Decimal("0"),  # Fixed value handled separately
+                    "confidence": "low",
+                    "std_deviation": None,
+                    "years_used": 0,
+                }
+
+    return derived_params
+
+
+@dataclass
+class CalibrationWindow:
+    """Enrollment history and progression rate statistics of the last calibrated window."""
+
+    history: dict[str, dict[str, int]] = field(default_factory=dict)
+    rates: dict[tuple[str, str], dict[str, float]] = field(default_factory=dict)
+    stats: dict[str, RollingRateStats] = field(default_factory=dict)
+    # Fingerprint of each school year's enrollment history when it was read
+    fingerprints: dict[str, tuple | None] = field(default_factory=dict)
+
+    def discard_years(self, school_years: Iterable[str]) -> None:
+        """Forget school years, with the year pairs they belong to."""
+        years = set(school_years)
+        for year in years:
+            self.history.pop(year, None)
+            self.fingerprints.pop(year, None)
+        self._drop_pairs([pair for pair in self.rates if years.intersection(pair)])
+
+    def roll(self, years_with_data: list[str]) -> list[tuple[str, str]]:
+        """
+        Move the rates and statistics to the consecutive pairs of years_with_data.
+
+        Pairs that left the window are removed from the statistics and only the
+        pairs that entered it are calculated.
+
+        Returns:
+            Year pairs calculated
+        """
+        pairs = list(pairwise(years_with_data))
+        self._drop_pairs([pair for pair in self.rates if pair not in pairs])
+        added = [pair for pair in pairs if pair not in self.rates]
+        for pair in added:
+            pair_rates = calculate_progression_rates(self.history, list(pair))[pair]
+            self.rates[pair] = pair_rates
+            for grade, rate in pair_rates.items():
+                self.stats.setdefault(grade, RollingRateStats()).add(pair, rate)
+        return added
+
+    def _drop_pairs(self, pairs: list[tuple[str, str]]) -> None:
+        for pair in pairs:
+            for grade in self.rates.pop(pair):
+                self.stats[grade].remove(pair)
+
+
+# Process-local rolling window per organization, reused by the next recalibration.
+# Each worker keeps its own copy: a school year is only reused while its history
+# fingerprint is unchanged, so writes made through another worker are seen.
+_calibration_cache: dict[UUID, CalibrationWindow] = {}
+
+
+def invalidate_calibration_cache(
+    organization_id: UUID | None = None,
+    school_years: Iterable[str] | None = None,
+) -> None:
+    """
+    Drop cached calibration windows, or only some of their school years.
+
+    Called whenever HistoricalActuals enrollment rows are written or deleted in this
+    process; other workers notice the change through the history fingerprints.
+
+    Args:
+        organization_id: Organization UUID, None for every organization
+        school_years: School years written (e.g. "2024/2025"), None for all years
+    """
+    if school_years is not None:
+        years = list(school_years)
+        windows = (
+            list(_calibration_cache.values())
+            if organization_id is None
+            else [w for w in (_calibration_cache.get(organization_id),) if w is not None]
+        )
+        for window in windows:
+            window.discard_years(years)
+    elif organization_id is None:
+        _calibration_cache.clear()
+    else:
+        _calibration_cache.pop(organization_id, None)
+
+
 class EnrollmentCalibrationService:
     """
     Service for calibrating enrollment parameters from historical data.
@@ -257,6 +526,32 @@ class EnrollmentCalibrationService:
 
         return history
 
+    async def _fetch_history_fingerprints(self, school_years: list[str]) -> dict[str, tuple]:
+        """
+        Fetch a cheap fingerprint of each school year's historical enrollment rows.
+
+        Row count and row version (sum of xmin, see input_fingerprint) change
+        whenever a year's enrollment history is imported, edited or deleted,
+        whatever the commit order of concurrent writers. Years without rows
+        are absent, i.e. their fingerprint is None.
+        """
+        fiscal_years = [school_year_to_fiscal_year(y) for y in school_years]
+        stmt = (
+            select(
+                HistoricalActuals.fiscal_year,
+                func.count(HistoricalActuals.id),
+                row_version_aggregate(self.session, HistoricalActuals.updated_at),
+            )
+            .where(
+                HistoricalActuals.module_code == HistoricalModuleCode.ENROLLMENT,
+                HistoricalActuals.dimension_type == HistoricalDimensionType.LEVEL,
+                HistoricalActuals.fiscal_year.in_(fiscal_years),
+            )
+            .group_by(HistoricalActuals.fiscal_year)
+        )
+        result = await self.session.execute(stmt)
+        return {fiscal_year_to_school_year(row[0]): tuple(row[1:]) for row in result.all()}
+
     # =========================================================================
     # Calibration Algorithm
     # =========================================================================
@@ -272,21 +567,48 @@ class EnrollmentCalibrationService:
 
         Algorithm:
         1. Fetch historical enrollment for the last 4 complete school years
-        2. For each grade (except PS), calculate progression rates year over year
+        2. Calculate progression rates of all grades for each consecutive pair of years
         3. Use median (robust to outliers) if high volatility, else mean
         4. Decompose: retention = min(rate, 1.0), lateral = max(0, rate - retention)
-        5. Persist to database
+        5. Persist all grades with a single upsert
+
+        The window of the previous calibration is kept in memory with the
+        fingerprint of each school year: only the years that entered the window
+        or whose fingerprint changed are fetched, and the rolling statistics only
+        drop the year pairs that left the window and add the pairs that entered
+        it. Use force=True to rescan the whole window.
         """
         current_year = await self.get_current_school_year()
         source_years = get_historical_window(current_year, window_size=4)
 
-        # Fetch historical data
-        historical_data = await self._fetch_enrollment_history(
-            organization_id, source_years
+        fingerprints = await self._fetch_history_fingerprints(source_years)
+        window = None if force else _calibration_cache.get(organization_id)
+        if window is None:
+            window = CalibrationWindow()
+        missing_years = [
+            year
+            for year in source_years
+            if year not in window.history or window.fingerprints.get(year) != fingerprints.get(year)
+        ]
+        fetched = (
+            await self._fetch_enrollment_history(organization_id, missing_years)
+            if missing_years
+            else {}
         )
 
+        # No await until the window is cached again: concurrent calibrations in
+        # this process see it either before or after the update
+        window.discard_years(
+            [year for year in window.history if year not in source_years or year in missing_years]
+        )
+        # Years read without rows are cached too, with a None fingerprint, so
+        # they are only fetched again once history is written for them
+        window.history.update({year: fetched.get(year, {}) for year in missing_years})
+        window.fingerprints.update({year: fingerprints.get(year) for year in missing_years})
+        _calibration_cache[organization_id] = window
+
         # Filter to years with actual data
-        years_with_data = [y for y in source_years if historical_data.get(y)]
+        years_with_data = sorted(y for y in source_years if window.history.get(y))
 
         if len(years_with_data) < 2:
             return CalibrationResult(
@@ -296,146 +618,22 @@ class EnrollmentCalibrationService:
                 fallback_used=True,
             )
 
-        # Sort years chronologically
-        years_with_data.sort()
-
-        # Calculate progression rates for each grade
-        derived_params: dict[str, dict] = {}
-        confidence_scores: list[float] = []
-
-        for grade in GRADE_SEQUENCE[1:]:  # Skip PS
-            prev_grade = get_previous_grade(grade)
-            if not prev_grade:
-                continue
-
-            progression_rates: list[float] = []
-
-            for i in range(1, len(years_with_data)):
-                prev_year = years_with_data[i - 1]
-                curr_year = years_with_data[i]
-
-                prev_enrollment = historical_data[prev_year].get(prev_grade, 0)
-                curr_enrollment = historical_data[curr_year].get(grade, 0)
-
-                if prev_enrollment > 0:
-                    rate = curr_enrollment / prev_enrollment
-                    progression_rates.append(rate)
-
-            if len(progression_rates) >= 2:
-                # Calculate statistics
-                avg_rate = statistics.mean(progression_rates)
-                median_rate = statistics.median(progression_rates)
-                std_dev = (
-                    statistics.stdev(progression_rates)
-                    if len(progression_rates) > 1
-                    else 0.0
-                )
-
-                # Use median if high volatility (more robust to outliers)
-                effective_rate = median_rate if std_dev > 0.10 else avg_rate
-
-                # Decompose into retention + lateral
-                # Retention cannot exceed 100%
-                retention = min(effective_rate, 1.0)
-                lateral = max(0.0, effective_rate - retention)
-
-                confidence = calculate_confidence(std_dev, len(progression_rates))
-                confidence_scores.append(
-                    1.0 if confidence == "high" else 0.5 if confidence == "medium" else 0.0
-                )
-
-                derived_params[grade] = {
-                    "progression_rate": Decimal(str(round(effective_rate, 4))),
-                    "retention_rate": Decimal(str(round(retention, 4))),
-                    "lateral_entry_rate": Decimal(str(round(lateral, 4))),
-                    "confidence": confidence,
-                    "std_deviation": Decimal(str(round(std_dev, 4))),
-                    "years_used": len(progression_rates),
-                }
-
-            elif len(progression_rates) == 1:
-                # Only one data point - low confidence
-                rate = progression_rates[0]
-                retention = min(rate, 1.0)
-                lateral = max(0.0, rate - retention)
-
-                derived_params[grade] = {
-                    "progression_rate": Decimal(str(round(rate, 4))),
-                    "retention_rate": Decimal(str(round(retention, 4))),
-                    "lateral_entry_rate": Decimal(str(round(lateral, 4))),
-                    "confidence": "low",
-                    "std_deviation": None,
-                    "years_used": 1,
-                }
-                confidence_scores.append(0.0)
+        pairs_calculated = window.roll(years_with_data)
+        derived_params = derive_grade_parameters(window.rates, window.stats)
 
-            else:
-                # No data - use document defaults
-                defaults = DOCUMENT_DEFAULTS.get(grade, {})
-                if "lateral_rate" in defaults:
-                    derived_params[grade] = {
-                        "progression_rate": defaults["retention_rate"] + defaults["lateral_rate"],
-                        "retention_rate": defaults["retention_rate"],
-                        "lateral_entry_rate": defaults["lateral_rate"],
-                        "confidence": "low",
-                        "std_deviation": None,
-                        "years_used": 0,
-                    }
-                elif "fixed_lateral" in defaults:
-                    # For incidental grades, we still derive retention
-                    derived_params[grade] = {
-                        "progression_rate": defaults["retention_rate"],
-                        "retention_rate": defaults["retention_rate"],
-                        "lateral_entry_rate": Decimal("0"),  # Fixed value handled separately
-                        "confidence": "low",
-                        "std_deviation": None,
-                        "years_used": 0,
-                    }
-
-        # Persist to database
         now = datetime.now(UTC)
-        params_updated = 0
-
-        for grade, params in derived_params.items():
-            # Check for existing record
-            existing = await self.session.execute(
-                select(EnrollmentDerivedParameter).where(
-                    EnrollmentDerivedParameter.organization_id == organization_id,
-                    EnrollmentDerivedParameter.grade_code == grade,
-                )
-            )
-            existing_param = existing.scalar_one_or_none()
-
-            if existing_param:
-                # Update existing
-                existing_param.progression_rate = params["progression_rate"]
-                existing_param.retention_rate = params["retention_rate"]
-                existing_param.lateral_entry_rate = params["lateral_entry_rate"]
-                existing_param.confidence = params["confidence"]
-                existing_param.std_deviation = params["std_deviation"]
-                existing_param.years_used = params["years_used"]
-                existing_param.calculated_at = now
-                existing_param.source_years = years_with_data
-                existing_param.updated_at = now
-            else:
-                # Create new
-                new_param = EnrollmentDerivedParameter(
-                    organization_id=organization_id,
-                    grade_code=grade,
-                    progression_rate=params["progression_rate"],
-                    retention_rate=params["retention_rate"],
-                    lateral_entry_rate=params["lateral_entry_rate"],
-                    confidence=params["confidence"],
-                    std_deviation=params["std_deviation"],
-                    years_used=params["years_used"],
-                    calculated_at=now,
-                    source_years=years_with_data,
-                )
-                self.session.add(new_param)
-
-            params_updated += 1
-
-        await self.session.flush()
+        await self._upsert_derived_parameters(
+            organization_id, derived_params, years_with_data, now
+        )
+        params_updated = len(derived_params)
+        logger.info(
+            "Enrollment parameters calibrated",
+            organization_id=str(organization_id),
+            years_fetched=missing_years,
+            pairs_calculated=len(pairs_calculated),
+            source_years=years_with_data,
+            parameters_updated=params_updated,
+        )
 
         return CalibrationResult(
             success=True,
@@ -446,6 +644,43 @@ class EnrollmentCalibrationService:
             fallback_used=False,
         )
 
+    async def _upsert_derived_parameters(
+        self,
+        organization_id: UUID,
+        derived_params: dict[str, dict],
+        source_years: list[str],
+        calculated_at: datetime,
+    ) -> None:
+        """Insert or update the derived parameters of all grades in one statement."""
+        if not derived_params:
+            return
+
+        rows = [
+            {
+                "organization_id": organization_id,
+                "grade_code": grade,
+                **params,
+                "calculated_at": calculated_at,
+                "source_years": source_years,
+            }
+            for grade, params in derived_params.items()
+        ]
+        dialect_insert = (
+            sqlite_insert
+            if self.session.get_bind().dialect.name == "sqlite"
+            else postgresql_insert
+        )
+        stmt = dialect_insert(EnrollmentDerivedParameter).values(rows)
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["organization_id", "grade_code"],
+                set_={
+                    **{name: stmt.excluded[name] for name in DERIVED_PARAMETER_FIELDS},
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
     # =========================================================================
     # Settings Retrieval
     # =========================================================================
@@ -460,13 +695,16 @@ class EnrollmentCalibrationService:
             .where(EnrollmentDerivedParameter.organization_id == organization_id)
             .order_by(EnrollmentDerivedParameter.calculated_at.desc())
             .limit(1)
+            .execution_options(populate_existing=True)
         )
         result = await self.session.execute(stmt)
         latest = result.scalar_one_or_none()
 
         # Get all derived params for confidence calculation
-        all_params_stmt = select(EnrollmentDerivedParameter).where(
-            EnrollmentDerivedParameter.organization_id == organization_id
+        all_params_stmt = (
+            select(EnrollmentDerivedParameter)
+            .where(EnrollmentDerivedParameter.organization_id == organization_id)
+            .execution_options(populate_existing=True)
         )
         all_result = await self.session.execute(all_params_stmt)
         all_params = all_result.scalars().all()
@@ -519,8 +757,10 @@ class EnrollmentCalibrationService:
         self, organization_id: UUID
     ) -> dict[str, EnrollmentDerivedParameter]:
         """Get all derived parameters for an organization."""
-        stmt = select(EnrollmentDerivedParameter).where(
-            EnrollmentDerivedParameter.organization_id == organization_id
+        stmt = (
+            select(EnrollmentDerivedParameter)
+            .where(EnrollmentDerivedParameter.organization_id == organization_id)
+            .execution_options(populate_existing=True)
         )
         result = await self.session.execute(stmt)
         params = result.scalars().all()
@@ -8,10 +8,14 @@ caches results, and handles validation cascade to downstream planning steps.
 from __future__ import annotations
 
 import uuid
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload, selectinload
@@ -21,18 +25,10 @@ from sqlalchemy.orm import joinedload, selectinload
 # See update_config method comment for full rationale.
 from app.core.logging import logger
 from app.engine.enrollment import (
-    ClassSizeConfig,
     EngineEffectiveRates,
-    GradeOptimizationInput,
-    GradeOptimizationResult,
-    NewStudentsSummary,
     ProjectionInput,
     ScenarioParams,
-    build_new_students_summary,
     calculate_proration_by_grade,
-    is_entry_point_grade,
-    optimize_grade_lateral_entry,
-    optimize_ps_entry,
     project_multi_year,
     validate_projection_input,
 )
@@ -45,7 +41,7 @@ from app.engine.enrollment import (
 from app.engine.enrollment import (
     LevelOverride as EngineLevelOverride,
 )
-from app.engine.enrollment.projection_engine import GRADE_SEQUENCE, GRADE_TO_CYCLE
+from app.engine.enrollment.projection_engine import GRADE_SEQUENCE
 from app.models.analysis import (
     HistoricalActuals,
     HistoricalDimensionType,
@@ -54,7 +50,6 @@ from app.models.analysis import (
 from app.models.configuration import (
     AcademicLevel,
     BudgetVersion,
-    ClassSizeParam,
     NationalityType,
 )
 from app.models.enrollment_projection import (
@@ -69,8 +64,60 @@ from app.models.planning import EnrollmentPlan, NationalityDistribution
 from app.services.cascade_service import CascadeService
 from app.services.enrollment_calibration_service import EnrollmentCalibrationService
 from app.services.enrollment_capacity import DEFAULT_SCHOOL_CAPACITY
+from app.services.entity_loader import get_entity_loader
 from app.services.exceptions import NotFoundError, ValidationError
 
+# Stored projection values compared to decide whether a cached row changed
+PROJECTION_VALUE_FIELDS: tuple[str, ...] = (
+    "fiscal_year",
+    "projected_students",
+    "divisions",
+    "avg_class_size",
+    "fiscal_year_weighted_students",
+    "was_capacity_constrained",
+    "original_projection",
+    "reduction_applied",
+    "reduction_percentage",
+)
+
+# PERFORMANCE FIX (Phase 11): Aggressive joinedload for ALL config relations
+# to reduce database roundtrips from 5 to 1 query.
+# - joinedload for collections is safe here because:
+#   1. Data volume is tiny (4 level_overrides, 0 grade_overrides)
+#   2. Cartesian product risk is negligible
+#   3. Network latency (~400ms/roundtrip) dominates query execution (~0.1ms)
+# This reduces Supabase cloud latency from ~2s (5 roundtrips) to ~400ms (1 roundtrip).
+# NOTE: .unique() REQUIRED after execute() when using joinedload with collections!
+CONFIG_LOAD_OPTIONS = (
+    joinedload(EnrollmentProjectionConfig.scenario),  # FK → 1 row
+    joinedload(EnrollmentProjectionConfig.global_overrides),  # uselist=False → 1 row
+    joinedload(EnrollmentProjectionConfig.level_overrides).joinedload(
+        EnrollmentLevelOverride.cycle  # FK → 1 row per override
+    ),
+    joinedload(EnrollmentProjectionConfig.grade_overrides).joinedload(
+        EnrollmentGradeOverride.level  # FK → 1 row per override
+    ),
+)
+CONFIG_LOAD_CRITERIA = (EnrollmentProjectionConfig.deleted_at.is_(None),)
+
+
+@dataclass
+class ProjectionSaveResult:
+    """Projection results with the cached rows actually written."""
+
+    projections: list = field(default_factory=list)
+    changed_grades: list[str] = field(default_factory=list)
+    rows_upserted: int = 0
+    rows_deleted: int = 0
+
+
+def _stored_value(field_name: str, value: Any) -> Any:
+    """Round a value to its column scale so it compares equal to the stored one."""
+    scale = getattr(EnrollmentProjection.__table__.c[field_name].type, "scale", None)
+    if value is None or scale is None:
+        return value
+    return Decimal(str(value)).quantize(Decimal(1).scaleb(-scale))
+
 
 class EnrollmentProjectionService:
     """Service layer for enrollment projections."""
@@ -90,44 +137,19 @@ class EnrollmentProjectionService:
     async def get_or_create_config(
         self, version_id: uuid.UUID
     ) -> EnrollmentProjectionConfig:
-        query = (
-            select(EnrollmentProjectionConfig)
-            .where(
-                and_(
-                    EnrollmentProjectionConfig.budget_version_id == version_id,
-                    EnrollmentProjectionConfig.deleted_at.is_(None),
-                )
-            )
-            # PERFORMANCE FIX (Phase 11): Aggressive joinedload for ALL relations
-            # to reduce database roundtrips from 5 to 1 query.
-            # - joinedload for collections is safe here because:
-            #   1. Data volume is tiny (4 level_overrides, 0 grade_overrides)
-            #   2. Cartesian product risk is negligible
-            #   3. Network latency (~400ms/roundtrip) dominates query execution (~0.1ms)
-            # This reduces Supabase cloud latency from ~2s (5 roundtrips) to ~400ms (1 roundtrip).
-            # NOTE: .unique() REQUIRED after execute() when using joinedload with collections!
-            .options(
-                joinedload(EnrollmentProjectionConfig.scenario),  # FK → 1 row
-                joinedload(EnrollmentProjectionConfig.global_overrides),  # uselist=False → 1 row
-                joinedload(EnrollmentProjectionConfig.level_overrides).joinedload(
-                    EnrollmentLevelOverride.cycle  # FK → 1 row per override
-                ),
-                joinedload(EnrollmentProjectionConfig.grade_overrides).joinedload(
-                    EnrollmentGradeOverride.level  # FK → 1 row per override
-                ),
-            )
-        )
-        # PHASE 11: .unique() is REQUIRED when using joinedload with One-to-Many collections
-        # Without it, SQLAlchemy 2.0 may return duplicate parent rows due to LEFT JOINs
-        existing = (await self.session.execute(query)).unique().scalar_one_or_none()
+        # One round trip for the config and all its relations, memoized for the
+        # request (several service calls per request resolve the same config)
+        existing = await get_entity_loader(
+            self.session,
+            EnrollmentProjectionConfig,
+            key="budget_version_id",
+            options=CONFIG_LOAD_OPTIONS,
+            criteria=CONFIG_LOAD_CRITERIA,
+        ).load(version_id)
         if existing:
             return existing
 
-        version = (
-            await self.session.execute(
-                select(BudgetVersion).where(BudgetVersion.id == version_id)
-            )
-        ).scalar_one_or_none()
+        version = await get_entity_loader(self.session, BudgetVersion).load(version_id)
         if not version:
             raise NotFoundError("BudgetVersion", str(version_id))
 
@@ -157,16 +179,7 @@ class EnrollmentProjectionService:
             refetch_query = (
                 select(EnrollmentProjectionConfig)
                 .where(EnrollmentProjectionConfig.id == config.id)
-                .options(
-                    joinedload(EnrollmentProjectionConfig.scenario),
-                    joinedload(EnrollmentProjectionConfig.global_overrides),
-                    joinedload(EnrollmentProjectionConfig.level_overrides).joinedload(
-                        EnrollmentLevelOverride.cycle
-                    ),
-                    joinedload(EnrollmentProjectionConfig.grade_overrides).joinedload(
-                        EnrollmentGradeOverride.level
-                    ),
-                )
+                .options(*CONFIG_LOAD_OPTIONS)
             )
             return (await self.session.execute(refetch_query)).unique().scalar_one()
         except IntegrityError:
@@ -392,7 +405,7 @@ class EnrollmentProjectionService:
         self,
         version_id: uuid.UUID,
         config: EnrollmentProjectionConfig | None = None,
-    ) -> list:
+    ) -> ProjectionSaveResult:
         """
         Calculate enrollment projections and save to database.
 
@@ -400,6 +413,14 @@ class EnrollmentProjectionService:
             version_id: Budget version ID
             config: Pre-loaded config (optional, avoids redundant queries)
 
+        Returns:
+            ProjectionSaveResult with the projections, the grades whose
+            cached rows changed and the number of rows written and deleted
+
+        Only rows whose values differ from the cached ones are written, in a
+        single INSERT ... ON CONFLICT DO UPDATE; rows no longer projected are
+        deleted. An override save that does not move a grade writes nothing.
+
         Uses calibrated rates from the EnrollmentCalibrationService with percentage-based
         lateral entry for entry point grades (MS, GS, CP, 6EME, 2NDE) derived from the
         rolling 4-year historical window.
@@ -430,11 +451,7 @@ class EnrollmentProjectionService:
         # Get organization_id from budget_version for calibrated rates lookup.
         # Each budget version belongs to an organization, which scopes the
         # enrollment derived parameters, overrides, and scenario multipliers.
-        version = (
-            await self.session.execute(
-                select(BudgetVersion).where(BudgetVersion.id == version_id)
-            )
-        ).scalar_one_or_none()
+        version = await get_entity_loader(self.session, BudgetVersion).load(version_id)
 
         if not version:
             raise NotFoundError("BudgetVersion", str(version_id))
@@ -473,13 +490,6 @@ class EnrollmentProjectionService:
 
         projections = project_multi_year(engine_input, years=config.projection_years)
 
-        await self.session.execute(
-            delete(EnrollmentProjection).where(
-                EnrollmentProjection.projection_config_id == config.id
-            )
-        )
-        await self.session.flush()
-
         now = datetime.now(UTC)
 
         # PERFORMANCE FIX: Pre-fetch ALL level codes in ONE query (was N+1 pattern)
@@ -526,13 +536,107 @@ class EnrollmentProjectionService:
 
             prev_enrollment = curr_enrollment
 
-        # PERFORMANCE FIX: Bulk insert all rows in ONE statement (was 75 individual inserts)
-        if projection_rows:
-            await self.session.execute(insert(EnrollmentProjection).values(projection_rows))
+        level_id_to_code = {level_id: code for code, level_id in level_code_to_id.items()}
+        result = await self._save_projection_rows(config.id, projection_rows, level_id_to_code)
+        result.projections = projections
 
         await self.session.commit()
-        logger.info("enrollment_projections_calculated", version_id=str(version_id))
-        return projections
+        logger.info(
+            "enrollment_projections_calculated",
+            version_id=str(version_id),
+            changed_grades=result.changed_grades,
+            rows_upserted=result.rows_upserted,
+            rows_deleted=result.rows_deleted,
+        )
+        return result
+
+    async def _save_projection_rows(
+        self,
+        config_id: uuid.UUID,
+        projection_rows: list[dict],
+        level_id_to_code: dict[uuid.UUID, str],
+    ) -> ProjectionSaveResult:
+        """
+        Write only the projection rows that differ from the cached ones.
+
+        Args:
+            config_id: Projection config ID
+            projection_rows: Freshly calculated rows
+            level_id_to_code: Level ID to grade code lookup
+
+        Returns:
+            ProjectionSaveResult with changed grades and row counts
+        """
+        existing_result = await self.session.execute(
+            select(
+                EnrollmentProjection.id,
+                EnrollmentProjection.school_year,
+                EnrollmentProjection.level_id,
+                EnrollmentProjection.deleted_at,
+                *(getattr(EnrollmentProjection, name) for name in PROJECTION_VALUE_FIELDS),
+            ).where(EnrollmentProjection.projection_config_id == config_id)
+        )
+        existing = {(row.school_year, row.level_id): row for row in existing_result}
+
+        changed_rows: list[dict] = []
+        for row in projection_rows:
+            values = {
+                name: _stored_value(name, row[name]) for name in PROJECTION_VALUE_FIELDS
+            }
+            stored = existing.pop((row["school_year"], row["level_id"]), None)
+            if (
+                stored is not None
+                and stored.deleted_at is None
+                and all(getattr(stored, name) == values[name] for name in PROJECTION_VALUE_FIELDS)
+            ):
+                continue
+            changed_rows.append(
+                {
+                    "projection_config_id": config_id,
+                    "school_year": row["school_year"],
+                    "level_id": row["level_id"],
+                    "calculation_timestamp": row["calculation_timestamp"],
+                    **values,
+                }
+            )
+
+        if changed_rows:
+            dialect_insert = (
+                sqlite_insert
+                if self.session.get_bind().dialect.name == "sqlite"
+                else postgresql_insert
+            )
+            stmt = dialect_insert(EnrollmentProjection).values(changed_rows)
+            await self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["projection_config_id", "school_year", "level_id"],
+                    set_={
+                        **{name: stmt.excluded[name] for name in PROJECTION_VALUE_FIELDS},
+                        "calculation_timestamp": stmt.excluded.calculation_timestamp,
+                        "deleted_at": None,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+
+        # Rows left over are no longer projected (e.g., fewer projection years)
+        if existing:
+            await self.session.execute(
+                delete(EnrollmentProjection).where(
+                    EnrollmentProjection.id.in_([row.id for row in existing.values()])
+                )
+            )
+
+        changed_level_ids = {row["level_id"] for row in changed_rows} | {
+            row.level_id for row in existing.values()
+        }
+        return ProjectionSaveResult(
+            changed_grades=sorted(
+                level_id_to_code.get(level_id, str(level_id)) for level_id in changed_level_ids
+            ),
+            rows_upserted=len(changed_rows),
+            rows_deleted=len(existing),
+        )
 
     async def get_projection_results(
         self, version_id: uuid.UUID, include_fiscal_proration: bool = True
@@ -656,7 +760,7 @@ class EnrollmentProjectionService:
             raise ValidationError("Validation requires confirmation")
 
         config = await self.get_or_create_config(version_id)
-        projections = await self.calculate_and_save(version_id)
+        projections = (await self.calculate_and_save(version_id)).projections
         if not projections:
             raise ValidationError("No projections available to validate")
 
@@ -1045,304 +1149,3 @@ class EnrollmentProjectionService:
             })
 
         return result
-
-    # ---------------------------------------------------------------------
-    # Lateral Entry Optimization (Class Structure Aware)
-    # ---------------------------------------------------------------------
-
-    async def _get_class_size_configs(
-        self, version_id: uuid.UUID
-    ) -> dict[str, ClassSizeConfig]:
-        """
-        Get effective class size configurations for all grades.
-
-        Resolves level-specific → cycle-level → default hierarchy.
-
-        Args:
-            version_id: Budget version UUID
-
-        Returns:
-            Dict mapping grade_code to ClassSizeConfig
-        """
-        # Get all class size params for this version
-        params_query = select(ClassSizeParam).where(
-            and_(
-                ClassSizeParam.budget_version_id == version_id,
-                ClassSizeParam.deleted_at.is_(None),
-            )
-        )
-        params = (await self.session.execute(params_query)).scalars().all()
-
-        # Get all levels for code lookups
-        levels = (await self.session.execute(select(AcademicLevel))).scalars().all()
-
-        # Build params lookup: level_id → param, cycle_id → param
-        level_params: dict[uuid.UUID, ClassSizeParam] = {}
-        cycle_params: dict[uuid.UUID, ClassSizeParam] = {}
-
-        for param in params:
-            if param.level_id:
-                level_params[param.level_id] = param
-            elif param.cycle_id:
-                cycle_params[param.cycle_id] = param
-
-        # Default configs by cycle (fallback values)
-        default_configs = {
-            "MAT": ClassSizeConfig(
-                min_class_size=21, target_class_size=25, max_class_size=28, max_divisions=6
-            ),
-            "ELEM": ClassSizeConfig(
-                min_class_size=21, target_class_size=25, max_class_size=28, max_divisions=6
-            ),
-            "COLL": ClassSizeConfig(
-                min_class_size=15, target_class_size=25, max_class_size=30, max_divisions=6
-            ),
-            "LYC": ClassSizeConfig(
-                min_class_size=15, target_class_size=25, max_class_size=30, max_divisions=6
-            ),
-        }
-
-        # Build effective config for each grade
-        configs: dict[str, ClassSizeConfig] = {}
-
-        for grade in GRADE_SEQUENCE:
-            cycle_code = GRADE_TO_CYCLE.get(grade, "ELEM")
-
-            # Find level ID for this grade
-            level_id = None
-            cycle_id = None
-            for level in levels:
-                if level.code == grade:
-                    level_id = level.id
-                    cycle_id = level.cycle_id
-                    break
-
-            # Resolution priority: level-specific → cycle-level → default
-            param = None
-            if level_id and level_id in level_params:
-                param = level_params[level_id]
-            elif cycle_id and cycle_id in cycle_params:
-                param = cycle_params[cycle_id]
-
-            if param:
-                configs[grade] = ClassSizeConfig(
-                    min_class_size=param.min_class_size,
-                    target_class_size=param.target_class_size,
-                    max_class_size=param.max_class_size,
-                    max_divisions=6,  # Default, could be overridden from level_overrides
-                )
-            else:
-                configs[grade] = default_configs.get(
-                    cycle_code,
-                    ClassSizeConfig(
-                        min_class_size=21,
-                        target_class_size=25,
-                        max_class_size=28,
-                        max_divisions=6,
-                    ),
-                )
-
-        return configs
-
-    async def calculate_lateral_optimization(
-        self,
-        version_id: uuid.UUID,
-        base_year_enrollment: dict[str, int],
-        effective_rates: dict[str, EngineEffectiveRates] | None = None,
-        ps_entry: int = 55,
-        entry_growth_rate: Decimal = Decimal("0.0"),
-    ) -> tuple[list[GradeOptimizationResult], NewStudentsSummary]:
-        """
-        Calculate optimal lateral entry for all grades using class structure optimization.
-
-        This implements the capacity-aware lateral entry model that minimizes
-        rejections while maintaining efficient class structures.
-
-        Args:
-            version_id: Budget version UUID (for class size config lookup)
-            base_year_enrollment: Current enrollment by grade
-            effective_rates: Calibrated rates from EnrollmentCalibrationService
-            ps_entry: Base PS entry count from scenario
-            entry_growth_rate: Growth rate to apply to PS entry
-
-        Returns:
-            Tuple of (list of grade optimization results, summary)
-        """
-        # Get class size configs from database
-        class_configs = await self._get_class_size_configs(version_id)
-
-        results: list[GradeOptimizationResult] = []
-
-        # PS is special - pure entry point with no retention
-        ps_demand = int(ps_entry * (1 + float(entry_growth_rate)))
-        ps_result = optimize_ps_entry(ps_demand, class_configs.get("PS", class_configs["MS"]))
-        results.append(ps_result)
-
-        # Process other grades in sequence
-        for i in range(1, len(GRADE_SEQUENCE)):
-            grade = GRADE_SEQUENCE[i]
-            prev_grade = GRADE_SEQUENCE[i - 1]
-
-            # Calculate retained students from previous grade
-            prev_enrollment = base_year_enrollment.get(prev_grade, 0)
-
-            # Get retention rate
-            if effective_rates and grade in effective_rates:
-                retention_rate = float(effective_rates[grade].retention_rate)
-            else:
-                retention_rate = 0.96  # Default
-
-            retained = int(prev_enrollment * retention_rate)
-
-            # Get historical demand (from calibration)
-            historical_demand = 0
-            if effective_rates and grade in effective_rates:
-                rate = effective_rates[grade]
-                if rate.is_percentage_based and rate.lateral_entry_rate:
-                    # Entry point: percentage of previous grade
-                    historical_demand = int(
-                        prev_enrollment * float(rate.lateral_entry_rate)
-                    )
-                elif rate.lateral_entry_fixed is not None:
-                    # Incidental: fixed count
-                    historical_demand = rate.lateral_entry_fixed
-
-            # Get class size config for this grade
-            config = class_configs.get(grade)
-            if not config:
-                cycle_code = GRADE_TO_CYCLE.get(grade, "ELEM")
-                config = class_configs.get(
-                    grade,
-                    ClassSizeConfig(
-                        min_class_size=21 if cycle_code in ("MAT", "ELEM") else 15,
-                        target_class_size=25,
-                        max_class_size=28 if cycle_code in ("MAT", "ELEM") else 30,
-                        max_divisions=6,
-                    ),
-                )
-
-            # Build optimization input
-            grade_input = GradeOptimizationInput(
-                grade_code=grade,
-                cycle_code=GRADE_TO_CYCLE.get(grade, "ELEM"),
-                retained_students=retained,
-                historical_demand=historical_demand,
-                class_size_config=config,
-                is_entry_point=is_entry_point_grade(grade),
-            )
-
-            # Run optimization
-            result = optimize_grade_lateral_entry(grade_input)
-            results.append(result)
-
-        # Build summary
-        summary = build_new_students_summary(results)
-
-        logger.info(
-            "lateral_optimization_calculated",
-            version_id=str(version_id),
-            total_demand=summary.total_demand,
-            total_accepted=summary.total_accepted,
-            acceptance_rate=str(summary.overall_acceptance_rate),
-        )
-
-        return results, summary
-
-    async def get_lateral_optimization(
-        self,
-        version_id: uuid.UUID,
-    ) -> dict:
-        """
-        Get lateral entry optimization results for a budget version.
-
-        Calculates optimization based on current projection config and baseline.
-
-        Args:
-            version_id: Budget version UUID
-
-        Returns:
-            Dict with optimization_results and new_students_summary
-        """
-        config = await self.get_or_create_config(version_id)
-        scenario = config.scenario
-        # Use historical_actuals for base year (actual enrollment from previous year)
-        baseline = await self._get_baseline_from_historical(config.base_year)
-
-        # Get organization_id for calibrated rates
-        version = (
-            await self.session.execute(
-                select(BudgetVersion).where(BudgetVersion.id == version_id)
-            )
-        ).scalar_one_or_none()
-
-        if not version:
-            raise NotFoundError("BudgetVersion", str(version_id))
-
-        effective_rates = await self._get_calibrated_rates(
-            version.organization_id, scenario.code
-        )
-
-        results, summary = await self.calculate_lateral_optimization(
-            version_id=version_id,
-            base_year_enrollment=baseline,
-            effective_rates=effective_rates,
-            ps_entry=scenario.ps_entry,
-            entry_growth_rate=scenario.entry_growth_rate,
-        )
-
-        return {
-            "optimization_results": [
-                {
-                    "grade_code": r.grade_code,
-                    "cycle_code": r.cycle_code,
-                    "is_entry_point": r.is_entry_point,
-                    "retained_students": r.retained_students,
-                    "historical_demand": r.historical_demand,
-                    "base_classes": r.base_classes,
-                    "fill_to_target": r.fill_to_target,
-                    "fill_to_max": r.fill_to_max,
-                    "new_class_threshold": r.new_class_threshold,
-                    "decision": r.decision.value,
-                    "accepted": r.accepted,
-                    "rejected": r.rejected,
-                    "final_classes": r.final_classes,
-                    "final_students": r.final_students,
-                    "avg_class_size": r.avg_class_size,
-                    "utilization_pct": r.utilization_pct,
-                    "acceptance_rate": r.acceptance_rate,
-                }
-                for r in results
-            ],
-            "new_students_summary": {
-                "total_demand": summary.total_demand,
-                "total_available": summary.total_available,
-                "total_accepted": summary.total_accepted,
-                "total_rejected": summary.total_rejected,
-                "overall_acceptance_rate": summary.overall_acceptance_rate,
-                "entry_point_demand": summary.entry_point_demand,
-                "entry_point_accepted": summary.entry_point_accepted,
-                "incidental_demand": summary.incidental_demand,
-                "incidental_accepted": summary.incidental_accepted,
-                "grades_accept_all": summary.grades_accept_all,
-                "grades_fill_max": summary.grades_fill_max,
-                "grades_restricted": summary.grades_restricted,
-                "grades_new_class": summary.grades_new_class,
-                "grades_at_ceiling": summary.grades_at_ceiling,
-                "by_grade": [
-                    {
-                        "grade_code": row.grade_code,
-                        "grade_name": row.grade_name,
-                        "cycle_code": row.cycle_code,
-                        "is_entry_point": row.is_entry_point,
-                        "historical_demand": row.historical_demand,
-                        "available_slots": row.available_slots,
-                        "accepted": row.accepted,
-                        "rejected": row.rejected,
-                        "acceptance_rate": row.acceptance_rate,
-                        "pct_of_total_intake": row.pct_of_total_intake,
-                        "decision": row.decision.value,
-                    }
-                    for row in summary.by_grade
-                ],
-            },
-        }
@@ -0,0 +1,248 @@
+"""
+Request-scoped entity loader (DataLoader style).
+
+One request often resolves the same BudgetVersion, projection config or
+reference entity in several services, each with its own SELECT. Loaders
+attached to the request's AsyncSession batch and memoize those lookups:
+
+    version = await get_entity_loader(session, BudgetVersion).load(version_id)
+
+- Memoization: an entity found once is returned from the loader until the
+  session commits or rolls back, without another round trip
+- Batching: loads scheduled concurrently (asyncio.gather) are resolved by a
+  single ``WHERE key IN (...)`` query
+
+Loaders live in ``session.info``, so they share the session's lifetime (one
+request with get_db). They are dropped on commit and rollback, which expire
+the session's instances. Only found entities are memoized: a missing key is
+looked up again on the next load.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Hashable, Sequence
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import ColumnElement, event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import ORMOption
+
+from app.models.base import ReferenceDataModel
+from app.models.configuration import BudgetVersion
+from app.models.enrollment_projection import EnrollmentProjectionConfig
+
+T = TypeVar("T")
+
+# session.info key holding the session's loaders
+_LOADERS_INFO_KEY = "entity_loaders"
+
+# Models BaseService.get_by_id resolves through a loader
+REQUEST_CACHED_MODELS: tuple[type, ...] = (
+    BudgetVersion,
+    EnrollmentProjectionConfig,
+    ReferenceDataModel,
+)
+
+
+def is_request_cached(model: type) -> bool:
+    """Check whether lookups of a model by id go through the request loader."""
+    return issubclass(model, REQUEST_CACHED_MODELS)
+
+
+def _is_current(instance: Any) -> bool:
+    """
+    Check a memoized instance can still be returned as is.
+
+    Instances expired by a flush (server-side defaults) or removed from the
+    session would lazy-load on attribute access, which fails under asyncio;
+    they are loaded again instead.
+    """
+    state = inspect(instance, raiseerr=False)
+    if state is None:
+        return True
+    return not (state.expired_attributes or state.detached or state.deleted)
+
+
+class EntityLoader(Generic[T]):
+    """
+    Batching, memoizing loader of one model by one column.
+
+    Use get_entity_loader() to share a loader across services of a request.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        model: type[T],
+        key: str = "id",
+        options: Sequence[ORMOption] = (),
+        criteria: Sequence[ColumnElement[bool]] = (),
+    ):
+        """
+        Initialize entity loader.
+
+        Args:
+            session: Async database session
+            model: SQLAlchemy model class
+            key: Column the loader looks entities up by (unique per entity)
+            options: Loader options (e.g. joinedload) applied to every query
+            criteria: Extra WHERE criteria (e.g. not soft-deleted)
+        """
+        self.session = session
+        self.model = model
+        self.key = key
+        self.options = tuple(options)
+        self.criteria = tuple(criteria)
+        self._cache: dict[Hashable, T] = {}
+        self._pending: dict[Hashable, asyncio.Future[T | None]] = {}
+        self._dispatch_lock = asyncio.Lock()
+
+    async def load(self, key: Hashable) -> T | None:
+        """
+        Load one entity.
+
+        Args:
+            key: Value of the loader's key column
+
+        Returns:
+            Entity, or None if not found
+        """
+        instance = self._cache.get(key)
+        if instance is not None:
+            if _is_current(instance):
+                return instance
+            del self._cache[key]
+
+        future = self._pending.get(key)
+        if future is not None:
+            return await future
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        if len(self._pending) > 1:
+            # A batch is being collected: its dispatcher resolves this key
+            return await future
+
+        try:
+            # Let loads scheduled in the same tick join the batch
+            await asyncio.sleep(0)
+            async with self._dispatch_lock:
+                await self._dispatch()
+        except asyncio.CancelledError:
+            # Cancelled before sending the batch: don't leave its waiters hanging
+            if self._pending.get(key) is future:
+                batch, self._pending = self._pending, {}
+                for pending in batch.values():
+                    pending.cancel()
+            raise
+        return future.result()
+
+    async def load_many(self, keys: Sequence[Hashable]) -> list[T | None]:
+        """
+        Load several entities with at most one query.
+
+        Args:
+            keys: Values of the loader's key column
+
+        Returns:
+            Entities in key order (None for keys not found)
+        """
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, instance: T) -> None:
+        """Memoize an entity loaded or created elsewhere."""
+        self._cache[getattr(instance, self.key)] = instance
+
+    def forget(self, key: Hashable) -> None:
+        """Drop one memoized entity (e.g. after deleting it)."""
+        self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all memoized entities."""
+        self._cache.clear()
+
+    async def _dispatch(self) -> None:
+        """Resolve all pending keys with one query."""
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        try:
+            found = await self._fetch(list(batch))
+        except BaseException as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            raise
+
+        for key, future in batch.items():
+            instance = found.get(key)
+            if instance is not None:
+                self._cache[key] = instance
+            future.set_result(instance)
+
+    async def _fetch(self, keys: list[Hashable]) -> dict[Hashable, T]:
+        column = getattr(self.model, self.key)
+        query = select(self.model).where(*self.criteria)
+        if self.options:
+            query = query.options(*self.options)
+
+        if len(keys) == 1:
+            result = await self.session.execute(query.where(column == keys[0]))
+            # Joined eager loads of collections repeat the parent row
+            if self.options:
+                result = result.unique()
+            instance = result.scalar_one_or_none()
+            return {keys[0]: instance} if instance is not None else {}
+
+        scalars = (await self.session.execute(query.where(column.in_(keys)))).scalars()
+        if self.options:
+            scalars = scalars.unique()
+        return {getattr(instance, self.key): instance for instance in scalars.all()}
+
+
+def get_entity_loader(
+    session: AsyncSession,
+    model: type[T],
+    key: str = "id",
+    options: Sequence[ORMOption] = (),
+    criteria: Sequence[ColumnElement[bool]] = (),
+) -> EntityLoader[T]:
+    """
+    Get the session's loader for a model and key column, creating it once.
+
+    Loaders with options or criteria are shared per (identical) objects: pass
+    module-level constants so every call site shares the same loader.
+
+    Args:
+        session: Async database session
+        model: SQLAlchemy model class
+        key: Column the loader looks entities up by (unique per entity)
+        options: Loader options applied to every query
+        criteria: Extra WHERE criteria applied to every query
+
+    Returns:
+        Loader shared by all services using the session
+    """
+    options = tuple(options)
+    criteria = tuple(criteria)
+    info = session.info
+    if not isinstance(info, dict):
+        # Sessions without an info dict (test doubles) get an unshared loader
+        return EntityLoader(session, model, key, options, criteria)
+
+    loaders: dict[tuple[Any, ...], EntityLoader[Any]] = info.setdefault(_LOADERS_INFO_KEY, {})
+    loader_key = (model, key, options, criteria)
+    loader = loaders.get(loader_key)
+    if loader is None:
+        loader = EntityLoader(session, model, key, options, criteria)
+        loaders[loader_key] = loader
+    return loader
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_entity_loaders(session: Session, *args: Any) -> None:
+    """Drop a session's loaders when the transaction ends (instances expire)."""
+    session.info.pop(_LOADERS_INFO_KEY, None)
@@ -9,12 +9,26 @@ Handles generation of:
 """
 
 import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
 from decimal import Decimal
 
 from sqlalchemy import and_, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.engine.financial_statements import (
+    ConsolidationEntry,
+    FinancialPeriod,
+    PeriodTotals,
+    StatementLine,
+    StatementLineType,
+    calculate_period_totals,
+    generate_balance_sheet_lines,
+    generate_cash_flow_lines,
+    generate_income_statement_lines,
+)
+from app.engine.financial_statements import StatementFormat as EngineStatementFormat
 from app.models.configuration import BudgetVersion
 from app.models.consolidation import (
     BudgetConsolidation,
@@ -27,6 +41,164 @@ from app.models.consolidation import (
 )
 from app.services.base import BaseService
 from app.services.exceptions import ValidationError
+from app.services.input_fingerprint import compute_input_fingerprint
+
+# Period weighting:
+# - Revenue follows trimester recognition (T1 40% Sep-Dec, T2 30% Jan-Mar, T3 30% Apr-Jun)
+#   → p1 (Jan-Jun) = 60%, summer (Jul-Aug) = 0%, p2 (Sep-Dec) = 40%
+# - Expenses (non-revenue) are assumed evenly distributed across months
+PERIOD_REVENUE_WEIGHTS: dict[FinancialPeriod, Decimal] = {
+    FinancialPeriod.PERIOD_1: Decimal("0.60"),
+    FinancialPeriod.SUMMER: Decimal("0.00"),
+    FinancialPeriod.PERIOD_2: Decimal("0.40"),
+    FinancialPeriod.ANNUAL: Decimal("1.00"),
+}
+PERIOD_EXPENSE_WEIGHTS: dict[FinancialPeriod, Decimal] = {
+    FinancialPeriod.PERIOD_1: Decimal("0.50"),  # 6/12 months
+    FinancialPeriod.SUMMER: Decimal(2) / Decimal(12),  # Jul-Aug
+    FinancialPeriod.PERIOD_2: Decimal("0.3333333333"),  # 4/12 months
+    FinancialPeriod.ANNUAL: Decimal("1.00"),
+}
+
+CAPEX_CATEGORIES = frozenset({
+    ConsolidationCategory.CAPEX_EQUIPMENT.value,
+    ConsolidationCategory.CAPEX_IT.value,
+    ConsolidationCategory.CAPEX_FURNITURE.value,
+    ConsolidationCategory.CAPEX_BUILDING.value,
+    ConsolidationCategory.CAPEX_SOFTWARE.value,
+})
+
+# Engine line types as persisted on FinancialStatementLine (blank lines are not stored)
+_LINE_TYPES: dict[StatementLineType, LineType] = {
+    StatementLineType.SECTION_HEADER: LineType.SECTION_HEADER,
+    StatementLineType.SUBSECTION_HEADER: LineType.ACCOUNT_GROUP,
+    StatementLineType.ACCOUNT_LINE: LineType.ACCOUNT_LINE,
+    StatementLineType.SUBTOTAL: LineType.SUBTOTAL,
+    StatementLineType.TOTAL: LineType.TOTAL,
+}
+
+
+@dataclass
+class StatementSet:
+    """
+    All financial statements of a budget version, for every period.
+
+    Built from one grouped read of the version's consolidation, and valid
+    while the consolidation fingerprint is unchanged. The balance sheet is a
+    year-end position, so it is only computed for the annual period.
+    """
+
+    fingerprint: str
+    entries: dict[FinancialPeriod, list[ConsolidationEntry]]
+    period_totals: dict[FinancialPeriod, PeriodTotals]
+    income_statements: dict[tuple[FinancialPeriod, EngineStatementFormat], list[StatementLine]]
+    cash_flows: dict[FinancialPeriod, list[StatementLine]]
+    balance_sheet: tuple[list[StatementLine], list[StatementLine]]
+
+
+# Budget versions whose statement sets are kept in memory (least recently used evicted)
+STATEMENT_SET_CACHE_SIZE = 32
+
+# Statement sets by budget version (validated against the fingerprint on read)
+_statement_set_cache: OrderedDict[uuid.UUID, StatementSet] = OrderedDict()
+
+
+def invalidate_statement_set_cache(budget_version_id: uuid.UUID | None = None) -> None:
+    """Drop cached statement sets for one budget version, or all versions."""
+    if budget_version_id is None:
+        _statement_set_cache.clear()
+    else:
+        _statement_set_cache.pop(budget_version_id, None)
+
+
+def build_statement_set(
+    fingerprint: str,
+    annual_entries: list[ConsolidationEntry],
+) -> StatementSet:
+    """
+    Compute income, cash flow and balance sheet statements for all periods.
+
+    Args:
+        fingerprint: Fingerprint of the consolidation the entries were read from
+        annual_entries: Annual consolidation entries, one per account
+
+    Returns:
+        StatementSet for the version
+    """
+    entries: dict[FinancialPeriod, list[ConsolidationEntry]] = {}
+    for period in FinancialPeriod:
+        entries[period] = [
+            entry.model_copy(
+                update={
+                    "period": period,
+                    # Unrounded: totals and statement lines are rounded once
+                    "amount_sar": entry.amount_sar
+                    * (
+                        PERIOD_REVENUE_WEIGHTS[period]
+                        if entry.is_revenue
+                        else PERIOD_EXPENSE_WEIGHTS[period]
+                    ),
+                }
+            )
+            for entry in annual_entries
+        ]
+
+    all_entries = [entry for period_entries in entries.values() for entry in period_entries]
+    period_totals = {
+        period: calculate_period_totals(all_entries, period) for period in FinancialPeriod
+    }
+
+    income_statements = {
+        (period, statement_format): generate_income_statement_lines(
+            entries[period], statement_format
+        )
+        for period in FinancialPeriod
+        for statement_format in EngineStatementFormat
+    }
+
+    cash_flows = {}
+    for period in FinancialPeriod:
+        operating = [e for e in entries[period] if e.consolidation_category not in CAPEX_CATEGORIES]
+        investing = [e for e in entries[period] if e.consolidation_category in CAPEX_CATEGORIES]
+        cash_flows[period] = generate_cash_flow_lines(operating, investing, [])
+
+    # Simplified: fixed assets are CapEx, mirrored by equity
+    fixed_assets = [
+        e for e in entries[FinancialPeriod.ANNUAL] if e.consolidation_category in CAPEX_CATEGORIES
+    ]
+    total_fixed_assets = sum((e.amount_sar for e in fixed_assets), start=Decimal("0.00"))
+    balance_sheet = generate_balance_sheet_lines(fixed_assets, [], total_fixed_assets)
+
+    return StatementSet(
+        fingerprint=fingerprint,
+        entries=entries,
+        period_totals=period_totals,
+        income_statements=income_statements,
+        cash_flows=cash_flows,
+        balance_sheet=balance_sheet,
+    )
+
+
+def _to_line_data(lines: list[StatementLine]) -> list[dict]:
+    """Convert engine statement lines to FinancialStatementLine data."""
+    line_data = []
+    for line in lines:
+        if line.line_type == StatementLineType.BLANK_LINE:
+            continue
+        data = {
+            "line_number": len(line_data) + 1,
+            "line_type": _LINE_TYPES[line.line_type],
+            "indent_level": line.indent_level,
+            "line_code": line.line_code,
+            "line_description": line.line_description,
+            "amount_sar": line.amount_sar,
+            "is_bold": line.is_bold,
+            "is_underlined": line.is_underlined,
+        }
+        if line.source_category:
+            data["source_consolidation_category"] = line.source_category
+        line_data.append(data)
+    return line_data
 
 
 class FinancialStatementsService:
@@ -51,6 +223,8 @@ class FinancialStatementsService:
         self.statement_service = BaseService(FinancialStatement, session)
         self.line_service = BaseService(FinancialStatementLine, session)
         self.budget_version_service = BaseService(BudgetVersion, session)
+        # Whether the last statement request regenerated (None before any request)
+        self.last_recomputed: bool | None = None
 
     async def get_income_statement(
         self,
@@ -60,6 +234,10 @@ class FinancialStatementsService:
         """
         Get or generate income statement for a budget version.
 
+        A stored statement is returned while the consolidation it was generated
+        from is unchanged; otherwise it is regenerated. last_recomputed records
+        which path was taken.
+
         Args:
             budget_version_id: Budget version UUID
             format: Statement format ('pcg' or 'ifrs')
@@ -82,20 +260,28 @@ class FinancialStatementsService:
             StatementFormat.FRENCH_PCG if format == "pcg" else StatementFormat.IFRS
         )
 
-        # Check if statement already exists
+        fingerprint = await self._consolidation_fingerprint(budget_version_id)
+
+        # Check if an up-to-date statement already exists
         existing = await self._get_existing_statement(
             budget_version_id,
             StatementType.INCOME_STATEMENT,
             statement_format,
         )
 
-        if existing:
+        if existing and existing.input_fingerprint == fingerprint:
+            self.last_recomputed = False
             return existing
 
+        if existing:
+            await self._discard_statements(existing)
+
         # Generate new statement
+        self.last_recomputed = True
         return await self._generate_income_statement(
             budget_version_id,
             statement_format,
+            fingerprint,
         )
 
     async def get_balance_sheet(
@@ -105,6 +291,10 @@ class FinancialStatementsService:
         """
         Get or generate balance sheet for a budget version.
 
+        Stored statements are returned while the consolidation they were
+        generated from is unchanged; otherwise both are regenerated.
+        last_recomputed records which path was taken.
+
         Args:
             budget_version_id: Budget version UUID
 
@@ -114,7 +304,9 @@ class FinancialStatementsService:
         Raises:
             NotFoundError: If budget version not found
         """
-        # Check if statements already exist
+        fingerprint = await self._consolidation_fingerprint(budget_version_id)
+
+        # Check if up-to-date statements already exist
         assets = await self._get_existing_statement(
             budget_version_id,
             StatementType.BALANCE_SHEET_ASSETS,
@@ -127,11 +319,20 @@ class FinancialStatementsService:
             StatementFormat.FRENCH_PCG,
         )
 
-        if assets and liabilities:
+        if (
+            assets
+            and liabilities
+            and assets.input_fingerprint == fingerprint
+            and liabilities.input_fingerprint == fingerprint
+        ):
+            self.last_recomputed = False
             return {"assets": assets, "liabilities": liabilities}
 
+        await self._discard_statements(assets, liabilities)
+
         # Generate new statements
-        return await self._generate_balance_sheet(budget_version_id)
+        self.last_recomputed = True
+        return await self._generate_balance_sheet(budget_version_id, fingerprint)
 
     async def calculate_statement_lines(
         self,
@@ -190,62 +391,85 @@ class FinancialStatementsService:
         Raises:
             ValidationError: If period is invalid
         """
-        valid_periods = ["p1", "summer", "p2", "annual"]
+        valid_periods = [p.value for p in FinancialPeriod]
         if period not in valid_periods:
             raise ValidationError(
                 f"Invalid period '{period}'. Must be one of: {', '.join(valid_periods)}",
                 field="period",
             )
 
-        # Period weighting:
-        # - Revenue follows trimester recognition (T1 40% Sep-Dec, T2 30% Jan-Mar, T3 30% Apr-Jun)
-        #   → p1 (Jan-Jun) = 60%, summer (Jul-Aug) = 0%, p2 (Sep-Dec) = 40%
-        # - Expenses (non-revenue) are assumed evenly distributed across months
-        revenue_weights = {
-            "p1": Decimal("0.60"),
-            "summer": Decimal("0.00"),
-            "p2": Decimal("0.40"),
-            "annual": Decimal("1.00"),
-        }
-        expense_weights = {
-            "p1": Decimal("0.50"),  # 6/12 months
-            "summer": Decimal(2) / Decimal(12),  # Jul-Aug
-            "p2": Decimal("0.3333333333"),  # 4/12 months
-            "annual": Decimal("1.00"),
+        statement_set = await self.get_statement_set(budget_version_id)
+        totals = statement_set.period_totals[FinancialPeriod(period)]
+
+        return {
+            "total_revenue": totals.total_revenue,
+            "total_expenses": totals.total_expenses,
+            "operating_result": totals.operating_result,
+            "net_result": totals.net_result,
         }
 
-        # Get all consolidation entries
+    async def get_statement_set(
+        self,
+        budget_version_id: uuid.UUID,
+    ) -> StatementSet:
+        """
+        Get income, cash flow and balance sheet statements for all periods.
+
+        The set is computed from a single grouped query over the version's
+        consolidation and cached per version until the consolidation changes.
+
+        Args:
+            budget_version_id: Budget version UUID
+
+        Returns:
+            StatementSet for the version
+        """
+        fingerprint = await self._consolidation_fingerprint(budget_version_id)
+        cached = _statement_set_cache.get(budget_version_id)
+        if cached is not None and cached.fingerprint == fingerprint:
+            _statement_set_cache.move_to_end(budget_version_id)
+            return cached
+
         query = (
-            select(BudgetConsolidation)
+            select(
+                BudgetConsolidation.account_code,
+                BudgetConsolidation.account_name,
+                BudgetConsolidation.consolidation_category,
+                BudgetConsolidation.is_revenue,
+                func.sum(BudgetConsolidation.amount_sar).label("amount_sar"),
+            )
             .where(
                 and_(
                     BudgetConsolidation.budget_version_id == budget_version_id,
                     BudgetConsolidation.deleted_at.is_(None),
                 )
             )
+            .group_by(
+                BudgetConsolidation.account_code,
+                BudgetConsolidation.account_name,
+                BudgetConsolidation.consolidation_category,
+                BudgetConsolidation.is_revenue,
+            )
+            .order_by(BudgetConsolidation.account_code)
         )
         result = await self.session.execute(query)
-        consolidations = result.scalars().all()
-
-        # Calculate totals
-        total_revenue = Decimal("0.00")
-        total_expenses = Decimal("0.00")
-
-        for item in consolidations:
-            if item.is_revenue:
-                total_revenue += item.amount_sar * revenue_weights[period]
-            else:
-                total_expenses += item.amount_sar * expense_weights[period]
+        annual_entries = [
+            ConsolidationEntry(
+                account_code=row.account_code,
+                account_name=row.account_name,
+                amount_sar=row.amount_sar,
+                is_revenue=row.is_revenue,
+                consolidation_category=row.consolidation_category.value,
+            )
+            for row in result.all()
+        ]
 
-        operating_result = total_revenue - total_expenses
-        net_result = operating_result  # Simplified - no financial income/expenses
-
-        return {
-            "total_revenue": total_revenue,
-            "total_expenses": total_expenses,
-            "operating_result": operating_result,
-            "net_result": net_result,
-        }
+        statement_set = build_statement_set(fingerprint, annual_entries)
+        _statement_set_cache[budget_version_id] = statement_set
+        _statement_set_cache.move_to_end(budget_version_id)
+        while len(_statement_set_cache) > STATEMENT_SET_CACHE_SIZE:
+            _statement_set_cache.popitem(last=False)
+        return statement_set
 
     # ==========================================================================
     # Private Helper Methods
@@ -273,10 +497,26 @@ class FinancialStatementsService:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def _consolidation_fingerprint(self, budget_version_id: uuid.UUID) -> str:
+        """Fingerprint the consolidation statements are generated from."""
+        return await compute_input_fingerprint(
+            self.session,
+            budget_version_id,
+            [BudgetConsolidation],
+        )
+
+    async def _discard_statements(self, *statements: FinancialStatement | None) -> None:
+        """Delete stale statements (and their lines) before regeneration."""
+        for statement in statements:
+            if statement is not None:
+                await self.session.delete(statement)
+        await self.session.flush()
+
     async def _generate_income_statement(
         self,
         budget_version_id: uuid.UUID,
         statement_format: StatementFormat,
+        input_fingerprint: str | None = None,
     ) -> FinancialStatement:
         """Generate income statement."""
         # Get budget version
@@ -309,6 +549,7 @@ class FinancialStatementsService:
             "fiscal_year": budget_version.fiscal_year,
             "total_amount_sar": total_amount,
             "is_calculated": True,
+            "input_fingerprint": input_fingerprint,
         })
 
         # Create lines
@@ -324,6 +565,7 @@ class FinancialStatementsService:
     async def _generate_balance_sheet(
         self,
         budget_version_id: uuid.UUID,
+        input_fingerprint: str | None = None,
     ) -> dict[str, FinancialStatement]:
         """Generate balance sheet (assets and liabilities)."""
         # Get budget version
@@ -344,6 +586,7 @@ class FinancialStatementsService:
             "fiscal_year": budget_version.fiscal_year,
             "total_amount_sar": assets_total,
             "is_calculated": True,
+            "input_fingerprint": input_fingerprint,
         })
 
         for line_data in assets_lines:
@@ -367,6 +610,7 @@ class FinancialStatementsService:
             "fiscal_year": budget_version.fiscal_year,
             "total_amount_sar": liabilities_total,
             "is_calculated": True,
+            "input_fingerprint": input_fingerprint,
         })
 
         for line_data in liabilities_lines:
@@ -387,319 +631,49 @@ class FinancialStatementsService:
         budget_version_id: uuid.UUID,
         statement_format: StatementFormat,
     ) -> list[dict]:
-        """Calculate income statement lines from consolidation."""
-        # Get consolidation data
-        query = (
-            select(BudgetConsolidation)
-            .where(
-                and_(
-                    BudgetConsolidation.budget_version_id == budget_version_id,
-                    BudgetConsolidation.deleted_at.is_(None),
-                )
-            )
-            .order_by(
-                BudgetConsolidation.is_revenue.desc(),
-                BudgetConsolidation.consolidation_category,
-            )
+        """Calculate annual income statement lines from consolidation."""
+        statement_set = await self.get_statement_set(budget_version_id)
+        return _to_line_data(
+            statement_set.income_statements[
+                (FinancialPeriod.ANNUAL, EngineStatementFormat(statement_format.value))
+            ]
         )
-        result = await self.session.execute(query)
-        consolidations = result.scalars().all()
-
-        lines = []
-        line_number = 1
-
-        # REVENUE SECTION
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.SECTION_HEADER,
-            "indent_level": 0,
-            "line_code": None,
-            "line_description": "PRODUITS D'EXPLOITATION"
-            if statement_format == StatementFormat.FRENCH_PCG
-            else "OPERATING REVENUE",
-            "amount_sar": None,
-            "is_bold": True,
-            "is_underlined": False,
-        })
-        line_number += 1
-
-        # Revenue items
-        revenue_total = Decimal("0.00")
-        for item in consolidations:
-            if item.is_revenue:
-                lines.append({
-                    "line_number": line_number,
-                    "line_type": LineType.ACCOUNT_LINE,
-                    "indent_level": 2,
-                    "line_code": item.account_code,
-                    "line_description": item.account_name,
-                    "amount_sar": item.amount_sar,
-                    "is_bold": False,
-                    "is_underlined": False,
-                    "source_consolidation_category": item.consolidation_category.value,
-                })
-                line_number += 1
-                revenue_total += item.amount_sar
-
-        # Revenue subtotal
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.SUBTOTAL,
-            "indent_level": 1,
-            "line_code": None,
-            "line_description": "Total Produits d'Exploitation"
-            if statement_format == StatementFormat.FRENCH_PCG
-            else "Total Operating Revenue",
-            "amount_sar": revenue_total,
-            "is_bold": True,
-            "is_underlined": True,
-        })
-        line_number += 1
-
-        # EXPENSES SECTION
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.SECTION_HEADER,
-            "indent_level": 0,
-            "line_code": None,
-            "line_description": "CHARGES D'EXPLOITATION"
-            if statement_format == StatementFormat.FRENCH_PCG
-            else "OPERATING EXPENSES",
-            "amount_sar": None,
-            "is_bold": True,
-            "is_underlined": False,
-        })
-        line_number += 1
-
-        # Expense items
-        expense_total = Decimal("0.00")
-        for item in consolidations:
-            if not item.is_revenue:
-                lines.append({
-                    "line_number": line_number,
-                    "line_type": LineType.ACCOUNT_LINE,
-                    "indent_level": 2,
-                    "line_code": item.account_code,
-                    "line_description": item.account_name,
-                    "amount_sar": item.amount_sar,
-                    "is_bold": False,
-                    "is_underlined": False,
-                    "source_consolidation_category": item.consolidation_category.value,
-                })
-                line_number += 1
-                expense_total += item.amount_sar
-
-        # Expense subtotal
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.SUBTOTAL,
-            "indent_level": 1,
-            "line_code": None,
-            "line_description": "Total Charges d'Exploitation"
-            if statement_format == StatementFormat.FRENCH_PCG
-            else "Total Operating Expenses",
-            "amount_sar": expense_total,
-            "is_bold": True,
-            "is_underlined": True,
-        })
-        line_number += 1
-
-        # OPERATING RESULT
-        operating_result = revenue_total - expense_total
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.TOTAL,
-            "indent_level": 0,
-            "line_code": None,
-            "line_description": "RÉSULTAT D'EXPLOITATION"
-            if statement_format == StatementFormat.FRENCH_PCG
-            else "OPERATING RESULT",
-            "amount_sar": operating_result,
-            "is_bold": True,
-            "is_underlined": True,
-        })
-        line_number += 1
-
-        # NET RESULT (simplified - no financial income/expenses)
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.TOTAL,
-            "indent_level": 0,
-            "line_code": None,
-            "line_description": "RÉSULTAT NET"
-            if statement_format == StatementFormat.FRENCH_PCG
-            else "NET RESULT",
-            "amount_sar": operating_result,
-            "is_bold": True,
-            "is_underlined": True,
-        })
-
-        return lines
 
     async def _calculate_balance_sheet_assets_lines(
         self,
         budget_version_id: uuid.UUID,
     ) -> list[dict]:
         """Calculate balance sheet assets lines (simplified)."""
-        lines = []
-        line_number = 1
-
-        # Header
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.SECTION_HEADER,
-            "indent_level": 0,
-            "line_code": None,
-            "line_description": "ACTIF",
-            "amount_sar": None,
-            "is_bold": True,
-            "is_underlined": False,
-        })
-        line_number += 1
-
-        # Get CapEx items (fixed assets)
-        query = (
-            select(BudgetConsolidation)
-            .where(
-                and_(
-                    BudgetConsolidation.budget_version_id == budget_version_id,
-                    BudgetConsolidation.source_table == "capex_plans",
-                    BudgetConsolidation.deleted_at.is_(None),
-                )
-            )
-        )
-        result = await self.session.execute(query)
-        capex_items = result.scalars().all()
-
-        total_assets = Decimal("0.00")
-        for item in capex_items:
-            lines.append({
-                "line_number": line_number,
-                "line_type": LineType.ACCOUNT_LINE,
-                "indent_level": 2,
-                "line_code": item.account_code,
-                "line_description": item.account_name,
-                "amount_sar": item.amount_sar,
-                "is_bold": False,
-                "is_underlined": False,
-            })
-            line_number += 1
-            total_assets += item.amount_sar
-
-        # Total
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.TOTAL,
-            "indent_level": 0,
-            "line_code": None,
-            "line_description": "TOTAL ACTIF",
-            "amount_sar": total_assets,
-            "is_bold": True,
-            "is_underlined": True,
-        })
-
-        return lines
+        statement_set = await self.get_statement_set(budget_version_id)
+        assets_lines, _liabilities_lines = statement_set.balance_sheet
+        return _to_line_data(assets_lines)
 
     async def _calculate_balance_sheet_liabilities_lines(
         self,
         budget_version_id: uuid.UUID,
     ) -> list[dict]:
         """Calculate balance sheet liabilities lines (simplified)."""
-        lines = []
-        line_number = 1
-
-        # Compute equity based on total assets (mirrors capex total for now)
-        capex_query = (
-            select(func.coalesce(func.sum(BudgetConsolidation.amount_sar), 0))
-            .where(
-                and_(
-                    BudgetConsolidation.budget_version_id == budget_version_id,
-                    BudgetConsolidation.source_table == "capex_plans",
-                    BudgetConsolidation.deleted_at.is_(None),
-                )
-            )
-        )
-        total_assets = Decimal(str((await self.session.execute(capex_query)).scalar()))
-
-        # Header
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.SECTION_HEADER,
-            "indent_level": 0,
-            "line_code": None,
-            "line_description": "PASSIF",
-            "amount_sar": None,
-            "is_bold": True,
-            "is_underlined": False,
-        })
-        line_number += 1
-
-        # Simplified: Just show equity as total
-        # In reality, this would include detailed equity and liabilities
-        total_liabilities = total_assets
-
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.ACCOUNT_LINE,
-            "indent_level": 2,
-            "line_code": None,
-            "line_description": "Capitaux propres",
-            "amount_sar": total_liabilities,
-            "is_bold": False,
-            "is_underlined": False,
-        })
-        line_number += 1
-
-        # Total
-        lines.append({
-            "line_number": line_number,
-            "line_type": LineType.TOTAL,
-            "indent_level": 0,
-            "line_code": None,
-            "line_description": "TOTAL PASSIF",
-            "amount_sar": total_liabilities,
-            "is_bold": True,
-            "is_underlined": True,
-        })
-
-        return lines
+        statement_set = await self.get_statement_set(budget_version_id)
+        _assets_lines, liabilities_lines = statement_set.balance_sheet
+        return _to_line_data(liabilities_lines)
 
     async def _calculate_cash_flow_lines(
         self,
         budget_version_id: uuid.UUID,
     ) -> list[dict]:
-        """Calculate cash flow statement lines using consolidation data."""
-        capex_categories = {
-            ConsolidationCategory.CAPEX_EQUIPMENT,
-            ConsolidationCategory.CAPEX_IT,
-            ConsolidationCategory.CAPEX_FURNITURE,
-            ConsolidationCategory.CAPEX_BUILDING,
-            ConsolidationCategory.CAPEX_SOFTWARE,
-        }
-
-        query = (
-            select(BudgetConsolidation)
-            .where(
-                and_(
-                    BudgetConsolidation.budget_version_id == budget_version_id,
-                    BudgetConsolidation.deleted_at.is_(None),
-                )
-            )
-            .order_by(BudgetConsolidation.account_code)
-        )
-        result = await self.session.execute(query)
-        consolidations = result.scalars().all()
+        """Calculate detailed annual cash flow statement lines from consolidation."""
+        statement_set = await self.get_statement_set(budget_version_id)
 
-        operating_entries: list[BudgetConsolidation] = []
-        investing_entries: list[BudgetConsolidation] = []
+        operating_entries: list[ConsolidationEntry] = []
+        investing_entries: list[ConsolidationEntry] = []
 
-        for item in consolidations:
-            if item.consolidation_category in capex_categories:
+        for item in statement_set.entries[FinancialPeriod.ANNUAL]:
+            if item.consolidation_category in CAPEX_CATEGORIES:
                 investing_entries.append(item)
             else:
                 operating_entries.append(item)
 
-        def _signed_amount(entry: BudgetConsolidation) -> Decimal:
+        def _signed_amount(entry: ConsolidationEntry) -> Decimal:
             return entry.amount_sar if entry.is_revenue else -entry.amount_sar
 
         operating_total = sum((_signed_amount(e) for e in operating_entries), start=Decimal("0.00"))
@@ -746,7 +720,7 @@ class FinancialStatementsService:
                 "amount_sar": _signed_amount(entry),
                 "is_bold": False,
                 "is_underlined": False,
-                "source_consolidation_category": entry.consolidation_category.value,
+                "source_consolidation_category": entry.consolidation_category,
             })
             line_number += 1
 
@@ -785,7 +759,7 @@ class FinancialStatementsService:
                 "amount_sar": _signed_amount(entry),
                 "is_bold": False,
                 "is_underlined": False,
-                "source_consolidation_category": entry.consolidation_category.value,
+                "source_consolidation_category": entry.consolidation_category,
             })
             line_number += 1
 
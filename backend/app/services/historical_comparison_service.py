@@ -7,16 +7,19 @@ against 2 years of historical actuals (N-2, N-1, Current).
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import case, delete, func, insert, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.logging import logger
 from app.models import (
     BudgetVersion,
     HistoricalActuals,
+    HistoricalComparisonCube,
     HistoricalDimensionType,
     HistoricalModuleCode,
 )
@@ -24,6 +27,55 @@ from app.schemas.historical import (
     HistoricalComparison,
     HistoricalDataPoint,
 )
+from app.services.input_fingerprint import row_version_aggregate
+
+# Prior years held by the comparison cube (N-1 and N-2)
+MAX_HISTORY_YEARS = 2
+
+# Modules whose comparison value is a count rather than a decimal quantity
+COUNT_MODULES = (HistoricalModuleCode.ENROLLMENT, HistoricalModuleCode.CLASS_STRUCTURE)
+
+
+@dataclass
+class CachedHistory:
+    """Historical data points of one module and planning fiscal year held in memory."""
+
+    historical: dict[str, dict[int, HistoricalDataPoint]]
+    # Row count and row version of the cube rows the points were read from
+    fingerprint: tuple[Any, ...]
+
+
+# Keyed by (module, dimension type, planning fiscal year, history years)
+_history_cache: dict[
+    tuple[HistoricalModuleCode, HistoricalDimensionType, int, int], CachedHistory
+] = {}
+
+
+def invalidate_historical_comparison_cache() -> None:
+    """Drop every cached historical lookup (called once a cube rebuild commits)."""
+    _history_cache.clear()
+
+
+def comparison_value_expression() -> Any:
+    """SQL expression of the comparison value of a historical actual, per module."""
+    return case(
+        (
+            HistoricalActuals.module_code == HistoricalModuleCode.ENROLLMENT,
+            HistoricalActuals.annual_count,
+        ),
+        (
+            HistoricalActuals.module_code == HistoricalModuleCode.CLASS_STRUCTURE,
+            HistoricalActuals.annual_classes,
+        ),
+        (
+            # For DHG, prefer FTE, fall back to hours
+            HistoricalActuals.module_code == HistoricalModuleCode.DHG,
+            func.coalesce(
+                func.nullif(HistoricalActuals.annual_fte, 0), HistoricalActuals.annual_hours
+            ),
+        ),
+        else_=HistoricalActuals.annual_amount_sar,
+    )
 
 
 class HistoricalComparisonService:
@@ -53,6 +105,13 @@ class HistoricalComparisonService:
         """
         Fetch historical data for a module, organized by dimension code.
 
+        Reads the precomputed comparison cube (one primary-key range lookup) and
+        caches the result per planning fiscal year. A cached lookup is reused
+        while the fingerprint of its cube rows is unchanged, so rebuilds
+        committed by other workers (or reaching a replica late) are picked
+        up. The cube holds N-1 and N-2 only, so history_years above
+        MAX_HISTORY_YEARS returns the same points as MAX_HISTORY_YEARS.
+
         Args:
             module_code: Module to fetch (enrollment, dhg, revenue, etc.)
             dimension_type: Dimension type to group by (level, subject, account_code)
@@ -62,66 +121,156 @@ class HistoricalComparisonService:
         Returns:
             Dictionary mapping dimension_code -> {fiscal_year -> HistoricalDataPoint}
         """
-        # Calculate fiscal years to fetch
-        fiscal_years = [current_fiscal_year - i for i in range(1, history_years + 1)]
+        history_years = min(history_years, MAX_HISTORY_YEARS)
+        cache_key = (module_code, dimension_type, current_fiscal_year, history_years)
+        fingerprint = await self._cube_fingerprint(
+            module_code, dimension_type, current_fiscal_year
+        )
+        cached = _history_cache.get(cache_key)
+        if cached is not None and cached.fingerprint == fingerprint:
+            return cached.historical
 
-        # Query historical data
         stmt = (
-            select(HistoricalActuals)
-            .where(
-                HistoricalActuals.module_code == module_code,
-                HistoricalActuals.dimension_type == dimension_type,
-                HistoricalActuals.fiscal_year.in_(fiscal_years),
-                HistoricalActuals.deleted_at.is_(None),
+            select(
+                HistoricalComparisonCube.dimension_code,
+                HistoricalComparisonCube.n_minus_1_value,
+                HistoricalComparisonCube.n_minus_2_value,
             )
-            .order_by(
-                HistoricalActuals.dimension_code,
-                HistoricalActuals.fiscal_year.desc(),
+            .where(
+                HistoricalComparisonCube.module_code == module_code,
+                HistoricalComparisonCube.dimension_type == dimension_type,
+                HistoricalComparisonCube.fiscal_year == current_fiscal_year,
             )
+            .order_by(HistoricalComparisonCube.dimension_code)
         )
-
         result = await self.session.execute(stmt)
-        records = result.scalars().all()
 
         # Organize by dimension code and fiscal year
         historical_data: dict[str, dict[int, HistoricalDataPoint]] = {}
+        for row in result.all():
+            values = {current_fiscal_year - 1: row.n_minus_1_value}
+            if history_years >= 2:
+                values[current_fiscal_year - 2] = row.n_minus_2_value
+
+            points = {
+                year: HistoricalDataPoint(
+                    fiscal_year=year,
+                    value=int(value) if module_code in COUNT_MODULES else value,
+                    is_actual=True,
+                )
+                for year, value in values.items()
+                if value is not None
+            }
+            if points:
+                historical_data[row.dimension_code] = points
 
-        for record in records:
-            dim_code = record.dimension_code
-            if dim_code not in historical_data:
-                historical_data[dim_code] = {}
+        _history_cache[cache_key] = CachedHistory(
+            historical=historical_data, fingerprint=fingerprint
+        )
+        return historical_data
 
-            # Determine the value based on module type
-            value = self._get_value_for_module(record, module_code)
+    async def _cube_fingerprint(
+        self,
+        module_code: HistoricalModuleCode,
+        dimension_type: HistoricalDimensionType,
+        fiscal_year: int,
+    ) -> tuple[Any, ...]:
+        """Row count and row version of the cube rows of a module and planning year."""
+        result = await self.session.execute(
+            select(
+                func.count(),
+                row_version_aggregate(self.session, HistoricalComparisonCube.refreshed_at),
+            ).where(
+                HistoricalComparisonCube.module_code == module_code,
+                HistoricalComparisonCube.dimension_type == dimension_type,
+                HistoricalComparisonCube.fiscal_year == fiscal_year,
+            )
+        )
+        return tuple(result.one())
+
+    async def refresh_cube(
+        self,
+        module_codes: list[HistoricalModuleCode] | None = None,
+        fiscal_years: list[int] | None = None,
+    ) -> int:
+        """
+        Rebuild the comparison cube rows fed by the given historical years.
+
+        Historical year Y is N-1 of planning year Y+1 and N-2 of Y+2, so only
+        those planning years are rebuilt, with one DELETE and one INSERT ... SELECT
+        per planning year. Does not commit: the caller commits, then calls
+        invalidate_historical_comparison_cache, which also drops lookups of
+        the old rows cached while the rebuild was uncommitted.
+
+        Args:
+            module_codes: Modules to rebuild (None for all)
+            fiscal_years: Historical fiscal years that changed (None for all)
 
-            historical_data[dim_code][record.fiscal_year] = HistoricalDataPoint(
-                fiscal_year=record.fiscal_year,
-                value=value,
-                is_actual=True,
+        Returns:
+            Number of cube rows written
+        """
+        if fiscal_years is None:
+            years_result = await self.session.execute(
+                select(HistoricalActuals.fiscal_year)
+                .where(HistoricalActuals.deleted_at.is_(None))
+                .distinct()
+            )
+            fiscal_years = list(years_result.scalars().all())
+        target_years = sorted({year + offset for year in fiscal_years for offset in (1, 2)})
+
+        delete_stmt = delete(HistoricalComparisonCube)
+        if target_years:
+            delete_stmt = delete_stmt.where(HistoricalComparisonCube.fiscal_year.in_(target_years))
+        if module_codes is not None:
+            delete_stmt = delete_stmt.where(HistoricalComparisonCube.module_code.in_(module_codes))
+        await self.session.execute(delete_stmt)
+
+        value = comparison_value_expression()
+        rows_written = 0
+        for target_year in target_years:
+            source = select(
+                HistoricalActuals.module_code,
+                HistoricalActuals.dimension_type,
+                literal(target_year),
+                HistoricalActuals.dimension_code,
+                func.max(case((HistoricalActuals.fiscal_year == target_year - 1, value))),
+                func.max(case((HistoricalActuals.fiscal_year == target_year - 2, value))),
+                func.now(),
+            ).where(
+                HistoricalActuals.fiscal_year.in_([target_year - 1, target_year - 2]),
+                HistoricalActuals.deleted_at.is_(None),
+            )
+            if module_codes is not None:
+                source = source.where(HistoricalActuals.module_code.in_(module_codes))
+            source = source.group_by(
+                HistoricalActuals.module_code,
+                HistoricalActuals.dimension_type,
+                HistoricalActuals.dimension_code,
             )
 
-        return historical_data
+            result = await self.session.execute(
+                insert(HistoricalComparisonCube).from_select(
+                    [
+                        "module_code",
+                        "dimension_type",
+                        "fiscal_year",
+                        "dimension_code",
+                        "n_minus_1_value",
+                        "n_minus_2_value",
+                        "refreshed_at",
+                    ],
+                    source,
+                )
+            )
+            rows_written += result.rowcount or 0
 
-    def _get_value_for_module(
-        self,
-        record: HistoricalActuals,
-        module_code: HistoricalModuleCode,
-    ) -> Decimal | int | None:
-        """Extract the appropriate value from a historical record based on module type."""
-        if module_code == HistoricalModuleCode.ENROLLMENT:
-            return record.annual_count
-        elif module_code == HistoricalModuleCode.CLASS_STRUCTURE:
-            return record.annual_classes
-        elif module_code == HistoricalModuleCode.DHG:
-            # For DHG, prefer FTE, fall back to hours
-            return record.annual_fte or record.annual_hours
-        elif module_code in (
-            HistoricalModuleCode.REVENUE,
-            HistoricalModuleCode.COSTS,
-            HistoricalModuleCode.CAPEX,
-        ):
-            return record.annual_amount_sar
-        return None
+        logger.info(
+            "Historical comparison cube refreshed",
+            modules=[m.value for m in module_codes] if module_codes else None,
+            planning_years=target_years,
+            rows_written=rows_written,
+        )
+        return rows_written
 
     def build_comparison(
         self,
@@ -8,18 +8,32 @@ Supports multiple modules (enrollment, revenue, costs, dhg, capex).
 from __future__ import annotations
 
 import csv
+import functools
 import io
+import itertools
 import uuid
+from collections.abc import Callable, Iterable, Iterator
 from decimal import Decimal, InvalidOperation
 from enum import Enum
 from typing import Any
 
 from openpyxl import load_workbook
 from pydantic import BaseModel
-from sqlalchemy import delete, select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.analysis import HistoricalActuals
+from app.core.logging import logger
+from app.models.analysis import HistoricalActuals, HistoricalModuleCode
+from app.services.base import BaseService
+from app.services.enrollment_calibration_service import (
+    fiscal_year_to_school_year,
+    invalidate_calibration_cache,
+)
+from app.services.historical_comparison_service import (
+    HistoricalComparisonService,
+    invalidate_historical_comparison_cache,
+)
+from app.services.parallel_validation import validate_in_chunks
 
 
 class ImportModule(str, Enum):
@@ -112,6 +126,71 @@ DHG_COLUMNS = {
 }
 
 
+# Rows written per multi-row INSERT during import
+IMPORT_BATCH_SIZE = 1000
+
+
+def get_module_columns(module: ImportModule) -> dict[str, list[str]]:
+    """Get the column mapping of a module."""
+    if module == ImportModule.ENROLLMENT:
+        return ENROLLMENT_COLUMNS
+    if module == ImportModule.DHG:
+        return DHG_COLUMNS
+    return FINANCIAL_COLUMNS
+
+
+class ColumnMap:
+    """
+    Header resolution of an import file, computed once per file.
+
+    Maps each logical field (e.g., level_code) to the first file header matching
+    one of its possible names, case-insensitively, so rows are read by direct key
+    lookup instead of scanning every header for every field.
+    """
+
+    def __init__(self, headers: Iterable[str], columns: dict[str, list[str]]) -> None:
+        normalized: dict[str, str] = {}
+        for header in headers:
+            normalized.setdefault(header.lower().strip(), header)
+
+        self.headers: dict[str, str] = {}
+        for field, possible_names in columns.items():
+            for name in possible_names:
+                if name.lower() in normalized:
+                    self.headers[field] = normalized[name.lower()]
+                    break
+
+    def get(self, row: dict[str, str], field: str) -> str | None:
+        """Get the stripped value of a field, None when missing or empty."""
+        header = self.headers.get(field)
+        if header is None:
+            return None
+        value = row.get(header)
+        return value.strip() if value else None
+
+
+@functools.lru_cache(maxsize=32)
+def _column_map(module: ImportModule, headers: tuple[str, ...]) -> ColumnMap:
+    """Header resolution of a file, computed once per worker process."""
+    return ColumnMap(headers, get_module_columns(module))
+
+
+def _validate_rows_chunk(
+    rows: list[dict[str, str]],
+    start: int,
+    fiscal_year: int,
+    module: ImportModule,
+    headers: tuple[str, ...],
+) -> list[ImportRecordResult]:
+    """Validate a chunk of rows; start is the index of the first row in the file."""
+    columns = _column_map(module, headers)
+    return [
+        # Row numbers start at 2 (header is row 1)
+        HistoricalImportService._validate_record(row, start + i + 2, fiscal_year, module, columns)
+        for i, row in enumerate(rows)
+    ]
+
+
 class HistoricalImportService:
     """Service for importing historical actuals."""
 
@@ -139,9 +218,9 @@ class HistoricalImportService:
         """
         # Parse file based on extension
         if filename.endswith(".csv"):
-            rows = self._parse_csv(file_content)
+            rows = self._iter_csv_rows(file_content)
         elif filename.endswith((".xlsx", ".xls")):
-            rows = self._parse_excel(file_content)
+            rows = self._iter_excel_rows(file_content)
         else:
             return ImportPreviewResult(
                 fiscal_year=fiscal_year,
@@ -155,31 +234,36 @@ class HistoricalImportService:
                 can_import=False,
             )
 
-        # Detect module from columns if not specified
-        detected_module = module or self._detect_module(rows)
+        # Detect module from the first rows if not specified
+        head = list(itertools.islice(rows, 5))
+        detected_module = module or self._detect_module(head)
+        columns = ColumnMap(head[0].keys() if head else [], get_module_columns(detected_module))
+
+        # Validate records in chunks (in worker processes for large files)
+        results = await validate_in_chunks(
+            itertools.chain(head, rows),
+            _validate_rows_chunk,
+            context=(fiscal_year, detected_module, tuple(columns.headers.values())),
+        )
 
-        # Validate records
-        results: list[ImportRecordResult] = []
+        valid_count = 0
+        error_count = 0
         warnings: list[str] = []
         errors: list[str] = []
-
-        for idx, row in enumerate(rows, start=2):  # Start at 2 (header is row 1)
-            result = self._validate_record(row, idx, fiscal_year, detected_module)
-            results.append(result)
-
+        for result in results:
             # Collect warnings and errors with row context
-            if result.status == ImportStatus.WARNING and result.message:
+            if result.status == ImportStatus.VALID:
+                valid_count += 1
+            elif result.status == ImportStatus.ERROR:
+                error_count += 1
+                if result.message and len(errors) < 10:
+                    errors.append(f"Row {result.row_number}: {result.message}")
+            elif result.message and len(warnings) < 10:
                 warnings.append(f"Row {result.row_number}: {result.message}")
-            elif result.status == ImportStatus.ERROR and result.message:
-                errors.append(f"Row {result.row_number}: {result.message}")
-
-        # Calculate totals
-        valid_count = sum(1 for r in results if r.status == ImportStatus.VALID)
-        error_count = sum(1 for r in results if r.status == ImportStatus.ERROR)
 
         # Convert first few rows to sample_data format
         sample_data: list[dict[str, str | int | float | None]] = []
-        for row in rows[:5]:  # First 5 rows as sample
+        for row in head:  # First 5 rows as sample
             sample_row: dict[str, str | int | float | None] = {}
             for key, value in row.items():
                 # Try to convert numeric strings to numbers
@@ -204,8 +288,8 @@ class HistoricalImportService:
             total_rows=len(results),
             valid_rows=valid_count,
             invalid_rows=error_count,
-            warnings=warnings[:10],  # Limit to first 10 warnings
-            errors=errors[:10],  # Limit to first 10 errors
+            warnings=warnings,  # Limited to first 10 warnings
+            errors=errors,  # Limited to first 10 errors
             sample_data=sample_data,
             can_import=error_count == 0 and valid_count > 0,
         )
@@ -218,10 +302,14 @@ class HistoricalImportService:
         module: ImportModule | None = None,
         overwrite: bool = False,
         user_id: uuid.UUID | None = None,
+        on_progress: Callable[[int], None] | None = None,
     ) -> ImportResult:
         """
         Import historical data from file.
 
+        Rows are streamed from the file and written in multi-row INSERT batches
+        of IMPORT_BATCH_SIZE, so memory stays bounded for large GL extracts.
+
         Args:
             file_content: Raw file bytes
             filename: Original filename
@@ -229,15 +317,17 @@ class HistoricalImportService:
             module: Optional module filter
             overwrite: Whether to replace existing data
             user_id: User performing the import
+            on_progress: Optional callback receiving the number of rows processed
+                after each written batch
 
         Returns:
             ImportResult with import status
         """
         # Parse file
         if filename.endswith(".csv"):
-            rows = self._parse_csv(file_content)
+            rows = self._iter_csv_rows(file_content)
         elif filename.endswith((".xlsx", ".xls")):
-            rows = self._parse_excel(file_content)
+            rows = self._iter_excel_rows(file_content)
         else:
             return ImportResult(
                 fiscal_year=fiscal_year,
@@ -251,7 +341,8 @@ class HistoricalImportService:
                 errors=["Unsupported file format"],
             )
 
-        if not rows:
+        head = list(itertools.islice(rows, 5))
+        if not head:
             return ImportResult(
                 fiscal_year=fiscal_year,
                 module=module.value if module else "unknown",
@@ -265,7 +356,8 @@ class HistoricalImportService:
             )
 
         # Detect module
-        detected_module = module or self._detect_module(rows)
+        detected_module = module or self._detect_module(head)
+        columns = ColumnMap(head[0].keys(), get_module_columns(detected_module))
 
         # Delete existing data if overwrite (count as updates)
         updated_count = 0
@@ -275,22 +367,41 @@ class HistoricalImportService:
         # Import records
         imported = 0
         skipped = 0
+        processed = 0
+        error_count = 0
         errors: list[str] = []
+        batch: list[dict[str, Any]] = []
+        import_batch_id = uuid.uuid4()
 
-        for idx, row in enumerate(rows, start=2):
-            try:
-                record = self._create_record(row, fiscal_year, detected_module)
-                if record:
-                    self.session.add(record)
-                    imported += 1
-                else:
+        try:
+            for idx, row in enumerate(itertools.chain(head, rows), start=2):
+                processed += 1
+                try:
+                    values = self._record_values(row, fiscal_year, detected_module, columns)
+                except Exception as e:
+                    error_count += 1
+                    if len(errors) < 10:  # Limit errors to first 10
+                        errors.append(f"Row {idx}: {e!s}")
                     skipped += 1
-            except Exception as e:
-                errors.append(f"Row {idx}: {e!s}")
-                skipped += 1
+                    continue
+                if values is None:
+                    skipped += 1
+                    continue
 
-        # Commit transaction
-        try:
+                values["import_batch_id"] = import_batch_id
+                batch.append(values)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    imported += await self._insert_batch(batch)
+                    batch = []
+                    self._report_progress(processed, import_batch_id, on_progress)
+
+            if batch:
+                imported += await self._insert_batch(batch)
+            self._report_progress(processed, import_batch_id, on_progress)
+
+            await self.refresh_comparison_cube(fiscal_year, detected_module)
+
+            # Commit transaction
             await self.session.commit()
         except Exception as e:
             await self.session.rollback()
@@ -300,16 +411,21 @@ class HistoricalImportService:
                 status=ImportResultStatus.ERROR,
                 imported_count=0,
                 updated_count=0,
-                skipped_count=len(rows),
+                skipped_count=processed,
                 error_count=1,
                 message=f"Database error: {e!s}",
                 errors=[str(e)],
             )
 
+        invalidate_historical_comparison_cache()
+        if detected_module == ImportModule.ENROLLMENT:
+            # Calibration windows reuse already-seen school years; this one changed
+            invalidate_calibration_cache(school_years=[fiscal_year_to_school_year(fiscal_year)])
+
         # Determine status
-        if imported > 0 and len(errors) == 0:
+        if imported > 0 and error_count == 0:
             status = ImportResultStatus.SUCCESS
-        elif imported > 0 and len(errors) > 0:
+        elif imported > 0 and error_count > 0:
             status = ImportResultStatus.PARTIAL
         else:
             status = ImportResultStatus.ERROR
@@ -321,9 +437,9 @@ class HistoricalImportService:
             imported_count=imported,
             updated_count=updated_count,
             skipped_count=skipped,
-            error_count=len(errors),
+            error_count=error_count,
             message=f"Successfully imported {imported} records",
-            errors=errors[:10],  # Limit errors to first 10
+            errors=errors,
         )
 
     async def get_import_history(
@@ -378,38 +494,77 @@ class HistoricalImportService:
             for row in rows
         ]
 
-    def _parse_csv(self, content: bytes) -> list[dict[str, str]]:
-        """Parse CSV file content."""
-        text = content.decode("utf-8-sig")  # Handle BOM
-        reader = csv.DictReader(io.StringIO(text))
-        return [row for row in reader]
+    async def get_historical_rows_keyset(
+        self,
+        fiscal_year: int | None = None,
+        module: ImportModule | None = None,
+        cursor: str | None = None,
+        page_size: int = 50,
+        estimate_total: bool = False,
+    ) -> dict[str, Any]:
+        """
+        List imported historical rows with keyset (cursor) pagination.
 
-    def _parse_excel(self, content: bytes) -> list[dict[str, str]]:
-        """Parse Excel file content."""
-        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
-        sheet = workbook.active
+        Args:
+            fiscal_year: Optional filter by year
+            module: Optional filter by module
+            cursor: Cursor from the previous page (None for the first page)
+            page_size: Records per page
+            estimate_total: Whether to include an estimated total (unfiltered
+                lists only)
 
-        if not sheet:
-            return []
+        Returns:
+            Keyset page with items, page_size, next_cursor, has_more, total
+
+        Raises:
+            ValidationError: If the cursor is malformed
+        """
+        filters: dict[str, Any] = {}
+        if fiscal_year:
+            filters["fiscal_year"] = fiscal_year
+        if module:
+            filters["module_code"] = HistoricalModuleCode(module.value)
+
+        return await BaseService(HistoricalActuals, self.session).get_keyset_paginated(
+            cursor=cursor,
+            page_size=page_size,
+            filters=filters,
+            order_by="created_at",
+            estimate_total=estimate_total,
+        )
 
-        rows: list[dict[str, str]] = []
-        headers: list[str] = []
+    def _iter_csv_rows(self, content: bytes) -> Iterator[dict[str, str]]:
+        """Yield CSV rows one at a time."""
+        text = content.decode("utf-8-sig")  # Handle BOM
+        yield from csv.DictReader(io.StringIO(text))
 
-        for idx, row in enumerate(sheet.iter_rows(values_only=True)):
-            if idx == 0:
-                # First row is headers
-                headers = [str(cell).lower().strip() if cell else f"col_{i}" for i, cell in enumerate(row)]
-            else:
-                # Data rows
+    def _iter_excel_rows(self, content: bytes) -> Iterator[dict[str, str]]:
+        """Yield rows of the active sheet one at a time from a read-only workbook."""
+        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            if not sheet:
+                return
+
+            sheet_rows = sheet.iter_rows(values_only=True)
+            header_row = next(sheet_rows, None)
+            if header_row is None:
+                return
+
+            # First row is headers
+            headers = [
+                str(cell).lower().strip() if cell else f"col_{i}"
+                for i, cell in enumerate(header_row)
+            ]
+            for row in sheet_rows:
                 row_dict = {
-                    headers[i]: str(cell) if cell is not None else ""
-                    for i, cell in enumerate(row)
-                    if i < len(headers)
+                    header: str(cell) if cell is not None else ""
+                    for header, cell in zip(headers, row, strict=False)
                 }
                 if any(row_dict.values()):  # Skip empty rows
-                    rows.append(row_dict)
-
-        return rows
+                    yield row_dict
+        finally:
+            workbook.close()
 
     def _detect_module(self, rows: list[dict[str, str]]) -> ImportModule:
         """Detect module type from column names."""
@@ -430,8 +585,9 @@ class HistoricalImportService:
         # Check for financial columns (revenue/costs)
         if any(c in lower_columns for c in ["account_code", "account"]):
             # Determine if revenue or costs based on account code prefix
+            financial_columns = ColumnMap(columns, FINANCIAL_COLUMNS)
             for row in rows[:5]:
-                account = self._get_column_value(row, FINANCIAL_COLUMNS["account_code"])
+                account = financial_columns.get(row, "account_code")
                 if account and account.startswith("7"):
                     return ImportModule.REVENUE
                 if account and account.startswith("6"):
@@ -441,38 +597,39 @@ class HistoricalImportService:
 
         return ImportModule.ENROLLMENT
 
-    def _get_column_value(self, row: dict[str, str], possible_names: list[str]) -> str | None:
-        """Get value from row using possible column names."""
-        for name in possible_names:
-            for key in row.keys():
-                if key.lower().strip() == name.lower():
-                    return row[key].strip() if row[key] else None
-        return None
-
+    @staticmethod
     def _validate_record(
-        self,
         row: dict[str, str],
         row_number: int,
         fiscal_year: int,
         module: ImportModule,
+        columns: ColumnMap | None = None,
     ) -> ImportRecordResult:
         """Validate a single import record."""
+        columns = columns or ColumnMap(row.keys(), get_module_columns(module))
         if module == ImportModule.ENROLLMENT:
-            return self._validate_enrollment_record(row, row_number, fiscal_year)
+            return HistoricalImportService._validate_enrollment_record(
+                row, row_number, fiscal_year, columns
+            )
         elif module == ImportModule.DHG:
-            return self._validate_dhg_record(row, row_number, fiscal_year)
+            return HistoricalImportService._validate_dhg_record(
+                row, row_number, fiscal_year, columns
+            )
         else:
-            return self._validate_financial_record(row, row_number, fiscal_year, module)
+            return HistoricalImportService._validate_financial_record(
+                row, row_number, fiscal_year, module, columns
+            )
 
+    @staticmethod
     def _validate_enrollment_record(
-        self,
         row: dict[str, str],
         row_number: int,
         fiscal_year: int,
+        columns: ColumnMap,
     ) -> ImportRecordResult:
         """Validate enrollment record."""
-        level_code = self._get_column_value(row, ENROLLMENT_COLUMNS["level_code"])
-        count_str = self._get_column_value(row, ENROLLMENT_COLUMNS["student_count"])
+        level_code = columns.get(row, "level_code")
+        count_str = columns.get(row, "student_count")
 
         if not level_code:
             return ImportRecordResult(
@@ -509,15 +666,16 @@ class HistoricalImportService:
             value=count,
         )
 
+    @staticmethod
     def _validate_dhg_record(
-        self,
         row: dict[str, str],
         row_number: int,
         fiscal_year: int,
+        columns: ColumnMap,
     ) -> ImportRecordResult:
         """Validate DHG record."""
-        subject_code = self._get_column_value(row, DHG_COLUMNS["subject_code"])
-        fte_str = self._get_column_value(row, DHG_COLUMNS["fte_count"])
+        subject_code = columns.get(row, "subject_code")
+        fte_str = columns.get(row, "fte_count")
 
         if not subject_code:
             return ImportRecordResult(
@@ -554,16 +712,17 @@ class HistoricalImportService:
             value=fte,
         )
 
+    @staticmethod
     def _validate_financial_record(
-        self,
         row: dict[str, str],
         row_number: int,
         fiscal_year: int,
         module: ImportModule,
+        columns: ColumnMap,
     ) -> ImportRecordResult:
         """Validate financial (revenue/costs) record."""
-        account_code = self._get_column_value(row, FINANCIAL_COLUMNS["account_code"])
-        amount_str = self._get_column_value(row, FINANCIAL_COLUMNS["annual_amount"])
+        account_code = columns.get(row, "account_code")
+        amount_str = columns.get(row, "annual_amount")
 
         if not account_code:
             return ImportRecordResult(
@@ -610,68 +769,102 @@ class HistoricalImportService:
             message=message,
         )
 
-    def _create_record(
+    def _record_values(
         self,
         row: dict[str, str],
         fiscal_year: int,
         module: ImportModule,
-    ) -> HistoricalActuals | None:
-        """Create HistoricalActuals record from row data."""
+        columns: ColumnMap,
+    ) -> dict[str, Any] | None:
+        """Build HistoricalActuals column values from row data, None if incomplete."""
         if module == ImportModule.ENROLLMENT:
-            level_code = self._get_column_value(row, ENROLLMENT_COLUMNS["level_code"])
-            count_str = self._get_column_value(row, ENROLLMENT_COLUMNS["student_count"])
+            level_code = columns.get(row, "level_code")
+            count_str = columns.get(row, "student_count")
 
             if not level_code or not count_str:
                 return None
 
-            level_name = self._get_column_value(row, ENROLLMENT_COLUMNS["level_name"])
-            return HistoricalActuals(
-                fiscal_year=fiscal_year,
-                module_code=module.value,
-                dimension_type="level",
-                dimension_code=level_code,
-                dimension_name=level_name,
-                annual_count=int(count_str),
-                data_source="manual_upload",
-            )
+            return {
+                "fiscal_year": fiscal_year,
+                "module_code": module.value,
+                "dimension_type": "level",
+                "dimension_code": level_code,
+                "dimension_name": columns.get(row, "level_name"),
+                "annual_count": int(count_str),
+                "data_source": "manual_upload",
+            }
 
         elif module == ImportModule.DHG:
-            subject_code = self._get_column_value(row, DHG_COLUMNS["subject_code"])
-            subject_name = self._get_column_value(row, DHG_COLUMNS["subject_name"])
-            fte_str = self._get_column_value(row, DHG_COLUMNS["fte_count"])
-            hours_str = self._get_column_value(row, DHG_COLUMNS["hours"])
+            subject_code = columns.get(row, "subject_code")
+            fte_str = columns.get(row, "fte_count")
+            hours_str = columns.get(row, "hours")
 
             if not subject_code or not fte_str:
                 return None
 
-            return HistoricalActuals(
-                fiscal_year=fiscal_year,
-                module_code=module.value,
-                dimension_type="subject",
-                dimension_code=subject_code,
-                dimension_name=subject_name,
-                annual_fte=Decimal(fte_str),
-                annual_hours=Decimal(hours_str) if hours_str else None,
-                data_source="manual_upload",
-            )
+            return {
+                "fiscal_year": fiscal_year,
+                "module_code": module.value,
+                "dimension_type": "subject",
+                "dimension_code": subject_code,
+                "dimension_name": columns.get(row, "subject_name"),
+                "annual_fte": Decimal(fte_str),
+                "annual_hours": Decimal(hours_str) if hours_str else None,
+                "data_source": "manual_upload",
+            }
 
         else:  # Revenue or Costs
-            account_code = self._get_column_value(row, FINANCIAL_COLUMNS["account_code"])
-            account_name = self._get_column_value(row, FINANCIAL_COLUMNS["account_name"])
-            amount_str = self._get_column_value(row, FINANCIAL_COLUMNS["annual_amount"])
+            account_code = columns.get(row, "account_code")
+            amount_str = columns.get(row, "annual_amount")
 
             if not account_code or not amount_str:
                 return None
 
-            return HistoricalActuals(
-                fiscal_year=fiscal_year,
-                module_code=module.value,
-                dimension_type="account_code",
-                dimension_code=account_code,
-                dimension_name=account_name,
-                annual_amount_sar=Decimal(amount_str.replace(",", "")),
-                data_source="manual_upload",
-            )
+            return {
+                "fiscal_year": fiscal_year,
+                "module_code": module.value,
+                "dimension_type": "account_code",
+                "dimension_code": account_code,
+                "dimension_name": columns.get(row, "account_name"),
+                "annual_amount_sar": Decimal(amount_str.replace(",", "")),
+                "data_source": "manual_upload",
+            }
+
+    async def _insert_batch(self, batch: list[dict[str, Any]]) -> int:
+        """Write a batch of rows with a single multi-row INSERT."""
+        await self.session.execute(insert(HistoricalActuals), batch)
+        return len(batch)
+
+    def _report_progress(
+        self,
+        processed: int,
+        import_batch_id: uuid.UUID,
+        on_progress: Callable[[int], None] | None,
+    ) -> None:
+        """Report the number of rows processed so far."""
+        logger.info(
+            "Historical import progress",
+            import_batch_id=str(import_batch_id),
+            rows_processed=processed,
+        )
+        if on_progress is not None:
+            on_progress(processed)
+
+    async def refresh_comparison_cube(
+        self,
+        fiscal_year: int,
+        module: ImportModule | None,
+    ) -> None:
+        """
+        Rebuild the comparison cube rows fed by a year/module (all modules if None).
+
+        Does not commit; call invalidate_historical_comparison_cache once the
+        caller has committed.
+        """
+        await HistoricalComparisonService(self.session).refresh_cube(
+            module_codes=[HistoricalModuleCode(module.value)] if module else None,
+            fiscal_years=[fiscal_year],
+        )
 
     async def _delete_existing(
         self,
@@ -4,30 +4,88 @@ Impact Calculator Service - Real-time impact preview calculations
 Calculates the cascading impact of proposed budget changes before they are saved.
 This allows users to see the downstream effects of their edits in real-time.
 
+The proposed change is applied to a copy of the version's cached in-memory
+snapshot (see BudgetModelService.get_cached_model) and the real class
+structure, DHG, revenue and cost engines are rerun on it. Nothing is written
+and, once the snapshot is cached, nothing is read from the database, so the
+deltas are exact and a preview costs a single engine pass.
+
 Key Metrics Calculated:
 - FTE Change: Impact on teacher Full-Time Equivalents
 - Cost Impact: Total change in personnel + operating costs
 - Revenue Impact: Change in expected revenue
 - Margin Impact: Net impact on operating margin percentage
+
+Sensitivity analysis perturbs several drivers (enrollment, fees, class size
+ceilings, salaries) by low/high deltas against the same cached snapshot and
+ranks them by their swing on the net result (tornado chart). The scenarios
+run off the event loop, in the shared process pool for large batches.
+
+Goal seek solves for the value of one driver that makes the net result,
+the operating margin or the staff cost ratio reach a target, using the
+bracketed solver of the budget model engine on the same snapshot.
 """
 
 from __future__ import annotations
 
-from decimal import Decimal
+import asyncio
+import time
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal, InvalidOperation
 from typing import Any
 from uuid import UUID
 
 from pydantic import BaseModel
-from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.planning import (
-    ClassStructure,
-    DHGTeacherRequirement,
-    EnrollmentPlan,
-    PersonnelCostPlan,
-    RevenuePlan,
+from app.engine.budget_model import (
+    BudgetModelInput,
+    BudgetModelResult,
+    ClassSizeInput,
+    EnrollmentInput,
+    GoalSeekIteration,
+    calculate_budget_model,
+    calculate_class_structures,
+    calculate_subject_hours,
+    calculate_teacher_requirements,
+    goal_seek,
 )
+from app.engine.kpi import calculate_margin_percentage, calculate_staff_cost_ratio
+from app.services.budget_model_service import BudgetModelService
+from app.services.exceptions import BusinessRuleError, ValidationError
+from app.services.parallel_validation import (
+    get_validation_pool,
+    iter_chunks,
+    shutdown_validation_pool,
+)
+
+# DHG fields that change hours per class rather than the FTE requirement
+DHG_HOURS_FIELDS = frozenset({"hours_per_week", "hours_per_class_per_week"})
+
+# Sensitivity drivers and the unit of their deltas
+SENSITIVITY_DRIVER_UNITS: dict[str, str] = {
+    "enrollment": "students",
+    "fee": "%",
+    "class_size": "students",
+    "salary": "%",
+}
+
+# Drivers that only take whole values (students)
+DISCRETE_DRIVERS = frozenset({"enrollment", "class_size"})
+
+# Scenarios sent to a pool worker per task
+SENSITIVITY_CHUNK_SIZE = 16
+
+# Below this many scenarios the batch runs in a worker thread (pool round
+# trips, which pickle the version drivers with every chunk, would cost more)
+PARALLEL_SENSITIVITY_MIN_SCENARIOS = 64
+
+# Goal-seek metrics with their default tolerance
+GOAL_SEEK_TOLERANCES: dict[str, Decimal] = {
+    "net_result": Decimal("1"),
+    "margin_pct": Decimal("0.01"),
+    "staff_cost_ratio": Decimal("0.01"),
+}
 
 
 class ImpactMetrics(BaseModel):
@@ -50,6 +108,7 @@ class ImpactMetrics(BaseModel):
     margin_proposed_pct: float = 0.0
 
     affected_steps: list[str] = []
+    warnings: list[str] = []
 
     class Config:
         """Pydantic configuration."""
@@ -68,11 +127,105 @@ class ProposedChange(BaseModel):
     new_value: Any  # The proposed new value
 
 
+class SensitivityDriver(BaseModel):
+    """Driver perturbed by a sensitivity analysis."""
+
+    driver_type: str  # 'enrollment', 'fee', 'class_size', 'salary'
+    dimension_id: str | None = None  # level (or cycle) UUID; teacher category for salary
+    label: str | None = None
+    low_delta: Decimal
+    high_delta: Decimal
+
+
+class TornadoBar(BaseModel):
+    """Net result of one driver at its low and high deltas."""
+
+    driver_type: str
+    dimension_id: str | None = None
+    label: str
+    unit: str
+    low_delta: Decimal
+    high_delta: Decimal
+    low_net_result_sar: Decimal
+    high_net_result_sar: Decimal
+    low_impact_sar: Decimal
+    high_impact_sar: Decimal
+    swing_sar: Decimal
+    rank: int = 0
+    warnings: list[str] = []
+
+
+class SensitivityResult(BaseModel):
+    """Ranked tornado dataset for a budget version."""
+
+    version_id: UUID
+    baseline_net_result_sar: Decimal
+    baseline_margin_pct: float
+    scenario_count: int
+    calculation_ms: float
+    bars: list[TornadoBar] = []
+
+
+class GoalSeekResult(BaseModel):
+    """Driver delta reaching a target metric, with convergence diagnostics."""
+
+    version_id: UUID
+    driver_type: str
+    dimension_id: str | None = None
+    unit: str
+    target_metric: str
+    target_value: Decimal
+    baseline_metric_value: Decimal
+    solved_delta: Decimal
+    achieved_metric_value: Decimal
+    residual: Decimal
+    converged: bool
+    termination: str
+    iterations: int
+    evaluations: int
+    calculation_ms: float
+    history: list[GoalSeekIteration] = []
+
+
+def _parse_uuid(value: str | None) -> UUID | None:
+    """Parse a dimension id, None when missing or malformed."""
+    if not value:
+        return None
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _parse_int(value: Any) -> int | None:
+    """Parse an integer proposed value, None when not numeric."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def baseline_subject_fte(result: BudgetModelResult) -> dict[UUID, Decimal]:
+    """Simple FTE requirement per subject of an engine result."""
+    return {req.subject_id: req.simple_fte for req in result.teacher_requirements}
+
+
+def _parse_decimal(value: Any) -> Decimal | None:
+    """Parse a decimal proposed value, None when not numeric."""
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
 class ImpactCalculatorService:
     """Service for calculating real-time impact of proposed budget changes."""
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+        self.budget_model_service = BudgetModelService(session)
 
     async def calculate_impact(
         self,
@@ -83,6 +236,7 @@ class ImpactCalculatorService:
         Calculate the cascading impact of a proposed change.
 
         This is a preview-only calculation - no database changes are made.
+        A change whose value or dimension cannot be applied has zero impact.
 
         Args:
             version_id: Budget version UUID
@@ -90,307 +244,698 @@ class ImpactCalculatorService:
 
         Returns:
             ImpactMetrics showing FTE, cost, revenue, and margin impacts
+
+        Raises:
+            NotFoundError: If budget version not found
         """
-        metrics = ImpactMetrics()
+        cached = await self.budget_model_service.get_cached_model(version_id)
+        current = cached.baseline
 
-        # Get current totals
-        current = await self._get_current_totals(version_id)
+        scenario = self._apply_change(cached.model_input, current, proposed_change)
+        proposed = current if scenario is None else calculate_budget_model(scenario)
 
-        # Calculate proposed totals based on the change type
-        if proposed_change.step_id == "enrollment":
-            proposed = await self._calculate_enrollment_impact(
-                version_id, proposed_change, current
-            )
-        elif proposed_change.step_id == "class_structure":
-            proposed = await self._calculate_class_structure_impact(
-                version_id, proposed_change, current
-            )
-        elif proposed_change.step_id == "dhg":
-            proposed = await self._calculate_dhg_impact(
-                version_id, proposed_change, current
-            )
-        elif proposed_change.step_id == "revenue":
-            proposed = await self._calculate_revenue_impact(
-                version_id, proposed_change, current
-            )
-        elif proposed_change.step_id == "costs":
-            proposed = await self._calculate_costs_impact(
-                version_id, proposed_change, current
-            )
-        else:
-            # Unknown step type - return zero impact
-            proposed = current
+        metrics = ImpactMetrics()
 
         # Calculate deltas
-        metrics.fte_current = current["fte"]
-        metrics.fte_proposed = proposed["fte"]
-        metrics.fte_change = proposed["fte"] - current["fte"]
+        metrics.fte_current = float(current.total_teacher_fte)
+        metrics.fte_proposed = float(proposed.total_teacher_fte)
+        metrics.fte_change = float(proposed.total_teacher_fte - current.total_teacher_fte)
 
-        metrics.cost_current_sar = current["costs"]
-        metrics.cost_proposed_sar = proposed["costs"]
-        metrics.cost_impact_sar = proposed["costs"] - current["costs"]
+        metrics.cost_current_sar = current.total_costs
+        metrics.cost_proposed_sar = proposed.total_costs
+        metrics.cost_impact_sar = proposed.total_costs - current.total_costs
 
-        metrics.revenue_current_sar = current["revenue"]
-        metrics.revenue_proposed_sar = proposed["revenue"]
-        metrics.revenue_impact_sar = proposed["revenue"] - current["revenue"]
+        metrics.revenue_current_sar = current.total_revenue
+        metrics.revenue_proposed_sar = proposed.total_revenue
+        metrics.revenue_impact_sar = proposed.total_revenue - current.total_revenue
 
         # Calculate margin impact
-        if current["revenue"] > 0:
-            metrics.margin_current_pct = float(
-                (current["revenue"] - current["costs"]) / current["revenue"] * 100
-            )
-        if proposed["revenue"] > 0:
-            metrics.margin_proposed_pct = float(
-                (proposed["revenue"] - proposed["costs"]) / proposed["revenue"] * 100
-            )
+        metrics.margin_current_pct = self._margin_pct(current)
+        metrics.margin_proposed_pct = self._margin_pct(proposed)
         metrics.margin_impact_pct = metrics.margin_proposed_pct - metrics.margin_current_pct
 
         # Determine affected steps
         metrics.affected_steps = self._get_affected_steps(proposed_change.step_id)
+        metrics.warnings = [violation.message for violation in proposed.violations]
 
         return metrics
 
-    async def _get_current_totals(self, version_id: UUID) -> dict[str, Any]:
-        """Get current FTE, costs, and revenue totals for a budget version."""
-        # Get total FTE from DHG
-        fte_result = await self.session.execute(
-            select(func.sum(DHGTeacherRequirement.simple_fte)).where(
-                DHGTeacherRequirement.budget_version_id == version_id,
-                DHGTeacherRequirement.deleted_at.is_(None),
-            )
-        )
-        total_fte = fte_result.scalar() or 0.0
+    async def calculate_sensitivity(
+        self,
+        version_id: UUID,
+        drivers: list[SensitivityDriver],
+    ) -> SensitivityResult:
+        """
+        Rank drivers by their impact on the net result (tornado analysis).
 
-        # Get total costs from personnel cost plans
-        costs_result = await self.session.execute(
-            select(func.sum(PersonnelCostPlan.total_cost_sar)).where(
-                PersonnelCostPlan.budget_version_id == version_id,
-                PersonnelCostPlan.deleted_at.is_(None),
-            )
-        )
-        total_costs = costs_result.scalar() or Decimal("0")
+        Every driver is evaluated at its low and high delta in one batch
+        against the same cached snapshot, so the version is loaded at most
+        once and identical perturbations are calculated only once. The batch
+        runs off the event loop (see _evaluate_scenarios).
 
-        # Get total revenue
-        revenue_result = await self.session.execute(
-            select(func.sum(RevenuePlan.amount_sar)).where(
-                RevenuePlan.budget_version_id == version_id,
-                RevenuePlan.deleted_at.is_(None),
+        Args:
+            version_id: Budget version UUID
+            drivers: Drivers with their low/high deltas
+
+        Returns:
+            SensitivityResult with bars ranked by descending swing
+
+        Raises:
+            NotFoundError: If budget version not found
+            ValidationError: If a driver type or dimension is invalid
+        """
+        if not drivers:
+            raise ValidationError("At least one sensitivity driver is required", field="drivers")
+        for driver in drivers:
+            self._driver_target(driver.driver_type, driver.dimension_id)
+
+        started = time.perf_counter()
+        cached = await self.budget_model_service.get_cached_model(version_id)
+        baseline = cached.baseline
+
+        # Distinct perturbations, each calculated once; a zero delta is the baseline
+        perturbations = list(
+            dict.fromkeys(
+                (driver.driver_type, driver.dimension_id, delta)
+                for driver in drivers
+                for delta in (driver.low_delta, driver.high_delta)
+                if delta != 0
             )
         )
-        total_revenue = revenue_result.scalar() or Decimal("0")
+        results = await self._evaluate_scenarios(
+            cached.model_input, baseline_subject_fte(baseline), perturbations
+        )
+        scenarios = dict(zip(perturbations, results, strict=True))
+
+        def evaluate(driver: SensitivityDriver, delta: Decimal) -> BudgetModelResult:
+            if delta == 0:
+                return baseline
+            return scenarios[(driver.driver_type, driver.dimension_id, delta)]
+
+        bars: list[TornadoBar] = []
+        for driver in drivers:
+            low = evaluate(driver, driver.low_delta)
+            high = evaluate(driver, driver.high_delta)
+            low_impact = low.net_result - baseline.net_result
+            high_impact = high.net_result - baseline.net_result
+            bars.append(
+                TornadoBar(
+                    driver_type=driver.driver_type,
+                    dimension_id=driver.dimension_id,
+                    label=driver.label or driver.driver_type,
+                    unit=SENSITIVITY_DRIVER_UNITS[driver.driver_type],
+                    low_delta=driver.low_delta,
+                    high_delta=driver.high_delta,
+                    low_net_result_sar=low.net_result,
+                    high_net_result_sar=high.net_result,
+                    low_impact_sar=low_impact,
+                    high_impact_sar=high_impact,
+                    swing_sar=abs(high_impact - low_impact),
+                    warnings=sorted(
+                        {v.message for v in low.violations + high.violations}
+                        - {v.message for v in baseline.violations}
+                    ),
+                )
+            )
 
-        return {
-            "fte": float(total_fte),
-            "costs": Decimal(str(total_costs)),
-            "revenue": Decimal(str(total_revenue)),
-        }
+        bars.sort(key=lambda bar: bar.swing_sar, reverse=True)
+        for rank, bar in enumerate(bars, start=1):
+            bar.rank = rank
+
+        return SensitivityResult(
+            version_id=version_id,
+            baseline_net_result_sar=baseline.net_result,
+            baseline_margin_pct=self._margin_pct(baseline),
+            scenario_count=len(perturbations),
+            calculation_ms=round((time.perf_counter() - started) * 1000, 2),
+            bars=bars,
+        )
 
-    async def _calculate_enrollment_impact(
-        self,
-        version_id: UUID,
-        change: ProposedChange,
-        current: dict[str, Any],
-    ) -> dict[str, Any]:
+    @staticmethod
+    async def _evaluate_scenarios(
+        model_input: BudgetModelInput,
+        baseline_fte: dict[UUID, Decimal],
+        perturbations: list[tuple[str, str | None, Decimal]],
+    ) -> list[BudgetModelResult]:
         """
-        Calculate impact of enrollment change.
+        Run the engine for a batch of driver perturbations off the event loop.
 
-        Enrollment changes cascade to:
-        - Class structure (more students = more classes)
-        - DHG hours (more classes = more teaching hours)
-        - Personnel costs (more FTE = more salary costs)
-        - Revenue (more students = more tuition)
+        Small batches run in one worker thread; large ones are split into
+        chunks calculated in parallel on the shared process pool.
+
+        Returns:
+            Engine results, in perturbation order
         """
-        # Get current enrollment for the level
-        level_id = change.dimension_id
-
-        # Get current student count for this level
-        enrollment_result = await self.session.execute(
-            select(EnrollmentPlan.student_count).where(
-                EnrollmentPlan.budget_version_id == version_id,
-                EnrollmentPlan.level_id == level_id,
-                EnrollmentPlan.deleted_at.is_(None),
+        if len(perturbations) < PARALLEL_SENSITIVITY_MIN_SCENARIOS:
+            return await asyncio.to_thread(
+                evaluate_scenario_chunk, perturbations, model_input, baseline_fte
             )
-        )
-        current_students = enrollment_result.scalar() or 0
 
-        # Calculate change
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(
+                get_validation_pool(), evaluate_scenario_chunk, chunk, model_input, baseline_fte
+            )
+            for chunk in iter_chunks(perturbations, SENSITIVITY_CHUNK_SIZE)
+        ]
         try:
-            new_students = int(change.new_value)
-        except (ValueError, TypeError):
-            new_students = current_students
-
-        student_delta = new_students - current_students
-
-        # Simple estimation rules (can be refined based on actual business logic):
-        # - Average tuition per student: ~45,000 SAR/year
-        # - Students per FTE: ~15 students
-        # - Cost per FTE: ~250,000 SAR/year
-
-        avg_tuition = Decimal("45000")
-        students_per_fte = 15
-        cost_per_fte = Decimal("250000")
-
-        # Calculate impacts
-        fte_delta = student_delta / students_per_fte
-        revenue_delta = Decimal(str(student_delta)) * avg_tuition
-        cost_delta = Decimal(str(fte_delta)) * cost_per_fte
-
-        return {
-            "fte": current["fte"] + fte_delta,
-            "costs": current["costs"] + cost_delta,
-            "revenue": current["revenue"] + revenue_delta,
-        }
-
-    async def _calculate_class_structure_impact(
-        self,
-        version_id: UUID,
-        change: ProposedChange,
-        current: dict[str, Any],
-    ) -> dict[str, Any]:
+            chunk_results = await asyncio.gather(*futures)
+        except BrokenProcessPool:
+            # A worker died: start a fresh pool for the next batch
+            shutdown_validation_pool()
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
+        return [result for chunk_result in chunk_results for result in chunk_result]
+
+    @staticmethod
+    def _driver_target(driver_type: str, dimension_id: str | None) -> UUID | None:
         """
-        Calculate impact of class structure change.
+        Validate a sensitivity driver and parse its dimension.
 
-        Class structure changes cascade to:
-        - DHG hours (more classes = more teaching hours)
-        - Personnel costs (more hours = more FTE)
+        Raises:
+            ValidationError: If the driver type or dimension is invalid
         """
-        # Get current class count for this level
-        level_id = change.dimension_id
-
-        class_result = await self.session.execute(
-            select(ClassStructure.number_of_classes).where(
-                ClassStructure.budget_version_id == version_id,
-                ClassStructure.level_id == level_id,
-                ClassStructure.deleted_at.is_(None),
+        if driver_type not in SENSITIVITY_DRIVER_UNITS:
+            raise ValidationError(
+                f"Unknown sensitivity driver '{driver_type}'",
+                field="driver_type",
+                details={"allowed": list(SENSITIVITY_DRIVER_UNITS)},
             )
-        )
-        current_classes = class_result.scalar() or 0
 
-        try:
-            new_classes = int(change.new_value)
-        except (ValueError, TypeError):
-            new_classes = current_classes
+        target_id = _parse_uuid(dimension_id)
+        if dimension_id and target_id is None:
+            raise ValidationError(
+                f"Invalid dimension id '{dimension_id}'", field="dimension_id"
+            )
+        if driver_type == "enrollment" and target_id is None:
+            raise ValidationError(
+                "Enrollment drivers require a level dimension_id", field="dimension_id"
+            )
+        return target_id
+
+    @staticmethod
+    def apply_driver_delta(
+        model_input: BudgetModelInput,
+        driver_type: str,
+        dimension_id: str | None,
+        delta: Decimal,
+        baseline_fte: dict[UUID, Decimal] | None = None,
+    ) -> BudgetModelInput:
+        """
+        Build the scenario input for a driver moved by a delta.
+
+        Deltas are in students for enrollment and class size drivers and in
+        percent for fee and salary drivers. Without a dimension the delta
+        applies to every level (fees, class sizes) or teacher category
+        (salaries); enrollment deltas always target one level. Enrollment and
+        class size deltas also scale the teacher allocations to the new FTE
+        requirement, so personnel costs follow the class count.
 
-        class_delta = new_classes - current_classes
+        Args:
+            model_input: Cached engine input (never mutated)
+            driver_type: 'enrollment', 'fee', 'class_size' or 'salary'
+            dimension_id: Level, cycle or teacher category UUID
+            delta: Driver change
+            baseline_fte: Subject FTE of model_input (baseline_subject_fte of
+                its result), calculated from model_input when omitted
 
-        # Estimation: ~1.5 FTE per class, ~250,000 SAR per FTE
-        fte_per_class = 1.5
-        cost_per_fte = Decimal("250000")
+        Returns:
+            Scenario engine input
 
-        fte_delta = class_delta * fte_per_class
-        cost_delta = Decimal(str(fte_delta)) * cost_per_fte
+        Raises:
+            ValidationError: If the driver type or dimension is invalid
+        """
+        target_id = ImpactCalculatorService._driver_target(driver_type, dimension_id)
 
-        return {
-            "fte": current["fte"] + fte_delta,
-            "costs": current["costs"] + cost_delta,
-            "revenue": current["revenue"],  # Class changes don't directly affect revenue
-        }
+        if driver_type == "enrollment":
+            current = sum(
+                e.student_count for e in model_input.enrollments if e.level_id == target_id
+            )
+            new_students = max(0, current + int(delta.to_integral_value()))
+            scenario = ImpactCalculatorService._set_level_students(
+                model_input, target_id, new_students
+            )
+            return ImpactCalculatorService._scale_allocations_to_fte(
+                model_input, scenario, baseline_fte
+            )
 
-    async def _calculate_dhg_impact(
+        if driver_type == "class_size":
+            scenario = ImpactCalculatorService._shift_class_sizes(
+                model_input, target_id, int(delta.to_integral_value())
+            )
+            return ImpactCalculatorService._scale_allocations_to_fte(
+                model_input, scenario, baseline_fte
+            )
+
+        factor = Decimal("1") + delta / Decimal("100")
+        if driver_type == "fee":
+            fees = [
+                fee.model_copy(update={"amount_sar": fee.amount_sar * factor})
+                if target_id is None or fee.level_id == target_id
+                else fee
+                for fee in model_input.fees
+            ]
+            return model_input.model_copy(update={"fees": fees})
+
+        teacher_costs = [
+            param.model_copy(
+                update={
+                    "avg_salary_sar": param.avg_salary_sar * factor
+                    if param.avg_salary_sar is not None
+                    else None,
+                    "prrd_contribution_eur": param.prrd_contribution_eur * factor
+                    if param.prrd_contribution_eur is not None
+                    else None,
+                    "benefits_allowance_sar": param.benefits_allowance_sar * factor,
+                }
+            )
+            if target_id is None or param.category_id == target_id
+            else param
+            for param in model_input.teacher_costs
+        ]
+        return model_input.model_copy(update={"teacher_costs": teacher_costs})
+
+    async def goal_seek(
         self,
         version_id: UUID,
-        change: ProposedChange,
-        current: dict[str, Any],
-    ) -> dict[str, Any]:
+        driver_type: str,
+        target_metric: str,
+        target_value: Decimal,
+        lower_delta: Decimal,
+        upper_delta: Decimal,
+        dimension_id: str | None = None,
+        tolerance: Decimal | None = None,
+        max_iterations: int = 50,
+    ) -> GoalSeekResult:
         """
-        Calculate impact of DHG (workforce) change.
+        Solve for the driver delta that makes a metric reach a target.
+
+        Each solver evaluation reruns the cascade in memory on the cached
+        snapshot; the margin and staff cost ratio come from the KPI engine.
+
+        Args:
+            version_id: Budget version UUID
+            driver_type: 'enrollment', 'fee', 'class_size' or 'salary'
+            target_metric: 'net_result', 'margin_pct' or 'staff_cost_ratio'
+            target_value: Metric value to reach
+            lower_delta: Lower bound of the driver delta
+            upper_delta: Upper bound of the driver delta
+            dimension_id: Level, cycle or teacher category UUID
+            tolerance: Accepted distance to the target (metric default if None)
+            max_iterations: Maximum number of solver iterations
+
+        Returns:
+            GoalSeekResult with the solved delta and solver diagnostics
 
-        DHG changes cascade to:
-        - Personnel costs
+        Raises:
+            NotFoundError: If budget version not found
+            ValidationError: If the metric, driver or bracket is invalid
+            BusinessRuleError: If the target is outside the bracket or the
+                metric is undefined (e.g., no revenue)
         """
-        # For DHG changes, we're typically changing FTE directly
+        if target_metric not in GOAL_SEEK_TOLERANCES:
+            raise ValidationError(
+                f"Unknown goal-seek metric '{target_metric}'",
+                field="target_metric",
+                details={"allowed": list(GOAL_SEEK_TOLERANCES)},
+            )
+        if lower_delta >= upper_delta:
+            raise ValidationError(
+                "lower_delta must be below upper_delta", field="lower_delta"
+            )
+
+        if tolerance is None:
+            tolerance = GOAL_SEEK_TOLERANCES[target_metric]
+
+        started = time.perf_counter()
+        cached = await self.budget_model_service.get_cached_model(version_id)
+        baseline_fte = baseline_subject_fte(cached.baseline)
+
+        def evaluate(delta: float) -> float:
+            scenario = self.apply_driver_delta(
+                cached.model_input, driver_type, dimension_id, Decimal(str(delta)), baseline_fte
+            )
+            return float(self._goal_metric(calculate_budget_model(scenario), target_metric))
+
+        baseline_value = self._goal_metric(cached.baseline, target_metric)
         try:
-            new_fte = float(change.new_value)
-        except (ValueError, TypeError):
-            return current
-
-        # Get current FTE for this subject/level
-        subject_id = change.dimension_id
-
-        dhg_result = await self.session.execute(
-            select(DHGTeacherRequirement.simple_fte).where(
-                DHGTeacherRequirement.budget_version_id == version_id,
-                DHGTeacherRequirement.subject_id == subject_id,
-                DHGTeacherRequirement.deleted_at.is_(None),
+            solution = goal_seek(
+                evaluate,
+                target=float(target_value),
+                lower=float(lower_delta),
+                upper=float(upper_delta),
+                tolerance=float(tolerance),
+                max_iterations=max_iterations,
+                step=1.0 if driver_type in DISCRETE_DRIVERS else None,
             )
+        except ValueError as e:
+            raise BusinessRuleError(
+                "GOAL_NOT_BRACKETED",
+                str(e),
+                details={
+                    "target_metric": target_metric,
+                    "target_value": str(target_value),
+                    "lower_delta": str(lower_delta),
+                    "upper_delta": str(upper_delta),
+                },
+            ) from e
+
+        return GoalSeekResult(
+            version_id=version_id,
+            driver_type=driver_type,
+            dimension_id=dimension_id,
+            unit=SENSITIVITY_DRIVER_UNITS[driver_type],
+            target_metric=target_metric,
+            target_value=target_value,
+            baseline_metric_value=baseline_value,
+            solved_delta=Decimal(str(solution.solved_value)),
+            achieved_metric_value=Decimal(str(solution.metric_value)),
+            residual=Decimal(str(solution.residual)),
+            converged=solution.converged,
+            termination=solution.termination,
+            iterations=solution.iterations,
+            evaluations=solution.evaluations,
+            calculation_ms=round((time.perf_counter() - started) * 1000, 2),
+            history=solution.history,
         )
-        current_fte = dhg_result.scalar() or 0.0
 
-        fte_delta = new_fte - current_fte
+    @staticmethod
+    def _goal_metric(result: BudgetModelResult, target_metric: str) -> Decimal:
+        """Value of a goal-seek metric for an engine result."""
+        if target_metric == "net_result":
+            return result.net_result
+        try:
+            if target_metric == "margin_pct":
+                return calculate_margin_percentage(
+                    result.total_revenue, result.total_costs
+                ).value
+            return calculate_staff_cost_ratio(
+                result.total_personnel_costs, result.total_costs
+            ).value
+        except ValueError as e:
+            raise BusinessRuleError(
+                "GOAL_METRIC_UNDEFINED",
+                f"Cannot evaluate {target_metric}: {e}",
+                details={"target_metric": target_metric},
+            ) from e
+
+    @staticmethod
+    def _shift_class_sizes(
+        model_input: BudgetModelInput,
+        target_id: UUID | None,
+        delta: int,
+    ) -> BudgetModelInput:
+        """
+        Move target and maximum class sizes by a number of students.
+
+        A level target that currently inherits its cycle default gets its
+        own level-specific parameters so the rest of the cycle is untouched.
+        """
 
-        # Cost per FTE
-        cost_per_fte = Decimal("250000")
-        cost_delta = Decimal(str(fte_delta)) * cost_per_fte
+        def shifted(param: ClassSizeInput, **update: Any) -> ClassSizeInput:
+            target = max(1, param.target_class_size + delta)
+            return param.model_copy(
+                update={
+                    **update,
+                    "target_class_size": target,
+                    "max_class_size": max(target, param.max_class_size + delta),
+                    "min_class_size": min(param.min_class_size, target),
+                }
+            )
 
-        return {
-            "fte": current["fte"] + fte_delta,
-            "costs": current["costs"] + cost_delta,
-            "revenue": current["revenue"],  # DHG changes don't affect revenue
-        }
+        params = [
+            shifted(param)
+            if target_id is None or target_id in (param.level_id, param.cycle_id)
+            else param
+            for param in model_input.class_size_params
+        ]
+
+        level = next((lv for lv in model_input.levels if lv.level_id == target_id), None)
+        if level is not None and not any(p.level_id == target_id for p in params):
+            cycle_default = next(
+                (
+                    p
+                    for p in model_input.class_size_params
+                    if p.level_id is None and p.cycle_id == level.cycle_id
+                ),
+                None,
+            )
+            if cycle_default is not None:
+                params.append(shifted(cycle_default, level_id=target_id, cycle_id=None))
 
-    async def _calculate_revenue_impact(
-        self,
-        version_id: UUID,
-        change: ProposedChange,
-        current: dict[str, Any],
-    ) -> dict[str, Any]:
-        """Calculate impact of direct revenue change."""
-        try:
-            new_amount = Decimal(str(change.new_value))
-        except (ValueError, TypeError):
-            return current
+        return model_input.model_copy(update={"class_size_params": params})
 
-        # Get current amount for this revenue line
-        account_code = change.dimension_code
+    @staticmethod
+    def _scale_allocations_to_fte(
+        model_input: BudgetModelInput,
+        scenario: BudgetModelInput,
+        baseline_fte: dict[UUID, Decimal] | None = None,
+    ) -> BudgetModelInput:
+        """
+        Scale teacher allocations to the scenario's FTE requirement.
+
+        Personnel costs come from the allocations, not from the DHG
+        requirement: each subject's allocations move in the ratio of its new
+        to current simple FTE (as for DHG FTE changes), allocations without a
+        subject in the ratio of the total requirement. The current FTE is
+        taken from baseline_fte when given (the cached baseline result has
+        it), otherwise calculated from model_input.
+        """
 
-        revenue_result = await self.session.execute(
-            select(RevenuePlan.amount_sar).where(
-                RevenuePlan.budget_version_id == version_id,
-                RevenuePlan.account_code == account_code,
-                RevenuePlan.deleted_at.is_(None),
+        def subject_fte(drivers: BudgetModelInput) -> dict[UUID, Decimal]:
+            class_structures, _violations = calculate_class_structures(drivers)
+            subject_hours = calculate_subject_hours(drivers, class_structures)
+            return {
+                req.subject_id: req.simple_fte
+                for req in calculate_teacher_requirements(drivers, subject_hours)
+            }
+
+        current = baseline_fte if baseline_fte is not None else subject_fte(model_input)
+        new = subject_fte(scenario)
+        current_total = sum(current.values(), Decimal("0"))
+        total_ratio = (
+            sum(new.values(), Decimal("0")) / current_total if current_total else Decimal("1")
+        )
+
+        def ratio(subject_id: UUID | None) -> Decimal:
+            if subject_id is None:
+                return total_ratio
+            current_fte = current.get(subject_id)
+            if not current_fte:
+                return Decimal("1")
+            return new.get(subject_id, Decimal("0")) / current_fte
+
+        allocations = [
+            allocation.model_copy(
+                update={"fte_count": allocation.fte_count * ratio(allocation.subject_id)}
             )
+            for allocation in scenario.allocations
+        ]
+        return scenario.model_copy(update={"allocations": allocations})
+
+    @staticmethod
+    def _margin_pct(result: BudgetModelResult) -> float:
+        """Operating margin percentage of an engine result."""
+        if result.total_revenue <= 0:
+            return 0.0
+        return float(
+            (result.total_revenue - result.total_costs) / result.total_revenue * 100
         )
-        current_amount = revenue_result.scalar() or Decimal("0")
 
-        revenue_delta = new_amount - current_amount
+    def _apply_change(
+        self,
+        model_input: BudgetModelInput,
+        baseline: BudgetModelResult,
+        change: ProposedChange,
+    ) -> BudgetModelInput | None:
+        """
+        Build the scenario input for a proposed change.
 
-        return {
-            "fte": current["fte"],  # Revenue changes don't affect FTE
-            "costs": current["costs"],  # Revenue changes don't affect costs
-            "revenue": current["revenue"] + revenue_delta,
-        }
+        The cached input is never mutated: only the driver lists touched by
+        the change are replaced on a shallow copy.
 
-    async def _calculate_costs_impact(
+        Returns:
+            Scenario input, or None when the change has no effect
+        """
+        if change.step_id == "enrollment":
+            return self._apply_enrollment_change(model_input, baseline, change)
+        if change.step_id == "class_structure":
+            return self._apply_class_structure_change(model_input, baseline, change)
+        if change.step_id == "dhg":
+            return self._apply_dhg_change(model_input, baseline, change)
+        if change.step_id in ("revenue", "costs", "capex"):
+            return self._apply_account_change(model_input, change)
+        # Unknown step type - zero impact
+        return None
+
+    def _apply_enrollment_change(
         self,
-        version_id: UUID,
+        model_input: BudgetModelInput,
+        baseline: BudgetModelResult,
         change: ProposedChange,
-        current: dict[str, Any],
-    ) -> dict[str, Any]:
-        """Calculate impact of direct cost change."""
-        try:
-            new_amount = Decimal(str(change.new_value))
-        except (ValueError, TypeError):
-            return current
+    ) -> BudgetModelInput | None:
+        """
+        Set the total students of a level.
 
-        # Get current amount for this cost line
-        account_code = change.dimension_code
+        The new total is spread over the level's nationalities in proportion
+        to the current mix (largest remainder), so revenue follows the fee
+        grid of each nationality. Enrollment changes cascade to class
+        structure, DHG hours, teacher FTE (and the allocations costing it)
+        and revenue.
+        """
+        level_id = _parse_uuid(change.dimension_id)
+        new_students = _parse_int(change.new_value)
+        if level_id is None or new_students is None or new_students < 0:
+            return None
+        scenario = self._set_level_students(model_input, level_id, new_students)
+        return self._scale_allocations_to_fte(
+            model_input, scenario, baseline_subject_fte(baseline)
+        )
 
-        cost_result = await self.session.execute(
-            select(PersonnelCostPlan.total_cost_sar).where(
-                PersonnelCostPlan.budget_version_id == version_id,
-                PersonnelCostPlan.account_code == account_code,
-                PersonnelCostPlan.deleted_at.is_(None),
+    @staticmethod
+    def _set_level_students(
+        model_input: BudgetModelInput,
+        level_id: UUID,
+        new_students: int,
+    ) -> BudgetModelInput:
+        """Spread a new level total over its nationalities (largest remainder)."""
+        level_rows = [e for e in model_input.enrollments if e.level_id == level_id]
+        other_rows = [e for e in model_input.enrollments if e.level_id != level_id]
+        current_students = sum(e.student_count for e in level_rows)
+
+        if not level_rows:
+            nationality = next(
+                (f.nationality_code for f in model_input.fees if f.level_id == level_id),
+                "OTHER",
             )
+            new_rows = [
+                EnrollmentInput(
+                    level_id=level_id,
+                    nationality_code=nationality,
+                    student_count=new_students,
+                )
+            ]
+        elif current_students == 0:
+            new_rows = [
+                row.model_copy(update={"student_count": new_students if i == 0 else 0})
+                for i, row in enumerate(level_rows)
+            ]
+        else:
+            shares = [
+                (row, new_students * row.student_count / current_students)
+                for row in level_rows
+            ]
+            counts = [int(share) for _row, share in shares]
+            remainder = new_students - sum(counts)
+            by_fraction = sorted(
+                range(len(shares)), key=lambda i: shares[i][1] - counts[i], reverse=True
+            )
+            for i in by_fraction[:remainder]:
+                counts[i] += 1
+            new_rows = [
+                row.model_copy(update={"student_count": count})
+                for (row, _share), count in zip(shares, counts, strict=True)
+            ]
+
+        return model_input.model_copy(update={"enrollments": other_rows + new_rows})
+
+    def _apply_class_structure_change(
+        self,
+        model_input: BudgetModelInput,
+        baseline: BudgetModelResult,
+        change: ProposedChange,
+    ) -> BudgetModelInput | None:
+        """
+        Override the number of classes of a level.
+
+        Class structure changes cascade to DHG hours and teacher FTE, and
+        through the rescaled allocations to personnel costs.
+        """
+        level_id = _parse_uuid(change.dimension_id)
+        new_classes = _parse_int(change.new_value)
+        if level_id is None or new_classes is None:
+            return None
+
+        overrides = {**model_input.class_overrides, level_id: new_classes}
+        scenario = model_input.model_copy(update={"class_overrides": overrides})
+        return self._scale_allocations_to_fte(
+            model_input, scenario, baseline_subject_fte(baseline)
         )
-        current_amount = cost_result.scalar() or Decimal("0")
 
-        cost_delta = new_amount - current_amount
+    def _apply_dhg_change(
+        self,
+        model_input: BudgetModelInput,
+        baseline: BudgetModelResult,
+        change: ProposedChange,
+    ) -> BudgetModelInput | None:
+        """
+        Change the hours or FTE requirement of a subject.
 
-        return {
-            "fte": current["fte"],  # Direct cost changes don't affect FTE
-            "costs": current["costs"] + cost_delta,
-            "revenue": current["revenue"],  # Cost changes don't affect revenue
+        Hours changes update the subject hours matrix (one level when
+        dimension_code is a level code, every level otherwise) and scale the
+        allocations to the new FTE requirement. FTE changes replace the
+        subject requirement and scale its teacher allocations in the same
+        ratio, so personnel costs follow the real cost parameters.
+        """
+        subject_id = _parse_uuid(change.dimension_id)
+        new_value = _parse_decimal(change.new_value)
+        if subject_id is None or new_value is None or new_value < 0:
+            return None
+
+        if change.field_name in DHG_HOURS_FIELDS:
+            level_ids = {
+                level.level_id
+                for level in model_input.levels
+                if level.level_code == change.dimension_code
+            }
+            subject_hours = [
+                entry.model_copy(update={"hours_per_week": new_value})
+                if entry.subject_id == subject_id
+                and (not level_ids or entry.level_id in level_ids)
+                else entry
+                for entry in model_input.subject_hours
+            ]
+            scenario = model_input.model_copy(update={"subject_hours": subject_hours})
+            return self._scale_allocations_to_fte(
+                model_input, scenario, baseline_subject_fte(baseline)
+            )
+
+        current_fte = next(
+            (
+                req.simple_fte
+                for req in baseline.teacher_requirements
+                if req.subject_id == subject_id
+            ),
+            None,
+        )
+        update: dict[str, Any] = {
+            "fte_overrides": {**model_input.fte_overrides, subject_id: new_value}
         }
+        if current_fte:
+            ratio = new_value / current_fte
+            update["allocations"] = [
+                allocation.model_copy(update={"fte_count": allocation.fte_count * ratio})
+                if allocation.subject_id == subject_id
+                else allocation
+                for allocation in model_input.allocations
+            ]
+        return model_input.model_copy(update=update)
+
+    def _apply_account_change(
+        self,
+        model_input: BudgetModelInput,
+        change: ProposedChange,
+    ) -> BudgetModelInput | None:
+        """Set the consolidated amount of a revenue, cost or capex account."""
+        account_code = change.dimension_code
+        new_amount = _parse_decimal(change.new_value)
+        if not account_code or new_amount is None:
+            return None
+
+        overrides = {**model_input.account_overrides, account_code: new_amount}
+        return model_input.model_copy(update={"account_overrides": overrides})
 
     def _get_affected_steps(self, step_id: str) -> list[str]:
         """Get the list of steps affected by a change to the given step."""
@@ -405,6 +950,26 @@ class ImpactCalculatorService:
         return cascade_map.get(step_id, [])
 
 
+def evaluate_scenario_chunk(
+    perturbations: list[tuple[str, str | None, Decimal]],
+    model_input: BudgetModelInput,
+    baseline_fte: dict[UUID, Decimal],
+) -> list[BudgetModelResult]:
+    """
+    Run the engine for a chunk of (driver type, dimension id, delta) perturbations.
+
+    Pure and module-level, so it can run in a worker thread or process.
+    """
+    return [
+        calculate_budget_model(
+            ImpactCalculatorService.apply_driver_delta(
+                model_input, driver_type, dimension_id, delta, baseline_fte
+            )
+        )
+        for driver_type, dimension_id, delta in perturbations
+    ]
+
+
 async def calculate_budget_impact(
     session: AsyncSession,
     version_id: UUID,
@@ -0,0 +1,83 @@
+"""Cheap change detection over table rows (budget version inputs, historical data)."""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import BigInteger, Text, cast, func, literal, literal_column, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def row_version_aggregate(session: AsyncSession, updated_at: Any) -> Any:
+    """
+    Aggregate over the selected rows of one table that changes on every write.
+
+    Sum of the rows' xmin on PostgreSQL (see compute_input_fingerprint for why
+    not max(updated_at)); SQLite (tests) has no xmin and falls back to the
+    latest updated_at. Pair it with the row count to also catch deletes.
+
+    Args:
+        session: Async database session the aggregate will run on
+        updated_at: Last write timestamp column of the table (SQLite fallback)
+
+    Returns:
+        SQL aggregate expression
+    """
+    bind = session.get_bind()
+    if bind.dialect.name == "sqlite":
+        return func.max(updated_at)
+    return func.sum(cast(cast(literal_column("xmin"), Text), BigInteger))
+
+
+async def compute_input_fingerprint(
+    session: AsyncSession,
+    budget_version_id: uuid.UUID,
+    models: Sequence[type],
+) -> str:
+    """
+    Fingerprint the active rows of a budget version across input tables.
+
+    The fingerprint combines, per table, the number of active rows and the
+    sum of their xmin, read in a single query. Every insert, update, soft
+    delete or hard delete of a version row changes it, so a derived result
+    stored with the fingerprint it was computed from can be reused while
+    they match.
+
+    xmin is the id of the transaction that wrote the row version: an update
+    always replaces it, whatever the commit order of concurrent writers. The
+    latest updated_at is not enough, because it is set when a statement runs,
+    not when it commits: a write committing after a later-stamped one leaves
+    the count and max(updated_at) unchanged. SQLite (tests) has no xmin and
+    falls back to max(updated_at).
+
+    Args:
+        session: Async database session
+        budget_version_id: Budget version UUID
+        models: Versioned models (budget_version_id, updated_at, deleted_at)
+
+    Returns:
+        Hex SHA-256 digest (64 characters)
+    """
+    row_versions = [row_version_aggregate(session, model.updated_at) for model in models]
+    query = union_all(
+        *(
+            select(
+                literal(model.__tablename__).label("table_name"),
+                func.count(model.id).label("row_count"),
+                row_version.label("row_version"),
+            ).where(
+                model.budget_version_id == budget_version_id,
+                model.deleted_at.is_(None),
+            )
+            for model, row_version in zip(models, row_versions, strict=True)
+        )
+    )
+    result = await session.execute(query)
+
+    digest = hashlib.sha256()
+    for row in sorted(result.all(), key=lambda row: row.table_name):
+        digest.update(f"{row.table_name}:{row.row_count}:{row.row_version}|".encode())
+    return digest.hexdigest()
@@ -29,6 +29,7 @@ from app.models.planning import (
 )
 from app.services.base import BaseService
 from app.services.enrollment_capacity import get_effective_capacity
+from app.services.entity_loader import get_entity_loader
 from app.services.exceptions import NotFoundError, ValidationError
 
 
@@ -143,9 +144,7 @@ class KPIService:
             ValidationError: If calculation fails
         """
         # Verify budget version exists
-        query = select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-        result = await self.session.execute(query)
-        version = result.scalar_one_or_none()
+        version = await get_entity_loader(self.session, BudgetVersion).load(budget_version_id)
 
         if not version:
             raise NotFoundError("BudgetVersion", str(budget_version_id))
@@ -344,9 +343,7 @@ class KPIService:
         trends = []
         for version_id in version_ids:
             # Get version
-            version_query = select(BudgetVersion).where(BudgetVersion.id == version_id)
-            version_result = await self.session.execute(version_query)
-            version = version_result.scalar_one_or_none()
+            version = await get_entity_loader(self.session, BudgetVersion).load(version_id)
 
             if not version:
                 continue
@@ -9,19 +9,27 @@ Business Purpose:
 1. Maintain precomputed aggregations for fast dashboard queries
 2. Support scheduled and on-demand refresh of materialized views
 3. Monitor refresh performance and handle errors gracefully
+4. Keep per-version summary tables current by recomputing dirty versions only
 
 Performance Notes:
 ------------------
 - REFRESH MATERIALIZED VIEW CONCURRENTLY allows queries during refresh
 - Requires unique indexes on the materialized views
 - Typical refresh time: 0.5-2 seconds depending on data volume
+- Summary tables (kpi_dashboard_summary, budget_consolidation_summary) hold
+  the same rows as the views; statement triggers on planning tables log
+  written versions as dirty, so refresh_dirty cost scales with the versions
+  that changed
 """
 
+import asyncio
 import time
+import uuid
+from collections.abc import Iterable
 from typing import Any
 
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.logging import logger
 
@@ -43,16 +51,32 @@ class MaterializedViewService:
         "efir_budget.mv_budget_consolidation",
     ]
 
+    # Per-version summary tables and the plain views they are recomputed from
+    SUMMARY_TABLES: dict[str, str] = {
+        "efir_budget.kpi_dashboard_summary": "efir_budget.v_kpi_dashboard",
+        "efir_budget.budget_consolidation_summary": "efir_budget.v_budget_consolidation",
+    }
+
+    # Insert-only log of budget versions whose summary rows are stale (filled by triggers)
+    DIRTY_VERSIONS_TABLE = "efir_budget.summary_dirty_versions"
+
     @classmethod
-    async def refresh_all(cls, db: AsyncSession) -> dict[str, dict[str, Any]]:
+    async def refresh_all(
+        cls,
+        db: AsyncSession,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> dict[str, dict[str, Any]]:
         """
         Refresh all materialized views.
 
         This method refreshes all KPI dashboard materialized views
-        concurrently to minimize query disruption.
+        concurrently to minimize query disruption. The views are independent:
+        with a session_factory, each is refreshed on its own connection at the
+        same time instead of one after another on db.
 
         Args:
             db: Database session
+            session_factory: Optional factory opening one session per view
 
         Returns:
             Dictionary mapping view names to refresh results:
@@ -69,6 +93,20 @@ class MaterializedViewService:
             >>> print(results["efir_budget.mv_kpi_dashboard"]["status"])
             "success"
         """
+        if session_factory is not None:
+
+            async def _refresh_on_own_session(view_name: str) -> dict[str, Any]:
+                async with session_factory() as view_db:
+                    result = await cls.refresh_view(view_db, view_name)
+                result.pop("view")
+                return result
+
+            view_names = list(cls.VIEWS)
+            view_results = await asyncio.gather(
+                *(_refresh_on_own_session(view_name) for view_name in view_names)
+            )
+            return dict(zip(view_names, view_results, strict=True))
+
         results: dict[str, dict[str, Any]] = {}
 
         for view_name in cls.VIEWS:
@@ -249,3 +287,212 @@ class MaterializedViewService:
             "size_bytes": row[3],
             "size_mb": round(row[3] / (1024 * 1024), 2),
         }
+
+    @classmethod
+    async def mark_dirty(
+        cls, db: AsyncSession, budget_version_ids: Iterable[uuid.UUID]
+    ) -> None:
+        """
+        Mark budget versions as needing a summary refresh.
+
+        Planning table writes are marked by database triggers; this is for
+        changes the triggers cannot see (e.g. reference data used by the
+        summaries) and for re-marking versions of a failed refresh. The
+        caller commits.
+
+        Args:
+            db: Database session
+            budget_version_ids: Budget versions to mark
+        """
+        version_ids = list(dict.fromkeys(budget_version_ids))
+        if not version_ids:
+            return
+
+        bind = db.get_bind()
+        if bind and bind.dialect.name == "sqlite":
+            return
+
+        await db.execute(
+            text(
+                f"""
+                INSERT INTO {cls.DIRTY_VERSIONS_TABLE} (budget_version_id)
+                SELECT UNNEST(CAST(:version_ids AS UUID[]))
+                """
+            ),
+            {"version_ids": version_ids},
+        )
+
+    @classmethod
+    async def get_dirty_count(cls, db: AsyncSession) -> int:
+        """
+        Count budget versions waiting for a summary refresh.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of dirty budget versions
+        """
+        bind = db.get_bind()
+        if bind and bind.dialect.name == "sqlite":
+            return 0
+
+        result = await db.execute(
+            text(f"SELECT COUNT(DISTINCT budget_version_id) FROM {cls.DIRTY_VERSIONS_TABLE}")
+        )
+        return int(result.scalar_one())
+
+    @classmethod
+    async def refresh_dirty(
+        cls,
+        db: AsyncSession,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Recompute the summary table rows of dirty budget versions only.
+
+        The committed dirty log rows are claimed and the claim committed at
+        once, so writers logging versions never wait on a running refresh.
+        Rows locked by a concurrent claim are skipped, and rows logged by
+        writers that have not committed are invisible to the claim: both stay
+        for the next call. The summary rows of the claimed versions are then
+        replaced from the summary views; on error the versions are marked
+        dirty again.
+
+        With a session_factory, the summary tables are independent and each is
+        rebuilt on its own connection concurrently.
+
+        Args:
+            db: Database session for the claim
+            session_factory: Optional factory opening one session per table
+
+        Returns:
+            Refresh result dictionary:
+            {
+                "status": "success" | "error",
+                "versions": list[str] (refreshed budget version ids),
+                "duration_seconds": float,
+                "error": str (only if status is "error")
+            }
+
+        Example:
+            >>> result = await MaterializedViewService.refresh_dirty(db)
+            >>> print(len(result["versions"]))
+            1
+        """
+        # SQLite (test) fallback: no summary tables or triggers
+        bind = db.get_bind()
+        if bind and bind.dialect.name == "sqlite":
+            return {"status": "success", "versions": [], "duration_seconds": 0.0}
+
+        start_time = time.time()
+        version_ids: list[uuid.UUID] = []
+        try:
+            result = await db.execute(
+                text(
+                    f"""
+                    DELETE FROM {cls.DIRTY_VERSIONS_TABLE}
+                    WHERE id IN (
+                        SELECT id FROM {cls.DIRTY_VERSIONS_TABLE} FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING budget_version_id
+                    """
+                )
+            )
+            version_ids = list(dict.fromkeys(row[0] for row in result.fetchall()))
+            await db.commit()
+
+            if version_ids and session_factory is not None:
+
+                async def _rebuild_on_own_session(table: str, source: str) -> None:
+                    async with session_factory() as table_db:
+                        await cls._rebuild_summary_rows(table_db, table, source, version_ids)
+                        await table_db.commit()
+
+                await asyncio.gather(
+                    *(
+                        _rebuild_on_own_session(table, source)
+                        for table, source in cls.SUMMARY_TABLES.items()
+                    )
+                )
+            elif version_ids:
+                for table, source in cls.SUMMARY_TABLES.items():
+                    await cls._rebuild_summary_rows(db, table, source, version_ids)
+                await db.commit()
+
+            duration = time.time() - start_time
+
+            logger.info(
+                "summary_tables_refreshed",
+                versions=len(version_ids),
+                duration_seconds=duration,
+            )
+
+            return {
+                "status": "success",
+                "versions": [str(version_id) for version_id in version_ids],
+                "duration_seconds": round(duration, 2),
+            }
+
+        except Exception as e:
+            await db.rollback()
+            if version_ids:
+                await cls._remark_dirty(db, version_ids)
+
+            logger.error(
+                "summary_tables_refresh_failed",
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+
+            return {"status": "error", "versions": [], "error": str(e)}
+
+    @classmethod
+    async def _remark_dirty(cls, db: AsyncSession, version_ids: list[uuid.UUID]) -> None:
+        """Log the versions of a failed refresh as dirty again."""
+        try:
+            await cls.mark_dirty(db, version_ids)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(
+                "summary_dirty_remark_failed",
+                versions=len(version_ids),
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+
+    @staticmethod
+    async def _rebuild_summary_rows(
+        db: AsyncSession, table: str, source: str, version_ids: list[uuid.UUID]
+    ) -> None:
+        """Replace the rows of a summary table for the given budget versions."""
+        # Refreshes of the same version can overlap (one scheduler per worker,
+        # plus the refresh-dirty endpoint). Under READ COMMITTED a second
+        # DELETE does not see rows inserted by a concurrent, uncommitted
+        # rebuild, so rebuilds of a (table, version) pair are serialized with
+        # transaction-scoped advisory locks. Sorted order avoids deadlocks.
+        for version_id in sorted(version_ids):
+            await db.execute(
+                text("SELECT pg_advisory_xact_lock(hashtextextended(:lock_key, 0))"),
+                {"lock_key": f"{table}:{version_id}"},
+            )
+
+        params = {"version_ids": version_ids}
+        await db.execute(
+            text(
+                f"DELETE FROM {table} "
+                "WHERE budget_version_id = ANY(CAST(:version_ids AS UUID[]))"
+            ),
+            params,
+        )
+        # Statements after the lock take a fresh snapshot, so the DELETE above
+        # sees the rows of a rebuild that held the lock before us.
+        # Deleted versions have no rows in the source and simply drop out
+        await db.execute(
+            text(
+                f"INSERT INTO {table} SELECT * FROM {source} "
+                "WHERE budget_version_id = ANY(CAST(:version_ids AS UUID[]))"
+            ),
+            params,
+        )
@@ -0,0 +1,131 @@
+"""Shared helpers for validating large imports in chunks off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from app.core.logging import logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Rows sent to a worker per task
+VALIDATION_CHUNK_SIZE = 5000
+
+# Below this many rows, validation runs inline (pool startup would cost more)
+PARALLEL_VALIDATION_MIN_ROWS = 20000
+
+MAX_VALIDATION_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+
+# Worker processes shared by every validation (and sensitivity scenario batch)
+# of this application process
+_validation_pool: ProcessPoolExecutor | None = None
+
+
+def get_validation_pool() -> ProcessPoolExecutor:
+    """Get the shared validation process pool, starting it on first use."""
+    global _validation_pool
+    if _validation_pool is None:
+        _validation_pool = ProcessPoolExecutor(
+            max_workers=MAX_VALIDATION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _validation_pool
+
+
+def shutdown_validation_pool() -> None:
+    """Stop the shared validation pool (application shutdown or broken pool)."""
+    global _validation_pool
+    pool, _validation_pool = _validation_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_chunks(items: Iterable[T], chunk_size: int) -> Iterator[list[T]]:
+    """Yield consecutive chunks of at most chunk_size items."""
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+async def validate_in_chunks(
+    items: Iterable[T],
+    validate_chunk: Callable[..., list[R]],
+    context: tuple[Any, ...] = (),
+    chunk_size: int = VALIDATION_CHUNK_SIZE,
+    min_parallel_rows: int = PARALLEL_VALIDATION_MIN_ROWS,
+) -> list[R]:
+    """
+    Validate items chunk by chunk, in the shared process pool for large inputs.
+
+    validate_chunk receives a chunk, the index of its first item and the context
+    arguments, and must be a module-level function so it can be sent to worker
+    processes. The context (e.g. resolved file headers) is sent with every chunk,
+    since pool workers are shared by all imports.
+
+    Small inputs are validated inline. Results are returned in item order.
+
+    Args:
+        items: Items to validate (consumed lazily)
+        validate_chunk: Function validating one chunk
+        context: Extra arguments passed to validate_chunk
+        chunk_size: Items per chunk
+        min_parallel_rows: Minimum number of items to use the process pool
+
+    Returns:
+        Validation results of all items, in order
+    """
+    chunks = iter_chunks(items, chunk_size)
+    buffered: list[list[T]] = []
+    buffered_rows = 0
+    for chunk in chunks:
+        buffered.append(chunk)
+        buffered_rows += len(chunk)
+        if buffered_rows >= min_parallel_rows:
+            break
+    else:
+        # Exhausted before reaching the threshold: not worth the pool round trips
+        results: list[R] = []
+        start = 0
+        for chunk in buffered:
+            results.extend(validate_chunk(chunk, start, *context))
+            start += len(chunk)
+        return results
+
+    loop = asyncio.get_running_loop()
+    pool = get_validation_pool()
+    futures: list[asyncio.Future[list[R]]] = []
+    try:
+        start = 0
+        for chunk in itertools.chain(buffered, chunks):
+            futures.append(
+                loop.run_in_executor(pool, validate_chunk, chunk, start, *context)
+            )
+            start += len(chunk)
+            # Let other requests run while the remaining chunks are read
+            await asyncio.sleep(0)
+
+        logger.info(
+            "Validating import in process pool",
+            rows=start,
+            chunks=len(futures),
+            workers=MAX_VALIDATION_WORKERS,
+        )
+        chunk_results = await asyncio.gather(*futures)
+    except BrokenProcessPool:
+        # A worker died: start a fresh pool for the next validation
+        shutdown_validation_pool()
+        raise
+    finally:
+        # Drop the chunks of a failed validation that have not started yet
+        for future in futures:
+            future.cancel()
+
+    return [result for chunk_result in chunk_results for result in chunk_result]
@@ -27,6 +27,7 @@ from app.schemas.planning_progress import (
     StepValidation,
 )
 from app.services.enrollment_capacity import get_effective_capacity
+from app.services.entity_loader import get_entity_loader
 
 
 class PlanningProgressService:
@@ -106,10 +107,7 @@ class PlanningProgressService:
 
     async def _get_budget_version(self, budget_version_id: UUID) -> BudgetVersion:
         """Get budget version or raise NotFoundError."""
-        result = await self.db.execute(
-            select(BudgetVersion).where(BudgetVersion.id == budget_version_id)
-        )
-        budget_version = result.scalar_one_or_none()
+        budget_version = await get_entity_loader(self.db, BudgetVersion).load(budget_version_id)
         if not budget_version:
             from app.services.exceptions import NotFoundError
 
@@ -30,6 +30,7 @@ from app.models.strategic import (
     StrategicPlanScenario,
 )
 from app.services.base import BaseService
+from app.services.entity_loader import get_entity_loader
 from app.services.exceptions import (
     BusinessRuleError,
     NotFoundError,
@@ -113,9 +114,7 @@ class StrategicService:
 
         try:
             # Get base budget version
-            version_query = select(BudgetVersion).where(BudgetVersion.id == base_version_id)
-            version_result = await self.session.execute(version_query)
-            version = version_result.scalar_one_or_none()
+            version = await get_entity_loader(self.session, BudgetVersion).load(base_version_id)
 
             if not version:
                 raise NotFoundError("BudgetVersion", str(base_version_id))
@@ -0,0 +1,277 @@
+"""
+Debounced background refresh of the per-version summary tables.
+
+Consolidation and KPI writes notify the scheduler instead of refreshing
+inline, once their transaction commits. Notifications arriving in a burst are coalesced into one refresh that
+runs once writes have been quiet for QUIET_PERIOD_SECONDS (or after at most
+MAX_DELAY_SECONDS of continuous editing). Writes made by other processes are
+picked up by polling the dirty version count every POLL_INTERVAL_SECONDS.
+Each refresh also compacts the data revision log behind conditional GETs.
+
+Metrics:
+- summary_refresh_staleness_seconds: time since the last successful refresh
+- summary_refresh_pending_versions: budget versions waiting for a refresh
+- summary_refresh_runs_total: refresh runs by status
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+from app.services.data_revision import compact_data_revisions
+from app.services.materialized_view_service import MaterializedViewService
+
+QUIET_PERIOD_SECONDS = float(os.getenv("SUMMARY_REFRESH_QUIET_SECONDS", "2.0"))
+MAX_DELAY_SECONDS = float(os.getenv("SUMMARY_REFRESH_MAX_DELAY_SECONDS", "30.0"))
+POLL_INTERVAL_SECONDS = float(os.getenv("SUMMARY_REFRESH_POLL_SECONDS", "60.0"))
+
+SUMMARY_REFRESH_STALENESS = Gauge(
+    "summary_refresh_staleness_seconds",
+    "Seconds since the summary tables were last refreshed successfully",
+)
+SUMMARY_REFRESH_PENDING = Gauge(
+    "summary_refresh_pending_versions",
+    "Budget versions marked dirty and waiting for a summary refresh",
+)
+SUMMARY_REFRESH_RUNS = Counter(
+    "summary_refresh_runs_total",
+    "Summary table refresh runs",
+    ["status"],
+)
+
+# Session.info key of the budget versions to notify once the session commits
+_PENDING_INFO_KEY = "summary_refresh_pending_versions"
+
+
+class SummaryRefreshScheduler:
+    """
+    Coalesce summary refresh requests into debounced background refreshes.
+
+    notify() is cheap and synchronous; the refresh itself runs in a single
+    background task, so at most one refresh is in flight at a time. Each
+    refresh rebuilds the summary tables concurrently on separate sessions.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        quiet_period: float = QUIET_PERIOD_SECONDS,
+        max_delay: float = MAX_DELAY_SECONDS,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.session_factory = session_factory
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        # Monotonic clock bounding the quiet period by max_delay
+        self.clock = clock
+        # Staleness counts from startup until the first refresh succeeds
+        self.last_refresh_at = time.time()
+        self._pending_versions: set[uuid.UUID] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        SUMMARY_REFRESH_STALENESS.set_function(self.staleness_seconds)
+
+    def staleness_seconds(self) -> float:
+        """Seconds since the last successful refresh."""
+        return time.time() - self.last_refresh_at
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background task is active."""
+        return self._task is not None and not self._task.done()
+
+    def notify(self, budget_version_id: uuid.UUID | None = None) -> None:
+        """
+        Record a write affecting the summaries and (re)start the quiet period.
+
+        Args:
+            budget_version_id: Budget version written, if known
+        """
+        if budget_version_id is not None:
+            self._pending_versions.add(budget_version_id)
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the background refresh task (idempotent)."""
+        if self.is_running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            "summary_refresh_scheduler_started",
+            quiet_period=self.quiet_period,
+            max_delay=self.max_delay,
+            poll_interval=self.poll_interval,
+        )
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        logger.info("summary_refresh_scheduler_stopped")
+
+    async def _run(self) -> None:
+        """Wait for notifications or the poll interval, then refresh."""
+        while True:
+            if not await self._wait_for_wakeup(self.poll_interval):
+                # Nothing notified here: refresh only if another process marked versions
+                await self._refresh_if_dirty()
+                continue
+
+            await self._wait_for_quiet_period()
+            await self.refresh_now()
+
+    async def _wait_for_wakeup(self, seconds: float) -> bool:
+        """Wait up to seconds for a notification; False when none arrived."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=seconds)
+        except TimeoutError:
+            return False
+        return True
+
+    async def _wait_for_quiet_period(self) -> None:
+        """Return once no notification arrived for quiet_period (or max_delay)."""
+        deadline = self.clock() + self.max_delay
+        while True:
+            self._wakeup.clear()
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return
+            if not await self._wait_for_wakeup(min(self.quiet_period, remaining)):
+                return
+
+    async def _refresh_if_dirty(self) -> None:
+        """Poll the dirty version count and refresh when any are pending."""
+        try:
+            async with self.session_factory() as db:
+                pending = await MaterializedViewService.get_dirty_count(db)
+        except Exception as exc:
+            logger.warning("summary_refresh_poll_failed", error=str(exc))
+            return
+
+        SUMMARY_REFRESH_PENDING.set(pending)
+        if pending:
+            await self.refresh_now()
+
+    async def refresh_now(self) -> dict[str, Any]:
+        """
+        Refresh the summary tables of all dirty versions immediately.
+
+        Returns:
+            Result of MaterializedViewService.refresh_dirty
+        """
+        notified = len(self._pending_versions)
+        self._pending_versions.clear()
+
+        try:
+            async with self.session_factory() as db:
+                result = await MaterializedViewService.refresh_dirty(
+                    db, session_factory=self.session_factory
+                )
+                pending = await MaterializedViewService.get_dirty_count(db)
+        except Exception as exc:
+            result = {"status": "error", "versions": [], "error": str(exc)}
+            pending = None
+
+        await self.compact_revisions()
+
+        SUMMARY_REFRESH_RUNS.labels(status=result["status"]).inc()
+        if pending is not None:
+            SUMMARY_REFRESH_PENDING.set(pending)
+
+        if result["status"] == "success":
+            self.last_refresh_at = time.time()
+            logger.info(
+                "summary_refresh_completed",
+                notified_versions=notified,
+                refreshed_versions=len(result["versions"]),
+                pending_versions=pending,
+            )
+        else:
+            logger.warning(
+                "summary_refresh_failed",
+                notified_versions=notified,
+                error=result.get("error"),
+            )
+        return result
+
+    async def compact_revisions(self) -> int:
+        """
+        Compact the data revision log, including the rows the refresh logged.
+
+        Returns:
+            Number of log rows removed (0 when compaction failed)
+        """
+        try:
+            async with self.session_factory() as db:
+                removed = await compact_data_revisions(db)
+                await db.commit()
+        except Exception as exc:
+            logger.warning("data_revision_compaction_failed", error=str(exc))
+            return 0
+
+        logger.debug("data_revisions_compacted", removed_rows=removed)
+        return removed
+
+
+# Scheduler started with the application (None when disabled, e.g. in tests)
+_scheduler: SummaryRefreshScheduler | None = None
+
+
+def get_summary_refresh_scheduler() -> SummaryRefreshScheduler | None:
+    """Return the application's summary refresh scheduler, if running."""
+    return _scheduler
+
+
+def set_summary_refresh_scheduler(scheduler: SummaryRefreshScheduler | None) -> None:
+    """Install (or clear) the application's summary refresh scheduler."""
+    global _scheduler
+    _scheduler = scheduler
+
+
+def notify_summary_write(db: AsyncSession, budget_version_id: uuid.UUID | None = None) -> None:
+    """
+    Tell the summary refresh scheduler that summary inputs were written.
+
+    The scheduler is notified once db's transaction commits, so a refresh
+    never runs before the write is visible (and never for a rolled back
+    write). A no-op when no scheduler is running.
+
+    Args:
+        db: Session the write was made on
+        budget_version_id: Budget version written, if known
+    """
+    if _scheduler is not None:
+        db.sync_session.info.setdefault(_PENDING_INFO_KEY, set()).add(budget_version_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed_writes(session: Session) -> None:
+    """Forward the writes recorded on a session once its transaction commits."""
+    pending = session.info.pop(_PENDING_INFO_KEY, None)
+    if pending and _scheduler is not None:
+        for budget_version_id in pending:
+            _scheduler.notify(budget_version_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_writes(session: Session) -> None:
+    """Forget the writes recorded on a session when its transaction rolls back."""
+    session.info.pop(_PENDING_INFO_KEY, None)
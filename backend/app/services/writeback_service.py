@@ -24,6 +24,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.cache import CacheInvalidator
 from app.core.logging import logger
+from app.core.pagination import decode_cursor, encode_cursor
 from app.schemas.writeback import (
     BatchUpdateRequest,
     BatchUpdateResponse,
@@ -41,9 +42,11 @@ from app.schemas.writeback import (
     UndoResponse,
     UnlockRequest,
 )
+from app.services.budget_model_service import invalidate_budget_model_cache
 from app.services.exceptions import (
     CellLockedError,
     NotFoundError,
+    ValidationError,
     VersionConflictError,
 )
 
@@ -527,6 +530,94 @@ class WritebackService:
         """
         from sqlalchemy import text
 
+        query, params = self._change_history_query(
+            budget_version_id, module_code, entity_id, field_name
+        )
+
+        query += " ORDER BY changed_at DESC LIMIT :limit OFFSET :offset"
+        params["limit"] = limit
+        params["offset"] = offset
+
+        result = await self.session.execute(text(query), params)
+        rows = result.fetchall()
+
+        return [CellChangeResponse(**dict(row._mapping)) for row in rows]
+
+    async def get_change_history_keyset(
+        self,
+        budget_version_id: UUID,
+        module_code: str | None = None,
+        entity_id: UUID | None = None,
+        field_name: str | None = None,
+        cursor: str | None = None,
+        page_size: int = 100,
+    ) -> dict[str, Any]:
+        """
+        Get change history with keyset (cursor) pagination, most recent first.
+
+        Pages are ordered by (changed_at, id) and each page starts after the
+        change encoded in the cursor, so deep pages of a long audit trail
+        cost the same as the first. No COUNT query is issued.
+
+        Args:
+            budget_version_id: Budget version to query
+            module_code: Optional filter by module
+            entity_id: Optional filter by entity
+            field_name: Optional filter by field
+            cursor: Cursor from the previous page (None for the first page)
+            page_size: Records per page
+
+        Returns:
+            Keyset page with items, page_size, next_cursor, has_more, total
+
+        Raises:
+            ValidationError: If the cursor is malformed
+        """
+        from sqlalchemy import text
+
+        query, params = self._change_history_query(
+            budget_version_id, module_code, entity_id, field_name
+        )
+
+        if cursor:
+            try:
+                last_changed_at, last_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise ValidationError(str(e), field="cursor")
+            query += " AND (changed_at, id) < (:last_changed_at, :last_id)"
+            params["last_changed_at"] = last_changed_at
+            params["last_id"] = str(last_id)
+
+        # Fetch one extra row to know whether another page follows
+        query += " ORDER BY changed_at DESC, id DESC LIMIT :limit"
+        params["limit"] = page_size + 1
+
+        result = await self.session.execute(text(query), params)
+        items = [CellChangeResponse(**dict(row._mapping)) for row in result.fetchall()]
+
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(items[-1].changed_at, items[-1].id)
+
+        return {
+            "items": items,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "total": None,
+            "total_is_estimate": False,
+        }
+
+    @staticmethod
+    def _change_history_query(
+        budget_version_id: UUID,
+        module_code: str | None,
+        entity_id: UUID | None,
+        field_name: str | None,
+    ) -> tuple[str, dict[str, Any]]:
+        """Build the filtered change history SELECT and its parameters."""
         query = """
             SELECT
                 id, cell_id, budget_version_id, module_code, entity_id, field_name,
@@ -549,14 +640,7 @@ class WritebackService:
             query += " AND field_name = :field_name"
             params["field_name"] = field_name
 
-        query += " ORDER BY changed_at DESC LIMIT :limit OFFSET :offset"
-        params["limit"] = limit
-        params["offset"] = offset
-
-        result = await self.session.execute(text(query), params)
-        rows = result.fetchall()
-
-        return [CellChangeResponse(**dict(row._mapping)) for row in rows]
+        return query, params
 
     async def undo_session(
         self,
@@ -1014,6 +1098,7 @@ class WritebackService:
         budget_version_id: str,
     ) -> None:
         """Invalidate caches for a module and its dependents."""
+        invalidate_budget_model_cache(UUID(budget_version_id))
         cache_entity = MODULE_TO_CACHE_ENTITY.get(module_code)
         if cache_entity:
             try:
@@ -0,0 +1,264 @@
+"""
+Benchmark per-request overhead of the request middleware stack.
+
+Compares the production middleware stack (pure ASGI callables) against
+equivalent BaseHTTPMiddleware implementations (the previous design) for:
+
+- a trivial JSON endpoint
+- a streaming CSV download (StreamingResponse, many chunks)
+
+Each scenario runs in-process over httpx.ASGITransport, so the numbers
+isolate middleware overhead from network and server costs. The overhead
+column is relative to the same app without any middleware.
+
+Usage:
+    cd backend
+    source .venv/bin/activate
+    python -m scripts.benchmark_middleware [--requests 1000] [--csv-rows 2000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+
+# Benchmark without Redis and without per-request log output
+os.environ.setdefault("REDIS_ENABLED", "false")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("SUPABASE_URL", "https://benchmark.supabase.co")
+
+import httpx
+import structlog
+from app.core.logging import LoggingMiddleware, logger
+from app.core.security import SupabaseJWTVerifier, verify_supabase_jwt
+from app.middleware.auth import AuthenticationMiddleware
+from app.middleware.metrics import (
+    HTTP_REQUEST_COUNTER,
+    HTTP_REQUEST_DURATION,
+    RequestMetricsMiddleware,
+)
+from app.middleware.rate_limit import (
+    RATE_LIMITS,
+    ROLE_MULTIPLIERS,
+    RateLimitMiddleware,
+    get_client_identifier,
+    get_rate_limit_category,
+    get_user_role,
+)
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from jose import jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+
+structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+# ==============================================================================
+# BaseHTTPMiddleware equivalents (previous implementation)
+# ==============================================================================
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """Correlation id and request logging via BaseHTTPMiddleware."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        correlation_id = str(uuid.uuid4())
+        structlog.contextvars.bind_contextvars(
+            correlation_id=correlation_id,
+            path=request.url.path,
+            method=request.method,
+            client_host=request.client.host if request.client else None,
+        )
+        logger.info("request_started", user_agent=request.headers.get("user-agent"))
+        try:
+            response = await call_next(request)
+            logger.info("request_completed", status_code=response.status_code)
+            response.headers["X-Correlation-ID"] = correlation_id
+            return response
+        finally:
+            structlog.contextvars.clear_contextvars()
+
+
+class LegacyMetricsMiddleware(BaseHTTPMiddleware):
+    """Prometheus metrics and timing header via BaseHTTPMiddleware."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        start_time = time.perf_counter()
+        response = await call_next(request)
+        duration = time.perf_counter() - start_time
+        path = RequestMetricsMiddleware._normalize_path(request.url.path)
+        HTTP_REQUEST_COUNTER.labels(
+            method=request.method, path=path, status=str(response.status_code)
+        ).inc()
+        HTTP_REQUEST_DURATION.labels(method=request.method, path=path).observe(duration)
+        response.headers["X-Request-Time-Ms"] = str(round(duration * 1000, 2))
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """Rate limit check and headers via BaseHTTPMiddleware."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        category = get_rate_limit_category(request.url.path)
+        base_limit = RATE_LIMITS.get(category, RATE_LIMITS["default"])
+        max_requests = int(
+            base_limit["requests"] * ROLE_MULTIPLIERS.get(get_user_role(request), 1.0)
+        )
+        is_allowed, current_count, reset_time = await RateLimitMiddleware(
+            None  # type: ignore[arg-type]
+        )._check_rate_limit(
+            client_id=get_client_identifier(request),
+            category=category,
+            max_requests=max_requests,
+            window=base_limit["window"],
+        )
+        if not is_allowed:
+            return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(max_requests)
+        response.headers["X-RateLimit-Remaining"] = str(max(0, max_requests - current_count))
+        response.headers["X-RateLimit-Reset"] = str(int(time.time()) + reset_time)
+        return response
+
+
+class LegacyAuthenticationMiddleware(BaseHTTPMiddleware):
+    """Bearer token validation via BaseHTTPMiddleware."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        auth_header = request.headers.get("authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
+        payload = verify_supabase_jwt(auth_header.split(" ", 1)[1])
+        if not payload or not payload.get("sub"):
+            return JSONResponse(status_code=401, content={"detail": "Invalid or expired token"})
+        request.state.user_id = payload["sub"]
+        request.state.user_role = payload.get("role", "planner")
+        return await call_next(request)
+
+
+# ==============================================================================
+# Benchmark app
+# ==============================================================================
+
+# Innermost first, mirroring the add_middleware order in app.main
+ASGI_STACK = [
+    AuthenticationMiddleware,
+    RateLimitMiddleware,
+    RequestMetricsMiddleware,
+    LoggingMiddleware,
+]
+LEGACY_STACK = [
+    LegacyAuthenticationMiddleware,
+    LegacyRateLimitMiddleware,
+    LegacyMetricsMiddleware,
+    LegacyLoggingMiddleware,
+]
+
+
+def build_app(middleware: list[type], csv_rows: int) -> FastAPI:
+    """Create an app with a trivial and a streaming CSV endpoint."""
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/api/v1/export.csv")
+    async def export_csv() -> StreamingResponse:
+        async def rows() -> AsyncIterator[str]:
+            yield "account_code,description,amount\n"
+            for i in range(csv_rows):
+                yield f"{60000 + i},Line {i},{i * 1.5:.2f}\n"
+
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    for middleware_class in middleware:
+        app.add_middleware(middleware_class)
+    return app
+
+
+def make_token() -> str:
+    """Sign a Supabase-style access token accepted by the verifier."""
+    verifier = SupabaseJWTVerifier.from_env()
+    now = int(time.time())
+    claims = {
+        "sub": str(uuid.uuid4()),
+        "email": "bench@efir.local",
+        "role": "admin",
+        "aud": SupabaseJWTVerifier.AUDIENCE,
+        "iss": verifier.issuer,
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return jwt.encode(claims, verifier.secret, algorithm="HS256")
+
+
+async def measure(app: FastAPI, path: str, requests: int, token: str) -> list[float]:
+    """Return per-request latencies in milliseconds."""
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: list[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up (routing, token cache, metric label children)
+        for _ in range(min(50, requests)):
+            await client.get(path, headers=headers)
+
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return latencies
+
+
+def summarize(latencies: list[float]) -> tuple[float, float, float]:
+    """Mean, p50 and p95 of latencies."""
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return statistics.fmean(ordered), statistics.median(ordered), p95
+
+
+async def run(requests: int, csv_rows: int) -> None:
+    """Run all scenarios and print a comparison table."""
+    token = make_token()
+    stacks = {
+        "none": [],
+        "BaseHTTPMiddleware": LEGACY_STACK,
+        "pure ASGI": ASGI_STACK,
+    }
+    endpoints = {"trivial": "/api/v1/ping", "streaming CSV": "/api/v1/export.csv"}
+
+    print(f"{requests} requests per scenario, CSV rows: {csv_rows}\n")
+    print(
+        f"{'endpoint':<15} {'stack':<20} {'mean ms':>9} {'p50 ms':>9} "
+        f"{'p95 ms':>9} {'overhead ms':>12}"
+    )
+    for endpoint, path in endpoints.items():
+        baseline = None
+        for stack_name, stack in stacks.items():
+            app = build_app(stack, csv_rows)
+            mean, p50, p95 = summarize(await measure(app, path, requests, token))
+            if baseline is None:
+                baseline = mean
+            print(
+                f"{endpoint:<15} {stack_name:<20} {mean:>9.3f} {p50:>9.3f} "
+                f"{p95:>9.3f} {mean - baseline:>12.3f}"
+            )
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--csv-rows", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.csv_rows))
+
+
+if __name__ == "__main__":
+    main()
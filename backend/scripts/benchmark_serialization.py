@@ -0,0 +1,208 @@
+"""
+Benchmark response serialization for large read payloads.
+
+Compares, for a DHG subject hours list (ORM-like rows) and a consolidated
+budget (already built Pydantic model):
+
+- response_model + JSONResponse (the previous default)
+- response_model + ORJSONResponse (the current default response class)
+- the fast path: validated_response() / ORJSONResponse(model), which skips
+  FastAPI's response_model re-validation
+
+Each scenario runs in-process over httpx.ASGITransport without middleware,
+so the numbers isolate validation and encoding costs. Responses are checked
+to decode to identical JSON across scenarios.
+
+Usage:
+    cd backend
+    source .venv/bin/activate
+    python -m scripts.benchmark_serialization [--requests 200] [--rows 2000]
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import httpx
+import orjson
+from app.core.responses import ORJSONResponse, validated_response
+from app.models.configuration import BudgetVersionStatus
+from app.models.consolidation import ConsolidationCategory
+from app.schemas.consolidation import (
+    BudgetConsolidationResponse,
+    ConsolidationLineItemResponse,
+)
+from app.schemas.planning import DHGSubjectHoursResponse
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+# ==============================================================================
+# Payloads
+# ==============================================================================
+
+
+def make_subject_hours(rows: int) -> list[SimpleNamespace]:
+    """ORM-like DHG subject hours rows."""
+    version_id = uuid.uuid4()
+    now = datetime.now(UTC)
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            budget_version_id=version_id,
+            subject_id=uuid.uuid4(),
+            level_id=uuid.uuid4(),
+            number_of_classes=4,
+            hours_per_class_per_week=Decimal("4.50"),
+            total_hours_per_week=Decimal("18.00"),
+            is_split=i % 2 == 0,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(rows)
+    ]
+
+
+def make_consolidation(rows: int) -> BudgetConsolidationResponse:
+    """Consolidated budget with rows line items split across the groups."""
+    now = datetime.now(UTC)
+
+    def item(i: int, is_revenue: bool) -> ConsolidationLineItemResponse:
+        return ConsolidationLineItemResponse(
+            id=uuid.uuid4(),
+            account_code=f"{70000 if is_revenue else 60000 + i}",
+            account_name=f"Account {i}",
+            consolidation_category=(
+                ConsolidationCategory.REVENUE_TUITION
+                if is_revenue
+                else ConsolidationCategory.OPERATING_SUPPLIES
+            ),
+            is_revenue=is_revenue,
+            amount_sar=Decimal(i) + Decimal("0.25"),
+            source_table="revenue_plans" if is_revenue else "operating_cost_plans",
+            source_count=3,
+            is_calculated=True,
+            created_at=now,
+            updated_at=now,
+        )
+
+    half = rows // 2
+    return BudgetConsolidationResponse(
+        budget_version_id=uuid.uuid4(),
+        budget_version_name="Budget 2025",
+        fiscal_year=2025,
+        academic_year="2024-2025",
+        status=BudgetVersionStatus.WORKING,
+        revenue_items=[item(i, True) for i in range(half)],
+        operating_items=[item(i, False) for i in range(rows - half)],
+        total_revenue=Decimal("1000.00"),
+        total_personnel_costs=Decimal("0.00"),
+        total_operating_costs=Decimal("500.00"),
+        total_capex=Decimal("0.00"),
+        operating_result=Decimal("500.00"),
+        net_result=Decimal("500.00"),
+    )
+
+
+# ==============================================================================
+# Benchmark apps
+# ==============================================================================
+
+
+def build_app(
+    mode: str,
+    subject_hours: list[SimpleNamespace],
+    consolidation: BudgetConsolidationResponse,
+) -> FastAPI:
+    """Create an app serving both payloads in the given serialization mode."""
+    response_class = JSONResponse if mode == "response_model + JSONResponse" else ORJSONResponse
+    app = FastAPI(default_response_class=response_class)
+    fast_path = mode == "fast path"
+
+    @app.get("/dhg/subject-hours", response_model=list[DHGSubjectHoursResponse])
+    async def get_subject_hours():
+        if fast_path:
+            return validated_response(subject_hours, list[DHGSubjectHoursResponse])
+        return subject_hours
+
+    @app.get("/consolidation", response_model=BudgetConsolidationResponse)
+    async def get_consolidation():
+        if fast_path:
+            return ORJSONResponse(consolidation)
+        return consolidation
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> tuple[list[float], bytes]:
+    """Return per-request latencies in milliseconds and the response body."""
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up (routing, serializer construction)
+        for _ in range(min(10, requests)):
+            response = await client.get(path)
+
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return latencies, response.content
+
+
+def summarize(latencies: list[float]) -> tuple[float, float, float]:
+    """Mean, p50 and p95 of latencies."""
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return statistics.fmean(ordered), statistics.median(ordered), p95
+
+
+async def run(requests: int, rows: int) -> None:
+    """Run all scenarios and print a comparison table."""
+    modes = ["response_model + JSONResponse", "response_model + ORJSONResponse", "fast path"]
+    endpoints = {"subject hours": "/dhg/subject-hours", "consolidation": "/consolidation"}
+    subject_hours = make_subject_hours(rows)
+    consolidation = make_consolidation(rows)
+    apps = {mode: build_app(mode, subject_hours, consolidation) for mode in modes}
+
+    print(f"{requests} requests per scenario, rows per payload: {rows}\n")
+    print(
+        f"{'endpoint':<15} {'mode':<33} {'mean ms':>9} {'p50 ms':>9} "
+        f"{'p95 ms':>9} {'speedup':>8}"
+    )
+    for endpoint, path in endpoints.items():
+        baseline = None
+        payloads = []
+        for mode in modes:
+            latencies, body = await measure(apps[mode], path, requests)
+            payloads.append(orjson.loads(body))
+            mean, p50, p95 = summarize(latencies)
+            if baseline is None:
+                baseline = mean
+            print(
+                f"{endpoint:<15} {mode:<33} {mean:>9.3f} {p50:>9.3f} "
+                f"{p95:>9.3f} {baseline / mean:>7.2f}x"
+            )
+        same = all(payload == payloads[0] for payload in payloads)
+        print(f"{'':<15} identical JSON: {same}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.rows))
+
+
+if __name__ == "__main__":
+    main()
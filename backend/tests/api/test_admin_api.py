@@ -5,6 +5,7 @@ Tests cover:
 - Historical data preview endpoint
 - Historical data import endpoint
 - Import history endpoint
+- Historical rows and integration log cursor endpoints
 - Template download endpoint
 - Historical data deletion endpoint
 """
@@ -12,9 +13,12 @@ Tests cover:
 from __future__ import annotations
 
 import io
+import uuid
+from datetime import datetime
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from app.services.exceptions import ValidationError
 from app.services.historical_import_service import (
     ImportPreviewResult,
     ImportResult,
@@ -372,6 +376,141 @@ class TestImportHistoryEndpoint:
         mock_import_service.get_import_history.assert_called_once()
 
 
+class TestHistoricalRowsEndpoint:
+    """Tests for GET /admin/historical/rows."""
+
+    @pytest.mark.asyncio
+    async def test_list_rows_by_cursor(self, mock_import_service):
+        """Test a page of historical rows with its next cursor."""
+        mock_import_service.get_historical_rows_keyset.return_value = {
+            "items": [
+                {
+                    "id": uuid.uuid4(),
+                    "fiscal_year": 2024,
+                    "module_code": "enrollment",
+                    "dimension_type": "level",
+                    "dimension_id": None,
+                    "dimension_code": "6EME",
+                    "dimension_name": None,
+                    "annual_amount_sar": None,
+                    "annual_count": 120,
+                    "annual_fte": None,
+                    "annual_hours": None,
+                    "annual_classes": None,
+                    "data_source": "manual_upload",
+                    "import_batch_id": None,
+                    "created_at": datetime(2025, 1, 1),
+                }
+            ],
+            "page_size": 1,
+            "next_cursor": "abc",
+            "has_more": True,
+            "total": None,
+            "total_is_estimate": False,
+        }
+
+        from app.main import app
+        from httpx import ASGITransport, AsyncClient
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/api/v1/admin/historical/rows",
+                params={"fiscal_year": 2024, "module": "enrollment", "page_size": 1},
+            )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"][0]["dimension_code"] == "6EME"
+        assert data["next_cursor"] == "abc"
+        call = mock_import_service.get_historical_rows_keyset.call_args.kwargs
+        assert call["fiscal_year"] == 2024
+        assert call["module"].value == "enrollment"
+
+    @pytest.mark.asyncio
+    async def test_malformed_cursor(self, mock_import_service):
+        """Test a malformed cursor is a client error."""
+        mock_import_service.get_historical_rows_keyset.side_effect = ValidationError(
+            "Invalid pagination cursor", field="cursor"
+        )
+
+        from app.main import app
+        from httpx import ASGITransport, AsyncClient
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/api/v1/admin/historical/rows", params={"cursor": "bad"}
+            )
+
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_invalid_module(self):
+        """Test listing rows with an invalid module."""
+        from app.main import app
+        from httpx import ASGITransport, AsyncClient
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/api/v1/admin/historical/rows", params={"module": "invalid"}
+            )
+
+        assert response.status_code == 400
+
+
+class TestIntegrationLogsEndpoint:
+    """Tests for GET /admin/integration-logs."""
+
+    @pytest.mark.asyncio
+    async def test_list_logs_by_cursor(self):
+        """Test integration logs are listed by cursor with filters."""
+        with patch("app.api.v1.admin.BaseService") as mock:
+            log_service = AsyncMock()
+            mock.return_value = log_service
+            log_service.get_keyset_paginated.return_value = {
+                "items": [
+                    {
+                        "id": uuid.uuid4(),
+                        "integration_type": "odoo",
+                        "action": "import_actuals",
+                        "status": "completed",
+                        "records_processed": 10,
+                        "records_failed": 0,
+                        "created_at": datetime(2025, 1, 1),
+                    }
+                ],
+                "page_size": 50,
+                "next_cursor": None,
+                "has_more": False,
+                "total": None,
+                "total_is_estimate": False,
+            }
+
+            from app.main import app
+            from httpx import ASGITransport, AsyncClient
+
+            async with AsyncClient(
+                transport=ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.get(
+                    "/api/v1/admin/integration-logs",
+                    params={"integration_type": "odoo", "status": "completed"},
+                )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["items"][0]["integration_type"] == "odoo"
+        assert data["has_more"] is False
+        call = log_service.get_keyset_paginated.call_args.kwargs
+        assert call["filters"] == {"integration_type": "odoo", "status": "completed"}
+        assert call["order_by"] == "created_at"
+
+
 class TestTemplateEndpoint:
     """Tests for GET /admin/historical/template/{module}."""
 
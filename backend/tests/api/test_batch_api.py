@@ -0,0 +1,216 @@
+"""
+Tests for the batched read API endpoint.
+
+Tests cover:
+- Running whitelisted planning reads and serializing with their response models
+- Per-operation status codes (unknown route, malformed id, query string,
+  service errors)
+- Bounded concurrency on separate sessions from the read session factory
+- Request validation (duplicate ids, batch size)
+"""
+
+import asyncio
+import inspect
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.api.v1.batch import batch_read, get_batch_session_factory, resolve_batch_route
+from app.database import get_read_session_factory
+from app.schemas.batch import MAX_BATCH_OPERATIONS, BatchRequest
+from app.services.exceptions import NotFoundError
+from pydantic import ValidationError
+
+
+def _session_factory() -> MagicMock:
+    """Session factory yielding a fresh mock session per operation."""
+
+    @asynccontextmanager
+    async def _session():
+        yield AsyncMock()
+
+    return MagicMock(side_effect=_session)
+
+
+def _batch(*paths: str) -> BatchRequest:
+    return BatchRequest(operations=[{"path": path} for path in paths])
+
+
+class TestResolveBatchRoute:
+    """Tests for whitelisted route resolution."""
+
+    def test_resolves_planning_reads(self):
+        """Test whitelisted GET routes resolve with typed path parameters."""
+        version_id = uuid.uuid4()
+
+        batch_route, params = resolve_batch_route(
+            f"/api/v1/planning/enrollment/{version_id}/summary"
+        )
+
+        assert batch_route.route.path == "/api/v1/planning/enrollment/{version_id}/summary"
+        assert params == {"version_id": version_id}
+
+    def test_write_routes_are_not_whitelisted(self):
+        """Test calculation routes cannot be reached through a batch."""
+        version_id = uuid.uuid4()
+
+        assert resolve_batch_route(f"/api/v1/planning/dhg/trmd/{version_id}/calculate") is None
+        assert resolve_batch_route(f"/api/v1/configuration/budget-versions/{version_id}") is None
+
+
+class TestBatchRead:
+    """Tests for the batch endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_runs_operations_and_serializes_results(self):
+        """Test results follow request order and the routes' response models."""
+        version_id = uuid.uuid4()
+        now = datetime(2025, 1, 1)
+        distribution = MagicMock(
+            id=uuid.uuid4(),
+            budget_version_id=version_id,
+            level_id=uuid.uuid4(),
+            french_pct=Decimal("30.00"),
+            saudi_pct=Decimal("20.00"),
+            other_pct=Decimal("50.00"),
+            created_at=now,
+            updated_at=now,
+        )
+        enrollment_service = AsyncMock()
+        enrollment_service.get_distributions.return_value = [distribution]
+        dhg_service = AsyncMock()
+        dhg_service.get_teacher_allocations.return_value = []
+        session_factory = _session_factory()
+
+        with (
+            patch("app.api.v1.planning.EnrollmentService", return_value=enrollment_service),
+            patch("app.api.v1.planning.DHGService", return_value=dhg_service),
+        ):
+            response = await batch_read(
+                _batch(
+                    f"/api/v1/planning/distributions/{version_id}",
+                    f"/api/v1/planning/dhg/allocations/{version_id}",
+                ),
+                user=MagicMock(),
+                session_factory=session_factory,
+            )
+
+        first, second = response.results
+        assert first.id == f"/api/v1/planning/distributions/{version_id}"
+        assert first.status == 200
+        assert first.data[0]["french_pct"] == "30.00"
+        assert first.data[0]["budget_version_id"] == str(version_id)
+        assert second.status == 200
+        assert second.data == []
+        # One session per operation
+        assert session_factory.call_count == 2
+        enrollment_service.get_distributions.assert_awaited_once_with(version_id)
+
+    @pytest.mark.asyncio
+    async def test_failures_are_reported_per_operation(self):
+        """Test one failing operation does not fail the batch."""
+        version_id = uuid.uuid4()
+        progress_service = AsyncMock()
+        progress_service.get_planning_progress.side_effect = NotFoundError(
+            "BudgetVersion", str(version_id)
+        )
+
+        with patch("app.api.v1.planning.PlanningProgressService", return_value=progress_service):
+            response = await batch_read(
+                _batch(
+                    f"/api/v1/planning/progress/{version_id}",
+                    "/api/v1/planning/progress/not-a-uuid",
+                    f"/api/v1/costs/personnel/{version_id}",
+                ),
+                user=MagicMock(),
+                session_factory=_session_factory(),
+            )
+
+        assert [result.status for result in response.results] == [404, 422, 404]
+        assert "not found" in response.results[0].error
+
+    @pytest.mark.asyncio
+    async def test_query_string_rejected(self):
+        """Test a query string is rejected rather than silently dropped."""
+        version_id = uuid.uuid4()
+        session_factory = _session_factory()
+
+        response = await batch_read(
+            _batch(f"/api/v1/planning/enrollment/{version_id}/summary?level=6EME"),
+            user=MagicMock(),
+            session_factory=session_factory,
+        )
+
+        (result,) = response.results
+        assert result.status == 400
+        assert "Query strings" in result.error
+        session_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test at most BATCH_MAX_CONCURRENCY operations run at once."""
+        running = 0
+        peak = 0
+
+        async def get_class_structure(version_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return []
+
+        service = MagicMock()
+        service.get_class_structure = get_class_structure
+
+        with (
+            patch("app.api.v1.planning.ClassStructureService", return_value=service),
+            patch("app.api.v1.batch.BATCH_MAX_CONCURRENCY", 2),
+        ):
+            response = await batch_read(
+                BatchRequest(
+                    operations=[
+                        {"id": str(i), "path": f"/api/v1/planning/class-structure/{uuid.uuid4()}"}
+                        for i in range(6)
+                    ]
+                ),
+                user=MagicMock(),
+                session_factory=_session_factory(),
+            )
+
+        assert all(result.status == 200 for result in response.results)
+        assert peak == 2
+
+
+class TestBatchSessionFactory:
+    """Tests for the session factory of batch operations."""
+
+    def test_routed_like_read_routes(self):
+        """Test batch sessions use the read factory (replica when allowed)."""
+        param = inspect.signature(get_batch_session_factory).parameters["session_factory"]
+        factory = MagicMock()
+
+        assert param.default.dependency is get_read_session_factory
+        assert get_batch_session_factory(session_factory=factory) is factory
+
+
+class TestBatchRequestValidation:
+    """Tests for batch request validation."""
+
+    def test_duplicate_ids_rejected(self):
+        """Test operation ids must be unique."""
+        with pytest.raises(ValidationError):
+            BatchRequest(
+                operations=[
+                    {"id": "a", "path": "/api/v1/planning/progress/x"},
+                    {"id": "a", "path": "/api/v1/planning/progress/y"},
+                ]
+            )
+
+    def test_batch_size_limited(self):
+        """Test batches larger than MAX_BATCH_OPERATIONS are rejected."""
+        with pytest.raises(ValidationError):
+            _batch(*[f"/api/v1/planning/progress/{i}" for i in range(MAX_BATCH_OPERATIONS + 1)])
@@ -0,0 +1,165 @@
+"""
+Tests for conditional GET on budget version reads.
+
+Covers:
+- ETag derivation and If-None-Match matching
+- 304 responses answered before the endpoint runs
+- ETag changes when a write is logged to the revision log
+- Versions without a data revision
+- KPI reads left unconditional
+"""
+
+import uuid
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from app.database import get_db
+from app.dependencies.auth import get_current_user
+from app.dependencies.etag import ETagRoute, etag_matches, make_etag, version_etag
+from app.models.configuration import BudgetVersionRevision
+from app.services.data_revision import get_data_revision
+from fastapi import APIRouter, Depends, FastAPI
+
+
+class TestETagHelpers:
+    """Tests for ETag derivation and matching."""
+
+    def test_make_etag_varies_by_input(self):
+        version_id = uuid.uuid4()
+        etag = make_etag("/api/v1/planning/enrollment/{version_id}", version_id, 3)
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == make_etag("/api/v1/planning/enrollment/{version_id}", version_id, 3)
+        assert etag != make_etag("/api/v1/planning/enrollment/{version_id}", version_id, 4)
+        assert etag != make_etag("/api/v1/planning/progress/{version_id}", version_id, 3)
+        assert etag != make_etag(
+            "/api/v1/planning/enrollment/{version_id}", version_id, 3, "category=x"
+        )
+
+    def test_etag_matches_weak_comparison(self):
+        """Test weak comparison, lists and wildcards."""
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches('"other", W/"abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"other"', '"abc"')
+        assert not etag_matches(None, '"abc"')
+
+
+@pytest.fixture
+def calls() -> list[uuid.UUID]:
+    return []
+
+
+@pytest.fixture
+def app(db_session, calls) -> FastAPI:
+    """App with one version read opted in to conditional GET."""
+    router = APIRouter(prefix="/api/v1/planning", route_class=ETagRoute)
+
+    @router.get("/enrollment/{version_id}", dependencies=[Depends(version_etag)])
+    async def get_enrollment(version_id: uuid.UUID):
+        calls.append(version_id)
+        return {"version_id": str(version_id)}
+
+    async def override_get_db():
+        yield db_session
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: MagicMock()
+    return app
+
+
+async def _get(app: FastAPI, path: str, **headers: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+class TestVersionETag:
+    """Tests for the version_etag dependency and ETagRoute."""
+
+    @pytest.mark.asyncio
+    async def test_not_modified_skips_endpoint(self, app, db_session, calls):
+        """Test a matching If-None-Match gets 304 without running the endpoint."""
+        version_id = uuid.uuid4()
+        db_session.add(BudgetVersionRevision(budget_version_id=version_id))
+        await db_session.flush()
+        path = f"/api/v1/planning/enrollment/{version_id}"
+
+        first = await _get(app, path)
+        etag = first.headers["etag"]
+        second = await _get(app, path, **{"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert first.headers["cache-control"] == "private, no-cache"
+        assert second.status_code == 304
+        assert second.headers["etag"] == etag
+        assert second.content == b""
+        assert calls == [version_id]
+
+    @pytest.mark.asyncio
+    async def test_revision_bump_changes_etag(self, app, db_session, calls):
+        """Test a write (logged revision row) invalidates the client's ETag."""
+        version_id = uuid.uuid4()
+        db_session.add(BudgetVersionRevision(budget_version_id=version_id))
+        await db_session.flush()
+        path = f"/api/v1/planning/enrollment/{version_id}"
+        etag = (await _get(app, path)).headers["etag"]
+
+        db_session.add(BudgetVersionRevision(budget_version_id=version_id))
+        await db_session.flush()
+        response = await _get(app, path, **{"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_version_without_revision(self, app, calls):
+        """Test versions without a revision are served without an ETag."""
+        response = await _get(app, f"/api/v1/planning/enrollment/{uuid.uuid4()}")
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert len(calls) == 1
+
+
+class TestGetDataRevision:
+    """Tests for the data revision lookup."""
+
+    @pytest.mark.asyncio
+    async def test_lookup(self, db_session):
+        version_id = uuid.uuid4()
+        db_session.add_all(
+            [
+                BudgetVersionRevision(budget_version_id=version_id, writes=40),
+                BudgetVersionRevision(budget_version_id=version_id),
+                BudgetVersionRevision(budget_version_id=version_id),
+            ]
+        )
+        await db_session.flush()
+
+        # Sum of the write counts: a compacted row plus two logged writes
+        assert await get_data_revision(db_session, version_id) == 42
+        assert await get_data_revision(db_session, uuid.uuid4()) is None
+
+
+class TestConditionalRoutes:
+    """Tests for which routes opt in to conditional GET."""
+
+    def test_kpi_reads_not_conditional(self):
+        """KPI reads embed kpi_definitions, which the data revision does not cover."""
+        from app.api.v1 import analysis
+
+        kpi_reads = [
+            route
+            for route in analysis.router.routes
+            if "GET" in route.methods and route.path.startswith("/api/v1/analysis/kpis/")
+        ]
+
+        assert kpi_reads
+        for route in kpi_reads:
+            assert version_etag not in [d.call for d in route.dependant.dependencies]
@@ -211,6 +211,7 @@ class TestConsolidateBudget:
         with patch("app.api.v1.consolidation.get_consolidation_service") as mock_svc:
             mock_service = AsyncMock()
             mock_service.consolidate_budget.return_value = mock_consolidation_items
+            mock_service.last_recomputed = True
             mock_service.get_consolidation.return_value = mock_consolidation_items
             mock_service.budget_version_service.get_by_id.return_value = mock_budget_version
             mock_svc.return_value = mock_service
@@ -479,6 +480,7 @@ class TestFinancialStatements:
             from datetime import datetime
 
             mock_service = AsyncMock()
+            mock_service.last_recomputed = False
             mock_service.get_income_statement.return_value = {
                 "id": uuid.uuid4(),
                 "budget_version_id": version_id,
@@ -514,6 +516,7 @@ class TestFinancialStatements:
             from datetime import datetime
 
             mock_service = AsyncMock()
+            mock_service.last_recomputed = False
             mock_service.get_income_statement.return_value = {
                 "id": uuid.uuid4(),
                 "budget_version_id": version_id,
@@ -586,6 +589,7 @@ class TestFinancialStatements:
 
         with patch("app.api.v1.consolidation.get_financial_statements_service") as mock_svc:
             mock_service = AsyncMock()
+            mock_service.last_recomputed = False
             mock_service.get_balance_sheet.return_value = {
                 "assets": assets_mock,
                 "liabilities": liabilities_mock,
@@ -1149,6 +1153,7 @@ class TestConsolidationAdditionalCoverage:
 
         with patch("app.api.v1.consolidation.get_financial_statements_service") as mock_svc:
             mock_service = AsyncMock()
+            mock_service.last_recomputed = False
             mock_service.get_balance_sheet.return_value = {
                 "assets": assets_mock,
                 "liabilities": liabilities_mock,
@@ -1247,6 +1252,7 @@ class TestConsolidationAdditionalCoverage:
 
         with patch("app.api.v1.consolidation.get_financial_statements_service") as mock_svc:
             mock_service = AsyncMock()
+            mock_service.last_recomputed = False
             mock_service.get_income_statement.return_value = {
                 "id": uuid.uuid4(),
                 "budget_version_id": version_id,
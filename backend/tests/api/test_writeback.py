@@ -469,6 +469,55 @@ class TestChangeHistoryEndpoint:
         assert response.status_code in [200, 422, 500]
 
 
+class TestChangeHistoryCursorEndpoint:
+    """Test GET /api/v1/writeback/cells/changes/{budget_version_id}/cursor endpoint."""
+
+    def test_cursor_page_structure(self, client, mock_db_session, sample_budget_version_id):
+        """Test a cursor page returns items and the next cursor."""
+        change = {
+            "id": uuid4(),
+            "cell_id": uuid4(),
+            "budget_version_id": sample_budget_version_id,
+            "module_code": "enrollment",
+            "entity_id": uuid4(),
+            "field_name": "student_count",
+            "period_code": None,
+            "old_value_numeric": Decimal("100"),
+            "old_value_text": None,
+            "new_value_numeric": Decimal("150"),
+            "new_value_text": None,
+            "change_type": "update",
+            "session_id": uuid4(),
+            "sequence_number": 1,
+            "changed_by": uuid4(),
+            "changed_at": datetime(2025, 3, 1, 12, 0, 0),
+        }
+        mock_result = MagicMock()
+        mock_result.fetchall.return_value = [MagicMock(_mapping=change)] * 2
+        mock_db_session.execute.return_value = mock_result
+
+        response = client.get(
+            f"/api/v1/writeback/cells/changes/{sample_budget_version_id}/cursor",
+            params={"page_size": 1},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) == 1
+        assert data["has_more"] is True
+        assert data["next_cursor"]
+        assert data["total"] is None
+
+    def test_malformed_cursor(self, client, sample_budget_version_id):
+        """Test a malformed cursor is a client error."""
+        response = client.get(
+            f"/api/v1/writeback/cells/changes/{sample_budget_version_id}/cursor",
+            params={"cursor": "not-a-cursor"},
+        )
+
+        assert response.status_code == 400
+
+
 class TestUndoEndpoint:
     """Test POST /api/v1/writeback/cells/undo endpoint."""
 
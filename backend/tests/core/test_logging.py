@@ -8,7 +8,7 @@ Covers:
 - Request/response logging
 """
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from app.core.logging import LoggingMiddleware, configure_logging, logger
@@ -39,112 +39,100 @@ class TestLoggingConfiguration:
         mock_basic_config.assert_called_once()
 
 
+def _http_scope(
+    path: str = "/api/test",
+    method: str = "GET",
+    client: tuple[str, int] | None = ("127.0.0.1", 50000),
+    user_agent: str | None = None,
+) -> dict:
+    """Build a minimal ASGI HTTP scope."""
+    headers = [(b"user-agent", user_agent.encode())] if user_agent else []
+    return {
+        "type": "http",
+        "path": path,
+        "method": method,
+        "headers": headers,
+        "query_string": b"",
+        "client": client,
+    }
+
+
+def _app_returning(status: int = 200):
+    """ASGI app sending an empty response with the given status."""
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+async def _call(middleware: LoggingMiddleware, scope: dict) -> list[dict]:
+    """Run the middleware and return the sent ASGI messages."""
+    messages: list[dict] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
+
+
+def _response_headers(messages: list[dict]) -> dict[str, str]:
+    """Decode the headers of the http.response.start message."""
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    return {k.decode().lower(): v.decode() for k, v in start["headers"]}
+
+
 class TestLoggingMiddleware:
     """Test LoggingMiddleware functionality."""
 
     @pytest.mark.asyncio
     async def test_middleware_adds_correlation_id(self):
         """Test that middleware adds correlation ID to response."""
-        middleware = LoggingMiddleware(MagicMock())
-
-        # Mock request and response
-        request = MagicMock()
-        request.url.path = "/api/test"
-        request.method = "GET"
-        request.client.host = "127.0.0.1"
-        request.headers.get = MagicMock(return_value=None)
-
-        response = MagicMock()
-        response.status_code = 200
-        response.headers = {}
-
-        # Mock call_next
-        async def call_next(req):
-            return response
+        middleware = LoggingMiddleware(_app_returning())
 
-        # Process request
-        result = await middleware.dispatch(request, call_next)
+        messages = await _call(middleware, _http_scope())
 
-        # Verify correlation ID was added
-        assert "X-Correlation-ID" in result.headers
-        assert result.headers["X-Correlation-ID"] is not None
-        assert isinstance(result.headers["X-Correlation-ID"], str)
+        headers = _response_headers(messages)
+        assert "x-correlation-id" in headers
+        assert headers["x-correlation-id"]
 
     @pytest.mark.asyncio
     async def test_middleware_generates_unique_correlation_ids(self):
         """Test that each request gets a unique correlation ID."""
-        middleware = LoggingMiddleware(MagicMock())
+        middleware = LoggingMiddleware(_app_returning())
 
-        request1 = MagicMock()
-        request1.url.path = "/api/test1"
-        request1.method = "GET"
-        request1.client.host = "127.0.0.1"
-        request1.headers.get = MagicMock(return_value=None)
-
-        request2 = MagicMock()
-        request2.url.path = "/api/test2"
-        request2.method = "GET"
-        request2.client.host = "127.0.0.1"
-        request2.headers.get = MagicMock(return_value=None)
-
-        response = MagicMock()
-        response.status_code = 200
-        response.headers = {}
-
-        async def call_next(req):
-            return response
-
-        result1 = await middleware.dispatch(request1, call_next)
-        result2 = await middleware.dispatch(request2, call_next)
+        messages1 = await _call(middleware, _http_scope(path="/api/test1"))
+        messages2 = await _call(middleware, _http_scope(path="/api/test2"))
 
         # Correlation IDs should be different
-        assert result1.headers["X-Correlation-ID"] != result2.headers["X-Correlation-ID"]
+        assert (
+            _response_headers(messages1)["x-correlation-id"]
+            != _response_headers(messages2)["x-correlation-id"]
+        )
 
     @pytest.mark.asyncio
     async def test_middleware_logs_request_start(self):
         """Test that middleware logs request start."""
-        middleware = LoggingMiddleware(MagicMock())
-
-        request = MagicMock()
-        request.url.path = "/api/test"
-        request.method = "GET"
-        request.client.host = "127.0.0.1"
-        request.headers.get = MagicMock(return_value="test-agent")
-
-        response = MagicMock()
-        response.status_code = 200
-        response.headers = {}
-
-        async def call_next(req):
-            return response
+        middleware = LoggingMiddleware(_app_returning())
 
         with patch("app.core.logging.logger.info") as mock_log:
-            await middleware.dispatch(request, call_next)
+            await _call(middleware, _http_scope(user_agent="test-agent"))
 
             # Should log request_started
-            [str(call) for call in mock_log.call_args_list]
             assert any("request_started" in str(call) for call in mock_log.call_args_list)
 
     @pytest.mark.asyncio
     async def test_middleware_logs_request_completion(self):
         """Test that middleware logs request completion."""
-        middleware = LoggingMiddleware(MagicMock())
-
-        request = MagicMock()
-        request.url.path = "/api/test"
-        request.method = "GET"
-        request.client.host = "127.0.0.1"
-        request.headers.get = MagicMock(return_value=None)
-
-        response = MagicMock()
-        response.status_code = 200
-        response.headers = {}
-
-        async def call_next(req):
-            return response
+        middleware = LoggingMiddleware(_app_returning())
 
         with patch("app.core.logging.logger.info") as mock_log:
-            await middleware.dispatch(request, call_next)
+            await _call(middleware, _http_scope())
 
             # Should log request_completed
             assert any("request_completed" in str(call) for call in mock_log.call_args_list)
@@ -152,20 +140,15 @@ class TestLoggingMiddleware:
     @pytest.mark.asyncio
     async def test_middleware_logs_request_failure(self):
         """Test that middleware logs request failures."""
-        middleware = LoggingMiddleware(MagicMock())
 
-        request = MagicMock()
-        request.url.path = "/api/test"
-        request.method = "GET"
-        request.client.host = "127.0.0.1"
-        request.headers.get = MagicMock(return_value=None)
-
-        async def call_next(req):
+        async def failing_app(scope, receive, send):
             raise ValueError("Test error")
 
+        middleware = LoggingMiddleware(failing_app)
+
         with patch("app.core.logging.logger.error") as mock_log:
             with pytest.raises(ValueError):
-                await middleware.dispatch(request, call_next)
+                await _call(middleware, _http_scope())
 
             # Should log request_failed
             assert any("request_failed" in str(call) for call in mock_log.call_args_list)
@@ -173,23 +156,10 @@ class TestLoggingMiddleware:
     @pytest.mark.asyncio
     async def test_middleware_clears_context_vars(self):
         """Test that middleware clears context variables after request."""
-        middleware = LoggingMiddleware(MagicMock())
-
-        request = MagicMock()
-        request.url.path = "/api/test"
-        request.method = "GET"
-        request.client.host = "127.0.0.1"
-        request.headers.get = MagicMock(return_value=None)
-
-        response = MagicMock()
-        response.status_code = 200
-        response.headers = {}
-
-        async def call_next(req):
-            return response
+        middleware = LoggingMiddleware(_app_returning())
 
         with patch("app.core.logging.structlog.contextvars.clear_contextvars") as mock_clear:
-            await middleware.dispatch(request, call_next)
+            await _call(middleware, _http_scope())
 
             # Should clear context variables
             mock_clear.assert_called_once()
@@ -197,45 +167,22 @@ class TestLoggingMiddleware:
     @pytest.mark.asyncio
     async def test_middleware_handles_none_client(self):
         """Test that middleware handles request with None client."""
-        middleware = LoggingMiddleware(MagicMock())
-
-        request = MagicMock()
-        request.url.path = "/api/test"
-        request.method = "GET"
-        request.client = None
-        request.headers.get = MagicMock(return_value=None)
-
-        response = MagicMock()
-        response.status_code = 200
-        response.headers = {}
-
-        async def call_next(req):
-            return response
+        middleware = LoggingMiddleware(_app_returning())
 
         # Should not raise exception
-        result = await middleware.dispatch(request, call_next)
-        assert result.status_code == 200
+        messages = await _call(middleware, _http_scope(client=None))
+        assert messages[0]["status"] == 200
 
     @pytest.mark.asyncio
     async def test_middleware_binds_context_vars(self):
         """Test that middleware binds context variables."""
-        middleware = LoggingMiddleware(MagicMock())
-
-        request = MagicMock()
-        request.url.path = "/api/test"
-        request.method = "POST"
-        request.client.host = "192.168.1.1"
-        request.headers.get = MagicMock(return_value="test-agent")
-
-        response = MagicMock()
-        response.status_code = 201
-        response.headers = {}
-
-        async def call_next(req):
-            return response
+        middleware = LoggingMiddleware(_app_returning(201))
 
         with patch("app.core.logging.structlog.contextvars.bind_contextvars") as mock_bind:
-            await middleware.dispatch(request, call_next)
+            await _call(
+                middleware,
+                _http_scope(method="POST", client=("192.168.1.1", 50000), user_agent="test-agent"),
+            )
 
             # Should bind context variables
             mock_bind.assert_called_once()
@@ -245,3 +192,15 @@ class TestLoggingMiddleware:
             assert call_kwargs["method"] == "POST"
             assert call_kwargs["client_host"] == "192.168.1.1"
 
+    @pytest.mark.asyncio
+    async def test_middleware_passes_through_non_http_scopes(self):
+        """Test that lifespan and websocket scopes are forwarded untouched."""
+        inner = AsyncMock()
+        middleware = LoggingMiddleware(inner)
+        scope = {"type": "lifespan"}
+
+        with patch("app.core.logging.structlog.contextvars.bind_contextvars") as mock_bind:
+            await middleware(scope, AsyncMock(), AsyncMock())
+
+        inner.assert_awaited_once()
+        mock_bind.assert_not_called()
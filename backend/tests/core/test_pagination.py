@@ -6,13 +6,21 @@ Covers:
 - PaginatedResponse model
 - create_paginated_response helper function
 - Edge cases (empty lists, boundary values)
+- Keyset cursor encoding and cursor-mode responses
 """
 
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
 import pytest
 from app.core.pagination import (
     PaginatedResponse,
     PaginationParams,
+    create_cursor_paginated_response,
     create_paginated_response,
+    decode_cursor,
+    encode_cursor,
 )
 
 
@@ -328,3 +336,60 @@ class TestPaginationEdgeCases:
 
         assert response.total_pages == 3
 
+
+
+class TestCursorPagination:
+    """Test keyset cursor encoding and cursor-mode responses."""
+
+    @pytest.mark.parametrize(
+        "sort_value",
+        [
+            datetime(2025, 1, 15, 10, 30, 0),
+            date(2025, 1, 15),
+            Decimal("1234.56"),
+            uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            42,
+            "6110",
+        ],
+    )
+    def test_cursor_round_trip(self, sort_value):
+        """Test that cursors decode to the encoded sort value and id."""
+        item_id = uuid.uuid4()
+
+        cursor = encode_cursor(sort_value, item_id)
+
+        assert decode_cursor(cursor) == (sort_value, item_id)
+        assert "=" not in cursor
+
+    def test_invalid_cursor_raises(self):
+        """Test that malformed cursors raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_cursor_response(self):
+        """Test cursor-mode response without a total."""
+        response = create_cursor_paginated_response(
+            items=[{"id": 1}],
+            page_size=1,
+            next_cursor="abc",
+        )
+
+        assert response.next_cursor == "abc"
+        assert response.has_more is True
+        assert response.total is None
+        assert response.page is None
+        assert response.total_pages is None
+
+    def test_cursor_response_with_estimate(self):
+        """Test cursor-mode response on the last page with an estimated total."""
+        response = create_cursor_paginated_response(
+            items=[],
+            page_size=50,
+            next_cursor=None,
+            total=1200,
+            total_is_estimate=True,
+        )
+
+        assert response.has_more is False
+        assert response.total_pages == 24
+        assert response.total_is_estimate is True
@@ -0,0 +1,114 @@
+"""
+Tests for orjson responses.
+
+Covers:
+- Native encoding of Decimal, UUID, datetime and enums
+- Parity with Pydantic's JSON serialization
+- validated_response single-pass validation
+"""
+
+import enum
+import uuid
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+import orjson
+import pytest
+from app.core.responses import ORJSONResponse, json_dumps, validated_response
+from pydantic import BaseModel, ConfigDict
+
+
+class Status(str, enum.Enum):
+    WORKING = "working"
+
+
+class LineItem(BaseModel):
+    id: uuid.UUID
+    amount_sar: Decimal
+    status: Status
+    period: date
+    created_at: datetime
+    tags: dict[int, str] = {}
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def _line_item() -> LineItem:
+    return LineItem(
+        id=uuid.uuid4(),
+        amount_sar=Decimal("12345.60"),
+        status=Status.WORKING,
+        period=date(2025, 1, 31),
+        created_at=datetime(2025, 1, 31, 8, 30, tzinfo=UTC),
+        tags={1: "tuition"},
+    )
+
+
+class TestJsonDumps:
+    """Test orjson serialization."""
+
+    def test_native_types(self):
+        """Test Decimal, UUID, dates and enums are encoded like Pydantic's JSON mode."""
+        item_id = uuid.uuid4()
+        content = {
+            "id": item_id,
+            "amount": Decimal("1.50"),
+            "status": Status.WORKING,
+            "day": date(2025, 1, 1),
+        }
+
+        assert orjson.loads(json_dumps(content)) == {
+            "id": str(item_id),
+            "amount": "1.50",
+            "status": "working",
+            "day": "2025-01-01",
+        }
+
+    def test_model_matches_pydantic_json(self):
+        """Test models serialize to the same JSON as model_dump_json."""
+        item = _line_item()
+
+        assert json_dumps(item) == item.model_dump_json().encode()
+
+    def test_unsupported_type_raises(self):
+        """Test unknown objects are rejected."""
+        with pytest.raises(TypeError):
+            json_dumps({"value": object()})
+
+
+class TestORJSONResponse:
+    """Test the response class."""
+
+    def test_render(self):
+        """Test the response body and media type."""
+        response = ORJSONResponse({"amount": Decimal("10.00")})
+
+        assert response.body == b'{"amount":"10.00"}'
+        assert response.media_type == "application/json"
+
+
+class TestValidatedResponse:
+    """Test single-pass validation and serialization."""
+
+    def test_validates_orm_like_objects(self):
+        """Test attribute objects are validated against the schema."""
+        item = _line_item()
+
+        class Row:
+            def __init__(self, **values):
+                self.__dict__.update(values)
+
+        response = validated_response([Row(**item.model_dump())], list[LineItem])
+
+        assert orjson.loads(response.body) == [orjson.loads(item.model_dump_json())]
+
+    def test_invalid_data_raises(self):
+        """Test data not matching the schema fails validation."""
+        with pytest.raises(ValueError):
+            validated_response([{"id": "not-a-uuid"}], list[LineItem])
+
+    def test_status_code(self):
+        """Test the status code is passed through."""
+        response = validated_response([], list[LineItem], status_code=201)
+
+        assert response.status_code == 201
@@ -5,19 +5,45 @@ Covers:
 - Password hashing and verification
 - JWT token creation and decoding
 - Supabase JWT verification
+- Verified-token cache
 - Edge cases and error handling
 """
 
+import time
 from datetime import timedelta
 from unittest.mock import patch
 
+import pytest
 from app.core.security import (
+    JWT_CACHE_REQUESTS,
+    SupabaseJWTVerifier,
     create_access_token,
     decode_access_token,
     hash_password,
+    reset_jwt_verifier,
     verify_password,
     verify_supabase_jwt,
 )
+from jose import JWTError, jwt
+
+SUPABASE_SECRET = "test-supabase-jwt-secret"
+SUPABASE_ISSUER = "https://test.supabase.co/auth/v1"
+
+
+def _supabase_token(sub: str = "user-uuid-123", expires_in: int = 3600) -> str:
+    """Encode a Supabase-style token for the test secret and issuer."""
+    claims = {
+        "sub": sub,
+        "aud": "authenticated",
+        "iss": SUPABASE_ISSUER,
+        "exp": int(time.time()) + expires_in,
+    }
+    return jwt.encode(claims, SUPABASE_SECRET, algorithm="HS256")
+
+
+def _cache_count(result: str) -> float:
+    """Current value of the token cache counter for a result label."""
+    return JWT_CACHE_REQUESTS.labels(result=result)._value.get()
 
 
 class TestPasswordHashing:
@@ -156,6 +182,13 @@ class TestJWTToken:
 class TestSupabaseJWT:
     """Test Supabase JWT verification."""
 
+    @pytest.fixture(autouse=True)
+    def _fresh_verifier(self):
+        """Re-read the (patched) configuration in every test."""
+        reset_jwt_verifier()
+        yield
+        reset_jwt_verifier()
+
     def test_verify_supabase_jwt_with_custom_secret(self):
         """Test Supabase JWT verification with custom secret."""
         from app.core.security import ALGORITHM
@@ -230,6 +263,86 @@ class TestSupabaseJWT:
             assert decoded is None
 
 
+class TestVerifiedTokenCache:
+    """Test the verified-token LRU cache."""
+
+    def test_repeated_token_is_served_from_cache(self):
+        """A verified token is decoded once, then served from the cache."""
+        verifier = SupabaseJWTVerifier(SUPABASE_SECRET, SUPABASE_ISSUER)
+        token = _supabase_token()
+        hits, misses = _cache_count("hit"), _cache_count("miss")
+
+        with patch("app.core.security.jwt.decode", wraps=jwt.decode) as mock_decode:
+            first = verifier.verify(token)
+            second = verifier.verify(token)
+
+        assert first is not None
+        assert second is first
+        assert mock_decode.call_count == 1
+        assert _cache_count("miss") == misses + 1
+        assert _cache_count("hit") == hits + 1
+
+    def test_expired_cache_entry_is_reverified(self):
+        """Entries are only served until the token's exp."""
+        verifier = SupabaseJWTVerifier(SUPABASE_SECRET, SUPABASE_ISSUER)
+        token = _supabase_token(expires_in=60)
+        assert verifier.verify(token) is not None
+
+        with (
+            patch("app.core.security.time.time", return_value=time.time() + 120),
+            patch("app.core.security.jwt.decode", side_effect=JWTError("expired")),
+        ):
+            assert verifier.verify(token) is None
+        assert len(verifier._cache) == 0
+
+    def test_cache_is_bounded_lru(self):
+        """The least recently used token is evicted past cache_size."""
+        verifier = SupabaseJWTVerifier(SUPABASE_SECRET, SUPABASE_ISSUER, cache_size=2)
+        token_a, token_b, token_c = (_supabase_token(sub=sub) for sub in "abc")
+
+        verifier.verify(token_a)
+        verifier.verify(token_b)
+        verifier.verify(token_a)  # a is now most recently used
+        verifier.verify(token_c)  # evicts b
+
+        with patch("app.core.security.jwt.decode", wraps=jwt.decode) as mock_decode:
+            verifier.verify(token_a)
+            verifier.verify(token_b)
+
+        assert len(verifier._cache) == 2
+        assert mock_decode.call_count == 1
+
+    def test_invalid_tokens_are_not_cached(self):
+        """Failed verifications are neither cached nor returned."""
+        verifier = SupabaseJWTVerifier(SUPABASE_SECRET, SUPABASE_ISSUER)
+        forged = jwt.encode(
+            {"sub": "x", "aud": "authenticated", "iss": SUPABASE_ISSUER, "exp": time.time() + 60},
+            "wrong-secret",
+            algorithm="HS256",
+        )
+
+        assert verifier.verify(forged) is None
+        assert len(verifier._cache) == 0
+
+    def test_configuration_resolved_once(self):
+        """verify_supabase_jwt reads the environment only when (re)building."""
+        reset_jwt_verifier()
+        try:
+            with patch("app.core.security.os.getenv") as mock_getenv:
+                mock_getenv.side_effect = lambda key, default="": {
+                    "SUPABASE_JWT_SECRET": SUPABASE_SECRET,
+                    "SUPABASE_URL": "https://test.supabase.co",
+                }.get(key, default)
+
+                token = _supabase_token()
+                assert verify_supabase_jwt(token) is not None
+                calls = mock_getenv.call_count
+                assert verify_supabase_jwt(_supabase_token(sub="other")) is not None
+                assert mock_getenv.call_count == calls
+        finally:
+            reset_jwt_verifier()
+
+
 class TestSecurityEdgeCases:
     """Test edge cases and error scenarios."""
 
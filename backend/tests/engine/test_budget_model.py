@@ -0,0 +1,333 @@
+"""
+Unit Tests for Budget Model Engine
+
+Tests for the whole-version cascade on plain data.
+
+Test Categories:
+1. Class structure calculation and class size violations
+2. DHG hours and teacher FTE
+3. Revenue from enrollment × fee grid
+4. Personnel costs from allocations
+5. Consolidation rollup and headline totals
+6. What-if overrides (classes, FTE, account amounts)
+7. Goal-seek solver
+"""
+
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from app.engine.budget_model import (
+    AllocationInput,
+    BudgetModelInput,
+    ClassSizeInput,
+    EnrollmentInput,
+    FeeInput,
+    LedgerLine,
+    LevelInput,
+    SubjectHoursInput,
+    TeacherCostInput,
+    calculate_budget_model,
+    calculate_class_structures,
+    goal_seek,
+    map_consolidation_category,
+)
+
+
+@pytest.fixture
+def model_input() -> BudgetModelInput:
+    """Small two-level version: PS (maternelle) and 6EME (collège)."""
+    maternelle_id, college_id = uuid4(), uuid4()
+    ps_id, sixieme_id = uuid4(), uuid4()
+    math_id = uuid4()
+    local_id = uuid4()
+
+    return BudgetModelInput(
+        version_id=uuid4(),
+        levels=[
+            LevelInput(
+                level_id=ps_id,
+                level_code="PS",
+                cycle_id=maternelle_id,
+                cycle_code="MAT",
+                cycle_name="Preschool",
+                is_secondary=False,
+                requires_atsem=True,
+                sort_order=1,
+            ),
+            LevelInput(
+                level_id=sixieme_id,
+                level_code="6EME",
+                cycle_id=college_id,
+                cycle_code="COLL",
+                cycle_name="Middle School",
+                is_secondary=True,
+                sort_order=6,
+            ),
+        ],
+        enrollments=[
+            EnrollmentInput(level_id=ps_id, nationality_code="FRENCH", student_count=35),
+            EnrollmentInput(level_id=ps_id, nationality_code="SAUDI", student_count=15),
+            EnrollmentInput(level_id=sixieme_id, nationality_code="FRENCH", student_count=80),
+        ],
+        class_size_params=[
+            ClassSizeInput(
+                cycle_id=maternelle_id, min_class_size=15, target_class_size=20, max_class_size=24
+            ),
+            ClassSizeInput(
+                level_id=sixieme_id, min_class_size=20, target_class_size=28, max_class_size=32
+            ),
+        ],
+        subject_hours=[
+            SubjectHoursInput(
+                subject_id=math_id, level_id=sixieme_id, hours_per_week=Decimal("4.5")
+            ),
+            SubjectHoursInput(
+                subject_id=uuid4(),
+                level_id=sixieme_id,
+                hours_per_week=Decimal("3.0"),
+                is_split=True,
+            ),
+        ],
+        fees=[
+            FeeInput(
+                level_id=ps_id,
+                nationality_code="FRENCH",
+                fee_category_code="TUITION",
+                amount_sar=Decimal("25000"),
+            ),
+            FeeInput(
+                level_id=ps_id,
+                nationality_code="FRENCH",
+                fee_category_code="DAI",
+                amount_sar=Decimal("3000"),
+            ),
+            FeeInput(
+                level_id=sixieme_id,
+                nationality_code="FRENCH",
+                fee_category_code="TUITION",
+                amount_sar=Decimal("32000"),
+            ),
+        ],
+        allocations=[
+            AllocationInput(
+                category_id=local_id,
+                category_code="LOCAL",
+                category_name="Local Teacher",
+                cycle_id=college_id,
+                cycle_name="Middle School",
+                fte_count=Decimal("2.0"),
+            ),
+        ],
+        teacher_costs=[
+            TeacherCostInput(
+                category_id=local_id,
+                cycle_id=None,
+                avg_salary_sar=Decimal("100000"),
+                social_charges_rate=Decimal("0.21"),
+                benefits_allowance_sar=Decimal("9000"),
+            ),
+        ],
+        ledger_lines=[
+            LedgerLine(
+                source_table="operating_cost_plans",
+                account_code="60610",
+                description="Supplies",
+                amount_sar=Decimal("50000"),
+            ),
+        ],
+    )
+
+
+class TestClassStructures:
+    """Tests for class structure step."""
+
+    def test_classes_and_atsem(self, model_input: BudgetModelInput):
+        """Classes use the target size; ATSEM follows the cycle flag."""
+        lines, violations = calculate_class_structures(model_input)
+
+        assert violations == []
+        assert [line.level_code for line in lines] == ["PS", "6EME"]
+        ps, sixieme = lines
+        assert ps.total_students == 50
+        assert ps.number_of_classes == 3
+        assert ps.avg_class_size == Decimal("16.67")
+        assert ps.atsem_count == 3
+        assert sixieme.number_of_classes == 3
+        assert sixieme.atsem_count == 0
+
+    def test_violation_collected_not_raised(self, model_input: BudgetModelInput):
+        """A class size rule break is reported as a violation."""
+        model_input.enrollments[2].student_count = 33  # 2 classes of 16.5 < min 20
+
+        _lines, violations = calculate_class_structures(model_input)
+
+        assert len(violations) == 1
+        assert violations[0].rule == "AVG_BELOW_MIN"
+        assert violations[0].level_code == "6EME"
+
+
+class TestBudgetModel:
+    """Tests for the full cascade."""
+
+    def test_dhg_hours_and_fte(self, model_input: BudgetModelInput):
+        """Split subjects double the hours; secondary FTE uses 18h."""
+        result = calculate_budget_model(model_input)
+
+        hours = sorted(line.total_hours_per_week for line in result.subject_hours)
+        assert hours == [Decimal("13.50"), Decimal("18.00")]
+        assert result.total_dhg_hours == Decimal("31.50")
+        assert {req.standard_teaching_hours for req in result.teacher_requirements} == {
+            Decimal("18.00")
+        }
+        assert result.total_teacher_fte == Decimal("1.75")
+
+    def test_revenue_merges_fee_categories(self, model_input: BudgetModelInput):
+        """Tuition and DAI rows of the same level/nationality are combined."""
+        result = calculate_budget_model(model_input)
+
+        # PS French: 35 × (25000 + 3000) ; 6EME French: 80 × 32000 ; Saudi: no fees
+        expected_total = Decimal("980000") + Decimal("2560000")
+        amounts = {line.account_code: line.amount_sar for line in result.revenue_lines}
+        assert amounts == {
+            "70110": expected_total * Decimal("0.40"),
+            "70120": expected_total * Decimal("0.30"),
+            "70130": expected_total * Decimal("0.30"),
+        }
+        assert result.total_revenue == expected_total
+
+    def test_personnel_costs_local_formula(self, model_input: BudgetModelInput):
+        """Local unit cost = salary + social charges + benefits."""
+        result = calculate_budget_model(model_input)
+
+        (line,) = result.personnel_costs
+        assert line.unit_cost_sar == Decimal("130000.00")
+        assert line.total_cost_sar == Decimal("260000.000")
+        assert line.description == "Teaching Staff - Local Teacher - Middle School"
+
+    def test_consolidation_and_totals(self, model_input: BudgetModelInput):
+        """Consolidation rolls up calculated and manual lines by account."""
+        result = calculate_budget_model(model_input)
+
+        categories = {
+            line.account_code: line.consolidation_category
+            for line in result.consolidation_lines
+        }
+        assert categories["70110"] == "revenue_tuition"
+        assert categories["64110"] == "personnel_teaching"
+        assert categories["60610"] == "operating_supplies"
+        assert result.consolidation_lines[0].is_revenue is True
+        assert result.total_costs == Decimal("310000")
+        assert result.net_result == result.total_revenue - result.total_costs
+
+    def test_no_fees_no_revenue_lines(self, model_input: BudgetModelInput):
+        """Without a fee grid the revenue step produces nothing."""
+        model_input.fees = []
+
+        result = calculate_budget_model(model_input)
+
+        assert result.revenue_lines == []
+        assert result.total_revenue == Decimal("0")
+
+
+class TestOverrides:
+    """Tests for what-if driver overrides."""
+
+    def test_class_override(self, model_input: BudgetModelInput):
+        """A manual class count replaces the target method."""
+        sixieme_id = model_input.levels[1].level_id
+        model_input.class_overrides = {sixieme_id: 4}
+
+        result = calculate_budget_model(model_input)
+
+        sixieme = result.class_structures[1]
+        assert sixieme.number_of_classes == 4
+        assert sixieme.calculation_method == "custom"
+        assert result.total_dhg_hours == Decimal("42.00")
+
+    def test_fte_override(self, model_input: BudgetModelInput):
+        """A manual FTE replaces the calculated requirement of its subject."""
+        math_id = model_input.subject_hours[0].subject_id
+        model_input.fte_overrides = {math_id: Decimal("2.4")}
+
+        result = calculate_budget_model(model_input)
+
+        math = next(r for r in result.teacher_requirements if r.subject_id == math_id)
+        assert math.simple_fte == Decimal("2.40")
+        assert math.rounded_fte == 3
+
+    def test_account_override(self, model_input: BudgetModelInput):
+        """Account overrides replace planned totals and add unplanned accounts."""
+        model_input.account_overrides = {
+            "60610": Decimal("80000"),
+            "61500": Decimal("10000"),
+        }
+
+        result = calculate_budget_model(model_input)
+
+        amounts = {line.account_code: line.amount_sar for line in result.consolidation_lines}
+        assert amounts["60610"] == Decimal("80000")
+        maintenance = next(
+            line for line in result.consolidation_lines if line.account_code == "61500"
+        )
+        assert maintenance.consolidation_category == "operating_maintenance"
+        assert result.total_costs == Decimal("350000")
+
+
+class TestGoalSeek:
+    """Tests for the bracketed goal-seek solver."""
+
+    def test_nonlinear_root(self):
+        """Secant steps with bisection fallback converge on a convex metric."""
+        solution = goal_seek(lambda x: x * x, 2.0, 0.0, 2.0, tolerance=1e-9)
+
+        assert solution.solved_value == pytest.approx(2**0.5)
+        assert solution.converged is True
+        assert solution.termination == "tolerance"
+        assert {step.method for step in solution.history} == {"bracket", "secant", "bisection"}
+        assert solution.evaluations == len(solution.history)
+
+    def test_discrete_driver_stops_at_resolution(self):
+        """Whole-step drivers return the closest grid value, unconverged if off target."""
+        solution = goal_seek(lambda x: 3 * x + 0.5, 100.0, 0.0, 50.0, tolerance=0.1, step=1.0)
+
+        assert solution.solved_value == 33.0
+        assert solution.termination == "resolution"
+        assert solution.residual == pytest.approx(-0.5)
+        assert solution.converged is False
+        assert (solution.bracket_lower, solution.bracket_upper) == (33.0, 34.0)
+
+    def test_max_iterations(self):
+        """Running out of iterations is reported as not converged."""
+        solution = goal_seek(lambda x: x**3, 1.0, -10.0, 10.0, tolerance=1e-12, max_iterations=2)
+
+        assert solution.converged is False
+        assert solution.termination == "max_iterations"
+        assert solution.iterations == 2
+
+    def test_not_bracketed(self):
+        """Both bracket ends on the same side of the target are rejected."""
+        with pytest.raises(ValueError, match="not bracketed"):
+            goal_seek(lambda x: x, 100.0, 0.0, 10.0, tolerance=0.1)
+
+
+class TestConsolidationMapping:
+    """Tests for consolidation category mapping."""
+
+    @pytest.mark.parametrize(
+        ("source_table", "account_code", "expected"),
+        [
+            ("revenue_plans", "70110", "revenue_tuition"),
+            ("revenue_plans", "70210", "revenue_fees"),
+            ("revenue_plans", "75000", "revenue_other"),
+            ("personnel_cost_plans", "64120", "personnel_admin"),
+            ("personnel_cost_plans", "64500", "personnel_social"),
+            ("operating_cost_plans", "61500", "operating_maintenance"),
+            ("operating_cost_plans", "62000", "operating_other"),
+            ("capex_plans", "21830", "capex_it"),
+            ("capex_plans", "20500", "capex_software"),
+        ],
+    )
+    def test_mapping(self, source_table: str, account_code: str, expected: str):
+        """Account prefixes map to the same categories as ConsolidationService."""
+        assert map_consolidation_category(source_table, account_code) == expected
@@ -0,0 +1,252 @@
+"""
+Tests for response compression middleware.
+
+Covers:
+- Accept-Encoding negotiation
+- Size threshold and content-type allow-list
+- Incremental compression of streaming responses
+- Compression metrics
+"""
+
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+from prometheus_client import REGISTRY
+
+
+def _http_scope(path: str = "/api/v1/test", accept_encoding: str | None = "gzip") -> dict:
+    """Build a minimal ASGI HTTP scope."""
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return {"type": "http", "path": path, "method": "GET", "headers": headers}
+
+
+def _app_returning(
+    body: bytes,
+    content_type: str = "application/json",
+    extra_headers: list[tuple[bytes, bytes]] | None = None,
+):
+    """ASGI app sending body in a single message with a Content-Length."""
+
+    async def app(scope, receive, send):
+        headers = [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+            *(extra_headers or []),
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+async def _call(middleware: CompressionMiddleware, scope: dict) -> list[dict]:
+    """Run the middleware and return the sent ASGI messages."""
+    messages: list[dict] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
+
+
+def _response_headers(messages: list[dict]) -> dict[str, str]:
+    """Decode the headers of the http.response.start message."""
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    return {k.decode().lower(): v.decode() for k, v in start["headers"]}
+
+
+def _body(messages: list[dict]) -> bytes:
+    return b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+
+
+def _payload(rows: int = 200) -> bytes:
+    return json.dumps([{"account_code": "60110", "amount_sar": "1250.00"}] * rows).encode()
+
+
+class TestNegotiateEncoding:
+    """Tests for Accept-Encoding negotiation."""
+
+    def test_gzip(self):
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+
+    def test_unsupported_or_missing(self):
+        assert negotiate_encoding("") is None
+        assert negotiate_encoding("deflate, identity") is None
+
+    def test_q_values(self):
+        """Test q=0 refuses an encoding and wildcards match the rest."""
+        assert negotiate_encoding("gzip;q=0, deflate") is None
+        assert negotiate_encoding("*;q=0.5") == negotiate_encoding("*")
+        assert negotiate_encoding("*, gzip;q=0") == ("br" if compression.brotli else None)
+
+    def test_brotli_preferred_when_available(self):
+        with patch.object(compression, "brotli", object()):
+            assert negotiate_encoding("gzip, br") == "br"
+            assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+        with patch.object(compression, "brotli", None):
+            assert negotiate_encoding("gzip, br") == "gzip"
+
+
+class TestCompressionMiddleware:
+    """Tests for CompressionMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_compresses_large_json(self):
+        """Test large JSON bodies are gzipped with a matching Content-Length."""
+        body = _payload()
+        middleware = CompressionMiddleware(_app_returning(body), minimum_size=100)
+
+        messages = await _call(middleware, _http_scope())
+
+        headers = _response_headers(messages)
+        compressed = _body(messages)
+        assert headers["content-encoding"] == "gzip"
+        assert headers["vary"] == "Accept-Encoding"
+        assert int(headers["content-length"]) == len(compressed) < len(body)
+        assert gzip.decompress(compressed) == body
+
+    @pytest.mark.asyncio
+    async def test_brotli(self):
+        """Test brotli is used when accepted and installed."""
+        brotli = pytest.importorskip("brotli")
+        body = _payload()
+        middleware = CompressionMiddleware(_app_returning(body), minimum_size=100)
+
+        messages = await _call(middleware, _http_scope(accept_encoding="gzip, br"))
+
+        assert _response_headers(messages)["content-encoding"] == "br"
+        assert brotli.decompress(_body(messages)) == body
+
+    @pytest.mark.asyncio
+    async def test_small_body_not_compressed(self):
+        body = b'{"status":"ok"}'
+        middleware = CompressionMiddleware(_app_returning(body), minimum_size=100)
+
+        messages = await _call(middleware, _http_scope())
+
+        headers = _response_headers(messages)
+        assert "content-encoding" not in headers
+        assert headers["vary"] == "Accept-Encoding"
+        assert _body(messages) == body
+
+    @pytest.mark.asyncio
+    async def test_content_type_not_allowed(self):
+        """Test binary exports are not recompressed."""
+        body = b"%PDF" * 1000
+        middleware = CompressionMiddleware(
+            _app_returning(body, content_type="application/pdf"), minimum_size=100
+        )
+
+        messages = await _call(middleware, _http_scope())
+
+        assert "content-encoding" not in _response_headers(messages)
+        assert _body(messages) == body
+
+    @pytest.mark.asyncio
+    async def test_already_encoded_passthrough(self):
+        body = gzip.compress(_payload())
+        middleware = CompressionMiddleware(
+            _app_returning(body, extra_headers=[(b"content-encoding", b"gzip")]),
+            minimum_size=100,
+        )
+
+        messages = await _call(middleware, _http_scope())
+
+        assert _body(messages) == body
+
+    @pytest.mark.asyncio
+    async def test_client_without_compression(self):
+        body = _payload()
+        middleware = CompressionMiddleware(_app_returning(body), minimum_size=100)
+
+        messages = await _call(middleware, _http_scope(accept_encoding=None))
+
+        assert "content-encoding" not in _response_headers(messages)
+        assert _body(messages) == body
+
+    @pytest.mark.asyncio
+    async def test_strong_etag_weakened(self):
+        """Test a strong ETag does not claim byte equality for the compressed body."""
+        middleware = CompressionMiddleware(
+            _app_returning(_payload(), extra_headers=[(b"etag", b'"v1-42"')]),
+            minimum_size=100,
+        )
+
+        messages = await _call(middleware, _http_scope())
+
+        assert _response_headers(messages)["etag"] == 'W/"v1-42"'
+
+    @pytest.mark.asyncio
+    async def test_streaming_compressed_incrementally(self):
+        """Test chunks are compressed and sent as they are produced."""
+        rows = [f"{60000 + i},Line {i},{i * 1.5:.2f}\n".encode() for i in range(50)]
+        sent_before_last_chunk = 0
+        messages: list[dict] = []
+
+        async def app(scope, receive, send):
+            nonlocal sent_before_last_chunk
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", b"text/csv; charset=utf-8")],
+                }
+            )
+            for row in rows:
+                sent_before_last_chunk = len(messages)
+                await send({"type": "http.response.body", "body": row, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        async def send(message):
+            messages.append(message)
+
+        middleware = CompressionMiddleware(app, minimum_size=100, stream_flush_bytes=0)
+        await middleware(_http_scope(), None, send)
+
+        headers = _response_headers(messages)
+        assert headers["content-encoding"] == "gzip"
+        assert "content-length" not in headers
+        # Output was streamed while the app was still producing chunks
+        assert sent_before_last_chunk > len(rows) // 2
+        assert gzip.decompress(_body(messages)) == b"".join(rows)
+
+    @pytest.mark.asyncio
+    async def test_records_metrics(self):
+        """Test bytes and ratio are recorded per normalized route."""
+        body = _payload()
+        labels = {"path": "/api/v1/consolidation/{id}", "encoding": "gzip"}
+
+        def sample(name: str) -> float:
+            return REGISTRY.get_sample_value(name, labels) or 0.0
+
+        before_in = sample("http_compression_input_bytes_total")
+        before_count = sample("http_compression_ratio_count")
+        middleware = CompressionMiddleware(_app_returning(body), minimum_size=100)
+
+        await _call(
+            middleware,
+            _http_scope(path="/api/v1/consolidation/3f2b8a52-5f0c-4a6e-9c1d-0e6f7a8b9c0d"),
+        )
+
+        assert sample("http_compression_input_bytes_total") - before_in == len(body)
+        assert sample("http_compression_ratio_count") - before_count == 1
+
+    @pytest.mark.asyncio
+    async def test_non_http_passthrough(self):
+        """Test non-HTTP scopes are passed through untouched."""
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["type"])
+
+        await CompressionMiddleware(app)({"type": "lifespan"}, None, None)
+
+        assert calls == ["lifespan"]
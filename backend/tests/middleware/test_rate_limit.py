@@ -9,14 +9,17 @@ Covers:
 - Rate limit headers
 """
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from app.middleware.rate_limit import (
     RATE_LIMITS,
     ROLE_MULTIPLIERS,
+    SLIDING_WINDOW_SCRIPT,
+    LocalRateLimiter,
     RateLimitMiddleware,
     get_client_identifier,
+    get_local_rate_limiter,
     get_rate_limit_category,
     get_user_role,
 )
@@ -270,3 +273,98 @@ class TestRedisIntegration:
 
                 # Should allow request on error
                 assert is_allowed is True
+
+
+# ==============================================================================
+# Test: Sliding Window Script and Local Pre-check
+# ==============================================================================
+
+
+def _redis_client(*results: list[int]) -> MagicMock:
+    """Redis client whose sliding-window script returns the given results in turn."""
+    client = MagicMock()
+    client.register_script.return_value = AsyncMock(side_effect=list(results))
+    return client
+
+
+class TestSlidingWindowLimiter:
+    """Tests for the single-script Redis check and local token buckets."""
+
+    @pytest.fixture(autouse=True)
+    def redis_enabled(self):
+        """Enable Redis checks and start from empty local buckets."""
+        get_local_rate_limiter().clear()
+        with patch("app.middleware.rate_limit.REDIS_ENABLED", True):
+            yield
+        get_local_rate_limiter().clear()
+
+    async def _check(self, max_requests: int = 100):
+        return await RateLimitMiddleware(app=None)._check_rate_limit(
+            client_id="user:1", category="default", max_requests=max_requests, window=60
+        )
+
+    @pytest.mark.asyncio
+    async def test_single_script_call_per_check(self):
+        """Each Redis check runs one script with the limit, window and pending count."""
+        client = _redis_client([1, 5, 42])
+
+        with (
+            patch("app.core.cache.get_redis_client", AsyncMock(return_value=client)),
+            patch("app.middleware.rate_limit.LOCAL_PRECHECK_ENABLED", False),
+        ):
+            assert await self._check() == (True, 5, 42)
+
+        client.register_script.assert_called_once_with(SLIDING_WINDOW_SCRIPT)
+        script = client.register_script.return_value
+        script.assert_awaited_once_with(
+            keys=["rate_limit:sw:default:user:1"], args=[100, 60, 0], client=client
+        )
+        client.pipeline.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_limited_by_script(self):
+        """A zero result from the script rejects the request."""
+        client = _redis_client([0, 100, 12])
+
+        with patch("app.core.cache.get_redis_client", AsyncMock(return_value=client)):
+            assert await self._check() == (False, 100, 12)
+
+    @pytest.mark.asyncio
+    async def test_local_precheck_skips_redis_and_flushes_pending(self):
+        """Clients well under the limit are admitted locally until the bucket empties."""
+        client = _redis_client([1, 1, 60], [1, 12, 50])
+
+        with patch("app.core.cache.get_redis_client", AsyncMock(return_value=client)):
+            # First request seeds the bucket from Redis (share 0.1 of 100 -> 10 tokens)
+            await self._check()
+            results = [await self._check() for _ in range(10)]
+            # Bucket empty: Redis decides and receives the 10 local admissions
+            final = await self._check()
+
+        assert all(is_allowed for is_allowed, _count, _reset in results)
+        assert [count for _allowed, count, _reset in results] == list(range(2, 12))
+        assert final == (True, 12, 50)
+
+        script = client.register_script.return_value
+        assert script.await_count == 2
+        assert script.await_args.kwargs["args"] == [100, 60, 10]
+
+    @pytest.mark.asyncio
+    async def test_clients_near_limit_always_use_redis(self):
+        """No local admission once the Redis count reaches the headroom threshold."""
+        client = _redis_client([1, 60, 30], [1, 61, 30], [0, 100, 30])
+
+        with patch("app.core.cache.get_redis_client", AsyncMock(return_value=client)):
+            results = [await self._check() for _ in range(3)]
+
+        assert [is_allowed for is_allowed, _count, _reset in results] == [True, True, False]
+        assert client.register_script.return_value.await_count == 3
+
+    def test_local_buckets_are_bounded(self):
+        """Least recently used clients are evicted beyond max_keys."""
+        limiter = LocalRateLimiter(max_keys=2)
+        for key in ("a", "b", "c"):
+            limiter.record(key, is_allowed=True, current_count=1, max_requests=100)
+
+        assert limiter.try_acquire("a", max_requests=100, window=60) is None
+        assert limiter.try_acquire("c", max_requests=100, window=60) == 2
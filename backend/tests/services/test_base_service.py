@@ -176,6 +176,65 @@ class TestGetPaginated:
         assert offset == 20
 
 
+class TestGetKeysetPaginated:
+    """Tests for get_keyset_paginated method."""
+
+    @pytest.mark.asyncio
+    async def test_estimated_total_only_for_unfiltered_lists(self, base_service, db_session):
+        """Test the table estimate is not reported as the total of a filtered list."""
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = []
+        db_session.execute.return_value = mock_result
+        base_service.estimate_total = AsyncMock(return_value=125000)
+
+        filtered = await base_service.get_keyset_paginated(
+            filters={"name": "x"}, estimate_total=True
+        )
+        unfiltered = await base_service.get_keyset_paginated(estimate_total=True)
+
+        assert filtered["total"] is None
+        assert filtered["total_is_estimate"] is False
+        assert unfiltered["total"] == 125000
+        assert unfiltered["total_is_estimate"] is True
+        base_service.estimate_total.assert_awaited_once()
+
+
+class TestEstimateTotal:
+    """Tests for estimate_total method."""
+
+    @pytest.mark.asyncio
+    async def test_estimate_total_reads_reltuples(self, base_service, db_session):
+        """Test estimate comes from pg_class on PostgreSQL."""
+        db_session.get_bind = MagicMock()
+        db_session.get_bind.return_value.dialect.name = "postgresql"
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = 125000
+        db_session.execute.return_value = mock_result
+
+        assert await base_service.estimate_total() == 125000
+        assert "reltuples" in str(db_session.execute.call_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_estimate_total_unanalyzed_table(self, base_service, db_session):
+        """Test tables never analyzed (reltuples = -1) have no estimate."""
+        db_session.get_bind = MagicMock()
+        db_session.get_bind.return_value.dialect.name = "postgresql"
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = -1
+        db_session.execute.return_value = mock_result
+
+        assert await base_service.estimate_total() is None
+
+    @pytest.mark.asyncio
+    async def test_estimate_total_sqlite(self, base_service, db_session):
+        """Test no estimate outside PostgreSQL."""
+        db_session.get_bind = MagicMock()
+        db_session.get_bind.return_value.dialect.name = "sqlite"
+
+        assert await base_service.estimate_total() is None
+        db_session.execute.assert_not_awaited()
+
+
 class TestCreate:
     """Tests for create method."""
 
@@ -21,6 +21,7 @@ from app.models.analysis import (
 )
 from app.models.configuration import BudgetVersion
 from app.models.consolidation import BudgetConsolidation, ConsolidationCategory
+from app.schemas.analysis import ActualDataResponse
 from app.services.budget_actual_service import BudgetActualService
 from app.services.exceptions import NotFoundError, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -126,6 +127,22 @@ class TestImportActuals:
         with pytest.raises(ValidationError):
             await service.import_actuals(test_budget_version.id, odoo_data)
 
+    @pytest.mark.asyncio
+    async def test_import_actuals_invalid_amount(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+    ):
+        """Test import rejects the whole batch when an amount is not numeric."""
+        service = BudgetActualService(db_session)
+        odoo_data = [
+            {"fiscal_year": 2025, "period": 1, "account_code": "70110", "amount_sar": 100},
+            {"fiscal_year": 2025, "period": 1, "account_code": "70120", "amount_sar": "n/a"},
+        ]
+
+        with pytest.raises(ValidationError, match="amount_sar"):
+            await service.import_actuals(test_budget_version.id, odoo_data)
+
     @pytest.mark.asyncio
     async def test_import_actuals_multiple_periods(
         self,
@@ -375,6 +392,69 @@ class TestCalculateVariance:
         assert variance.ytd_variance_sar == Decimal("-40000.00")
 
 
+class TestGetActualDataKeyset:
+    """Tests for listing actuals by cursor."""
+
+    @pytest.mark.asyncio
+    async def test_cursor_pages_cover_filtered_actuals_once(
+        self,
+        db_session: AsyncSession,
+    ):
+        """Test walking the cursor visits each matching actual once, newest first."""
+        fiscal_year = 2031
+        batch_id = uuid.uuid4()
+        created = datetime(2025, 1, 1, 12, 0, 0)
+        for period in (1, 1, 1, 2, 2):
+            db_session.add(
+                ActualData(
+                    fiscal_year=fiscal_year,
+                    period=period,
+                    account_code="70110",
+                    amount_sar=Decimal("1000.00"),
+                    currency="SAR",
+                    import_batch_id=batch_id,
+                    import_date=created,
+                    source=ActualDataSource.ODOO_IMPORT,
+                    is_reconciled=False,
+                    # Shared timestamps exercise the id tie-breaker
+                    created_at=created,
+                )
+            )
+        await db_session.flush()
+
+        service = BudgetActualService(db_session)
+        seen = []
+        cursor = None
+        while True:
+            page = await service.get_actual_data_keyset(
+                fiscal_year=fiscal_year,
+                period=1,
+                cursor=cursor,
+                page_size=2,
+                estimate_total=True,
+            )
+            seen.extend(page["items"])
+            assert page["total"] is None
+            cursor = page["next_cursor"]
+            if not page["has_more"]:
+                break
+
+        assert len(seen) == 3
+        assert len({a.id for a in seen}) == 3
+        assert {a.period for a in seen} == {1}
+        assert cursor is None
+        response = ActualDataResponse.model_validate(seen[0])
+        assert response.source == ActualDataSource.ODOO_IMPORT.value
+
+    @pytest.mark.asyncio
+    async def test_malformed_cursor_rejected(self, db_session: AsyncSession):
+        """Test a malformed cursor raises ValidationError."""
+        service = BudgetActualService(db_session)
+
+        with pytest.raises(ValidationError):
+            await service.get_actual_data_keyset(cursor="not-a-cursor")
+
+
 class TestGetVarianceReport:
     """Tests for variance report generation."""
 
@@ -0,0 +1,395 @@
+"""
+Tests for BudgetModelService.
+
+Tests cover:
+- Bulk snapshot loading of every driver
+- Single-pass recalculation writing all calculated tables
+- Upsert in place of previously calculated rows and removal of stale rows
+- Bounded in-memory model cache
+- Business rule enforcement before any write
+"""
+
+import uuid
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+from app.models.configuration import BudgetVersion
+from app.models.consolidation import BudgetConsolidation, ConsolidationCategory
+from app.models.planning import (
+    CapExPlan,
+    ClassStructure,
+    DHGSubjectHours,
+    DHGTeacherRequirement,
+    EnrollmentPlan,
+    OperatingCostPlan,
+    PersonnelCostPlan,
+    RevenuePlan,
+    TeacherAllocation,
+)
+from app.services import budget_model_service
+from app.services.budget_model_service import (
+    BudgetModelService,
+    invalidate_budget_model_cache,
+)
+from app.services.consolidation_service import ConsolidationService
+from app.services.exceptions import BusinessRuleError, NotFoundError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def _rows(db_session: AsyncSession, model, version_id: uuid.UUID) -> list:
+    """Fetch fresh rows for a version (bulk writes bypass the identity map)."""
+    result = await db_session.execute(
+        select(model)
+        .where(model.budget_version_id == version_id)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+@pytest.fixture
+async def budget_model_inputs(
+    db_session: AsyncSession,
+    test_budget_version: BudgetVersion,
+    test_enrollment_data: list[EnrollmentPlan],
+    test_class_size_params: list,
+    test_subject_hours_matrix: list,
+    test_fee_structure: list,
+    test_teacher_cost_params: list,
+    subjects: dict,
+    academic_cycles: dict,
+    teacher_categories: dict,
+    test_user_id: uuid.UUID,
+) -> BudgetVersion:
+    """Version with every driver of the cascade populated."""
+    db_session.add_all(
+        [
+            TeacherAllocation(
+                id=uuid.uuid4(),
+                budget_version_id=test_budget_version.id,
+                subject_id=subjects["MATH"].id,
+                cycle_id=academic_cycles["college"].id,
+                category_id=teacher_categories["LOCAL"].id,
+                fte_count=Decimal("1.5"),
+                created_by_id=test_user_id,
+            ),
+            OperatingCostPlan(
+                id=uuid.uuid4(),
+                budget_version_id=test_budget_version.id,
+                account_code="60610",
+                description="Fournitures",
+                category="supplies",
+                amount_sar=Decimal("50000.00"),
+                created_by_id=test_user_id,
+            ),
+        ]
+    )
+    await db_session.flush()
+    return test_budget_version
+
+
+class TestBudgetModelServiceSnapshot:
+    """Tests for bulk snapshot loading."""
+
+    @pytest.mark.asyncio
+    async def test_load_snapshot(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+    ):
+        """All drivers are loaded into plain engine inputs."""
+        service = BudgetModelService(db_session)
+
+        snapshot = await service.load_snapshot(budget_model_inputs.id)
+
+        model_input = snapshot.model_input
+        assert sum(e.student_count for e in model_input.enrollments) == 130
+        assert len(model_input.class_size_params) == 2
+        assert len(model_input.subject_hours) == 3
+        assert len(model_input.fees) == 3
+        assert len(model_input.allocations) == 1
+        assert len(model_input.teacher_costs) == 2
+        assert [line.account_code for line in model_input.ledger_lines] == ["60610"]
+
+    @pytest.mark.asyncio
+    async def test_load_snapshot_invalid_version(self, db_session: AsyncSession):
+        """Unknown version raises NotFoundError."""
+        service = BudgetModelService(db_session)
+
+        with pytest.raises(NotFoundError):
+            await service.load_snapshot(uuid.uuid4())
+
+
+class TestBudgetModelServiceRecalculate:
+    """Tests for single-pass recalculation."""
+
+    @pytest.mark.asyncio
+    async def test_recalculate_writes_all_tables(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+        test_user_id: uuid.UUID,
+    ):
+        """Every calculated table is populated from one pass."""
+        service = BudgetModelService(db_session)
+        version_id = budget_model_inputs.id
+
+        result, stats = await service.recalculate(version_id, user_id=test_user_id)
+
+        structures = await _rows(db_session, ClassStructure, version_id)
+        assert {cs.number_of_classes for cs in structures} == {3}
+        assert sum(cs.total_students for cs in structures) == 130
+
+        dhg_hours = await _rows(db_session, DHGSubjectHours, version_id)
+        assert sorted(h.total_hours_per_week for h in dhg_hours) == [
+            Decimal("13.50"),
+            Decimal("15.00"),
+            Decimal("18.00"),
+        ]
+
+        requirements = await _rows(db_session, DHGTeacherRequirement, version_id)
+        assert len(requirements) == 3
+
+        revenue = {r.account_code: r for r in await _rows(db_session, RevenuePlan, version_id)}
+        assert revenue["70110"].amount_sar == Decimal("1416000.00")
+        assert revenue["70120"].amount_sar == Decimal("1062000.00")
+        assert revenue["70110"].is_calculated is True
+
+        (personnel,) = await _rows(db_session, PersonnelCostPlan, version_id)
+        assert personnel.unit_cost_sar == Decimal("241800.00")
+        assert personnel.calculation_driver == "dhg_allocation"
+
+        consolidation = {
+            c.account_code: c for c in await _rows(db_session, BudgetConsolidation, version_id)
+        }
+        assert set(consolidation) == {"70110", "70120", "70130", "64110", "60610"}
+        assert consolidation["60610"].consolidation_category == (
+            ConsolidationCategory.OPERATING_SUPPLIES
+        )
+
+        assert result.total_revenue == Decimal("3540000.00")
+        assert stats.inserted["class_structures"] == 2
+        assert stats.updated["class_structures"] == 0
+
+    @pytest.mark.asyncio
+    async def test_recalculate_updates_existing_and_removes_stale(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+        test_dhg_data: dict,
+        subjects: dict,
+        academic_levels: dict,
+        test_user_id: uuid.UUID,
+    ):
+        """Existing rows are updated in place; rows no longer produced are removed."""
+        service = BudgetModelService(db_session)
+        version_id = budget_model_inputs.id
+        stale = DHGSubjectHours(
+            id=uuid.uuid4(),
+            budget_version_id=version_id,
+            subject_id=subjects["HISTORY"].id,
+            level_id=academic_levels["6EME"].id,
+            number_of_classes=3,
+            hours_per_class_per_week=Decimal("3.0"),
+            total_hours_per_week=Decimal("9.0"),
+            is_split=False,
+            created_by_id=test_user_id,
+        )
+        db_session.add(stale)
+        await db_session.flush()
+        existing_ids = {h.id for h in test_dhg_data["dhg_hours"]}
+
+        _result, stats = await service.recalculate(version_id, user_id=test_user_id)
+
+        dhg_hours = await _rows(db_session, DHGSubjectHours, version_id)
+        ids = {h.id for h in dhg_hours}
+        assert existing_ids <= ids
+        assert stale.id not in ids
+        assert stats.updated["dhg_subject_hours"] == 2
+        assert stats.inserted["dhg_subject_hours"] == 1
+        assert stats.deleted["dhg_subject_hours"] == 1
+
+    @pytest.mark.asyncio
+    async def test_recalculate_removes_stale_calculated_revenue(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+        test_fee_structure: list,
+        test_user_id: uuid.UUID,
+    ):
+        """Tuition rows no longer produced are removed; manual revenue is kept."""
+        service = BudgetModelService(db_session)
+        version_id = budget_model_inputs.id
+        await service.recalculate(version_id, user_id=test_user_id)
+        db_session.add(
+            RevenuePlan(
+                id=uuid.uuid4(),
+                budget_version_id=version_id,
+                account_code="75800",
+                description="Autres produits",
+                category="other",
+                amount_sar=Decimal("1000.00"),
+                is_calculated=False,
+                created_by_id=test_user_id,
+            )
+        )
+        for fee in test_fee_structure:
+            await db_session.delete(fee)
+        await db_session.flush()
+
+        result, stats = await service.recalculate(version_id, user_id=test_user_id)
+
+        revenue = await _rows(db_session, RevenuePlan, version_id)
+        assert [r.account_code for r in revenue] == ["75800"]
+        assert stats.deleted["revenue_plans"] == 3
+        assert result.total_revenue == Decimal("1000.00")
+
+    @pytest.mark.asyncio
+    async def test_recalculate_is_idempotent(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+    ):
+        """A second run updates rows instead of inserting duplicates."""
+        service = BudgetModelService(db_session)
+        version_id = budget_model_inputs.id
+
+        await service.recalculate(version_id)
+        _result, stats = await service.recalculate(version_id)
+
+        assert stats.inserted["class_structures"] == 0
+        assert stats.updated["class_structures"] == 2
+        assert stats.inserted["revenue_plans"] == 0
+        assert len(await _rows(db_session, BudgetConsolidation, version_id)) == 5
+
+    @pytest.mark.asyncio
+    async def test_recalculate_matches_consolidation_service(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+        test_user_id: uuid.UUID,
+    ):
+        """Both write paths roll lines up by account code into the same rows."""
+        version_id = budget_model_inputs.id
+        db_session.add_all(
+            [
+                CapExPlan(
+                    id=uuid.uuid4(),
+                    budget_version_id=version_id,
+                    account_code="21830",
+                    description=description,
+                    category="it",
+                    quantity=1,
+                    unit_cost_sar=amount,
+                    total_cost_sar=amount,
+                    acquisition_date=date(2025, 9, 1),
+                    useful_life_years=3,
+                    created_by_id=test_user_id,
+                )
+                for description, amount in (
+                    ("Serveurs", Decimal("40000.00")),
+                    ("Ordinateurs portables", Decimal("20000.00")),
+                )
+            ]
+        )
+        await db_session.flush()
+
+        def _lines(rows: list[BudgetConsolidation]) -> list[tuple]:
+            return sorted(
+                (
+                    row.account_code,
+                    row.account_name,
+                    row.consolidation_category,
+                    row.is_revenue,
+                    row.amount_sar,
+                    row.source_table,
+                    row.source_count,
+                )
+                for row in rows
+            )
+
+        await BudgetModelService(db_session).recalculate(version_id)
+        from_model = _lines(await _rows(db_session, BudgetConsolidation, version_id))
+
+        await ConsolidationService(db_session).consolidate_budget(version_id, force=True)
+        from_service = _lines(await _rows(db_session, BudgetConsolidation, version_id))
+
+        assert from_model == from_service
+        it_capex = [line for line in from_model if line[0] == "21830"]
+        assert len(it_capex) == 1
+        assert it_capex[0][1] == "Ordinateurs portables"
+        assert it_capex[0][4] == Decimal("60000.00")
+        assert it_capex[0][6] == 2
+
+    @pytest.mark.asyncio
+    async def test_recalculate_notifies_summary_refresh(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """The rewritten consolidation is announced to the summary refresher."""
+        notify = MagicMock()
+        monkeypatch.setattr(budget_model_service, "notify_summary_write", notify)
+        service = BudgetModelService(db_session)
+
+        await service.recalculate(budget_model_inputs.id)
+
+        notify.assert_called_once_with(db_session, budget_model_inputs.id)
+
+    @pytest.mark.asyncio
+    async def test_recalculate_class_size_violation(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+        test_enrollment_data: list[EnrollmentPlan],
+    ):
+        """Class size violations abort before anything is written."""
+        test_enrollment_data[2].student_count = 33
+        await db_session.flush()
+        service = BudgetModelService(db_session)
+
+        with pytest.raises(BusinessRuleError) as exc_info:
+            await service.recalculate(budget_model_inputs.id)
+
+        assert exc_info.value.details["rule"] == "AVG_BELOW_MIN"
+        assert await _rows(db_session, ClassStructure, budget_model_inputs.id) == []
+
+    @pytest.mark.asyncio
+    async def test_recalculate_without_enrollment(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+    ):
+        """Recalculation requires enrollment data."""
+        service = BudgetModelService(db_session)
+
+        with pytest.raises(BusinessRuleError) as exc_info:
+            await service.recalculate(test_budget_version.id)
+
+        assert exc_info.value.details["rule"] == "NO_ENROLLMENT_DATA"
+
+
+class TestBudgetModelCache:
+    """Tests for the in-memory model cache."""
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_version_evicted(
+        self,
+        db_session: AsyncSession,
+        budget_model_inputs: BudgetVersion,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """The cache holds at most MODEL_CACHE_SIZE versions."""
+        monkeypatch.setattr(budget_model_service, "MODEL_CACHE_SIZE", 1)
+        invalidate_budget_model_cache()
+        other_version_id = uuid.uuid4()
+        budget_model_service._model_cache[other_version_id] = MagicMock()
+        service = BudgetModelService(db_session)
+
+        await service.get_cached_model(budget_model_inputs.id)
+
+        assert list(budget_model_service._model_cache) == [budget_model_inputs.id]
+        invalidate_budget_model_cache()
@@ -9,6 +9,7 @@ Tests the budget version lifecycle management including:
 """
 
 import uuid
+from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -21,7 +22,12 @@ from app.models.configuration import (
     TeacherCostParam,
 )
 from app.services.budget_version_service import BudgetVersionService
-from app.services.exceptions import BusinessRuleError, ConflictError, NotFoundError
+from app.services.exceptions import (
+    BusinessRuleError,
+    ConflictError,
+    NotFoundError,
+    ValidationError,
+)
 
 
 class TestBudgetVersionServiceInitialization:
@@ -221,6 +227,82 @@ class TestGetBudgetVersionsPaginated:
         )
 
 
+class TestGetBudgetVersionsKeyset:
+    """Tests for get_budget_versions_keyset method."""
+
+    @pytest.mark.asyncio
+    async def test_keyset_delegates_to_base_service(self):
+        """Test keyset retrieval passes cursor and filters through."""
+        session = MagicMock()
+        service = BudgetVersionService(session)
+        service._base_service.get_keyset_paginated = AsyncMock(return_value={"items": []})
+
+        await service.get_budget_versions_keyset(
+            cursor="abc", page_size=10, fiscal_year=2025, estimate_total=True
+        )
+
+        service._base_service.get_keyset_paginated.assert_called_once_with(
+            cursor="abc",
+            page_size=10,
+            filters={"fiscal_year": 2025},
+            order_by="created_at",
+            estimate_total=True,
+        )
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages_cover_all_versions_once(
+        self, db_session, test_user_id, organization_id, fiscal_year_factory
+    ):
+        """Test walking the cursor visits each version once, newest first."""
+        # Three versions share a created_at so the id tie-breaker is exercised
+        same_time = datetime(2025, 1, 1, 12, 0, 0)
+        created = [same_time] * 3 + [same_time + timedelta(hours=h) for h in (1, 2)]
+        for created_at in created:
+            fiscal_year = fiscal_year_factory()
+            db_session.add(
+                BudgetVersion(
+                    id=uuid.uuid4(),
+                    name=f"Keyset {fiscal_year} {created_at}",
+                    fiscal_year=fiscal_year,
+                    academic_year=f"{fiscal_year - 1}-{fiscal_year}",
+                    status=BudgetVersionStatus.WORKING,
+                    organization_id=organization_id,
+                    created_by_id=test_user_id,
+                    created_at=created_at,
+                )
+            )
+        await db_session.flush()
+
+        service = BudgetVersionService(db_session)
+        seen = []
+        cursor = None
+        for _ in range(5):
+            page = await service._base_service.get_keyset_paginated(
+                cursor=cursor,
+                page_size=2,
+                filters={"organization_id": organization_id},
+            )
+            seen.extend(page["items"])
+            assert page["total"] is None
+            cursor = page["next_cursor"]
+            if not page["has_more"]:
+                break
+
+        assert len(seen) == 5
+        assert len({v.id for v in seen}) == 5
+        keys = [(v.created_at, v.id) for v in seen]
+        assert keys == sorted(keys, reverse=True)
+        assert cursor is None
+
+    @pytest.mark.asyncio
+    async def test_keyset_rejects_malformed_cursor(self, db_session):
+        """Test a malformed cursor raises ValidationError."""
+        service = BudgetVersionService(db_session)
+
+        with pytest.raises(ValidationError):
+            await service.get_budget_versions_keyset(cursor="not-a-cursor")
+
+
 class TestCreateBudgetVersion:
     """Tests for create_budget_version method."""
 
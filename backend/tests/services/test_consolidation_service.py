@@ -11,9 +11,11 @@ Tests cover:
 
 import uuid
 from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from app.models.configuration import BudgetVersion, BudgetVersionStatus
+from app.models.consolidation import ConsolidationCategory
 from app.models.planning import (
     ClassStructure,
     EnrollmentPlan,
@@ -23,6 +25,8 @@ from app.models.planning import (
 )
 from app.services.consolidation_service import ConsolidationService
 from app.services.exceptions import BusinessRuleError, NotFoundError
+from app.services.input_fingerprint import compute_input_fingerprint
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -173,6 +177,118 @@ class TestConsolidationServiceConsolidate:
         tuition_entries = [e for e in all_entries if e.account_code == "70110"]
         assert len(tuition_entries) == 1
 
+    @pytest.mark.asyncio
+    async def test_consolidate_budget_maps_categories_in_sql(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+        test_user_id: uuid.UUID,
+    ):
+        """Test account prefixes map to consolidation categories with audit fields set."""
+        db_session.add_all([
+            RevenuePlan(
+                id=uuid.uuid4(),
+                budget_version_id=test_budget_version.id,
+                account_code=account_code,
+                description=account_code,
+                category="other",
+                amount_sar=Decimal("100.00"),
+            )
+            for account_code in ("70110", "70300", "75100")
+        ])
+        db_session.add(
+            PersonnelCostPlan(
+                id=uuid.uuid4(),
+                budget_version_id=test_budget_version.id,
+                account_code="64500",
+                description="Social charges",
+                fte_count=Decimal("1"),
+                unit_cost_sar=Decimal("50.00"),
+                total_cost_sar=Decimal("50.00"),
+            )
+        )
+        db_session.add(
+            OperatingCostPlan(
+                id=uuid.uuid4(),
+                budget_version_id=test_budget_version.id,
+                account_code="61500",
+                description="Maintenance",
+                category="maintenance",
+                amount_sar=Decimal("25.00"),
+            )
+        )
+        await db_session.flush()
+
+        service = ConsolidationService(db_session)
+        result = await service.consolidate_budget(
+            test_budget_version.id,
+            user_id=test_user_id,
+        )
+
+        categories = {e.account_code: e.consolidation_category for e in result}
+        assert categories == {
+            "70110": ConsolidationCategory.REVENUE_TUITION,
+            "70300": ConsolidationCategory.REVENUE_FEES,
+            "75100": ConsolidationCategory.REVENUE_OTHER,
+            "64500": ConsolidationCategory.PERSONNEL_SOCIAL,
+            "61500": ConsolidationCategory.OPERATING_MAINTENANCE,
+        }
+        assert len({e.id for e in result}) == len(result)
+        assert all(e.created_by_id == test_user_id for e in result)
+        assert all(e.source_count == 1 and e.is_calculated for e in result)
+
+    @pytest.mark.asyncio
+    async def test_consolidate_budget_skips_unchanged_inputs(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+        test_user_id: uuid.UUID,
+    ):
+        """Test consolidation reuses stored entries until planning inputs change."""
+        revenue = RevenuePlan(
+            id=uuid.uuid4(),
+            budget_version_id=test_budget_version.id,
+            account_code="70110",
+            description="Tuition",
+            category="tuition",
+            amount_sar=Decimal("1000000.00"),
+            created_by_id=test_user_id,
+        )
+        db_session.add(revenue)
+        await db_session.flush()
+
+        service = ConsolidationService(db_session)
+        first = await service.consolidate_budget(test_budget_version.id)
+        assert service.last_recomputed is True
+
+        second = await service.consolidate_budget(test_budget_version.id)
+        assert service.last_recomputed is False
+        assert [e.id for e in second] == [e.id for e in first]
+
+        forced = await service.consolidate_budget(test_budget_version.id, force=True)
+        assert service.last_recomputed is True
+        assert forced[0].id != first[0].id
+
+        revenue.amount_sar = Decimal("1200000.00")
+        await db_session.flush()
+
+        changed = await service.consolidate_budget(test_budget_version.id)
+        assert service.last_recomputed is True
+        assert changed[0].amount_sar == Decimal("1200000.00")
+
+    @pytest.mark.asyncio
+    async def test_input_fingerprint_reads_xmin_on_postgresql(self):
+        """On PostgreSQL the fingerprint sums xmin, which every committed write replaces."""
+        session = AsyncMock()
+        session.get_bind = MagicMock(return_value=MagicMock(dialect=postgresql.dialect()))
+        session.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+
+        await compute_input_fingerprint(session, uuid.uuid4(), [RevenuePlan, ClassStructure])
+
+        sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.count("CAST(CAST(xmin AS TEXT) AS BIGINT)") == 2
+        assert "max(" not in sql
+
 
 class TestConsolidationServiceApprovalWorkflow:
     """Tests for budget approval workflow."""
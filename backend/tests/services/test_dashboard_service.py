@@ -6,10 +6,15 @@ Tests cover:
 - Chart data generation
 - Alert generation
 - Recent activity tracking
+- Combined dashboard bundle
 """
 
+import asyncio
+import time
 import uuid
+from contextlib import asynccontextmanager
 from decimal import Decimal
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from app.models.configuration import BudgetVersion
@@ -934,6 +939,120 @@ class TestKPISummary:
             await service.get_kpi_summary(uuid.uuid4())
 
 
+class TestGetDashboardBundle:
+    """Tests for the combined dashboard bundle."""
+
+    @pytest.mark.asyncio
+    async def test_bundle_contains_all_widgets(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+    ):
+        """The bundle matches the individual widget endpoints."""
+        service = DashboardService(db_session)
+
+        bundle = await service.get_dashboard_bundle(test_budget_version.id)
+
+        assert bundle["version_id"] == str(test_budget_version.id)
+        assert bundle["version_name"] == test_budget_version.name
+        widgets = bundle["widgets"]
+        assert set(widgets) == {
+            "summary",
+            "enrollment_chart",
+            "cost_breakdown",
+            "revenue_breakdown",
+            "alerts",
+            "kpi_summary",
+        }
+        for widget in widgets.values():
+            assert widget["error"] is None
+            assert widget["duration_ms"] >= 0
+
+        summary = await service.get_dashboard_summary(test_budget_version.id)
+        assert widgets["summary"]["data"]["total_revenue_sar"] == summary["total_revenue_sar"]
+        assert widgets["enrollment_chart"]["data"] == await service.get_enrollment_chart_data(
+            test_budget_version.id
+        )
+        assert widgets["kpi_summary"]["data"]["version_id"] == str(test_budget_version.id)
+        alert_types = {alert["alert_type"] for alert in widgets["alerts"]["data"]}
+        assert alert_types == {
+            alert["alert_type"] for alert in await service.get_alerts(test_budget_version.id)
+        }
+
+    @pytest.mark.asyncio
+    async def test_bundle_not_found(
+        self,
+        db_session: AsyncSession,
+    ):
+        """A missing version fails the whole bundle."""
+        service = DashboardService(db_session)
+
+        with pytest.raises(NotFoundError):
+            await service.get_dashboard_bundle(uuid.uuid4())
+
+    @pytest.mark.asyncio
+    async def test_bundle_reports_failing_widget(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+    ):
+        """A failing widget carries its error; the others are still returned."""
+        service = DashboardService(db_session)
+
+        with patch.object(
+            DashboardService,
+            "_build_summary",
+            new=AsyncMock(side_effect=RuntimeError("boom")),
+        ):
+            bundle = await service.get_dashboard_bundle(test_budget_version.id)
+
+        widgets = bundle["widgets"]
+        assert widgets["summary"]["data"] is None
+        assert widgets["summary"]["error"] == "boom"
+        assert widgets["alerts"]["error"] == "Dashboard summary unavailable"
+        assert widgets["kpi_summary"]["data"] is None
+        assert widgets["cost_breakdown"]["error"] is None
+
+    @pytest.mark.asyncio
+    async def test_bundle_loads_widgets_concurrently_on_separate_sessions(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+    ):
+        """With a session factory, widget aggregates overlap on their own sessions."""
+        sessions: list[object] = []
+        widget_sessions: list[object] = []
+
+        @asynccontextmanager
+        async def _session_factory():
+            session = object()
+            sessions.append(session)
+            yield session
+
+        async def _slow_widget(self, *args):
+            widget_sessions.append(self.session)
+            await asyncio.sleep(0.1)
+            return {"version_id": str(test_budget_version.id)}
+
+        service = DashboardService(db_session)
+        with (
+            patch.object(DashboardService, "_build_summary", new=_slow_widget),
+            patch.object(DashboardService, "_build_enrollment_chart", new=_slow_widget),
+            patch.object(DashboardService, "_build_cost_breakdown", new=_slow_widget),
+            patch.object(DashboardService, "_build_revenue_breakdown", new=_slow_widget),
+        ):
+            start = time.perf_counter()
+            bundle = await service.get_dashboard_bundle(
+                test_budget_version.id, session_factory=_session_factory
+            )
+            elapsed = time.perf_counter() - start
+
+        assert len(sessions) == 4
+        assert sorted(map(id, widget_sessions)) == sorted(map(id, sessions))
+        assert elapsed < 0.35
+        assert all(widget["error"] is None for widget in bundle["widgets"].values())
+
+
 class TestDashboardWidgets:
     """Tests for dashboard widget data generation."""
 
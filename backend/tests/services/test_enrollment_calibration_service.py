@@ -6,6 +6,7 @@ Tests cover:
 - Historical data fetching and summarization
 - Calibration algorithm (progression rate decomposition)
 - Confidence level calculation
+- Grouped progression rates and incremental window recalibration
 - Parameter override management
 - Scenario multiplier management
 - Effective rate resolution (override → derived → default)
@@ -35,16 +36,22 @@ from app.schemas.enrollment_settings import (
     ENTRY_POINT_GRADES,
 )
 from app.services.enrollment_calibration_service import (
+    CalibrationWindow,
     EnrollmentCalibrationService,
     calculate_confidence,
     calculate_data_quality_score,
+    calculate_progression_rates,
+    derive_grade_parameters,
     fiscal_year_to_school_year,
     get_historical_fiscal_years,
     get_historical_window,
     get_previous_grade,
+    invalidate_calibration_cache,
     school_year_to_fiscal_year,
 )
+from app.services.historical_import_service import HistoricalImportService, ImportModule
 from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # ==============================================================================
@@ -260,6 +267,77 @@ class TestCalculateDataQualityScore:
         assert score == 2  # 1 base + 1 for grades
 
 
+class TestCalculateProgressionRates:
+    """Tests for grouped progression rate calculation."""
+
+    HISTORY = {
+        "2022/2023": {"CP": 100, "CE1": 90},
+        "2023/2024": {"CP": 110, "CE1": 105},
+        "2024/2025": {"CP": 120, "CE1": 121},
+    }
+
+    def test_rates_grouped_by_year_pair(self):
+        """Every grade is calculated for each consecutive pair of years."""
+        rates = calculate_progression_rates(
+            self.HISTORY, ["2022/2023", "2023/2024", "2024/2025"]
+        )
+
+        assert list(rates) == [("2022/2023", "2023/2024"), ("2023/2024", "2024/2025")]
+        assert rates[("2022/2023", "2023/2024")]["CE1"] == pytest.approx(1.05)
+        assert rates[("2023/2024", "2024/2025")]["CE1"] == pytest.approx(1.10)
+
+    def test_grades_without_previous_enrollment_skipped(self):
+        """No rate is produced when the previous grade had no students."""
+        rates = calculate_progression_rates(self.HISTORY, ["2022/2023", "2023/2024"])
+
+        assert "CP" not in rates[("2022/2023", "2023/2024")]
+
+    def test_known_pairs_reused(self):
+        """Pairs already calculated are not recomputed."""
+        known = {("2022/2023", "2023/2024"): {"CE1": 2.0}}
+
+        rates = calculate_progression_rates(
+            self.HISTORY, ["2022/2023", "2023/2024", "2024/2025"], known_rates=known
+        )
+
+        assert rates[("2022/2023", "2023/2024")] == {"CE1": 2.0}
+        assert rates[("2023/2024", "2024/2025")]["CE1"] == pytest.approx(1.10)
+
+    def test_derive_parameters_from_rates(self):
+        """Grades with rates are decomposed; grades without fall back to defaults."""
+        rates = calculate_progression_rates(
+            self.HISTORY, ["2022/2023", "2023/2024", "2024/2025"]
+        )
+
+        params = derive_grade_parameters(rates)
+
+        assert params["CE1"]["progression_rate"] == Decimal("1.075")
+        assert params["CE1"]["retention_rate"] == Decimal("1.0")
+        assert params["CE1"]["lateral_entry_rate"] == Decimal("0.075")
+        assert params["CE1"]["years_used"] == 2
+        assert params["CP"]["years_used"] == 0
+        assert params["CP"]["lateral_entry_rate"] == DOCUMENT_DEFAULTS["CP"]["lateral_rate"]
+
+
+    def test_rolled_window_matches_fresh_window(self):
+        """Rolling drops the oldest pair and only calculates the new one."""
+        history = {
+            "2021/2022": {"CP": 100, "CE1": 95},
+            **self.HISTORY,
+        }
+        rolled = CalibrationWindow(history=dict(history))
+        rolled.roll(["2021/2022", "2022/2023", "2023/2024"])
+
+        added = rolled.roll(["2022/2023", "2023/2024", "2024/2025"])
+
+        fresh = CalibrationWindow(history=dict(history))
+        fresh.roll(["2022/2023", "2023/2024", "2024/2025"])
+        assert added == [("2023/2024", "2024/2025")]
+        assert rolled.rates == fresh.rates
+        assert derive_grade_parameters(rolled.rates, rolled.stats) == derive_grade_parameters(
+            fresh.rates
+        )
+
 class TestDocumentDefaults:
     """Tests for document defaults constants."""
 
@@ -350,6 +428,19 @@ class TestCalibrationServiceUnit:
         assert "Insufficient" in result.message
         assert result.fallback_used is True
 
+    @pytest.mark.asyncio
+    async def test_history_fingerprints_read_xmin_on_postgresql(self, service, mock_session):
+        """On PostgreSQL year fingerprints sum xmin rather than max(updated_at)."""
+        mock_session.get_bind = MagicMock(return_value=MagicMock(dialect=postgresql.dialect()))
+        mock_session.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+
+        await service._fetch_history_fingerprints(["2023/2024", "2024/2025"])
+
+        stmt = mock_session.execute.await_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "CAST(CAST(xmin AS TEXT) AS BIGINT)" in sql
+        assert "max(" not in sql
+
 
 # ==============================================================================
 # Integration Tests - With DB Fixtures
@@ -552,6 +643,7 @@ class TestCalibrationServiceIntegration:
     @pytest.fixture
     def service(self, db_session: AsyncSession) -> EnrollmentCalibrationService:
         """Create service with real session."""
+        invalidate_calibration_cache()
         return EnrollmentCalibrationService(db_session)
 
     @pytest.mark.asyncio
@@ -610,6 +702,173 @@ class TestCalibrationServiceIntegration:
 
         assert len(params) > 0
 
+    @pytest.mark.asyncio
+    async def test_recalibration_updates_rows_in_place(
+        self,
+        service: EnrollmentCalibrationService,
+        db_session: AsyncSession,
+        organization_id: uuid.UUID,
+        historical_enrollment_data: dict,
+    ):
+        """A forced recalibration upserts the existing row of each grade."""
+        with patch.object(service, "get_current_school_year", return_value="2025/2026"):
+            await service.calibrate_parameters(organization_id)
+            first = {
+                grade: (param.id, param.progression_rate)
+                for grade, param in (
+                    await service.get_derived_parameters(organization_id)
+                ).items()
+            }
+
+            latest = await db_session.execute(
+                select(HistoricalActuals).where(
+                    HistoricalActuals.fiscal_year == 2024,
+                    HistoricalActuals.dimension_code == "CE1",
+                )
+            )
+            latest.scalar_one().annual_count = 150
+            await db_session.flush()
+
+            result = await service.calibrate_parameters(organization_id, force=True)
+            second = await service.get_derived_parameters(organization_id)
+
+        assert result.parameters_updated == len(first)
+        assert {g: p.id for g, p in second.items()} == {g: v[0] for g, v in first.items()}
+        assert second["CE1"].progression_rate > first["CE1"][1]
+
+    @pytest.mark.asyncio
+    async def test_rolling_window_fetches_only_new_year(
+        self,
+        service: EnrollmentCalibrationService,
+        organization_id: uuid.UUID,
+        historical_enrollment_data: dict,
+    ):
+        """When the window rolls forward, only the new school year is read."""
+        with patch.object(service, "get_current_school_year", return_value="2024/2025"):
+            first = await service.calibrate_parameters(organization_id)
+
+        fetch = AsyncMock(wraps=service._fetch_enrollment_history)
+        with (
+            patch.object(service, "get_current_school_year", return_value="2025/2026"),
+            patch.object(service, "_fetch_enrollment_history", fetch),
+        ):
+            rolled = await service.calibrate_parameters(organization_id)
+
+        fetch.assert_awaited_once_with(organization_id, ["2024/2025"])
+        assert first.source_years == ["2021/2022", "2022/2023", "2023/2024"]
+        assert rolled.source_years == ["2021/2022", "2022/2023", "2023/2024", "2024/2025"]
+
+        # Incremental result matches a full rescan
+        incremental = await service.get_derived_parameters(organization_id)
+        incremental_rates = {g: p.progression_rate for g, p in incremental.items()}
+        with patch.object(service, "get_current_school_year", return_value="2025/2026"):
+            await service.calibrate_parameters(organization_id, force=True)
+        rescanned = await service.get_derived_parameters(organization_id)
+        assert {g: p.progression_rate for g, p in rescanned.items()} == incremental_rates
+
+    @pytest.mark.asyncio
+    async def test_import_of_new_year_fetches_only_that_year(
+        self,
+        service: EnrollmentCalibrationService,
+        db_session: AsyncSession,
+        organization_id: uuid.UUID,
+        historical_enrollment_data: dict,
+    ):
+        """Importing a school year invalidates and refetches that year alone."""
+        with patch.object(service, "get_current_school_year", return_value="2026/2027"):
+            first = await service.calibrate_parameters(organization_id)
+
+        lines = ["level_code,student_count"] + [
+            f"{grade},{count + 3}"
+            for grade, count in historical_enrollment_data["2024/2025"].items()
+        ]
+        with patch.object(db_session, "commit", AsyncMock()):
+            await HistoricalImportService(db_session).import_data(
+                file_content="\n".join(lines).encode(),
+                filename="enrollment.csv",
+                fiscal_year=2025,
+                module=ImportModule.ENROLLMENT,
+            )
+
+        fetch = AsyncMock(wraps=service._fetch_enrollment_history)
+        with (
+            patch.object(service, "get_current_school_year", return_value="2026/2027"),
+            patch.object(service, "_fetch_enrollment_history", fetch),
+        ):
+            updated = await service.calibrate_parameters(organization_id)
+
+        fetch.assert_awaited_once_with(organization_id, ["2025/2026"])
+        assert first.source_years == ["2022/2023", "2023/2024", "2024/2025"]
+        assert updated.source_years == ["2022/2023", "2023/2024", "2024/2025", "2025/2026"]
+
+        incremental = await service.get_derived_parameters(organization_id)
+        with patch.object(service, "get_current_school_year", return_value="2026/2027"):
+            await service.calibrate_parameters(organization_id, force=True)
+        rescanned = await service.get_derived_parameters(organization_id)
+        assert {g: p.progression_rate for g, p in rescanned.items()} == {
+            g: p.progression_rate for g, p in incremental.items()
+        }
+
+    @pytest.mark.asyncio
+    async def test_years_without_history_are_not_refetched(
+        self,
+        service: EnrollmentCalibrationService,
+        organization_id: uuid.UUID,
+        historical_enrollment_data: dict,
+    ):
+        """A school year read without rows is cached like any other year."""
+        fetch_history = service._fetch_enrollment_history
+
+        async def fetch_years_with_rows(org_id, school_years):
+            history = await fetch_history(org_id, school_years)
+            return {year: grades for year, grades in history.items() if grades}
+
+        with (
+            patch.object(service, "get_current_school_year", return_value="2026/2027"),
+            patch.object(service, "_fetch_enrollment_history", fetch_years_with_rows),
+        ):
+            first = await service.calibrate_parameters(organization_id)
+
+        fetch = AsyncMock(wraps=service._fetch_enrollment_history)
+        with (
+            patch.object(service, "get_current_school_year", return_value="2026/2027"),
+            patch.object(service, "_fetch_enrollment_history", fetch),
+        ):
+            second = await service.calibrate_parameters(organization_id)
+
+        fetch.assert_not_awaited()
+        assert first.source_years == ["2022/2023", "2023/2024", "2024/2025"]
+        assert second.source_years == first.source_years
+
+    @pytest.mark.asyncio
+    async def test_history_change_discards_window(
+        self,
+        service: EnrollmentCalibrationService,
+        db_session: AsyncSession,
+        organization_id: uuid.UUID,
+        historical_enrollment_data: dict,
+    ):
+        """History written elsewhere (e.g., another worker) forces a rescan."""
+        with patch.object(service, "get_current_school_year", return_value="2025/2026"):
+            await service.calibrate_parameters(organization_id)
+            first_rate = (await service.get_derived_parameters(organization_id))[
+                "CE1"
+            ].progression_rate
+
+            latest = await db_session.execute(
+                select(HistoricalActuals).where(
+                    HistoricalActuals.fiscal_year == 2024,
+                    HistoricalActuals.dimension_code == "CE1",
+                )
+            )
+            latest.scalar_one().annual_count = 150
+            await db_session.flush()
+
+            await service.calibrate_parameters(organization_id)
+            second = await service.get_derived_parameters(organization_id)
+
+        assert second["CE1"].progression_rate > first_rate
+
     @pytest.mark.asyncio
     async def test_calibration_status_after_calibration(
         self,
@@ -803,6 +1062,7 @@ class TestEnrollmentSettingsResponse:
     @pytest.fixture
     def service(self, db_session: AsyncSession) -> EnrollmentCalibrationService:
         """Create service with real session."""
+        invalidate_calibration_cache()
         return EnrollmentCalibrationService(db_session)
 
     @pytest.mark.asyncio
@@ -14,11 +14,16 @@ issues when running in parallel with pytest-xdist.
 """
 
 import uuid
+from datetime import UTC, datetime
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from app.models.enrollment_projection import EnrollmentScenario
+from app.models.enrollment_projection import (
+    EnrollmentProjection,
+    EnrollmentProjectionConfig,
+    EnrollmentScenario,
+)
 from app.services.enrollment_projection_service import EnrollmentProjectionService
 from app.services.exceptions import NotFoundError, ValidationError
 from sqlalchemy import select
@@ -439,3 +444,148 @@ class TestGetAllScenariosIntegration:
 
         # May be empty or contain scenarios from other tests
         assert isinstance(scenarios, list)
+
+
+# ==============================================================================
+# Integration Tests - Diff-based projection persistence
+# ==============================================================================
+
+
+class TestSaveProjectionRows:
+    """Tests for _save_projection_rows diff-based upsert."""
+
+    @pytest.fixture
+    async def projection_config(
+        self,
+        db_session: AsyncSession,
+        test_budget_version,
+    ) -> EnrollmentProjectionConfig:
+        """Projection config on a fresh scenario."""
+        scenario = EnrollmentScenario(
+            id=uuid.uuid4(),
+            code=f"diff_{uuid.uuid4().hex[:8]}",
+            name_en="Diff",
+            name_fr="Diff",
+            ps_entry=65,
+            entry_growth_rate=Decimal("0.00"),
+            default_retention=Decimal("0.96"),
+            terminal_retention=Decimal("0.98"),
+            lateral_multiplier=Decimal("1.00"),
+            color_code="#0d6efd",
+            sort_order=9,
+        )
+        config = EnrollmentProjectionConfig(
+            id=uuid.uuid4(),
+            budget_version_id=test_budget_version.id,
+            scenario_id=scenario.id,
+            base_year=2024,
+            projection_years=2,
+        )
+        db_session.add_all([scenario, config])
+        await db_session.flush()
+        return config
+
+    @staticmethod
+    def _rows(config_id: uuid.UUID, levels: dict, students: dict[str, int], years=(2025,)):
+        """Build calculated rows for the given grades and fiscal years."""
+        now = datetime.now(UTC)
+        return [
+            {
+                "projection_config_id": config_id,
+                "school_year": f"{year}-{year + 1}",
+                "fiscal_year": year + 1,
+                "level_id": levels[code].id,
+                "projected_students": count,
+                "divisions": 2,
+                "avg_class_size": Decimal(count) / 2,
+                "fiscal_year_weighted_students": Decimal(count) * Decimal("0.9"),
+                "was_capacity_constrained": False,
+                "original_projection": None,
+                "reduction_applied": 0,
+                "reduction_percentage": None,
+                "calculation_timestamp": now,
+            }
+            for year in years
+            for code, count in students.items()
+        ]
+
+    async def _stored(self, db_session: AsyncSession, config_id: uuid.UUID) -> list:
+        result = await db_session.execute(
+            select(EnrollmentProjection)
+            .where(EnrollmentProjection.projection_config_id == config_id)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    async def test_first_save_inserts_every_row(
+        self,
+        db_session: AsyncSession,
+        projection_config: EnrollmentProjectionConfig,
+        academic_levels: dict,
+    ):
+        """All grades are written and reported as changed."""
+        service = EnrollmentProjectionService(db_session)
+        level_codes = {level.id: code for code, level in academic_levels.items()}
+        rows = self._rows(projection_config.id, academic_levels, {"PS": 45, "6EME": 83})
+
+        result = await service._save_projection_rows(projection_config.id, rows, level_codes)
+
+        assert result.changed_grades == ["6EME", "PS"]
+        assert result.rows_upserted == 2
+        assert len(await self._stored(db_session, projection_config.id)) == 2
+
+    async def test_unchanged_rows_are_not_written(
+        self,
+        db_session: AsyncSession,
+        projection_config: EnrollmentProjectionConfig,
+        academic_levels: dict,
+    ):
+        """Only grades whose values moved are upserted; row ids are kept."""
+        service = EnrollmentProjectionService(db_session)
+        level_codes = {level.id: code for code, level in academic_levels.items()}
+        await service._save_projection_rows(
+            projection_config.id,
+            self._rows(projection_config.id, academic_levels, {"PS": 45, "6EME": 83}),
+            level_codes,
+        )
+        ids_before = {p.level_id: p.id for p in await self._stored(db_session, projection_config.id)}
+
+        result = await service._save_projection_rows(
+            projection_config.id,
+            self._rows(projection_config.id, academic_levels, {"PS": 45, "6EME": 85}),
+            level_codes,
+        )
+
+        assert result.changed_grades == ["6EME"]
+        assert result.rows_upserted == 1
+        stored = {p.level_id: p for p in await self._stored(db_session, projection_config.id)}
+        assert {level_id: p.id for level_id, p in stored.items()} == ids_before
+        assert stored[academic_levels["6EME"].id].projected_students == 85
+
+    async def test_stale_rows_are_deleted(
+        self,
+        db_session: AsyncSession,
+        projection_config: EnrollmentProjectionConfig,
+        academic_levels: dict,
+    ):
+        """Rows no longer projected are removed and their grade reported."""
+        service = EnrollmentProjectionService(db_session)
+        level_codes = {level.id: code for code, level in academic_levels.items()}
+        await service._save_projection_rows(
+            projection_config.id,
+            self._rows(
+                projection_config.id, academic_levels, {"PS": 45}, years=(2025, 2026)
+            ),
+            level_codes,
+        )
+
+        result = await service._save_projection_rows(
+            projection_config.id,
+            self._rows(projection_config.id, academic_levels, {"PS": 45}),
+            level_codes,
+        )
+
+        assert result.rows_upserted == 0
+        assert result.rows_deleted == 1
+        assert result.changed_grades == ["PS"]
+        assert len(await self._stored(db_session, projection_config.id)) == 1
@@ -0,0 +1,116 @@
+"""
+Tests for the request-scoped entity loader.
+
+Covers:
+- Batching of concurrent loads into one query
+- Memoization of found entities (not of misses)
+- Sharing per session and invalidation on rollback
+- BaseService.get_by_id through the loader
+"""
+
+import asyncio
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from app.models.configuration import AcademicCycle, BudgetVersion
+from app.services.base import BaseService
+from app.services.entity_loader import get_entity_loader
+from app.services.exceptions import NotFoundError
+from sqlalchemy import event
+
+
+@pytest.fixture
+def statements(db_session) -> list[str]:
+    """SQL statements sent to the database during the test."""
+    sent: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(sync_engine, "before_cursor_execute", record)
+
+
+class TestEntityLoader:
+    """Tests for EntityLoader batching and memoization."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_batched(self, db_session, academic_cycles, statements):
+        """Test loads gathered in one tick are resolved by a single query."""
+        cycles = list(academic_cycles.values())[:3]
+        missing_id = uuid.uuid4()
+        loader = get_entity_loader(db_session, AcademicCycle)
+
+        loaded = await loader.load_many([c.id for c in cycles] + [missing_id])
+
+        assert loaded == [*cycles, None]
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_found_entities_memoized(self, db_session, academic_cycles, statements):
+        cycle = academic_cycles["maternelle"]
+        loader = get_entity_loader(db_session, AcademicCycle)
+
+        first = await loader.load(cycle.id)
+        second = await get_entity_loader(db_session, AcademicCycle).load(cycle.id)
+
+        assert first is second is cycle
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_misses_not_memoized(self, db_session, statements):
+        loader = get_entity_loader(db_session, AcademicCycle)
+        missing_id = uuid.uuid4()
+
+        assert await loader.load(missing_id) is None
+        assert await loader.load(missing_id) is None
+        assert len(statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_dropped_on_rollback(self, db_session):
+        loader = get_entity_loader(db_session, AcademicCycle)
+        await loader.load(uuid.uuid4())
+
+        await db_session.rollback()
+
+        assert get_entity_loader(db_session, AcademicCycle) is not loader
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_all_waiters(self, db_session):
+        """Test a failed batch fails every load and caches nothing."""
+        loader = get_entity_loader(db_session, AcademicCycle, key="no_such_column")
+
+        results = await asyncio.gather(
+            loader.load(uuid.uuid4()), loader.load(uuid.uuid4()), return_exceptions=True
+        )
+
+        assert all(isinstance(r, AttributeError) for r in results)
+
+
+class TestBaseServiceGetById:
+    """Tests for BaseService.get_by_id on request-cached models."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_lookups_single_query(self, db_session, test_budget_version, statements):
+        service = BaseService(BudgetVersion, db_session)
+
+        first = await service.get_by_id(test_budget_version.id)
+        second = await BaseService(BudgetVersion, db_session).get_by_id(test_budget_version.id)
+
+        assert first is second is test_budget_version
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_soft_deleted_hidden(self, db_session, test_budget_version):
+        service = BaseService(BudgetVersion, db_session)
+        await service.get_by_id(test_budget_version.id)
+        test_budget_version.deleted_at = datetime.now(UTC)
+
+        with pytest.raises(NotFoundError):
+            await service.get_by_id(test_budget_version.id)
+        assert await service.get_by_id(test_budget_version.id, include_deleted=True) is (
+            test_budget_version
+        )
@@ -13,6 +13,12 @@ import uuid
 from decimal import Decimal
 
 import pytest
+from app.engine.financial_statements import (
+    ConsolidationEntry,
+    FinancialPeriod,
+    StatementLineType,
+)
+from app.engine.financial_statements import StatementFormat as EngineStatementFormat
 from app.models.configuration import BudgetVersion
 from app.models.consolidation import (
     BudgetConsolidation,
@@ -22,8 +28,13 @@ from app.models.consolidation import (
     StatementFormat,
     StatementType,
 )
+from app.services import financial_statements_service
 from app.services.exceptions import ValidationError
-from app.services.financial_statements_service import FinancialStatementsService
+from app.services.financial_statements_service import (
+    FinancialStatementsService,
+    build_statement_set,
+)
+from app.services.input_fingerprint import compute_input_fingerprint
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -130,6 +141,9 @@ class TestGetIncomeStatement:
         test_user_id: uuid.UUID,
     ):
         """Test retrieval of existing income statement."""
+        fingerprint = await compute_input_fingerprint(
+            db_session, test_budget_version.id, [BudgetConsolidation]
+        )
         # Create existing statement
         existing_statement = FinancialStatement(
             id=uuid.uuid4(),
@@ -140,6 +154,7 @@ class TestGetIncomeStatement:
             fiscal_year=2025,
             total_amount_sar=Decimal("500000.00"),
             is_calculated=True,
+            input_fingerprint=fingerprint,
         )
         db_session.add(existing_statement)
         await db_session.flush()
@@ -148,6 +163,46 @@ class TestGetIncomeStatement:
         result = await service.get_income_statement(test_budget_version.id, format="pcg")
 
         assert result.id == existing_statement.id
+        assert service.last_recomputed is False
+
+    @pytest.mark.asyncio
+    async def test_get_income_statement_regenerates_when_consolidation_changes(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+        test_user_id: uuid.UUID,
+    ):
+        """Test a stored statement is regenerated once consolidation changes."""
+        service = FinancialStatementsService(db_session)
+        first = await service.get_income_statement(test_budget_version.id, format="pcg")
+        assert service.last_recomputed is True
+        assert first.total_amount_sar == Decimal("0.00")
+
+        db_session.add(
+            BudgetConsolidation(
+                id=uuid.uuid4(),
+                budget_version_id=test_budget_version.id,
+                source_table="revenue_plans",
+                source_count=1,
+                is_calculated=True,
+                consolidation_category=ConsolidationCategory.REVENUE_TUITION,
+                account_code="70110",
+                account_name="Tuition T1",
+                amount_sar=Decimal("1000.00"),
+                is_revenue=True,
+                created_by_id=test_user_id,
+            )
+        )
+        await db_session.flush()
+
+        second = await service.get_income_statement(test_budget_version.id, format="pcg")
+        assert service.last_recomputed is True
+        assert second.id != first.id
+        assert second.total_amount_sar == Decimal("1000.00")
+
+        third = await service.get_income_statement(test_budget_version.id, format="pcg")
+        assert service.last_recomputed is False
+        assert third.id == second.id
 
     @pytest.mark.asyncio
     async def test_get_income_statement_empty_consolidation(
@@ -206,6 +261,9 @@ class TestGetBalanceSheet:
         test_budget_version: BudgetVersion,
     ):
         """Test retrieval of existing balance sheet."""
+        fingerprint = await compute_input_fingerprint(
+            db_session, test_budget_version.id, [BudgetConsolidation]
+        )
         # Create existing statements
         assets = FinancialStatement(
             id=uuid.uuid4(),
@@ -216,6 +274,7 @@ class TestGetBalanceSheet:
             fiscal_year=2025,
             total_amount_sar=Decimal("500000.00"),
             is_calculated=True,
+            input_fingerprint=fingerprint,
         )
         liabilities = FinancialStatement(
             id=uuid.uuid4(),
@@ -226,6 +285,7 @@ class TestGetBalanceSheet:
             fiscal_year=2025,
             total_amount_sar=Decimal("500000.00"),
             is_calculated=True,
+            input_fingerprint=fingerprint,
         )
         db_session.add_all([assets, liabilities])
         await db_session.flush()
@@ -235,6 +295,7 @@ class TestGetBalanceSheet:
 
         assert result["assets"].id == assets.id
         assert result["liabilities"].id == liabilities.id
+        assert service.last_recomputed is False
 
 
 class TestCalculateStatementLines:
@@ -566,6 +627,134 @@ class TestGetPeriodTotals:
         assert "Invalid period" in str(exc_info.value)
 
 
+class TestStatementSet:
+    """Tests for the multi-period statement set."""
+
+    @pytest.fixture
+    async def consolidation(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+        test_user_id: uuid.UUID,
+    ) -> list[BudgetConsolidation]:
+        """Revenue, personnel and CapEx consolidation lines."""
+        lines = [
+            BudgetConsolidation(
+                id=uuid.uuid4(),
+                budget_version_id=test_budget_version.id,
+                source_table=source_table,
+                source_count=1,
+                is_calculated=True,
+                consolidation_category=category,
+                account_code=account_code,
+                account_name=account_code,
+                amount_sar=amount,
+                is_revenue=is_revenue,
+                created_by_id=test_user_id,
+            )
+            for source_table, category, account_code, amount, is_revenue in [
+                ("revenue_plans", ConsolidationCategory.REVENUE_TUITION, "70110",
+                 Decimal("1000000.00"), True),
+                ("personnel_cost_plans", ConsolidationCategory.PERSONNEL_TEACHING, "64110",
+                 Decimal("600000.00"), False),
+                ("capex_plans", ConsolidationCategory.CAPEX_IT, "21830",
+                 Decimal("120000.00"), False),
+            ]
+        ]
+        db_session.add_all(lines)
+        await db_session.flush()
+        return lines
+
+    @pytest.mark.asyncio
+    async def test_statement_set_covers_all_periods(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+        consolidation: list[BudgetConsolidation],
+    ):
+        """Test every period has totals, income statements and cash flow."""
+        service = FinancialStatementsService(db_session)
+        statement_set = await service.get_statement_set(test_budget_version.id)
+
+        assert set(statement_set.period_totals) == set(FinancialPeriod)
+        p1 = statement_set.period_totals[FinancialPeriod.PERIOD_1]
+        assert p1.total_revenue == Decimal("600000.00")
+        assert p1.total_expenses == Decimal("360000.00")
+
+        ifrs_p2 = statement_set.income_statements[
+            (FinancialPeriod.PERIOD_2, EngineStatementFormat.IFRS)
+        ]
+        assert ifrs_p2[0].line_description == "OPERATING REVENUE"
+        assert ifrs_p2[-1].amount_sar == Decimal("160000.00")
+
+        summer_cash = statement_set.cash_flows[FinancialPeriod.SUMMER]
+        assert summer_cash[-1].line_type == StatementLineType.TOTAL
+
+        assets_lines, liabilities_lines = statement_set.balance_sheet
+        assert assets_lines[-1].amount_sar == Decimal("120000.00")
+        assert liabilities_lines[-1].amount_sar == Decimal("120000.00")
+
+    @pytest.mark.asyncio
+    async def test_statement_set_cached_until_consolidation_changes(
+        self,
+        db_session: AsyncSession,
+        test_budget_version: BudgetVersion,
+        consolidation: list[BudgetConsolidation],
+    ):
+        """Test the statement set is reused until consolidation changes."""
+        service = FinancialStatementsService(db_session)
+        first = await service.get_statement_set(test_budget_version.id)
+        assert await service.get_statement_set(test_budget_version.id) is first
+        assert (
+            await FinancialStatementsService(db_session).get_statement_set(test_budget_version.id)
+            is first
+        )
+
+        consolidation[0].amount_sar = Decimal("2000000.00")
+        await db_session.flush()
+
+        second = await service.get_statement_set(test_budget_version.id)
+        assert second is not first
+        annual = await service.get_period_totals(test_budget_version.id, "annual")
+        assert annual["total_revenue"] == Decimal("2000000.00")
+
+    @pytest.mark.asyncio
+    async def test_statement_set_cache_evicts_least_recently_used(
+        self,
+        db_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test only the most recently used versions stay cached."""
+        monkeypatch.setattr(financial_statements_service, "STATEMENT_SET_CACHE_SIZE", 2)
+        service = FinancialStatementsService(db_session)
+        first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+        for version_id in (first, second, first, third):
+            await service.get_statement_set(version_id)
+
+        assert list(financial_statements_service._statement_set_cache)[-2:] == [first, third]
+        assert second not in financial_statements_service._statement_set_cache
+
+    def test_period_totals_rounded_once(self):
+        """Test period totals round the weighted sum, not each weighted entry."""
+        entries = [
+            ConsolidationEntry(
+                account_code=f"6061{i}",
+                account_name="Supplies",
+                amount_sar=Decimal("10.01"),
+                is_revenue=False,
+                consolidation_category=ConsolidationCategory.OPERATING_SUPPLIES.value,
+            )
+            for i in range(3)
+        ]
+
+        statement_set = build_statement_set("fingerprint", entries)
+
+        # 30.03 x 4/12 = 10.01 (10.02 if each 3.3366... were rounded first)
+        p2 = statement_set.period_totals[FinancialPeriod.PERIOD_2]
+        assert p2.total_expenses == Decimal("10.01")
+
+
 class TestIncomeStatementCalculation:
     """Tests for detailed income statement calculation."""
 
@@ -0,0 +1,250 @@
+"""
+Tests for HistoricalComparisonService.
+
+Tests cover:
+- Comparison cube refresh from historical actuals (N-1 / N-2 per planning year)
+- Cube lookups organized by dimension code and fiscal year
+- Per fiscal year caching checked against cube fingerprints, invalidation after commit
+- Variance calculation in build_comparison
+"""
+
+from __future__ import annotations
+
+import uuid
+from decimal import Decimal
+
+import pytest
+from app.models import (
+    HistoricalActuals,
+    HistoricalComparisonCube,
+    HistoricalDimensionType,
+    HistoricalModuleCode,
+)
+from app.schemas.historical import HistoricalDataPoint
+from app.services.historical_comparison_service import (
+    MAX_HISTORY_YEARS,
+    HistoricalComparisonService,
+    _history_cache,
+    invalidate_historical_comparison_cache,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _actual(fiscal_year: int, module: HistoricalModuleCode, code: str, **values) -> HistoricalActuals:
+    """Build a historical actual for a module's natural dimension."""
+    dimension_type = {
+        HistoricalModuleCode.ENROLLMENT: HistoricalDimensionType.LEVEL,
+        HistoricalModuleCode.DHG: HistoricalDimensionType.SUBJECT,
+    }.get(module, HistoricalDimensionType.ACCOUNT_CODE)
+    return HistoricalActuals(
+        id=uuid.uuid4(),
+        fiscal_year=fiscal_year,
+        module_code=module,
+        dimension_type=dimension_type,
+        dimension_code=code,
+        **values,
+    )
+
+
+@pytest.fixture
+async def historical_actuals(db_session: AsyncSession) -> list[HistoricalActuals]:
+    """Two years of enrollment, DHG and revenue actuals."""
+    records = [
+        _actual(2023, HistoricalModuleCode.ENROLLMENT, "6EME", annual_count=100),
+        _actual(2024, HistoricalModuleCode.ENROLLMENT, "6EME", annual_count=110),
+        _actual(2024, HistoricalModuleCode.ENROLLMENT, "5EME", annual_count=95),
+        _actual(2024, HistoricalModuleCode.DHG, "MATH", annual_fte=Decimal("0"), annual_hours=Decimal("72")),
+        _actual(2024, HistoricalModuleCode.REVENUE, "70110", annual_amount_sar=Decimal("1000.00")),
+    ]
+    db_session.add_all(records)
+    await db_session.flush()
+    invalidate_historical_comparison_cache()
+    return records
+
+
+class TestRefreshCube:
+    """Tests for comparison cube maintenance."""
+
+    @pytest.mark.asyncio
+    async def test_full_refresh_pivots_prior_years(
+        self, db_session: AsyncSession, historical_actuals: list
+    ):
+        """Each historical year feeds N-1 of Y+1 and N-2 of Y+2."""
+        service = HistoricalComparisonService(db_session)
+
+        written = await service.refresh_cube()
+
+        rows = (
+            await db_session.execute(
+                select(HistoricalComparisonCube).where(
+                    HistoricalComparisonCube.dimension_code == "6EME"
+                )
+            )
+        ).scalars().all()
+        by_year = {r.fiscal_year: (r.n_minus_1_value, r.n_minus_2_value) for r in rows}
+        assert by_year == {
+            2024: (Decimal("100"), None),
+            2025: (Decimal("110"), Decimal("100")),
+            2026: (None, Decimal("110")),
+        }
+        assert written == 9
+
+    @pytest.mark.asyncio
+    async def test_partial_refresh_only_touches_module_and_years(
+        self, db_session: AsyncSession, historical_actuals: list
+    ):
+        """A module/year refresh rebuilds only the planning years it feeds."""
+        service = HistoricalComparisonService(db_session)
+        await service.refresh_cube()
+        historical_actuals[1].annual_count = 120
+        historical_actuals[4].annual_amount_sar = Decimal("5.00")
+        await db_session.flush()
+
+        await service.refresh_cube([HistoricalModuleCode.ENROLLMENT], [2024])
+
+        history = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT, HistoricalDimensionType.LEVEL, 2025
+        )
+        assert history["6EME"][2024].value == 120
+        revenue = await service.get_historical_for_module(
+            HistoricalModuleCode.REVENUE, HistoricalDimensionType.ACCOUNT_CODE, 2025
+        )
+        assert revenue["70110"][2024].value == Decimal("1000.00")
+
+
+class TestGetHistoricalForModule:
+    """Tests for cube lookups."""
+
+    @pytest.mark.asyncio
+    async def test_lookup_by_dimension_and_year(
+        self, db_session: AsyncSession, historical_actuals: list
+    ):
+        """Points are keyed by dimension code, then fiscal year."""
+        service = HistoricalComparisonService(db_session)
+        await service.refresh_cube()
+
+        history = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT, HistoricalDimensionType.LEVEL, 2025
+        )
+
+        assert set(history) == {"6EME", "5EME"}
+        assert history["6EME"][2024].value == 110
+        assert isinstance(history["6EME"][2024].value, int)
+        assert history["6EME"][2023].value == 100
+        assert set(history["5EME"]) == {2024}
+
+    @pytest.mark.asyncio
+    async def test_single_history_year_excludes_n_minus_2(
+        self, db_session: AsyncSession, historical_actuals: list
+    ):
+        """history_years=1 only returns N-1."""
+        service = HistoricalComparisonService(db_session)
+        await service.refresh_cube()
+
+        history = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT, HistoricalDimensionType.LEVEL, 2025, history_years=1
+        )
+
+        assert set(history["6EME"]) == {2024}
+
+    @pytest.mark.asyncio
+    async def test_history_years_beyond_cube_clamped(
+        self, db_session: AsyncSession, historical_actuals: list
+    ):
+        """The cube holds N-1 and N-2 only: more years return the same points."""
+        service = HistoricalComparisonService(db_session)
+
+        history = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT,
+            HistoricalDimensionType.LEVEL,
+            2025,
+            history_years=5,
+        )
+        capped = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT,
+            HistoricalDimensionType.LEVEL,
+            2025,
+            history_years=MAX_HISTORY_YEARS,
+        )
+
+        assert history == capped
+
+    @pytest.mark.asyncio
+    async def test_dhg_falls_back_to_hours(
+        self, db_session: AsyncSession, historical_actuals: list
+    ):
+        """DHG uses FTE, falling back to hours when FTE is zero."""
+        service = HistoricalComparisonService(db_session)
+        await service.refresh_cube()
+
+        history = await service.get_historical_for_module(
+            HistoricalModuleCode.DHG, HistoricalDimensionType.SUBJECT, 2025
+        )
+
+        assert history["MATH"][2024].value == Decimal("72")
+
+    @pytest.mark.asyncio
+    async def test_lookup_cached_while_cube_unchanged(
+        self, db_session: AsyncSession, historical_actuals: list, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Lookups are reused until the fingerprint of their cube rows changes."""
+        service = HistoricalComparisonService(db_session)
+        await service.refresh_cube()
+        fingerprints = iter([(2, 1), (2, 1), (2, 2)])
+
+        async def cube_fingerprint(*args):
+            return next(fingerprints)
+
+        monkeypatch.setattr(service, "_cube_fingerprint", cube_fingerprint)
+        first = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT, HistoricalDimensionType.LEVEL, 2025
+        )
+        second = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT, HistoricalDimensionType.LEVEL, 2025
+        )
+        assert second is first
+
+        # e.g. a rebuild committed by another worker
+        third = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT, HistoricalDimensionType.LEVEL, 2025
+        )
+        assert third is not first
+        assert third == first
+
+    @pytest.mark.asyncio
+    async def test_refresh_leaves_cache_to_the_committing_caller(
+        self, db_session: AsyncSession, historical_actuals: list
+    ):
+        """An uncommitted rebuild does not clear the cache; invalidation does."""
+        service = HistoricalComparisonService(db_session)
+        await service.refresh_cube()
+        first = await service.get_historical_for_module(
+            HistoricalModuleCode.ENROLLMENT, HistoricalDimensionType.LEVEL, 2025
+        )
+
+        await service.refresh_cube([HistoricalModuleCode.ENROLLMENT], [2024])
+        cube_key = (HistoricalModuleCode.ENROLLMENT, HistoricalDimensionType.LEVEL, 2025, 2)
+        assert _history_cache[cube_key].historical is first
+
+        invalidate_historical_comparison_cache()
+        assert cube_key not in _history_cache
+
+
+class TestBuildComparison:
+    """Tests for variance calculation."""
+
+    def test_variances_against_prior_years(self, db_session: AsyncSession):
+        """Absolute and percentage variances are computed against N-1 and N-2."""
+        service = HistoricalComparisonService(db_session)
+        history = {
+            2024: HistoricalDataPoint(fiscal_year=2024, value=100, is_actual=True),
+            2023: HistoricalDataPoint(fiscal_year=2023, value=80, is_actual=True),
+        }
+
+        comparison = service.build_comparison(110, history, 2025)
+
+        assert comparison.vs_n_minus_1_abs == 10
+        assert comparison.vs_n_minus_1_pct == Decimal("10.00")
+        assert comparison.vs_n_minus_2_pct == Decimal("37.50")
+
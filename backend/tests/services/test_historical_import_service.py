@@ -3,10 +3,12 @@ Tests for Historical Import Service
 
 Tests cover:
 - Module detection from column headers
-- CSV and Excel file parsing
+- CSV and Excel file parsing (streamed row by row)
+- Header resolution computed once per file
 - Validation logic (valid rows, invalid rows, warnings)
-- Import execution with upsert behavior
+- Import execution with batched multi-row inserts and progress reporting
 - Template generation
+- Cursor listing of imported rows
 - Error handling
 """
 
@@ -14,13 +16,19 @@ from __future__ import annotations
 
 import io
 from decimal import Decimal
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from app.models.analysis import (
+    HistoricalActuals,
+    HistoricalComparisonCube,
+    HistoricalModuleCode,
+)
 from app.services.historical_import_service import (
     DHG_COLUMNS,
     ENROLLMENT_COLUMNS,
     FINANCIAL_COLUMNS,
+    ColumnMap,
     HistoricalImportService,
     ImportModule,
     ImportPreviewResult,
@@ -28,7 +36,22 @@ from app.services.historical_import_service import (
     ImportResultStatus,
     ImportStatus,
     generate_template,
+    get_module_columns,
 )
+from openpyxl import Workbook
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _xlsx(rows: list[list]) -> bytes:
+    """Build an Excel file from rows (first row is headers)."""
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
 
 
 class TestImportModuleEnum:
@@ -259,18 +282,18 @@ class TestHistoricalImportService:
         service = HistoricalImportService(mock_session)
         assert service.session == mock_session
 
-    def test_parse_csv_content(self, service):
-        """Test parsing CSV content."""
+    def test_iter_csv_rows(self, service):
+        """Test streaming CSV content."""
         csv_content = b"fiscal_year,level_code,student_count\n2024,6EME,120\n2024,5EME,115"
-        rows = service._parse_csv(csv_content)
+        rows = list(service._iter_csv_rows(csv_content))
         assert len(rows) == 2
         assert rows[0]["level_code"] == "6EME"
         assert rows[0]["student_count"] == "120"
 
-    def test_parse_csv_with_bom(self, service):
-        """Test parsing CSV with BOM marker."""
+    def test_iter_csv_rows_with_bom(self, service):
+        """Test streaming CSV with BOM marker."""
         csv_content = b"\xef\xbb\xbffiscal_year,level_code,student_count\n2024,6EME,120"
-        rows = service._parse_csv(csv_content)
+        rows = list(service._iter_csv_rows(csv_content))
         assert len(rows) == 1
         # BOM should be stripped from first header
         assert "fiscal_year" in rows[0]
@@ -355,44 +378,51 @@ class TestHistoricalImportService:
         assert result.status == ImportStatus.WARNING
         assert "7xxxx" in result.message
 
-    def test_create_enrollment_record(self, service):
-        """Test creating enrollment record."""
+    @staticmethod
+    def _record_values(
+        service: HistoricalImportService, row: dict[str, str], module: ImportModule
+    ) -> dict | None:
+        return service._record_values(
+            row, 2024, module, ColumnMap(row.keys(), get_module_columns(module))
+        )
+
+    def test_enrollment_record_values(self, service):
+        """Test building enrollment record values."""
         row = {"level_code": "6EME", "student_count": "120"}
-        record = service._create_record(row, 2024, ImportModule.ENROLLMENT)
-        assert record is not None
-        assert record.fiscal_year == 2024
-        assert record.module_code == "enrollment"
-        assert record.dimension_type == "level"
-        assert record.dimension_code == "6EME"
-        assert record.annual_count == 120
-
-    def test_create_dhg_record(self, service):
-        """Test creating DHG record."""
+        values = self._record_values(service, row, ImportModule.ENROLLMENT)
+        assert values is not None
+        assert values["fiscal_year"] == 2024
+        assert values["module_code"] == "enrollment"
+        assert values["dimension_type"] == "level"
+        assert values["dimension_code"] == "6EME"
+        assert values["annual_count"] == 120
+
+    def test_dhg_record_values(self, service):
+        """Test building DHG record values."""
         row = {"subject_code": "MATH", "fte_count": "2.5"}
-        record = service._create_record(row, 2024, ImportModule.DHG)
-        assert record is not None
-        assert record.fiscal_year == 2024
-        assert record.module_code == "dhg"
-        assert record.dimension_type == "subject"
-        assert record.dimension_code == "MATH"
-        assert record.annual_fte == Decimal("2.5")
-
-    def test_create_revenue_record(self, service):
-        """Test creating revenue record."""
+        values = self._record_values(service, row, ImportModule.DHG)
+        assert values is not None
+        assert values["fiscal_year"] == 2024
+        assert values["module_code"] == "dhg"
+        assert values["dimension_type"] == "subject"
+        assert values["dimension_code"] == "MATH"
+        assert values["annual_fte"] == Decimal("2.5")
+
+    def test_revenue_record_values(self, service):
+        """Test building revenue record values."""
         row = {"account_code": "70100", "annual_amount": "1000000"}
-        record = service._create_record(row, 2024, ImportModule.REVENUE)
-        assert record is not None
-        assert record.fiscal_year == 2024
-        assert record.module_code == "revenue"
-        assert record.dimension_type == "account_code"
-        assert record.dimension_code == "70100"
-        assert record.annual_amount_sar == Decimal("1000000")
-
-    def test_create_record_with_missing_data(self, service):
-        """Test creating record with missing required data returns None."""
+        values = self._record_values(service, row, ImportModule.REVENUE)
+        assert values is not None
+        assert values["fiscal_year"] == 2024
+        assert values["module_code"] == "revenue"
+        assert values["dimension_type"] == "account_code"
+        assert values["dimension_code"] == "70100"
+        assert values["annual_amount_sar"] == Decimal("1000000")
+
+    def test_record_values_with_missing_data(self, service):
+        """Test record values with missing required data are None."""
         row = {"level_code": "", "student_count": ""}
-        record = service._create_record(row, 2024, ImportModule.ENROLLMENT)
-        assert record is None
+        assert self._record_values(service, row, ImportModule.ENROLLMENT) is None
 
     @pytest.mark.asyncio
     async def test_preview_import_success(self, service):
@@ -462,6 +492,45 @@ class TestHistoricalImportService:
         assert result.imported_count == 2
         mock_session.commit.assert_called()
 
+    @pytest.mark.asyncio
+    async def test_import_invalidates_comparisons_after_commit(self, service, mock_session):
+        """Cached comparisons are dropped once the rebuilt cube is committed."""
+        csv_content = b"fiscal_year,level_code,student_count\n2024,6EME,120"
+        invalidated_at_commit: list[bool] = []
+
+        with patch(
+            "app.services.historical_import_service.invalidate_historical_comparison_cache"
+        ) as invalidate:
+            mock_session.commit.side_effect = lambda: invalidated_at_commit.append(
+                invalidate.called
+            )
+            await service.import_data(
+                file_content=csv_content,
+                filename="test.csv",
+                fiscal_year=2024,
+            )
+
+        assert invalidated_at_commit == [False]
+        invalidate.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_historical_rows_listed_by_cursor(self, service):
+        """Row listing is a keyset page filtered by year and module code."""
+        with patch("app.services.historical_import_service.BaseService") as base:
+            base.return_value.get_keyset_paginated = AsyncMock(return_value={"items": []})
+            await service.get_historical_rows_keyset(
+                fiscal_year=2024, module=ImportModule.DHG, cursor="abc", page_size=10
+            )
+
+        base.assert_called_once_with(HistoricalActuals, service.session)
+        base.return_value.get_keyset_paginated.assert_awaited_once_with(
+            cursor="abc",
+            page_size=10,
+            filters={"fiscal_year": 2024, "module_code": HistoricalModuleCode.DHG},
+            order_by="created_at",
+            estimate_total=False,
+        )
+
     @pytest.mark.asyncio
     async def test_import_data_with_overwrite(self, service, mock_session):
         """Test import with overwrite option."""
@@ -525,46 +594,131 @@ class TestHistoricalImportService:
         assert "Unsupported" in result.message
 
 
-class TestGetColumnValue:
-    """Tests for _get_column_value helper."""
+class TestColumnMap:
+    """Tests for per-file header resolution."""
+
+    def test_resolves_first_matching_name(self):
+        """The first possible name present in the headers wins."""
+        columns = ColumnMap(["Code", "Level"], ENROLLMENT_COLUMNS)
+        assert columns.headers["level_code"] == "Level"
+
+    def test_case_insensitive_and_stripped(self):
+        """Headers are matched case-insensitively and values stripped."""
+        columns = ColumnMap([" Student_Count "], ENROLLMENT_COLUMNS)
+        assert columns.get({" Student_Count ": " 120 "}, "student_count") == "120"
+
+    def test_missing_field_returns_none(self):
+        """Unresolved or empty fields return None."""
+        columns = ColumnMap(["level_code"], ENROLLMENT_COLUMNS)
+        assert columns.get({"level_code": ""}, "level_code") is None
+        assert columns.get({"level_code": "6EME"}, "student_count") is None
+
+    def test_alternate_name(self):
+        """An alternate header name resolves the field."""
+        columns = ColumnMap(["level"], ENROLLMENT_COLUMNS)
+        assert columns.get({"level": "6EME"}, "level_code") == "6EME"
+
+    def test_case_insensitive_lookup(self):
+        """Headers in any case resolve the field."""
+        columns = ColumnMap(["Level_Code"], ENROLLMENT_COLUMNS)
+        assert columns.get({"Level_Code": "6EME"}, "level_code") == "6EME"
+
+
+class TestStreamingImport:
+    """Tests for streamed parsing and batched loading."""
 
     @pytest.fixture
-    def service(self):
-        """Create service with mock session."""
-        return HistoricalImportService(AsyncMock())
-
-    def test_get_exact_column(self, service):
-        """Test getting value from exact column name."""
-        row = {"level_code": "6EME"}
-        value = service._get_column_value(row, ["level_code"])
-        assert value == "6EME"
-
-    def test_get_alternate_column(self, service):
-        """Test getting value from alternate column name."""
-        row = {"level": "6EME"}
-        value = service._get_column_value(row, ["level_code", "level"])
-        assert value == "6EME"
-
-    def test_get_missing_column(self, service):
-        """Test getting value when column is missing."""
-        row = {"other": "value"}
-        value = service._get_column_value(row, ["level_code", "level"])
-        assert value is None
-
-    def test_get_column_strips_whitespace(self, service):
-        """Test that column values are stripped of whitespace."""
-        row = {"level_code": "  6EME  "}
-        value = service._get_column_value(row, ["level_code"])
-        assert value == "6EME"
-
-    def test_get_column_empty_string(self, service):
-        """Test getting empty string returns None."""
-        row = {"level_code": ""}
-        value = service._get_column_value(row, ["level_code"])
-        assert value is None
-
-    def test_get_column_case_insensitive(self, service):
-        """Test column lookup is case insensitive."""
-        row = {"Level_Code": "6EME"}
-        value = service._get_column_value(row, ["level_code"])
-        assert value == "6EME"
+    def mock_session(self):
+        """Create a mock async session."""
+        session = AsyncMock()
+        session.add = MagicMock()
+        return session
+
+    def test_iter_excel_rows_skips_empty_rows(self, mock_session):
+        """Excel rows are yielded lazily with lowercased headers."""
+        service = HistoricalImportService(mock_session)
+        content = _xlsx(
+            [["Level_Code", "Student_Count"], ["6EME", 120], [None, None], ["5EME", 115]]
+        )
+
+        rows = service._iter_excel_rows(content)
+
+        assert next(rows) == {"level_code": "6EME", "student_count": "120"}
+        assert list(rows) == [{"level_code": "5EME", "student_count": "115"}]
+
+    @pytest.mark.asyncio
+    async def test_import_writes_batches_and_reports_progress(self, mock_session):
+        """Rows are inserted in batches and progress is reported after each one."""
+        service = HistoricalImportService(mock_session)
+        lines = ["level_code,student_count"] + [f"L{i},{i}" for i in range(5)]
+        progress: list[int] = []
+
+        with patch("app.services.historical_import_service.IMPORT_BATCH_SIZE", 2):
+            result = await service.import_data(
+                file_content="\n".join(lines).encode(),
+                filename="test.csv",
+                fiscal_year=2024,
+                on_progress=progress.append,
+            )
+
+        assert result.imported_count == 5
+        batches = [
+            call.args[1] for call in mock_session.execute.await_args_list if len(call.args) > 1
+        ]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert progress == [2, 4, 5]
+        mock_session.add.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_import_counts_row_errors(self, mock_session):
+        """Rows that fail conversion are skipped and reported by row number."""
+        service = HistoricalImportService(mock_session)
+        content = b"level_code,student_count\n6EME,120\n5EME,abc"
+
+        result = await service.import_data(
+            file_content=content, filename="test.csv", fiscal_year=2024
+        )
+
+        assert result.status == ImportResultStatus.PARTIAL
+        assert result.imported_count == 1
+        assert result.error_count == 1
+        assert result.errors[0].startswith("Row 3:")
+
+    @pytest.mark.asyncio
+    async def test_import_excel_into_database(self, db_session: AsyncSession):
+        """Excel rows are bulk-inserted with a shared import batch id."""
+        service = HistoricalImportService(db_session)
+        content = _xlsx(
+            [
+                ["account_code", "account_name", "amount"],
+                ["70110", "Tuition", "1,500.50"],
+                ["70120", None, 800],
+            ]
+        )
+
+        with patch.object(db_session, "commit", AsyncMock()):
+            result = await service.import_data(
+                file_content=content, filename="gl.xlsx", fiscal_year=2024
+            )
+
+        assert result.status == ImportResultStatus.SUCCESS
+        records = (
+            await db_session.execute(
+                select(HistoricalActuals).where(HistoricalActuals.fiscal_year == 2024)
+            )
+        ).scalars().all()
+        amounts = {r.dimension_code: r.annual_amount_sar for r in records}
+        assert amounts == {"70110": Decimal("1500.50"), "70120": Decimal("800")}
+        assert len({r.import_batch_id for r in records}) == 1
+
+        cube = (
+            await db_session.execute(
+                select(HistoricalComparisonCube).where(
+                    HistoricalComparisonCube.dimension_code == "70110"
+                )
+            )
+        ).scalars().all()
+        assert {(c.fiscal_year, c.n_minus_1_value, c.n_minus_2_value) for c in cube} == {
+            (2025, Decimal("1500.50"), None),
+            (2026, None, Decimal("1500.50")),
+        }
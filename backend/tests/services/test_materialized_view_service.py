@@ -7,8 +7,13 @@ Tests cover:
 - View information retrieval
 - Error handling (invalid views, database errors)
 - Concurrent refresh handling
+- Incremental refresh of dirty budget versions
 """
 
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from app.services.materialized_view_service import MaterializedViewService
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -93,6 +98,155 @@ class TestMaterializedViewServiceRefreshAll:
             pytest.skip("Materialized views not available in test environment")
 
 
+def _postgres_session(dirty_version_ids: list[uuid.UUID]) -> AsyncMock:
+    """Mock a PostgreSQL session whose dirty table holds the given versions."""
+    session = AsyncMock()
+    session.get_bind = MagicMock(return_value=MagicMock(dialect=MagicMock()))
+    session.get_bind.return_value.dialect.name = "postgresql"
+    claim_result = MagicMock()
+    claim_result.fetchall.return_value = [(version_id,) for version_id in dirty_version_ids]
+    session.execute.return_value = claim_result
+    return session
+
+
+class TestMaterializedViewServiceRefreshDirty:
+    """Tests for refresh_dirty() and dirty version tracking."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_dirty_recomputes_only_dirty_versions(self):
+        """Each summary table is rebuilt once per claimed version."""
+        version_id = uuid.uuid4()
+        session = _postgres_session([version_id, version_id])
+
+        result = await MaterializedViewService.refresh_dirty(session)
+
+        assert result["status"] == "success"
+        assert result["versions"] == [str(version_id)]
+        statements = [str(call.args[0]) for call in session.execute.await_args_list]
+        assert statements[0].strip().startswith("DELETE FROM efir_budget.summary_dirty_versions")
+        # Per table: one advisory lock per version, then DELETE and INSERT
+        assert len(statements) == 1 + 3 * len(MaterializedViewService.SUMMARY_TABLES)
+        for call in session.execute.await_args_list[1:]:
+            if "pg_advisory_xact_lock" in str(call.args[0]):
+                continue
+            assert "budget_version_id = ANY" in str(call.args[0])
+            assert call.args[1] == {"version_ids": [version_id]}
+        # The claim is committed on its own, then the rebuilt rows
+        assert session.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_dirty_locks_versions_before_rebuilding(self):
+        """Each (table, version) rebuild takes an advisory lock, in sorted order."""
+        version_ids = [uuid.uuid4(), uuid.uuid4(), uuid.uuid4()]
+        session = _postgres_session(version_ids)
+
+        await MaterializedViewService.refresh_dirty(session)
+
+        calls = session.execute.await_args_list[1:]
+        for table in MaterializedViewService.SUMMARY_TABLES:
+            lock_keys = [
+                call.args[1]["lock_key"]
+                for call in calls
+                if "pg_advisory_xact_lock" in str(call.args[0])
+                and call.args[1]["lock_key"].startswith(f"{table}:")
+            ]
+            assert lock_keys == [f"{table}:{version_id}" for version_id in sorted(version_ids)]
+        # The locks precede the rebuild statements of the table
+        assert "pg_advisory_xact_lock" in str(calls[0].args[0])
+        assert str(calls[len(version_ids)].args[0]).startswith("DELETE FROM")
+
+    @pytest.mark.asyncio
+    async def test_refresh_dirty_claim_skips_locked_rows(self):
+        """The claim skips rows another refresh holds instead of waiting."""
+        session = _postgres_session([])
+
+        await MaterializedViewService.refresh_dirty(session)
+
+        claim = str(session.execute.await_args_list[0].args[0])
+        assert "FOR UPDATE SKIP LOCKED" in claim
+
+    @pytest.mark.asyncio
+    async def test_refresh_dirty_without_dirty_versions(self):
+        """Nothing is recomputed when no version changed."""
+        session = _postgres_session([])
+
+        result = await MaterializedViewService.refresh_dirty(session)
+
+        assert result["status"] == "success"
+        assert result["versions"] == []
+        assert session.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_dirty_rolls_back_claim_on_error(self):
+        """A failed refresh marks the claimed versions dirty again."""
+        version_id = uuid.uuid4()
+        session = _postgres_session([version_id])
+        claim_result = session.execute.return_value
+        session.execute.side_effect = [claim_result, RuntimeError("boom"), MagicMock()]
+
+        result = await MaterializedViewService.refresh_dirty(session)
+
+        assert result["status"] == "error"
+        assert "boom" in result["error"]
+        session.rollback.assert_awaited_once()
+        remark = session.execute.await_args_list[-1]
+        assert str(remark.args[0]).strip().startswith(
+            "INSERT INTO efir_budget.summary_dirty_versions"
+        )
+        assert remark.args[1] == {"version_ids": [version_id]}
+        # Claim commit, then the re-mark commit
+        assert session.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_dirty_rebuilds_tables_on_separate_sessions(self):
+        """With a session factory, each summary table gets its own session."""
+        version_id = uuid.uuid4()
+        session = _postgres_session([version_id])
+        table_sessions: list[AsyncMock] = []
+
+        @asynccontextmanager
+        async def _open_session():
+            table_session = AsyncMock()
+            table_sessions.append(table_session)
+            yield table_session
+
+        result = await MaterializedViewService.refresh_dirty(
+            session, session_factory=_open_session
+        )
+
+        assert result["status"] == "success"
+        assert len(table_sessions) == len(MaterializedViewService.SUMMARY_TABLES)
+        for table_session in table_sessions:
+            assert table_session.execute.await_count == 3
+            table_session.commit.assert_awaited_once()
+        # Only the claim runs on the main session
+        assert session.execute.await_count == 1
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_mark_dirty_deduplicates_versions(self):
+        """mark_dirty inserts each version once and ignores empty input."""
+        version_id = uuid.uuid4()
+        session = _postgres_session([])
+
+        await MaterializedViewService.mark_dirty(session, [])
+        session.execute.assert_not_awaited()
+
+        await MaterializedViewService.mark_dirty(session, [version_id, version_id])
+        assert session.execute.await_args.args[1] == {"version_ids": [version_id]}
+
+    @pytest.mark.asyncio
+    async def test_refresh_dirty_sqlite_fallback(
+        self,
+        db_session: AsyncSession,
+    ):
+        """SQLite has no summary tables: nothing to refresh."""
+        result = await MaterializedViewService.refresh_dirty(db_session)
+
+        assert result == {"status": "success", "versions": [], "duration_seconds": 0.0}
+        assert await MaterializedViewService.get_dirty_count(db_session) == 0
+
+
 class TestMaterializedViewServiceRefreshView:
     """Tests for refresh_view() method."""
 
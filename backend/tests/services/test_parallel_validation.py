@@ -0,0 +1,95 @@
+"""
+Tests for chunked import validation.
+
+Tests cover:
+- Chunking of lazily consumed rows
+- Inline validation of small inputs with the worker initializer
+- Process pool validation of large inputs, merged in row order
+"""
+
+from __future__ import annotations
+
+import pytest
+from app.services.historical_import_service import (
+    ImportModule,
+    ImportStatus,
+    _validate_rows_chunk,
+)
+from app.services.parallel_validation import (
+    get_validation_pool,
+    iter_chunks,
+    validate_in_chunks,
+)
+
+CONTEXT = (2024, ImportModule.ENROLLMENT, ("level_code", "student_count"))
+
+
+def _rows(count: int) -> list[dict[str, str]]:
+    """Enrollment rows where every third row has an invalid count."""
+    return [
+        {"level_code": f"L{i}", "student_count": "abc" if i % 3 == 0 else str(i)}
+        for i in range(count)
+    ]
+
+
+class TestIterChunks:
+    """Tests for iter_chunks."""
+
+    def test_chunks_preserve_order(self):
+        """Items are split into consecutive chunks, the last one shorter."""
+        assert list(iter_chunks(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_empty_input(self):
+        """No chunk is produced for empty input."""
+        assert list(iter_chunks([], 3)) == []
+
+
+class TestValidateInChunks:
+    """Tests for validate_in_chunks."""
+
+    @pytest.mark.asyncio
+    async def test_small_input_validated_inline(self):
+        """Below the threshold validation runs in-process."""
+        results = await validate_in_chunks(
+            _rows(5),
+            _validate_rows_chunk,
+            context=CONTEXT,
+            chunk_size=2,
+        )
+
+        assert [r.row_number for r in results] == [2, 3, 4, 5, 6]
+        assert [r.status for r in results][:2] == [ImportStatus.ERROR, ImportStatus.VALID]
+
+    @pytest.mark.asyncio
+    async def test_large_input_validated_in_process_pool(self):
+        """Chunks validated by worker processes are merged in row order."""
+        rows = _rows(9)
+
+        results = await validate_in_chunks(
+            iter(rows),
+            _validate_rows_chunk,
+            context=CONTEXT,
+            chunk_size=2,
+            min_parallel_rows=4,
+        )
+
+        assert [r.row_number for r in results] == list(range(2, 11))
+        assert [r.dimension_code for r in results] == [row["level_code"] for row in rows]
+        assert sum(r.status == ImportStatus.ERROR for r in results) == 3
+
+    @pytest.mark.asyncio
+    async def test_process_pool_shared_across_validations(self):
+        """Validations of different files reuse the same worker processes."""
+        pool = get_validation_pool()
+
+        for fiscal_year in (2023, 2024):
+            results = await validate_in_chunks(
+                _rows(4),
+                _validate_rows_chunk,
+                context=(fiscal_year, *CONTEXT[1:]),
+                chunk_size=2,
+                min_parallel_rows=4,
+            )
+            assert [r.row_number for r in results] == [2, 3, 4, 5]
+
+        assert get_validation_pool() is pool
@@ -0,0 +1,283 @@
+"""
+Tests for SummaryRefreshScheduler.
+
+Tests cover:
+- Coalescing notification bursts into one refresh after the quiet period
+- Maximum delay under continuous writes
+- Polling for versions marked dirty by other processes
+- Staleness and pending count metrics
+- Notifying the scheduler only after the write commits
+"""
+
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.services.summary_refresh_scheduler import (
+    SUMMARY_REFRESH_PENDING,
+    SUMMARY_REFRESH_STALENESS,
+    SummaryRefreshScheduler,
+    notify_summary_write,
+    set_summary_refresh_scheduler,
+)
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SERVICE = "app.services.summary_refresh_scheduler.MaterializedViewService"
+
+
+def _session_factory() -> MagicMock:
+    """Session factory yielding mock sessions."""
+
+    @asynccontextmanager
+    async def _session():
+        yield AsyncMock()
+
+    return MagicMock(side_effect=_session)
+
+
+@pytest.fixture
+def refresh_dirty():
+    """Patch refresh_dirty with a successful refresh."""
+    with patch(
+        f"{SERVICE}.refresh_dirty",
+        new=AsyncMock(return_value={"status": "success", "versions": [], "duration_seconds": 0}),
+    ) as mock_refresh:
+        yield mock_refresh
+
+
+@pytest.fixture(autouse=True)
+def compact_revisions():
+    """Patch the data revision log compaction."""
+    with patch(
+        "app.services.summary_refresh_scheduler.compact_data_revisions",
+        new=AsyncMock(return_value=0),
+    ) as mock_compact:
+        yield mock_compact
+
+
+@pytest.fixture
+def dirty_count():
+    """Patch get_dirty_count (no pending versions by default)."""
+    with patch(f"{SERVICE}.get_dirty_count", new=AsyncMock(return_value=0)) as mock_count:
+        yield mock_count
+
+
+class VirtualTime:
+    """
+    Drive a scheduler in virtual time, without real sleeps.
+
+    Each wakeup wait resolves at once: at the next scripted notification when
+    it falls within the timeout, otherwise by advancing the clock by the
+    timeout. Once the clock reaches idle_at with no notification left, the
+    next poll wait blocks and sets idle, so tests can stop the scheduler.
+    """
+
+    def __init__(
+        self,
+        scheduler: SummaryRefreshScheduler,
+        notify_at: tuple[float, ...] = (),
+        idle_at: float = 0.0,
+    ):
+        self.now = 0.0
+        self.scheduler = scheduler
+        self.pending = sorted(notify_at)
+        self.idle_at = idle_at
+        self.idle = asyncio.Event()
+        scheduler.clock = lambda: self.now
+        scheduler._wait_for_wakeup = self.wait_for_wakeup
+
+    async def wait_for_wakeup(self, seconds: float) -> bool:
+        if self.pending and self.pending[0] <= self.now + seconds:
+            self.now = max(self.now, self.pending.pop(0))
+            self.scheduler.notify(uuid.uuid4())
+            return True
+        if (
+            not self.pending
+            and self.now >= self.idle_at
+            and seconds == self.scheduler.poll_interval
+        ):
+            self.idle.set()
+            await asyncio.Event().wait()
+        self.now += seconds
+        return False
+
+    def record_refreshes(self, refresh_dirty: AsyncMock) -> list[float]:
+        """Record the virtual time of each refresh_dirty call."""
+        refreshed_at: list[float] = []
+
+        async def _refresh(*args, **kwargs):
+            refreshed_at.append(self.now)
+            return {"status": "success", "versions": [], "duration_seconds": 0}
+
+        refresh_dirty.side_effect = _refresh
+        return refreshed_at
+
+    async def run_until_idle(self) -> None:
+        """Run the scheduler until it waits for work that never comes."""
+        self.scheduler.start()
+        try:
+            await asyncio.wait_for(self.idle.wait(), timeout=5)
+        finally:
+            await self.scheduler.stop()
+
+
+class TestDebouncing:
+    """Tests for coalescing notifications."""
+
+    @pytest.mark.asyncio
+    async def test_burst_of_notifications_triggers_one_refresh(self, refresh_dirty, dirty_count):
+        """Notifications within the quiet period coalesce into a single refresh."""
+        scheduler = SummaryRefreshScheduler(
+            _session_factory(), quiet_period=0.05, max_delay=5.0, poll_interval=60.0
+        )
+        clock = VirtualTime(scheduler, notify_at=tuple(i * 0.01 for i in range(10)))
+        refreshed_at = clock.record_refreshes(refresh_dirty)
+
+        await clock.run_until_idle()
+
+        # One refresh, a quiet period after the last notification
+        assert refreshed_at == [pytest.approx(0.09 + 0.05)]
+        # Tables are rebuilt concurrently on sessions from the factory
+        assert refresh_dirty.await_args.kwargs["session_factory"] is scheduler.session_factory
+
+    @pytest.mark.asyncio
+    async def test_continuous_writes_refresh_after_max_delay(self, refresh_dirty, dirty_count):
+        """A steady stream of writes still refreshes once max_delay elapses."""
+        scheduler = SummaryRefreshScheduler(
+            _session_factory(), quiet_period=0.05, max_delay=0.15, poll_interval=60.0
+        )
+        clock = VirtualTime(scheduler, notify_at=tuple(i * 0.02 for i in range(16)))
+        refreshed_at = clock.record_refreshes(refresh_dirty)
+
+        await clock.run_until_idle()
+
+        # The first refresh does not wait for the writes to stop
+        assert refreshed_at[0] == pytest.approx(0.15)
+        assert len(refreshed_at) == 2
+
+    @pytest.mark.asyncio
+    async def test_poll_refreshes_versions_marked_elsewhere(self, refresh_dirty, dirty_count):
+        """Without notifications, polling refreshes when the dirty count is positive."""
+        dirty_count.return_value = 3
+        scheduler = SummaryRefreshScheduler(
+            _session_factory(), quiet_period=0.05, max_delay=5.0, poll_interval=0.05
+        )
+        clock = VirtualTime(scheduler, idle_at=0.05)
+
+        await clock.run_until_idle()
+
+        assert refresh_dirty.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_poll_without_dirty_versions_does_not_refresh(
+        self, refresh_dirty, dirty_count
+    ):
+        """Polling with nothing dirty only updates the pending gauge."""
+        scheduler = SummaryRefreshScheduler(
+            _session_factory(), quiet_period=0.05, max_delay=5.0, poll_interval=0.03
+        )
+        clock = VirtualTime(scheduler, idle_at=0.09)
+
+        await clock.run_until_idle()
+
+        refresh_dirty.assert_not_awaited()
+        assert dirty_count.await_count == 3
+        assert SUMMARY_REFRESH_PENDING._value.get() == 0
+
+
+class TestMetrics:
+    """Tests for staleness and pending metrics."""
+
+    @pytest.mark.asyncio
+    async def test_successful_refresh_resets_staleness(self, refresh_dirty, dirty_count):
+        """Staleness counts from the last successful refresh."""
+        dirty_count.return_value = 2
+        scheduler = SummaryRefreshScheduler(_session_factory())
+        scheduler.last_refresh_at = time.time() - 120
+
+        assert SUMMARY_REFRESH_STALENESS.collect()[0].samples[0].value >= 120
+
+        result = await scheduler.refresh_now()
+
+        assert result["status"] == "success"
+        assert scheduler.staleness_seconds() < 5
+        assert SUMMARY_REFRESH_PENDING._value.get() == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_staleness(self, refresh_dirty, dirty_count):
+        """A failed refresh does not count as fresh."""
+        refresh_dirty.return_value = {"status": "error", "versions": [], "error": "boom"}
+        scheduler = SummaryRefreshScheduler(_session_factory())
+        scheduler.last_refresh_at = time.time() - 120
+
+        result = await scheduler.refresh_now()
+
+        assert result["status"] == "error"
+        assert scheduler.staleness_seconds() >= 120
+
+
+    @pytest.mark.asyncio
+    async def test_refresh_compacts_revision_log(
+        self, refresh_dirty, dirty_count, compact_revisions
+    ):
+        """Each refresh compacts the revision log; a compaction failure is not fatal."""
+        scheduler = SummaryRefreshScheduler(_session_factory())
+
+        await scheduler.refresh_now()
+        compact_revisions.side_effect = RuntimeError("boom")
+        result = await scheduler.refresh_now()
+
+        assert compact_revisions.await_count == 2
+        assert result["status"] == "success"
+
+
+class TestNotifySummaryWrite:
+    """Tests for the module-level notification hook."""
+
+    def test_notify_without_scheduler_is_noop(self):
+        """Writes are ignored when no scheduler runs (e.g. in tests)."""
+        set_summary_refresh_scheduler(None)
+        session = MagicMock()
+        session.sync_session.info = {}
+
+        notify_summary_write(session, uuid.uuid4())
+
+        assert session.sync_session.info == {}
+
+    @pytest.mark.asyncio
+    async def test_notify_forwards_to_scheduler_after_commit(self, db_session: AsyncSession):
+        """Writes reach the scheduler only once the session commits."""
+        scheduler = MagicMock()
+        version_id = uuid.uuid4()
+        set_summary_refresh_scheduler(scheduler)
+        try:
+            await db_session.execute(text("SELECT 1"))
+            notify_summary_write(db_session, version_id)
+            scheduler.notify.assert_not_called()
+
+            await db_session.commit()
+        finally:
+            set_summary_refresh_scheduler(None)
+
+        scheduler.notify.assert_called_once_with(version_id)
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_write_is_not_notified(self, db_session: AsyncSession):
+        """A rolled back write never reaches the scheduler."""
+        scheduler = MagicMock()
+        set_summary_refresh_scheduler(scheduler)
+        try:
+            await db_session.execute(text("SELECT 1"))
+            notify_summary_write(db_session, uuid.uuid4())
+            await db_session.rollback()
+
+            await db_session.execute(text("SELECT 1"))
+            await db_session.commit()
+        finally:
+            set_summary_refresh_scheduler(None)
+
+        scheduler.notify.assert_not_called()
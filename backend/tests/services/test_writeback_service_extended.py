@@ -17,6 +17,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID, uuid4
 
 import pytest
+from app.core.pagination import decode_cursor, encode_cursor
 from app.schemas.writeback import (
     BatchUpdateRequest,
     CellUpdate,
@@ -27,6 +28,7 @@ from app.schemas.writeback import (
 )
 from app.services.exceptions import (
     NotFoundError,
+    ValidationError,
     VersionConflictError,
 )
 from app.services.writeback_service import WritebackService
@@ -1067,6 +1069,74 @@ class TestChangeHistory:
         assert result[1].changed_at > result[2].changed_at
 
 
+    @pytest.mark.asyncio
+    async def test_get_change_history_keyset_first_page(self):
+        """Test a keyset page fetches one extra row and returns a cursor."""
+        mock_session = AsyncMock(spec=AsyncSession)
+
+        budget_version_id = uuid4()
+        changes = [create_mock_change(uuid4(), budget_version_id) for _ in range(3)]
+
+        mock_result = MagicMock()
+        mock_result.fetchall.return_value = [MagicMock(_mapping=c) for c in changes]
+        mock_session.execute.return_value = mock_result
+
+        service = WritebackService(mock_session)
+        page = await service.get_change_history_keyset(budget_version_id, page_size=2)
+
+        assert len(page["items"]) == 2
+        assert page["has_more"] is True
+        assert page["total"] is None
+        assert decode_cursor(page["next_cursor"]) == (
+            changes[1]["changed_at"],
+            changes[1]["id"],
+        )
+
+        query, params = mock_session.execute.call_args[0]
+        assert "ORDER BY changed_at DESC, id DESC" in str(query)
+        assert "OFFSET" not in str(query)
+        assert params["limit"] == 3
+
+    @pytest.mark.asyncio
+    async def test_get_change_history_keyset_continues_after_cursor(self):
+        """Test the cursor becomes a (changed_at, id) row comparison."""
+        mock_session = AsyncMock(spec=AsyncSession)
+
+        budget_version_id = uuid4()
+        last_changed_at = datetime(2025, 3, 1, 12, 0, 0)
+        last_id = uuid4()
+
+        mock_result = MagicMock()
+        mock_result.fetchall.return_value = []
+        mock_session.execute.return_value = mock_result
+
+        service = WritebackService(mock_session)
+        page = await service.get_change_history_keyset(
+            budget_version_id,
+            module_code="enrollment",
+            cursor=encode_cursor(last_changed_at, last_id),
+        )
+
+        assert page["items"] == []
+        assert page["next_cursor"] is None
+        query, params = mock_session.execute.call_args[0]
+        assert "(changed_at, id) < (:last_changed_at, :last_id)" in str(query)
+        assert params["last_changed_at"] == last_changed_at
+        assert params["last_id"] == str(last_id)
+        assert params["module_code"] == "enrollment"
+
+    @pytest.mark.asyncio
+    async def test_get_change_history_keyset_rejects_malformed_cursor(self):
+        """Test a malformed cursor raises ValidationError."""
+        mock_session = AsyncMock(spec=AsyncSession)
+
+        service = WritebackService(mock_session)
+        with pytest.raises(ValidationError):
+            await service.get_change_history_keyset(uuid4(), cursor="not-a-cursor")
+
+        mock_session.execute.assert_not_awaited()
+
+
 # ==============================================================================
 # Cache Invalidation Tests
 # ==============================================================================
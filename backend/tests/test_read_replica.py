@@ -0,0 +1,179 @@
+"""
+Tests for read replica routing.
+
+Covers:
+- Replica lag measurement and fallback to the primary
+- Read-your-writes pins after mutating requests
+- get_read_db session and get_read_session_factory factory selection
+"""
+
+import math
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app import database
+from app.database import (
+    ReadYourWritesPins,
+    ReplicaLagMonitor,
+    get_db,
+    get_read_db,
+    get_read_session_factory,
+    use_read_replica,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import Request
+
+
+def _request(method: str = "GET", user_id: str | None = "user-1") -> Request:
+    """Build a request as seen after the auth middleware."""
+    request = Request({"type": "http", "method": method, "path": "/", "headers": []})
+    if user_id:
+        request.state.user_id = user_id
+    return request
+
+
+@pytest.fixture
+def pins():
+    """Fresh pins installed as the module's read-your-writes pins."""
+    fresh = ReadYourWritesPins(ttl=60)
+    with patch.object(database, "read_your_writes_pins", fresh):
+        yield fresh
+
+
+@pytest.fixture
+def monitor():
+    """Lag monitor installed as the module's monitor, measuring no lag."""
+    fresh = ReplicaLagMonitor(max_lag=5, check_interval=60)
+    with (
+        patch.object(database, "replica_lag_monitor", fresh),
+        patch.object(fresh, "_measure", AsyncMock(return_value=0.2)),
+    ):
+        yield fresh
+
+
+@pytest.fixture
+def replica(engine):
+    """Configure a replica (the test database) for the duration of a test."""
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    with (
+        patch.object(database, "read_engine", engine),
+        patch.object(database, "ReadSessionLocal", factory),
+    ):
+        yield factory
+
+
+class TestReplicaLagMonitor:
+    """Tests for ReplicaLagMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_lag_threshold(self):
+        monitor = ReplicaLagMonitor(max_lag=5, check_interval=0)
+        engine = MagicMock()
+
+        with patch.object(monitor, "_measure", AsyncMock(side_effect=[1.0, 12.0])):
+            assert await monitor.is_usable(engine)
+            assert not await monitor.is_usable(engine)
+
+    @pytest.mark.asyncio
+    async def test_measured_once_per_interval(self):
+        monitor = ReplicaLagMonitor(max_lag=5, check_interval=60)
+        measure = AsyncMock(return_value=1.0)
+
+        with patch.object(monitor, "_measure", measure):
+            for _ in range(3):
+                assert await monitor.is_usable(MagicMock())
+
+        measure.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_is_unusable(self):
+        """Test a failed measurement counts as infinite lag."""
+        monitor = ReplicaLagMonitor(max_lag=5, check_interval=0)
+        engine = MagicMock()
+        engine.connect.side_effect = OSError("connection refused")
+
+        assert not await monitor.is_usable(engine)
+        assert monitor.lag == math.inf
+
+
+class TestReadYourWritesPins:
+    """Tests for ReadYourWritesPins."""
+
+    @pytest.mark.asyncio
+    async def test_pin_and_expiry(self):
+        pins = ReadYourWritesPins(ttl=60)
+        expired = ReadYourWritesPins(ttl=0)
+
+        await pins.pin("user-1")
+        await expired.pin("user-1")
+
+        assert await pins.is_pinned("user-1")
+        assert not await pins.is_pinned("user-2")
+        assert not await expired.is_pinned("user-1")
+
+
+class TestUseReadReplica:
+    """Tests for the routing decision."""
+
+    @pytest.mark.asyncio
+    async def test_no_replica_configured(self):
+        with patch.object(database, "read_engine", None):
+            assert not await use_read_replica(_request())
+
+    @pytest.mark.asyncio
+    async def test_routes_to_replica(self, replica, pins, monitor):
+        assert await use_read_replica(_request())
+
+    @pytest.mark.asyncio
+    async def test_pinned_user_reads_primary(self, replica, pins, monitor):
+        await pins.pin("user-1")
+
+        assert not await use_read_replica(_request(user_id="user-1"))
+        assert await use_read_replica(_request(user_id="user-2"))
+
+    @pytest.mark.asyncio
+    async def test_lagging_replica_reads_primary(self, replica, pins, monitor):
+        monitor._measure.return_value = 30.0
+
+        assert not await use_read_replica(_request())
+
+
+class TestGetReadDb:
+    """Tests for get_read_db and the pin recorded by get_db."""
+
+    @pytest.mark.asyncio
+    async def test_primary_session_without_replica(self, db_session):
+        sessions = get_read_db(use_replica=False, db=db_session)
+
+        assert await anext(sessions) is db_session
+        await sessions.aclose()
+
+    @pytest.mark.asyncio
+    async def test_replica_session(self, db_session, replica):
+        sessions = get_read_db(use_replica=True, db=db_session)
+
+        session = await anext(sessions)
+        assert session is not db_session
+        assert session.bind is replica.kw["bind"]
+        await sessions.aclose()
+
+    @pytest.mark.asyncio
+    async def test_committed_mutation_pins_user(self, replica, pins):
+        for method in ("GET", "POST"):
+            sessions = get_db(_request(method=method, user_id=f"{method}-user"))
+            await anext(sessions)
+            with pytest.raises(StopAsyncIteration):
+                await anext(sessions)
+
+        assert await pins.is_pinned("POST-user")
+        assert not await pins.is_pinned("GET-user")
+
+
+class TestGetReadSessionFactory:
+    """Tests for the session factory of multi-session read routes."""
+
+    def test_primary_factory_when_replica_not_allowed(self, replica):
+        assert get_read_session_factory(use_replica=False) is database.AsyncSessionLocal
+
+    def test_replica_factory(self, replica):
+        assert get_read_session_factory(use_replica=True) is replica